@@ -0,0 +1,203 @@
+"""Generator obciążenia dla serwera API (src.api).
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.api_load [--url URL] [--clients N]
+        [--requests N] [--workers N]
+
+Bez --url skrypt uruchamia serwer w tym samym procesie na wolnym porcie.
+Ponieważ klienci i serwer dzielą wtedy GIL, bardziej miarodajny jest
+pomiar serwera uruchomionego osobno (python -m src.api) i wskazanego
+przez --url. Przed pomiarem skrypt zakłada przez API klientów i pojazdy.
+
+Każdy klient to wątek z jednym połączeniem keep-alive, wysyłający
+mieszankę żądań: 40% wolne pojazdy w popularnych terminach, 20% raport,
+20% pobranie klienta lub pojazdu i 20% rezerwacje. Wynik to liczba
+żądań na sekundę oraz opóźnienia p50/p95/p99 dla każdego rodzaju
+żądania i łącznie.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.api import RentalApi, RentalHTTPServer
+from src.customers import CustomerRegistry
+from src.rental import RentalManager
+from src.vehicles import VehicleInventory
+
+CUSTOMERS = 200
+VEHICLES = 500
+
+
+class Client:
+    def __init__(self, host: str, port: int) -> None:
+        self.connection = http.client.HTTPConnection(host, port, timeout=30)
+        self.connection.connect()
+        self.connection.sock.setsockopt(
+            socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+        )
+
+    def call(
+        self, method: str, path: str, body: Optional[dict] = None
+    ) -> Tuple[int, object]:
+        payload = None if body is None else json.dumps(body).encode()
+        headers = {} if body is None else {
+            "Content-Type": "application/json"
+        }
+        self.connection.request(method, path, payload, headers)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def seed(client: Client) -> None:
+    today = date.today()
+    for i in range(CUSTOMERS):
+        client.call("POST", "/customers", {
+            "customer_id": f"C{i}",
+            "first_name": "Jan",
+            "last_name": f"Kowalski{i % 20}",
+            "email": f"c{i}@example.com",
+            "phone": f"{500000000 + i}",
+            "address": "ul. Przykładowa 1, Warszawa",
+            "license_number": f"L{i}",
+            "license_issue_date": str(today - timedelta(days=365)),
+            "license_expiry_date": str(today + timedelta(days=3650)),
+            "license_categories": ["B"],
+        })
+    for i in range(VEHICLES):
+        client.call("POST", "/vehicles", {
+            "vehicle_id": f"V{i}",
+            "make": "Toyota",
+            "model": "Corolla",
+            "year": 2020,
+            "registration_number": f"WA{i}",
+            "daily_rate": 100.0,
+            "vehicle_type": "compact",
+        })
+
+
+def worker(
+    host: str,
+    port: int,
+    requests: int,
+    seed_value: int,
+    latencies: Dict[str, List[float]],
+    barrier: threading.Barrier,
+) -> None:
+    rng = random.Random(seed_value)
+    today = date.today()
+    client = Client(host, port)
+    own: Dict[str, List[float]] = {}
+    barrier.wait()
+    for _ in range(requests):
+        roll = rng.random()
+        popular = today + timedelta(days=rng.choice((1, 1, 2, 7, 14)))
+        if roll < 0.4:
+            kind, method, body = "wolne pojazdy", "GET", None
+            path = f"/vehicles/available?start={popular}&end={popular}"
+        elif roll < 0.6:
+            kind, method, body = "raport", "GET", None
+            path = f"/reports/rentals?start={today}&end={popular}"
+        elif roll < 0.8:
+            kind, method, body = "pobranie", "GET", None
+            path = rng.choice((
+                f"/customers/C{rng.randrange(CUSTOMERS)}",
+                f"/vehicles/V{rng.randrange(VEHICLES)}",
+            ))
+        else:
+            kind, method, path = "rezerwacja", "POST", "/rentals"
+            day = today + timedelta(days=rng.randrange(1, 365))
+            body = {
+                "customer_id": f"C{rng.randrange(CUSTOMERS)}",
+                "vehicle_id": f"V{rng.randrange(VEHICLES)}",
+                "start_date": str(day),
+                "end_date": str(day),
+            }
+        started = time.perf_counter()
+        client.call(method, path, body)
+        own.setdefault(kind, []).append(time.perf_counter() - started)
+    client.close()
+    for kind, values in own.items():
+        latencies.setdefault(kind, []).extend(values)
+
+
+def percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="adres działającego serwera API")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        api = RentalApi(
+            CustomerRegistry(), VehicleInventory(), RentalManager()
+        )
+        server = RentalHTTPServer(("127.0.0.1", 0), api, args.workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = "127.0.0.1", server.server_port
+
+    client = Client(host, port)
+    seed(client)
+    client.close()
+
+    latencies: Dict[str, List[float]] = {}
+    barrier = threading.Barrier(args.clients + 1)
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(host, port, args.requests, n, latencies, barrier),
+        )
+        for n in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    latencies["razem"] = [v for values in latencies.values() for v in values]
+    print(
+        f"{args.clients} klientów, {len(latencies['razem'])} żądań, "
+        f"{len(latencies['razem']) / elapsed:,.0f} żądań/s"
+    )
+    print(f"{'':<15}{'liczba':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for kind, values in latencies.items():
+        values.sort()
+        print(
+            f"{kind:<15}{len(values):>8}"
+            + "".join(
+                f"{percentile(values, p) * 1000:9.1f}"
+                for p in (0.5, 0.95, 0.99)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,93 @@
+"""Pomiar hurtowego importu pojazdów z pliku CSV.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.bulk_load [liczba_pojazdów]
+
+Generuje plik CSV z zadaną liczbą pojazdów (co drugi to Car), wczytuje
+go przez VehicleInventory.load_vehicles do magazynu SQLite w pamięci
+i podaje czas importu. Przy imporcie do magazynu zużycie pamięci nie
+rośnie z rozmiarem pliku, bo plik jest czytany porcjami; można to
+sprawdzić opcją --memory (pomiar przez tracemalloc, wyraźnie wolniej).
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from src.sqlite_storage import SQLiteStorage
+from src.vehicles import VehicleInventory
+
+
+def write_fleet(path: str, count: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "vehicle_id",
+                "make",
+                "model",
+                "year",
+                "registration_number",
+                "daily_rate",
+                "vehicle_type",
+                "doors",
+                "fuel_type",
+                "transmission",
+            ]
+        )
+        for i in range(count):
+            car = i % 2 == 1
+            writer.writerow(
+                [
+                    f"V{i}",
+                    "Toyota",
+                    "Corolla",
+                    2015 + i % 10,
+                    f"WA{i:07d}",
+                    100 + i % 200,
+                    "compact",
+                    5 if car else "",
+                    "benzyna" if car else "",
+                    "manualna" if car else "",
+                ]
+            )
+
+
+def main(argv: List[str]) -> None:
+    measure_memory = "--memory" in argv
+    argv = [arg for arg in argv if arg != "--memory"]
+    count = int(argv[0]) if argv else 1_000_000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "fleet.csv")
+        write_fleet(path, count)
+
+        for name, storage in (
+            ("pamięć", None),
+            ("SQLite", SQLiteStorage()),
+        ):
+            inventory = VehicleInventory(storage)
+            if measure_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            result = inventory.load_vehicles(path)
+            elapsed = time.perf_counter() - started
+            line = (
+                f"{name:<8} {result.loaded} pojazdów w {elapsed:.2f} s"
+                f" ({result.loaded / elapsed:,.0f}/s)"
+            )
+            if measure_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                line += f", szczyt pamięci {peak / 2**20:.1f} MiB"
+            print(line)
+            if storage is not None:
+                storage.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
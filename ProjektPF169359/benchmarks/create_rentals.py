@@ -0,0 +1,103 @@
+"""Porównanie tworzenia wypożyczeń pojedynczo i partią.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.create_rentals [liczba_zgłoszeń]
+
+Zgłoszenia dotyczą przyszłych terminów na flocie 1000 pojazdów, a co
+dziesiąte koliduje z wcześniejszym zgłoszeniem. Pomiar jest wykonywany
+bez magazynu i z magazynem SQLite w pliku, gdzie partia zapisuje się
+w jednej transakcji zamiast zatwierdzać każde wypożyczenie osobno.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from src.customers import Customer, DrivingLicense
+from src.rental import RentalException, RentalManager
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+from src.vehicles import Vehicle, VehicleType
+
+VEHICLES = 1000
+
+
+def make_requests(count: int) -> List[Tuple]:
+    today = date.today()
+    license = DrivingLicense(
+        "ABC123", today - timedelta(days=365), today + timedelta(days=3650),
+        ["B"],
+    )
+    customers = [
+        Customer(f"C{i}", "Jan", "Kowalski", "e", "t", "a", license)
+        for i in range(100)
+    ]
+    vehicles = [
+        Vehicle(f"V{i}", "Toyota", "Corolla", 2020, f"WA{i}", 100.0,
+                VehicleType.COMPACT)
+        for i in range(VEHICLES)
+    ]
+    requests = []
+    for i in range(count):
+        # Każdy pojazd dostaje kolejne trzydniowe terminy; co dziesiąte
+        # zgłoszenie powtarza poprzedni termin tego pojazdu.
+        slot = i // VEHICLES - (1 if i % 10 == 9 and i >= VEHICLES else 0)
+        start = today + timedelta(days=1 + 3 * slot)
+        requests.append(
+            (
+                customers[i % len(customers)],
+                vehicles[i % VEHICLES],
+                start,
+                start + timedelta(days=2),
+            )
+        )
+    return requests
+
+
+def one_by_one(manager: RentalManager, requests: List[Tuple]) -> None:
+    for request in requests:
+        try:
+            manager.create_rental(*request)
+        except RentalException:
+            pass
+
+
+def batch(manager: RentalManager, requests: List[Tuple]) -> None:
+    manager.create_rentals(requests)
+
+
+def measure(
+    run: Callable[[RentalManager, List[Tuple]], None],
+    storage: Optional[Storage],
+    count: int,
+) -> float:
+    manager = RentalManager(storage)
+    requests = make_requests(count)
+    started = time.perf_counter()
+    run(manager, requests)
+    return time.perf_counter() - started
+
+
+def main(argv: List[str]) -> None:
+    count = int(argv[0]) if argv else 5_000
+    for name in ("pamięć", "SQLite"):
+        for label, run in (("pojedynczo", one_by_one), ("partią", batch)):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                storage = None
+                if name == "SQLite":
+                    storage = SQLiteStorage(os.path.join(tmpdir, "bench.db"))
+                elapsed = measure(run, storage, count)
+                if storage is not None:
+                    storage.close()
+            print(
+                f"{name:<8} {label:<11} {elapsed:6.2f} s"
+                f" ({count / elapsed:,.0f} zgłoszeń/s)"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,52 @@
+"""Pomiar wyszukiwania klientów z literówkami w magazynie SQLite.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.fuzzy_search [liczba_klientów ...]
+
+Dla każdej liczby klientów z generatora (domyślnie 10 000, 30 000
+i 100 000) zapisuje ich do magazynu SQLite w pamięci i mierzy średni
+czas SQLiteStorage.customer_ids_by_similarity dla kilku zapytań, w tym
+adresu e-mail podobnego do wszystkich adresów z generatora. Trójki
+znaków występujące w wielu tekstach nie wybierają kandydatów, więc czas
+zapytania nie powinien rosnąć proporcjonalnie do liczby klientów.
+"""
+
+import random
+import sys
+import time
+from datetime import date
+from typing import List
+
+from benchmarks.generator import make_customers
+from src.sqlite_storage import SQLiteStorage
+
+QUERIES = ["Kowalsky", "Nowack Anna", "klient123@example.com"]
+REPEATS = 5
+
+
+def main(argv: List[str]) -> None:
+    counts = [int(arg) for arg in argv] or [10_000, 30_000, 100_000]
+    print(f"{'klienci':>9} {'zapis':>8}  " + "  ".join(
+        f"{query:>22}" for query in QUERIES
+    ))
+    for count in counts:
+        customers = make_customers(random.Random(0), count, date.today())
+        storage = SQLiteStorage()
+        started = time.perf_counter()
+        storage.save_customers(customers)
+        saved = time.perf_counter() - started
+
+        timings = []
+        for query in QUERIES:
+            started = time.perf_counter()
+            for _ in range(REPEATS):
+                storage.customer_ids_by_similarity(query, 0.3, 10)
+            elapsed = (time.perf_counter() - started) / REPEATS
+            timings.append(f"{elapsed * 1000:19.2f} ms")
+        storage.close()
+        print(f"{count:>9,} {saved:6.2f} s  " + "  ".join(timings))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,286 @@
+"""Deterministyczny generator floty, klientów, wypożyczeń i opinii.
+
+Dane zależą wyłącznie od profilu rozmiaru, ziarna i daty odniesienia,
+więc kolejne przebiegi benchmarków mierzą ten sam stan. Historia
+wypożyczeń obejmuje zadaną liczbę lat: zakończone (część ze zwrotem po
+terminie i opłatami), anulowane, trwające i przyszłe rezerwacje, a część
+zakończonych ma opinie.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import List, NamedTuple, Optional
+
+from src.customers import (
+    Customer,
+    CustomerCategory,
+    CustomerRegistry,
+    DrivingLicense,
+)
+from src.rental import Rental, RentalManager, RentalStatus
+from src.reviews import Review
+from src.vehicles import (
+    Car,
+    Vehicle,
+    VehicleInventory,
+    VehicleStatus,
+    VehicleType,
+)
+
+
+class Profile(NamedTuple):
+    vehicles: int
+    customers: int
+    years: int
+
+
+SIZES = {
+    "S": Profile(vehicles=100, customers=1_000, years=1),
+    "M": Profile(vehicles=1_000, customers=10_000, years=2),
+    "L": Profile(vehicles=5_000, customers=50_000, years=3),
+    "XL": Profile(vehicles=20_000, customers=200_000, years=5),
+}
+
+FIRST_NAMES = [
+    "Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Magdalena", "Paweł",
+    "Agnieszka", "Michał", "Joanna", "Krzysztof", "Małgorzata", "Łukasz",
+    "Ewa", "Marcin", "Zofia", "Grzegorz", "Barbara", "Adam", "Natalia",
+]
+LAST_NAMES = [
+    "Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński",
+    "Lewandowski", "Zieliński", "Szymański", "Woźniak", "Dąbrowski",
+    "Kozłowski", "Jankowski", "Mazur", "Kwiatkowski", "Krawczyk",
+    "Piotrowski", "Grabowski", "Nowakowski", "Pawłowski", "Michalski",
+    "Nowicki", "Adamczyk", "Dudek", "Zając", "Wieczorek", "Jabłoński",
+    "Król", "Majewski", "Olszewski",
+]
+CITIES = ["Warszawa", "Kraków", "Łódź", "Wrocław", "Poznań", "Gdańsk"]
+STREETS = ["Kwiatowa", "Polna", "Leśna", "Słoneczna", "Krótka", "Długa"]
+
+# Marki i modele oraz przedział stawek dziennych dla typów pojazdów.
+MODELS = {
+    VehicleType.ECONOMY: (
+        [("Fiat", "Panda"), ("Toyota", "Aygo"), ("Skoda", "Fabia")],
+        (80, 120),
+    ),
+    VehicleType.COMPACT: (
+        [("Toyota", "Corolla"), ("Volkswagen", "Golf"), ("Ford", "Focus")],
+        (120, 180),
+    ),
+    VehicleType.STANDARD: (
+        [("Skoda", "Octavia"), ("Toyota", "Camry"), ("Opel", "Insignia")],
+        (160, 240),
+    ),
+    VehicleType.PREMIUM: (
+        [("BMW", "Seria 5"), ("Audi", "A6"), ("Mercedes", "Klasa E")],
+        (300, 500),
+    ),
+    VehicleType.SUV: (
+        [("Toyota", "RAV4"), ("Kia", "Sportage"), ("BMW", "X5")],
+        (200, 400),
+    ),
+    VehicleType.VAN: (
+        [("Ford", "Transit"), ("Renault", "Trafic"), ("Fiat", "Ducato")],
+        (220, 320),
+    ),
+}
+TYPE_WEIGHTS = [20, 30, 20, 10, 15, 5]
+CATEGORY_WEIGHTS = [70, 15, 10, 5]
+FUEL_TYPES = ["Benzyna", "Diesel", "Hybryda", "Elektryczny"]
+TRANSMISSIONS = ["Manualna", "Automatyczna"]
+
+POSITIVE = [
+    "Świetny samochód, polecam", "Czyste auto i szybka obsługa",
+    "Bardzo wygodny i oszczędny", "Wszystko zgodnie z umową",
+]
+NEGATIVE = [
+    "Brudne wnętrze", "Długie oczekiwanie na odbiór",
+    "Samochód miał usterkę hamulców", "Obsługa niemiła",
+]
+
+# Wypożyczeń na pojazd w roku historii i udział wypożyczeń z opinią.
+RENTALS_PER_VEHICLE_YEAR = 25
+REVIEW_SHARE = 0.3
+
+
+class Fleet(NamedTuple):
+    registry: CustomerRegistry
+    inventory: VehicleInventory
+    manager: RentalManager
+    customers: List[Customer]
+    vehicles: List[Vehicle]
+    today: date
+
+
+def make_customers(
+    rng: random.Random, count: int, today: date
+) -> List[Customer]:
+    categories = list(CustomerCategory)
+    customers = []
+    for i in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        issued = today - timedelta(days=rng.randrange(365, 365 * 30))
+        license = DrivingLicense(
+            license_number=f"{chr(65 + i % 26)}{i:08d}",
+            issue_date=issued,
+            # Prawo jazdy ważne jeszcze co najmniej rok.
+            expiry_date=today + timedelta(days=rng.randrange(365, 365 * 15)),
+            categories=["B"] if rng.random() < 0.8 else ["B", "C"],
+        )
+        customer = Customer(
+            customer_id=f"C{i:07d}",
+            first_name=first,
+            last_name=last,
+            email=f"klient{i}@example.com",
+            phone=f"{500_000_000 + i}",
+            address=(
+                f"ul. {rng.choice(STREETS)} {rng.randrange(1, 200)}, "
+                f"{rng.choice(CITIES)}"
+            ),
+            driving_license=license,
+        )
+        customer.registration_date = issued + timedelta(days=30)
+        customer.category = rng.choices(categories, CATEGORY_WEIGHTS)[0]
+        customers.append(customer)
+    return customers
+
+
+def make_vehicles(
+    rng: random.Random, count: int, today: date
+) -> List[Vehicle]:
+    types = list(MODELS)
+    vehicles: List[Vehicle] = []
+    for i in range(count):
+        vehicle_type = rng.choices(types, TYPE_WEIGHTS)[0]
+        models, (low, high) = MODELS[vehicle_type]
+        make, model = rng.choice(models)
+        args = (
+            f"V{i:06d}",
+            make,
+            model,
+            rng.randrange(today.year - 12, today.year + 1),
+            f"W{i:06d}",
+            float(rng.randrange(low, high + 1, 5)),
+            vehicle_type,
+        )
+        if vehicle_type != VehicleType.VAN and rng.random() < 0.7:
+            vehicles.append(
+                Car(
+                    *args,
+                    doors=rng.choice((3, 5, 5, 5)),
+                    fuel_type=rng.choice(FUEL_TYPES),
+                    transmission=rng.choice(TRANSMISSIONS),
+                )
+            )
+        else:
+            vehicles.append(Vehicle(*args))
+    return vehicles
+
+
+def _add_history(
+    rng: random.Random,
+    manager: RentalManager,
+    vehicle: Vehicle,
+    customers: List[Customer],
+    first_day: date,
+    today: date,
+    counter: List[int],
+) -> None:
+    # Średnia przerwa między wypożyczeniami daje zadaną ich liczbę w roku.
+    mean_gap = max(1.0, 365 / RENTALS_PER_VEHICLE_YEAR - 5)
+    day = first_day + timedelta(days=rng.randrange(10))
+    horizon = today + timedelta(days=60)
+    while day <= horizon:
+        duration = min(int(rng.expovariate(1 / 4)) + 1, 21)
+        start, end = day, day + timedelta(days=duration - 1)
+        # Klienci wracają nierówno - część wypożycza znacznie częściej.
+        customer = customers[
+            min(int(rng.paretovariate(1.2)) - 1, len(customers) - 1)
+            if rng.random() < 0.3
+            else rng.randrange(len(customers))
+        ]
+        counter[0] += 1
+        rental = Rental(
+            f"R{counter[0]:09d}",
+            customer,
+            vehicle,
+            start,
+            end,
+            vehicle.daily_rate,
+        )
+
+        roll = rng.random()
+        if roll < 0.05:
+            # Anulowanie zwalnia pojazd, ale nie zmienia jego bieżącego
+            # stanu wynikającego z innych wypożyczeń.
+            status = vehicle.status
+            rental.cancel()
+            vehicle.change_status(status)
+        elif end < today - timedelta(days=3) or (end < today and roll < 0.7):
+            if rng.random() < 0.1:
+                rental.add_charge("Tankowanie", float(rng.randrange(50, 300)))
+            late = 0
+            if rng.random() < 0.08:
+                late = rng.randrange(1, 4)
+            rental.complete(end + timedelta(days=late))
+            end += timedelta(days=late)
+        else:
+            # Trwające wypożyczenie, także niezwrócone po terminie.
+            if start <= today:
+                vehicle.change_status(VehicleStatus.RENTED)
+
+        customer.add_rental_to_history(rental.rental_id)
+        manager._insert_rental(rental)
+
+        if (
+            rental.status == RentalStatus.COMPLETED
+            and rng.random() < REVIEW_SHARE
+        ):
+            rating = rng.choices((1, 2, 3, 4, 5), (5, 5, 10, 35, 45))[0]
+            comment = rng.choice(POSITIVE if rating >= 4 else NEGATIVE)
+            manager._insert_review(
+                Review(
+                    rental.rental_id,
+                    customer.customer_id,
+                    rating,
+                    comment,
+                    rental.actual_return_date
+                    + timedelta(days=rng.randrange(3)),
+                )
+            )
+
+        day = end + timedelta(days=1 + int(rng.expovariate(1 / mean_gap)))
+
+
+def generate(
+    profile: Profile, seed: int = 0, today: Optional[date] = None
+) -> Fleet:
+    """Tworzy rejestr, inwentarz i menedżer wypełnione danymi profilu."""
+    if today is None:
+        today = date.today()
+    rng = random.Random(seed)
+    registry = CustomerRegistry()
+    inventory = VehicleInventory()
+    manager = RentalManager()
+
+    customers = make_customers(rng, profile.customers, today)
+    for customer in customers:
+        registry.register_customer(customer)
+    vehicles = make_vehicles(rng, profile.vehicles, today)
+    for vehicle in vehicles:
+        inventory.add_vehicle(vehicle)
+
+    first_day = today - timedelta(days=365 * profile.years)
+    counter = [0]
+    for vehicle in vehicles:
+        _add_history(
+            rng, manager, vehicle, customers, first_day, today, counter
+        )
+        if vehicle.status == VehicleStatus.AVAILABLE:
+            roll = rng.random()
+            if roll < 0.02:
+                vehicle.change_status(VehicleStatus.OUT_OF_SERVICE)
+            elif roll < 0.05:
+                vehicle.change_status(VehicleStatus.MAINTENANCE)
+    return Fleet(registry, inventory, manager, customers, vehicles, today)
@@ -0,0 +1,70 @@
+"""Pomiar pamięci zajmowanej przez obiekty domenowe.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.memory [liczba_obiektów]
+
+Dla każdej klasy tworzy zadaną liczbę obiektów i podaje średnią liczbę
+bajtów na obiekt zmierzoną przez tracemalloc (razem z kontenerami, które
+obiekt alokuje, ale bez współdzielonych argumentów konstruktora).
+"""
+
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, List
+
+from src.customers import Customer, DrivingLicense
+from src.rental import Rental
+from src.reviews import Review
+from src.vehicles import Car, Vehicle, VehicleType
+
+TODAY = date.today()
+ISSUED = TODAY - timedelta(days=365)
+END = TODAY + timedelta(days=3)
+CATEGORIES = ["B"]
+LICENSE = DrivingLicense("ABC", ISSUED, TODAY, CATEGORIES)
+CUSTOMER = Customer("C", "Jan", "Kowalski", "e", "t", "a", LICENSE)
+VEHICLE = Vehicle(
+    "V", "Toyota", "Corolla", 2020, "WA1", 100.0, VehicleType.COMPACT
+)
+
+FACTORIES = {
+    "DrivingLicense": lambda i: DrivingLicense(
+        "ABC", ISSUED, TODAY, CATEGORIES
+    ),
+    "Customer": lambda i: Customer(
+        "C", "Jan", "Kowalski", "e", "t", "a", LICENSE
+    ),
+    "Vehicle": lambda i: Vehicle(
+        "V", "Toyota", "Corolla", 2020, "WA1", 100.0, VehicleType.COMPACT
+    ),
+    "Car": lambda i: Car(
+        "V", "Toyota", "Corolla", 2020, "WA1", 100.0, VehicleType.COMPACT,
+        5, "benzyna", "manualna",
+    ),
+    "Rental": lambda i: Rental("R", CUSTOMER, VEHICLE, TODAY, END, 100.0),
+    "Review": lambda i: Review("R", "C", 5, "Super", TODAY),
+}
+
+
+def bytes_per_object(factory: Callable[[int], object], count: int) -> float:
+    objects: List[object] = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects.extend(factory(i) for i in range(count))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Sama lista referencji nie jest kosztem obiektów.
+    return (after - before - sys.getsizeof(objects)) / count
+
+
+def main(argv: List[str]) -> None:
+    count = int(argv[0]) if argv else 100_000
+    print(f"{'Klasa':<16}{'B/obiekt':>10}")
+    for name, factory in FACTORIES.items():
+        print(f"{name:<16}{bytes_per_object(factory, count):>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
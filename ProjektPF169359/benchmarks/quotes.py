@@ -0,0 +1,123 @@
+"""Porównanie wyceny pojazdów obiektami Rental i wsadowo (PricingEngine).
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.quotes [liczba_pojazdów] [powtórzenia]
+
+Wyceniany jest tygodniowy termin dla wszystkich pojazdów i każdej
+kategorii klienta - tak jak na stronie wyszukiwania z cenami. Wycena
+obiektami tworzy dla każdego pojazdu tymczasowe wypożyczenie i liczy jego
+koszt, a wycena wsadowa wykonuje jedno wywołanie quote_vehicles.
+
+Na końcu mierzony jest czas powtarzanych wycen pojedynczych pojazdów
+(quote_vehicle) z pamięcią podręczną wycen i bez niej.
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+from benchmarks.generator import make_customers, make_vehicles
+from src.customers import Customer, CustomerCategory
+from src.pricing import PricingEngine
+from src.rental import Rental
+from src.vehicles import Vehicle
+
+LATE_DAYS = 2
+
+
+def with_objects(
+    engine: PricingEngine,
+    vehicles: List[Vehicle],
+    customer: Customer,
+    start: date,
+    end: date,
+) -> List[float]:
+    totals = []
+    for vehicle in vehicles:
+        rental = Rental(
+            "wycena",
+            customer,
+            vehicle,
+            start,
+            end,
+            engine.discounted_rate(vehicle.daily_rate, customer.category),
+        )
+        totals.append(
+            rental.calculate_base_cost()
+            + engine.late_fee(rental.daily_rate, LATE_DAYS)
+        )
+    return totals
+
+
+def vectorized(
+    engine: PricingEngine,
+    vehicles: List[Vehicle],
+    customer: Customer,
+    start: date,
+    end: date,
+) -> List[float]:
+    return engine.quote_vehicles(
+        vehicles, customer.category, start, end, LATE_DAYS
+    ).total
+
+
+def measure(run: Callable[..., List[float]], repeat: int, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def repeated(
+    engine: PricingEngine,
+    vehicles: List[Vehicle],
+    customer: Customer,
+    start: date,
+    end: date,
+) -> List[float]:
+    # Interfejs rezerwacji pyta wielokrotnie o te same pojazdy.
+    return [
+        engine.quote_vehicle(v, customer.category, start, end, LATE_DAYS).total
+        for v in vehicles[:50] * 10
+    ]
+
+
+def main(argv: List[str]) -> None:
+    count = int(argv[0]) if argv else 500
+    repeat = int(argv[1]) if len(argv) > 1 else 20
+    today = date.today()
+    rng = random.Random(0)
+    vehicles = make_vehicles(rng, count, today)
+    customer = make_customers(rng, 1, today)[0]
+    start = today + timedelta(days=7)
+    end = start + timedelta(days=6)
+    engine = PricingEngine()
+
+    for category in CustomerCategory:
+        customer.category = category
+        args = (engine, vehicles, customer, start, end)
+        objects = measure(with_objects, repeat, *args)
+        batch = measure(vectorized, repeat, *args)
+        print(
+            f"{category.value:<9} obiekty {objects * 1000:7.3f} ms"
+            f"  wsadowo {batch * 1000:7.3f} ms"
+            f"  ({objects / batch:4.1f}x)"
+        )
+
+    cached = PricingEngine()
+    args = (vehicles, customer, start, end)
+    uncached = measure(repeated, repeat, PricingEngine(cache_size=0), *args)
+    hot = measure(repeated, repeat, cached, *args)
+    print(
+        f"powtarzane wyceny: bez pamięci {uncached * 1000:7.3f} ms"
+        f"  z pamięcią {hot * 1000:7.3f} ms  ({cached.cache.stats()})"
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
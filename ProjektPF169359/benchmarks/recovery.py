@@ -0,0 +1,66 @@
+"""Pomiar odtwarzania stanu z migawki dziennika.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.recovery [rozmiar ...]
+
+Dla każdego rozmiaru danych z generatora (domyślnie S i M) zapisuje
+migawkę całego stanu, a następnie mierzy Journal.open na pustych
+menedżerach, czyli wczytanie migawki i odbudowę indeksów. Klienci
+i pojazdy z migawki trafiają do rejestru i inwentarza hurtowo, bez
+ponownego sprawdzania unikalności i zapisu do dziennika.
+"""
+
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.generator import SIZES, generate
+from src.customers import CustomerRegistry
+from src.journal import Journal
+from src.rental import RentalManager
+from src.vehicles import VehicleInventory
+
+
+def write_snapshot(directory: str, size: str) -> int:
+    """Zapisuje migawkę stanu z generatora i zwraca liczbę obiektów."""
+    fleet = generate(SIZES[size])
+    journal = Journal(directory)
+    journal.open(CustomerRegistry(), VehicleInventory(), RentalManager())
+    # Migawka obejmuje menedżery przypisane do dziennika, więc wystarczy
+    # podmienić je na wypełnione przez generator.
+    journal.registry = fleet.registry
+    journal.inventory = fleet.inventory
+    journal.manager = fleet.manager
+    journal.snapshot()
+    journal.close()
+    return (
+        len(fleet.registry.customers)
+        + len(fleet.inventory.vehicles)
+        + len(fleet.manager.rentals)
+        + len(fleet.manager.reviews)
+    )
+
+
+def main(argv: List[str]) -> None:
+    sizes = argv or ["S", "M"]
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            count = write_snapshot(tmpdir, size)
+            registry = CustomerRegistry()
+            inventory = VehicleInventory()
+            manager = RentalManager()
+            journal = Journal(tmpdir)
+            started = time.perf_counter()
+            journal.open(registry, inventory, manager)
+            elapsed = time.perf_counter() - started
+            journal.close()
+        print(
+            f"{size:<3} {count:>9,} obiektów w {elapsed:6.2f} s"
+            f" ({count / elapsed:,.0f}/s)"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
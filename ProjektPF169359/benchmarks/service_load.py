@@ -0,0 +1,144 @@
+"""Test obciążeniowy asynchronicznej fasady RentalService.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.service_load [liczba_klientów] [zapytań_na_klienta]
+
+Równolegli klienci (zadania asyncio) wysyłają mieszankę zapytań: 70%
+to odczyty (wolne pojazdy w popularnych terminach, raport, wypożyczenia
+klienta), 20% rezerwacje, a 10% zwroty. Pomiar podaje przepustowość
+i opóźnienia (mediana, p95, p99, maksimum) z łączeniem identycznych
+odczytów i bez niego, bez magazynu i z magazynem SQLite w pliku.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List, Optional
+
+from src.customers import Customer, CustomerRegistry, DrivingLicense
+from src.rental import RentalException, RentalManager
+from src.service import RentalService
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+from src.vehicles import Vehicle, VehicleInventory, VehicleType
+
+CUSTOMERS = 200
+VEHICLES = 500
+
+
+def build(storage: Optional[Storage], coalesce: bool) -> RentalService:
+    today = date.today()
+    registry = CustomerRegistry(storage)
+    inventory = VehicleInventory(storage)
+    for i in range(CUSTOMERS):
+        # E-mail, telefon i numer prawa jazdy muszą być unikalne.
+        license = DrivingLicense(
+            f"ABC{i:06d}", today - timedelta(days=365),
+            today + timedelta(days=3650), ["B"],
+        )
+        registry.register_customer(
+            Customer(f"C{i}", "Jan", "Kowalski", f"klient{i}@example.com",
+                     f"{500_000_000 + i}", "a", license)
+        )
+    for i in range(VEHICLES):
+        inventory.add_vehicle(
+            Vehicle(f"V{i}", "Toyota", "Corolla", 2020, f"WA{i}", 100.0,
+                    VehicleType.COMPACT)
+        )
+    return RentalService(
+        registry, inventory, RentalManager(storage), coalesce=coalesce
+    )
+
+
+async def client(
+    service: RentalService,
+    requests: int,
+    seed: int,
+    latencies: List[float],
+) -> None:
+    rng = random.Random(seed)
+    today = date.today()
+    booked: List[str] = []
+    for _ in range(requests):
+        roll = rng.random()
+        # Większość klientów pyta o kilka popularnych terminów.
+        start = today + timedelta(days=rng.choice((1, 1, 2, 7, 14)))
+        started = time.perf_counter()
+        try:
+            if roll < 0.3:
+                await service.find_available_vehicles(start, start)
+            elif roll < 0.5:
+                await service.generate_rental_report(today, start)
+            elif roll < 0.7:
+                await service.get_customer_rentals(
+                    f"C{rng.randrange(CUSTOMERS)}"
+                )
+            elif roll < 0.9 or not booked:
+                day = today + timedelta(days=rng.randrange(1, 365))
+                rental = await service.create_rental(
+                    f"C{rng.randrange(CUSTOMERS)}",
+                    f"V{rng.randrange(VEHICLES)}",
+                    day,
+                    day,
+                )
+                booked.append(rental.rental_id)
+            else:
+                rental_id = booked.pop()
+                rental = await service.get_rental(rental_id)
+                await service.complete_rental(rental_id, rental.end_date)
+        except RentalException:
+            pass
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(service: RentalService, clients: int, requests: int) -> tuple:
+    latencies: List[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(client(service, requests, n, latencies) for n in range(clients))
+    )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return len(latencies) / elapsed, latencies
+
+
+def percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main(argv: List[str]) -> None:
+    clients = int(argv[0]) if len(argv) > 0 else 50
+    requests = int(argv[1]) if len(argv) > 1 else 40
+    print(
+        f"{'':<24}{'zapytań/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}"
+    )
+    for name in ("pamięć", "SQLite"):
+        for coalesce in (False, True):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                storage = None
+                if name == "SQLite":
+                    storage = SQLiteStorage(os.path.join(tmpdir, "bench.db"))
+                service = build(storage, coalesce)
+                rate, latencies = asyncio.run(
+                    run(service, clients, requests)
+                )
+                if storage is not None:
+                    storage.close()
+            label = "z łączeniem" if coalesce else "bez łączenia"
+            print(
+                f"{name:<8} {label:<15}{rate:10,.0f}"
+                + "".join(
+                    f"{percentile(latencies, p) * 1000:9.1f}"
+                    for p in (0.5, 0.95, 0.99, 1.0)
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
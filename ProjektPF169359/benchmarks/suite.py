@@ -0,0 +1,568 @@
+"""Pomiar czasu publicznych metod RentalManager, VehicleInventory
+i CustomerRegistry na danych z generatora.
+
+Uruchomienie z katalogu projektu:
+
+    python -m benchmarks.suite [--size S|M|L|XL] [--seed N]
+        [--iterations N] [--output wynik.json] [--compare poprzedni.json]
+
+Dane są generowane deterministycznie (benchmarks.generator), a każda
+metoda jest wywoływana wielokrotnie z losowanymi argumentami. Czas
+mierzy tylko samo wywołanie - przygotowanie argumentów (np. utworzenie
+wypożyczenia, które pomiar zakończy) odbywa się przed startem zegara.
+Wynik w JSON zawiera opis środowiska, rozmiar danych i statystyki każdej
+metody; --compare wypisuje zmianę mediany względem wcześniejszego
+przebiegu.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from benchmarks.generator import (
+    SIZES,
+    Fleet,
+    Profile,
+    generate,
+    make_customers,
+    make_vehicles,
+)
+from src.customers import Customer, CustomerCategory, CustomerRegistry
+from src.rental import Rental, RentalManager
+from src.vehicles import (
+    Car,
+    Vehicle,
+    VehicleInventory,
+    VehicleStatus,
+    VehicleType,
+)
+
+# Liczba rekordów w plikach importu hurtowego.
+BULK_ROWS = 1_000
+# Rezerwacje tworzone przez pomiary zaczynają się za historią generatora
+# (ostatnie wypożyczenia startują najpóźniej 60 dni od dziś), a prawa
+# jazdy z generatora są ważne jeszcze co najmniej rok.
+FIRST_FREE_DAY = 90
+LAST_FREE_DAY = 360
+
+
+class Case(NamedTuple):
+    prepare: Callable[["Context"], Callable[[], Any]]
+    # Mnożnik liczby wywołań dla metod wyraźnie droższych od reszty.
+    weight: float = 1.0
+
+
+class Context:
+    """Stan współdzielony przez przygotowania pomiarów."""
+
+    def __init__(self, fleet: Fleet, seed: int, directory: str) -> None:
+        self.fleet = fleet
+        self.rng = random.Random(seed)
+        self.directory = directory
+        # Pojazd niezwrócony po terminie jest zajęty aż do zwrotu.
+        held = {
+            rental.vehicle.vehicle_id
+            for rental in fleet.manager.get_overdue_rentals(fleet.today)
+        }
+        self.bookable = [
+            v
+            for v in fleet.vehicles
+            if v.status != VehicleStatus.OUT_OF_SERVICE
+            and v.vehicle_id not in held
+        ]
+        self._rental_ids: Optional[List[str]] = None
+        self._sequence = 0
+        self._next_day: Dict[str, int] = {}
+        self._files: Dict[str, str] = {}
+
+    def unique(self, prefix: str) -> str:
+        self._sequence += 1
+        return f"{prefix}{self._sequence:08d}"
+
+    def customer(self) -> Customer:
+        return self.rng.choice(self.fleet.customers)
+
+    def vehicle(self) -> Vehicle:
+        return self.rng.choice(self.fleet.vehicles)
+
+    def rental_id(self) -> str:
+        if self._rental_ids is None:
+            self._rental_ids = list(self.fleet.manager.rentals)
+        return self.rng.choice(self._rental_ids)
+
+    def period(self) -> Tuple[date, date]:
+        today = self.fleet.today
+        start = today + timedelta(days=self.rng.randrange(-300, 30))
+        return start, start + timedelta(days=self.rng.randrange(1, 30))
+
+    def free_day(self, vehicle: Vehicle) -> date:
+        """Następny dzień, w którym pojazd nie ma jeszcze rezerwacji."""
+        offset = self._next_day.get(vehicle.vehicle_id, FIRST_FREE_DAY)
+        if offset > LAST_FREE_DAY:
+            raise RuntimeError(
+                f"Brak wolnych terminów dla pojazdu {vehicle.vehicle_id}"
+            )
+        self._next_day[vehicle.vehicle_id] = offset + 1
+        return self.fleet.today + timedelta(days=offset)
+
+    def booking(self) -> Tuple[Customer, Vehicle, date, date]:
+        vehicle = self.rng.choice(self.bookable)
+        day = self.free_day(vehicle)
+        return self.customer(), vehicle, day, day
+
+    def book(self) -> Rental:
+        """Rezerwacja w wolnym terminie, bez pomiaru czasu."""
+        return self.fleet.manager.create_rental(*self.booking())
+
+    def bulk_file(self, kind: str) -> str:
+        path = self._files.get(kind)
+        if path is None:
+            path = os.path.join(self.directory, f"{kind}.csv")
+            rng = random.Random(0)
+            today = self.fleet.today
+            if kind == "vehicles":
+                write_vehicles(path, make_vehicles(rng, BULK_ROWS, today))
+            else:
+                write_customers(path, make_customers(rng, BULK_ROWS, today))
+            self._files[kind] = path
+        return path
+
+
+def write_vehicles(path: str, vehicles: List[Vehicle]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "vehicle_id", "make", "model", "year", "registration_number",
+                "daily_rate", "vehicle_type", "doors", "fuel_type",
+                "transmission",
+            ]
+        )
+        for v in vehicles:
+            car = isinstance(v, Car)
+            writer.writerow(
+                [
+                    v.vehicle_id, v.make, v.model, v.year,
+                    v.registration_number, v.daily_rate,
+                    v.vehicle_type.value,
+                    v.doors if car else "",
+                    v.fuel_type if car else "",
+                    v.transmission if car else "",
+                ]
+            )
+
+
+def write_customers(path: str, customers: List[Customer]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "customer_id", "first_name", "last_name", "email", "phone",
+                "address", "license_number", "license_issue_date",
+                "license_expiry_date", "license_categories", "category",
+            ]
+        )
+        for c in customers:
+            license = c.driving_license
+            writer.writerow(
+                [
+                    c.customer_id, c.first_name, c.last_name, c.email,
+                    c.phone, c.address, license.license_number,
+                    license.issue_date, license.expiry_date,
+                    ";".join(license.categories), c.category.value,
+                ]
+            )
+
+
+def _new_vehicle(ctx: Context) -> Vehicle:
+    vehicle = make_vehicles(ctx.rng, 1, ctx.fleet.today)[0]
+    vehicle.vehicle_id = ctx.unique("NV")
+    return vehicle
+
+
+def _new_customer(ctx: Context) -> Customer:
+    customer = make_customers(ctx.rng, 1, ctx.fleet.today)[0]
+    customer.customer_id = ctx.unique("NC")
+    # Pola unikalne w rejestrze nie mogą powtarzać danych floty.
+    customer.email = f"{customer.customer_id}@example.com"
+    customer.phone = customer.customer_id
+    customer.driving_license.license_number = customer.customer_id
+    return customer
+
+
+def _create_rental(ctx: Context) -> Callable[[], Any]:
+    booking = ctx.booking()
+    return lambda: ctx.fleet.manager.create_rental(*booking)
+
+
+def _create_rentals(ctx: Context) -> Callable[[], Any]:
+    requests = []
+    for vehicle in ctx.rng.sample(ctx.bookable, min(100, len(ctx.bookable))):
+        day = ctx.free_day(vehicle)
+        requests.append((ctx.customer(), vehicle, day, day))
+    return lambda: ctx.fleet.manager.create_rentals(requests)
+
+
+def _complete_rental(ctx: Context) -> Callable[[], Any]:
+    rental = ctx.book()
+    return lambda: ctx.fleet.manager.complete_rental(
+        rental.rental_id, rental.end_date
+    )
+
+
+def _cancel_rental(ctx: Context) -> Callable[[], Any]:
+    rental = ctx.book()
+    return lambda: ctx.fleet.manager.cancel_rental(rental.rental_id)
+
+
+def _add_review(ctx: Context) -> Callable[[], Any]:
+    rental = ctx.book()
+    ctx.fleet.manager.complete_rental(rental.rental_id, rental.end_date)
+    return lambda: ctx.fleet.manager.add_review(
+        rental.rental_id, 5, "Czyste auto, polecam", rental.end_date
+    )
+
+
+def _load_vehicles(ctx: Context) -> Callable[[], Any]:
+    path = ctx.bulk_file("vehicles")
+    inventory = VehicleInventory()
+    return lambda: inventory.load_vehicles(path)
+
+
+def _load_customers(ctx: Context) -> Callable[[], Any]:
+    path = ctx.bulk_file("customers")
+    registry = CustomerRegistry()
+    return lambda: registry.load_customers(path)
+
+
+def _remove_vehicle(ctx: Context) -> Callable[[], Any]:
+    vehicle = _new_vehicle(ctx)
+    ctx.fleet.inventory.add_vehicle(vehicle)
+    return lambda: ctx.fleet.inventory.remove_vehicle(vehicle.vehicle_id)
+
+
+def _remove_customer(ctx: Context) -> Callable[[], Any]:
+    customer = _new_customer(ctx)
+    ctx.fleet.registry.register_customer(customer)
+    return lambda: ctx.fleet.registry.remove_customer(customer.customer_id)
+
+
+def _change_vehicle_status(ctx: Context) -> Callable[[], Any]:
+    vehicle = ctx.vehicle()
+    # Ten sam status - pomiar nie zmienia stanu floty.
+    return lambda: ctx.fleet.inventory.change_vehicle_status(
+        vehicle.vehicle_id, vehicle.status
+    )
+
+
+CASES: Dict[str, Case] = {
+    "RentalManager.create_rental": Case(_create_rental),
+    "RentalManager.create_rentals": Case(_create_rentals, 0.1),
+    "RentalManager.get_rental": Case(
+        lambda ctx: lambda r=ctx.rental_id(): ctx.fleet.manager.get_rental(r)
+    ),
+    "RentalManager.complete_rental": Case(_complete_rental),
+    "RentalManager.cancel_rental": Case(_cancel_rental),
+    "RentalManager.add_charge": Case(
+        lambda ctx: lambda r=ctx.book(): ctx.fleet.manager.add_charge(
+            r.rental_id, "Mycie", 50.0
+        )
+    ),
+    "RentalManager.is_vehicle_available": Case(
+        lambda ctx: lambda v=ctx.vehicle(), p=ctx.period(): (
+            ctx.fleet.manager.is_vehicle_available(v, *p)
+        )
+    ),
+    "RentalManager.find_available_vehicles": Case(
+        lambda ctx: lambda p=ctx.period(): (
+            ctx.fleet.manager.find_available_vehicles(
+                ctx.fleet.inventory, *p
+            )
+        ),
+        0.2,
+    ),
+    "RentalManager.get_active_rentals": Case(
+        lambda ctx: ctx.fleet.manager.get_active_rentals, 0.2
+    ),
+    "RentalManager.get_overdue_rentals": Case(
+        lambda ctx: ctx.fleet.manager.get_overdue_rentals, 0.2
+    ),
+    # Pierwsze wywołanie oznacza przeterminowane wypożyczenia z historii,
+    # kolejne mierzą przebieg bez zmian - typowy dla okresowego wywołania.
+    "RentalManager.mark_overdue_rentals": Case(
+        lambda ctx: lambda: ctx.fleet.manager.mark_overdue_rentals(
+            ctx.fleet.today
+        ),
+        0.2,
+    ),
+    # Jak wyżej: pierwsze wywołanie wydaje pojazdy rozpoczętych rezerwacji.
+    "RentalManager.start_rentals": Case(
+        lambda ctx: lambda: ctx.fleet.manager.start_rentals(ctx.fleet.today),
+        0.2,
+    ),
+    "RentalManager.get_customer_rentals": Case(
+        lambda ctx: lambda c=ctx.customer().customer_id: (
+            ctx.fleet.manager.get_customer_rentals(c)
+        )
+    ),
+    "RentalManager.get_vehicle_rental_history": Case(
+        lambda ctx: lambda v=ctx.vehicle().vehicle_id: (
+            ctx.fleet.manager.get_vehicle_rental_history(v)
+        )
+    ),
+    "RentalManager.add_review": Case(_add_review),
+    "RentalManager.get_reviews_for_customer": Case(
+        lambda ctx: lambda c=ctx.customer().customer_id: (
+            ctx.fleet.manager.get_reviews_for_customer(c)
+        )
+    ),
+    "RentalManager.get_reviews_for_rental": Case(
+        lambda ctx: lambda r=ctx.rental_id(): (
+            ctx.fleet.manager.get_reviews_for_rental(r)
+        )
+    ),
+    "RentalManager.search_reviews": Case(
+        lambda ctx: lambda k=ctx.rng.choice(
+            (["czyste"], ["usterka"], ["auto", "polecam"])
+        ): ctx.fleet.manager.search_reviews(k),
+        0.2,
+    ),
+    "RentalManager.get_average_rating_for_customer": Case(
+        lambda ctx: lambda c=ctx.customer().customer_id: (
+            ctx.fleet.manager.get_average_rating_for_customer(c)
+        )
+    ),
+    "RentalManager.generate_rental_report": Case(
+        lambda ctx: lambda p=ctx.period(): (
+            ctx.fleet.manager.generate_rental_report(*p)
+        )
+    ),
+    "VehicleInventory.add_vehicle": Case(
+        lambda ctx: lambda v=_new_vehicle(ctx): (
+            ctx.fleet.inventory.add_vehicle(v)
+        )
+    ),
+    "VehicleInventory.load_vehicles": Case(_load_vehicles, 0.02),
+    "VehicleInventory.update_vehicle": Case(
+        lambda ctx: lambda v=ctx.vehicle(): (
+            ctx.fleet.inventory.update_vehicle(v)
+        )
+    ),
+    "VehicleInventory.change_vehicle_status": Case(_change_vehicle_status),
+    "VehicleInventory.remove_vehicle": Case(_remove_vehicle),
+    "VehicleInventory.get_vehicle": Case(
+        lambda ctx: lambda v=ctx.vehicle().vehicle_id: (
+            ctx.fleet.inventory.get_vehicle(v)
+        )
+    ),
+    "VehicleInventory.iter_vehicles": Case(
+        lambda ctx: lambda: list(ctx.fleet.inventory.iter_vehicles()), 0.2
+    ),
+    "VehicleInventory.get_available_vehicles": Case(
+        lambda ctx: ctx.fleet.inventory.get_available_vehicles, 0.2
+    ),
+    "VehicleInventory.get_available_vehicles_by_type": Case(
+        lambda ctx: lambda t=ctx.rng.choice(list(VehicleType)): (
+            ctx.fleet.inventory.get_available_vehicles_by_type(t)
+        ),
+        0.2,
+    ),
+    "VehicleInventory.count_vehicles_by_status": Case(
+        lambda ctx: ctx.fleet.inventory.count_vehicles_by_status, 0.2
+    ),
+    "CustomerRegistry.register_customer": Case(
+        lambda ctx: lambda c=_new_customer(ctx): (
+            ctx.fleet.registry.register_customer(c)
+        )
+    ),
+    "CustomerRegistry.load_customers": Case(_load_customers, 0.02),
+    "CustomerRegistry.update_customer": Case(
+        lambda ctx: lambda c=ctx.customer(): (
+            ctx.fleet.registry.update_customer(c)
+        )
+    ),
+    "CustomerRegistry.remove_customer": Case(_remove_customer),
+    "CustomerRegistry.get_customer": Case(
+        lambda ctx: lambda c=ctx.customer().customer_id: (
+            ctx.fleet.registry.get_customer(c)
+        )
+    ),
+    "CustomerRegistry.get_customer_by_email": Case(
+        lambda ctx: lambda e=ctx.customer().email: (
+            ctx.fleet.registry.get_customer_by_email(e)
+        )
+    ),
+    "CustomerRegistry.get_customer_by_phone": Case(
+        lambda ctx: lambda p=ctx.customer().phone: (
+            ctx.fleet.registry.get_customer_by_phone(p)
+        )
+    ),
+    "CustomerRegistry.get_customer_by_license_number": Case(
+        lambda ctx: lambda n=ctx.customer().driving_license.license_number: (
+            ctx.fleet.registry.get_customer_by_license_number(n)
+        )
+    ),
+    "CustomerRegistry.find_customers_by_last_name": Case(
+        lambda ctx: lambda n=ctx.customer().last_name: (
+            ctx.fleet.registry.find_customers_by_last_name(n)
+        ),
+        0.2,
+    ),
+    "CustomerRegistry.find_customers_by_name_prefix": Case(
+        lambda ctx: lambda p=ctx.customer().last_name[:3]: (
+            ctx.fleet.registry.find_customers_by_name_prefix(p)
+        )
+    ),
+    "CustomerRegistry.find_customers_fuzzy": Case(
+        lambda ctx: lambda q=ctx.customer().last_name + "x": (
+            ctx.fleet.registry.find_customers_fuzzy(q)
+        ),
+        0.2,
+    ),
+    "CustomerRegistry.get_customers_by_category": Case(
+        lambda ctx: lambda c=ctx.rng.choice(list(CustomerCategory)): (
+            ctx.fleet.registry.get_customers_by_category(c)
+        ),
+        0.2,
+    ),
+    "CustomerRegistry.count_customers": Case(
+        lambda ctx: ctx.fleet.registry.count_customers
+    ),
+    "CustomerRegistry.count_customers_by_category": Case(
+        lambda ctx: ctx.fleet.registry.count_customers_by_category
+    ),
+}
+
+
+def public_methods() -> Set[str]:
+    """Nazwy publicznych metod mierzonych klas (Klasa.metoda)."""
+    return {
+        f"{cls.__name__}.{name}"
+        for cls in (RentalManager, VehicleInventory, CustomerRegistry)
+        for name, member in vars(cls).items()
+        if not name.startswith("_") and callable(member)
+    }
+
+
+def measure(case: Case, ctx: Context, iterations: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(max(3, int(iterations * case.weight))):
+        call = case.prepare(ctx)
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "median_us": statistics.median(timings) * 1e6,
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "p95_us": timings[int(len(timings) * 0.95)] * 1e6,
+        "min_us": timings[0] * 1e6,
+        "ops_per_s": len(timings) / sum(timings) if sum(timings) else 0.0,
+    }
+
+
+def run(
+    profile: Profile,
+    seed: int = 0,
+    iterations: int = 200,
+    names: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    fleet = generate(profile, seed)
+    setup_seconds = time.perf_counter() - started
+    counts = {
+        "customers": len(fleet.registry.customers),
+        "vehicles": len(fleet.inventory.vehicles),
+        "rentals": len(fleet.manager.rentals),
+        "reviews": len(fleet.manager.reviews),
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        ctx = Context(fleet, seed, directory)
+        for name in names or sorted(CASES):
+            results[name] = measure(CASES[name], ctx, iterations)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "profile": profile._asdict(),
+        "seed": seed,
+        "iterations": iterations,
+        "setup_seconds": setup_seconds,
+        "counts": counts,
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    if previous["profile"] != current["profile"]:
+        print("Uwaga: poprzedni przebieg dotyczył innego rozmiaru danych")
+    print(f"{'metoda':<50}{'przed µs':>11}{'teraz µs':>11}{'zmiana':>9}")
+    for name, result in current["results"].items():
+        before = previous["results"].get(name)
+        if before is None:
+            continue
+        change = result["median_us"] / before["median_us"] - 1
+        print(
+            f"{name:<50}{before['median_us']:11.1f}"
+            f"{result['median_us']:11.1f}{change:+9.0%}"
+        )
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=sorted(SIZES), default="S")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="plik wyniku JSON")
+    parser.add_argument("--compare", help="wcześniejszy wynik JSON")
+    args = parser.parse_args(argv)
+
+    missing = public_methods() - set(CASES)
+    if missing:
+        print(f"Brak pomiaru dla: {', '.join(sorted(missing))}")
+
+    result = run(SIZES[args.size], args.seed, args.iterations)
+    result["size"] = args.size
+    print(
+        f"Rozmiar {args.size}: "
+        + ", ".join(f"{k}={v:,}" for k, v in result["counts"].items())
+        + f" (generowanie {result['setup_seconds']:.1f} s)"
+    )
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+    else:
+        print(f"{'metoda':<50}{'mediana µs':>12}{'p95 µs':>11}")
+        for name, stats in result["results"].items():
+            print(
+                f"{name:<50}{stats['median_us']:12.1f}"
+                f"{stats['p95_us']:11.1f}"
+            )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,660 @@
+"""Serwer HTTP z API JSON nad rejestrem klientów, inwentarzem
+i menedżerem wypożyczeń.
+
+Uruchomienie z katalogu projektu:
+
+    python -m src.api [--host HOST] [--port PORT] [--workers N] [--db PLIK]
+
+Punkty końcowe (daty w formacie RRRR-MM-DD):
+
+    GET  /vehicles?status=&type=          GET  /vehicles/{id}
+    GET  /vehicles/available?start=&end=  GET  /vehicles/{id}/rentals
+    POST /vehicles                        GET  /customers?last_name=
+    GET  /customers?prefix=&limit=        GET  /customers?fuzzy=&limit=
+    GET  /customers?email=|phone=|license_number=
+    GET  /customers/{id}                  GET  /customers/{id}/rentals
+    GET  /customers/{id}/reviews          POST /customers
+    GET  /rentals/{id}                    POST /rentals
+    POST /rentals/{id}/complete           POST /rentals/{id}/cancel
+    POST /rentals/{id}/charges            POST /rentals/{id}/reviews
+    GET  /reviews?keywords=a,b&match_all= GET  /reports/rentals?start=&end=
+    GET  /quotes?start=&end=&category=&late_days=
+    GET  /vehicles/{id}/quote?start=&end=&category=&late_days=
+    GET  /metrics[?format=json]
+
+Wyceny zamiast category mogą przyjąć customer_id - wtedy liczone są dla
+bieżącej kategorii klienta.
+
+Z opcją --metrics serwer mierzy operacje menedżerów (src.metrics)
+i udostępnia wyniki pod /metrics w formacie Prometheusa lub JSON.
+Wątek OverdueSweeper (src.sweeper) co --sweep-interval sekund oznacza
+przeterminowane wypożyczenia.
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src import bulk
+from src.customers import (
+    Customer,
+    CustomerCategory,
+    CustomerRegistry,
+    customers_from_chunk,
+)
+from src.metrics import Metrics
+from src.rental import Rental, RentalException, RentalManager
+from src.reviews import Review
+from src.sweeper import OverdueSweeper
+from src.vehicles import (
+    Car,
+    Vehicle,
+    VehicleInventory,
+    VehicleStatus,
+    VehicleType,
+    vehicles_from_chunk,
+)
+
+# Największy przyjmowany rozmiar treści żądania.
+MAX_BODY = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def vehicle_json(vehicle: Vehicle) -> Dict[str, Any]:
+    data = {
+        "vehicle_id": vehicle.vehicle_id,
+        "make": vehicle.make,
+        "model": vehicle.model,
+        "year": vehicle.year,
+        "registration_number": vehicle.registration_number,
+        "daily_rate": vehicle.daily_rate,
+        "vehicle_type": vehicle.vehicle_type,
+        "status": vehicle.status,
+    }
+    if isinstance(vehicle, Car):
+        data["doors"] = vehicle.doors
+        data["fuel_type"] = vehicle.fuel_type
+        data["transmission"] = vehicle.transmission
+    return data
+
+
+def customer_json(customer: Customer) -> Dict[str, Any]:
+    license = customer.driving_license
+    return {
+        "customer_id": customer.customer_id,
+        "first_name": customer.first_name,
+        "last_name": customer.last_name,
+        "email": customer.email,
+        "phone": customer.phone,
+        "address": customer.address,
+        "category": customer.category,
+        "registration_date": customer.registration_date,
+        "license_number": license.license_number,
+        "license_issue_date": license.issue_date,
+        "license_expiry_date": license.expiry_date,
+        "license_categories": license.categories,
+    }
+
+
+def rental_json(rental: Rental) -> Dict[str, Any]:
+    return {
+        "rental_id": rental.rental_id,
+        "customer_id": rental.customer.customer_id,
+        "vehicle_id": rental.vehicle.vehicle_id,
+        "start_date": rental.start_date,
+        "end_date": rental.end_date,
+        "daily_rate": rental.daily_rate,
+        "status": rental.status,
+        "actual_return_date": rental.actual_return_date,
+        "total_cost": rental.total_cost,
+        "additional_charges": rental.additional_charges,
+    }
+
+
+def review_json(review: Review) -> Dict[str, Any]:
+    return {
+        "rental_id": review.rental_id,
+        "customer_id": review.customer_id,
+        "rating": review.rating,
+        "comment": review.comment,
+        "review_date": review.review_date,
+    }
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Nie można zapisać w JSON: {type(value).__name__}")
+
+
+def _date(value: Any, field: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"Pole {field} musi być datą w formacie RRRR-MM-DD"
+        ) from None
+
+
+def _int(query: Dict[str, str], field: str, default: int) -> int:
+    try:
+        return int(query.get(field, default))
+    except ValueError:
+        raise ValueError(f"Pole {field} musi być liczbą całkowitą") from None
+
+
+def _enum(enum: Any, value: Optional[str], field: str) -> Any:
+    if value is None:
+        return None
+    try:
+        return enum(value)
+    except ValueError:
+        raise ValueError(f"Nieznana wartość pola {field}") from None
+
+
+class RentalApi:
+    """Obsługa punktów końcowych API niezależna od warstwy HTTP.
+
+    Metody dostają parametry zapytania i treść żądania, a zwracają
+    (status, dane do zapisania w JSON).
+    """
+
+    def __init__(
+        self,
+        registry: CustomerRegistry,
+        inventory: VehicleInventory,
+        manager: RentalManager,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.registry = registry
+        self.inventory = inventory
+        self.manager = manager
+        self.metrics = metrics
+        routes = [
+            ("GET", r"/vehicles", self.list_vehicles),
+            ("GET", r"/vehicles/available", self.available_vehicles),
+            ("GET", r"/quotes", self.quotes),
+            ("POST", r"/vehicles", self.add_vehicle),
+            ("GET", r"/vehicles/([^/]+)", self.get_vehicle),
+            ("GET", r"/vehicles/([^/]+)/rentals", self.vehicle_rentals),
+            ("GET", r"/vehicles/([^/]+)/quote", self.vehicle_quote),
+            ("GET", r"/customers", self.find_customers),
+            ("POST", r"/customers", self.register_customer),
+            ("GET", r"/customers/([^/]+)", self.get_customer),
+            ("GET", r"/customers/([^/]+)/rentals", self.customer_rentals),
+            ("GET", r"/customers/([^/]+)/reviews", self.customer_reviews),
+            ("POST", r"/rentals", self.create_rental),
+            ("GET", r"/rentals/([^/]+)", self.get_rental),
+            ("POST", r"/rentals/([^/]+)/complete", self.complete_rental),
+            ("POST", r"/rentals/([^/]+)/cancel", self.cancel_rental),
+            ("POST", r"/rentals/([^/]+)/charges", self.add_charge),
+            ("POST", r"/rentals/([^/]+)/reviews", self.add_review),
+            ("GET", r"/reviews", self.search_reviews),
+            ("GET", r"/reports/rentals", self.rental_report),
+            ("GET", r"/metrics", self.metrics_snapshot),
+        ]
+        self.routes: List[Tuple[str, Any, Callable[..., Any]]] = [
+            (method, re.compile(pattern + r"/?\Z"), handler)
+            for method, pattern, handler in routes
+        ]
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        body: Any,
+    ) -> Tuple[int, Any]:
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            try:
+                return handler(*match.groups(), query=query, body=body)
+            except ApiError as e:
+                return e.status, {"error": str(e)}
+            except RentalException as e:
+                return 409, {"error": str(e)}
+            except (TypeError, ValueError) as e:
+                return 400, {"error": str(e)}
+            except Exception:
+                # Nieoczekiwany błąd (np. sqlite3.Error) też dostaje
+                # odpowiedź - inaczej klient widziałby zerwane połączenie.
+                logger.exception("Błąd obsługi żądania %s %s", method, path)
+                return 500, {"error": "Wewnętrzny błąd serwera"}
+        if allowed:
+            return 405, {"error": "Niedozwolona metoda"}
+        return 404, {"error": "Nie znaleziono"}
+
+    def _customer(self, customer_id: str) -> Customer:
+        customer = self.registry.get_customer(customer_id)
+        if customer is None:
+            raise ApiError(404, f"Klient o ID {customer_id} nie istnieje")
+        return customer
+
+    def _vehicle(self, vehicle_id: str) -> Vehicle:
+        vehicle = self.inventory.get_vehicle(vehicle_id)
+        if vehicle is None:
+            raise ApiError(404, f"Pojazd o ID {vehicle_id} nie istnieje")
+        return vehicle
+
+    def _rental(self, rental_id: str) -> Rental:
+        rental = self.manager.get_rental(rental_id)
+        if rental is None:
+            raise ApiError(
+                404, f"Wypożyczenie o ID {rental_id} nie istnieje"
+            )
+        return rental
+
+    @staticmethod
+    def _fields(body: Any) -> Dict[str, Any]:
+        if not isinstance(body, dict):
+            raise ValueError("Treść żądania musi być obiektem JSON")
+        return body
+
+    @staticmethod
+    def _period(query: Dict[str, str]) -> Tuple[date, date]:
+        return (
+            _date(query.get("start"), "start"),
+            _date(query.get("end"), "end"),
+        )
+
+    def list_vehicles(self, query: Dict[str, str], body: Any) -> tuple:
+        status = _enum(VehicleStatus, query.get("status"), "status")
+        vehicle_type = _enum(VehicleType, query.get("type"), "type")
+        return 200, [
+            vehicle_json(v)
+            for v in self.inventory.iter_vehicles()
+            if (status is None or v.status == status)
+            and (vehicle_type is None or v.vehicle_type == vehicle_type)
+        ]
+
+    def available_vehicles(self, query: Dict[str, str], body: Any) -> tuple:
+        start_date, end_date = self._period(query)
+        vehicles = self.manager.find_available_vehicles(
+            self.inventory, start_date, end_date
+        )
+        return 200, [vehicle_json(v) for v in vehicles]
+
+    def _quote_terms(
+        self, query: Dict[str, str]
+    ) -> Tuple[CustomerCategory, date, date, int]:
+        start_date, end_date = self._period(query)
+        if "customer_id" in query:
+            category = self._customer(query["customer_id"]).category
+        else:
+            category = _enum(
+                CustomerCategory, query.get("category"), "category"
+            )
+        late_days = _int(query, "late_days", 0)
+        return (
+            category or CustomerCategory.STANDARD,
+            start_date,
+            end_date,
+            late_days,
+        )
+
+    def quotes(self, query: Dict[str, str], body: Any) -> tuple:
+        category, start_date, end_date, late_days = self._quote_terms(query)
+        vehicles = self.manager.find_available_vehicles(
+            self.inventory, start_date, end_date
+        )
+        quote = self.manager.pricing.quote_vehicles(
+            vehicles, category, start_date, end_date, late_days
+        )
+        columns = {
+            name: values.tolist() for name, values in quote._asdict().items()
+        }
+        return 200, [
+            {
+                "vehicle_id": vehicle.vehicle_id,
+                **{name: values[i] for name, values in columns.items()},
+            }
+            for i, vehicle in enumerate(vehicles)
+        ]
+
+    def add_vehicle(self, query: Dict[str, str], body: Any) -> tuple:
+        chunk = bulk.Chunk([1], [self._fields(body)])
+        vehicle = vehicles_from_chunk(chunk, date.today().year + 1)[0]
+        if vehicle is None:
+            raise ValueError(chunk.errors[0])
+        self.inventory.add_vehicle(vehicle)
+        return 201, vehicle_json(vehicle)
+
+    def get_vehicle(
+        self, vehicle_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        return 200, vehicle_json(self._vehicle(vehicle_id))
+
+    def vehicle_quote(
+        self, vehicle_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        quote = self.manager.pricing.quote_vehicle(
+            self._vehicle(vehicle_id), *self._quote_terms(query)
+        )
+        return 200, dict(quote._asdict(), vehicle_id=vehicle_id)
+
+    def vehicle_rentals(
+        self, vehicle_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        rentals = self.manager.get_vehicle_rental_history(vehicle_id)
+        return 200, [rental_json(r) for r in rentals]
+
+    def find_customers(self, query: Dict[str, str], body: Any) -> tuple:
+        unique = {
+            "email": self.registry.get_customer_by_email,
+            "phone": self.registry.get_customer_by_phone,
+            "license_number": self.registry.get_customer_by_license_number,
+        }
+        field = next((f for f in unique if f in query), None)
+        if field is not None:
+            customer = unique[field](query[field])
+            customers = [] if customer is None else [customer]
+        elif "prefix" in query:
+            customers = self.registry.find_customers_by_name_prefix(
+                query["prefix"], _int(query, "limit", 10)
+            )
+        elif "fuzzy" in query:
+            customers = self.registry.find_customers_fuzzy(
+                query["fuzzy"], _int(query, "limit", 10)
+            )
+        else:
+            customers = self.registry.find_customers_by_last_name(
+                query.get("last_name", "")
+            )
+        return 200, [customer_json(c) for c in customers]
+
+    def register_customer(self, query: Dict[str, str], body: Any) -> tuple:
+        chunk = bulk.Chunk([1], [self._fields(body)])
+        customer = customers_from_chunk(chunk, date.today())[0]
+        if customer is None:
+            raise ValueError(chunk.errors[0])
+        self.registry.register_customer(customer)
+        return 201, customer_json(customer)
+
+    def get_customer(
+        self, customer_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        return 200, customer_json(self._customer(customer_id))
+
+    def customer_rentals(
+        self, customer_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        rentals = self.manager.get_customer_rentals(customer_id)
+        return 200, [rental_json(r) for r in rentals]
+
+    def customer_reviews(
+        self, customer_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        reviews = self.manager.get_reviews_for_customer(customer_id)
+        return 200, {
+            "average_rating": self.manager.get_average_rating_for_customer(
+                customer_id
+            ),
+            "reviews": [review_json(r) for r in reviews],
+        }
+
+    def create_rental(self, query: Dict[str, str], body: Any) -> tuple:
+        fields = self._fields(body)
+        rental = self.manager.create_rental(
+            self._customer(fields.get("customer_id")),
+            self._vehicle(fields.get("vehicle_id")),
+            _date(fields.get("start_date"), "start_date"),
+            _date(fields.get("end_date"), "end_date"),
+        )
+        return 201, rental_json(rental)
+
+    def get_rental(
+        self, rental_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        return 200, rental_json(self._rental(rental_id))
+
+    def complete_rental(
+        self, rental_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        fields = self._fields(body)
+        self._rental(rental_id)
+        self.manager.complete_rental(
+            rental_id, _date(fields.get("return_date"), "return_date")
+        )
+        return 200, rental_json(self._rental(rental_id))
+
+    def cancel_rental(
+        self, rental_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        self._rental(rental_id)
+        self.manager.cancel_rental(rental_id)
+        return 200, rental_json(self._rental(rental_id))
+
+    def add_charge(
+        self, rental_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        fields = self._fields(body)
+        self._rental(rental_id)
+        self.manager.add_charge(
+            rental_id, fields.get("description"), fields.get("amount")
+        )
+        return 200, rental_json(self._rental(rental_id))
+
+    def add_review(
+        self, rental_id: str, query: Dict[str, str], body: Any
+    ) -> tuple:
+        fields = self._fields(body)
+        review_date = fields.get("review_date")
+        self._rental(rental_id)
+        review = self.manager.add_review(
+            rental_id,
+            fields.get("rating"),
+            fields.get("comment"),
+            (
+                date.today()
+                if review_date is None
+                else _date(review_date, "review_date")
+            ),
+        )
+        return 201, review_json(review)
+
+    def search_reviews(self, query: Dict[str, str], body: Any) -> tuple:
+        keywords = [k for k in query.get("keywords", "").split(",") if k]
+        reviews = self.manager.search_reviews(
+            keywords, query.get("match_all") in ("1", "true")
+        )
+        return 200, [review_json(r) for r in reviews]
+
+    def rental_report(self, query: Dict[str, str], body: Any) -> tuple:
+        start_date, end_date = self._period(query)
+        return 200, self.manager.generate_rental_report(start_date, end_date)
+
+    def metrics_snapshot(self, query: Dict[str, str], body: Any) -> tuple:
+        if self.metrics is None:
+            raise ApiError(404, "Pomiar operacji jest wyłączony")
+        return 200, self.metrics.snapshot()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 utrzymuje połączenia (keep-alive) między żądaniami.
+    protocol_version = "HTTP/1.1"
+    # Bezczynne połączenie zwalnia wątek puli po tylu sekundach.
+    timeout = 30
+    # Nagłówki i treść odpowiedzi to osobne zapisy do gniazda; bez
+    # TCP_NODELAY algorytm Nagle'a opóźniałby drugi z nich.
+    disable_nagle_algorithm = True
+    server: "RentalHTTPServer"
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        metrics = self.server.api.metrics
+        if (
+            method == "GET"
+            and url.path == "/metrics"
+            and metrics is not None
+            and query.get("format") != "json"
+        ):
+            self._send(
+                200,
+                "text/plain; version=0.0.4; charset=utf-8",
+                metrics.to_prometheus().encode("utf-8"),
+            )
+            return
+
+        status, data = self._handle(method, url.path, query)
+        self._send(
+            status,
+            "application/json; charset=utf-8",
+            json.dumps(data, default=_encode, ensure_ascii=False).encode(
+                "utf-8"
+            ),
+        )
+
+    def _send(self, status: int, content_type: str, payload: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(
+        self, method: str, path: str, query: Dict[str, str]
+    ) -> Tuple[int, Any]:
+        body = None
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY:
+            self.close_connection = True
+            return 400, {"error": "Niepoprawna długość treści żądania"}
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                return 400, {"error": "Treść żądania nie jest poprawnym JSON"}
+        return self.server.api.handle(method, path, query, body)
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RentalHTTPServer(HTTPServer):
+    """Serwer HTTP obsługujący połączenia w puli wątków roboczych.
+
+    Każde połączenie (z wieloma żądaniami keep-alive) zajmuje jeden wątek
+    puli, a połączenia ponad rozmiar puli czekają w kolejce.
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        api: RentalApi,
+        workers: int = 16,
+        verbose: bool = False,
+    ) -> None:
+        if not isinstance(workers, int) or workers <= 0:
+            raise ValueError(
+                "Liczba wątków roboczych musi być dodatnią liczbą całkowitą"
+            )
+        super().__init__(address, RequestHandler)
+        self.api = api
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="api"
+        )
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="API wypożyczalni")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--db", help="plik bazy SQLite")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument(
+        "--metrics", action="store_true", help="mierz operacje menedżerów"
+    )
+    parser.add_argument(
+        "--sweep-interval",
+        type=float,
+        default=60.0,
+        help="co ile sekund oznaczać przeterminowane wypożyczenia (0 - nie)",
+    )
+    args = parser.parse_args(argv)
+
+    storage = None
+    if args.db:
+        from src.sqlite_storage import SQLiteStorage
+
+        storage = SQLiteStorage(args.db)
+    api = RentalApi(
+        CustomerRegistry(storage),
+        VehicleInventory(storage),
+        RentalManager(storage),
+    )
+    if args.metrics:
+        api.metrics = Metrics()
+        api.metrics.instrument(api.registry, api.inventory, api.manager)
+    server = RentalHTTPServer(
+        (args.host, args.port), api, args.workers, args.verbose
+    )
+    sweeper = None
+    if args.sweep_interval > 0:
+        sweeper = OverdueSweeper(api.manager, args.sweep_interval)
+        sweeper.start()
+    print(f"API nasłuchuje na http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sweeper is not None:
+            sweeper.stop()
+        server.server_close()
+        if storage is not None:
+            storage.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
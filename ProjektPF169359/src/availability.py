@@ -0,0 +1,141 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class BookingCalendar:
+    """Posortowana lista nienachodzących na siebie rezerwacji pojazdu.
+
+    Rezerwacje są przedziałami domkniętymi [start, koniec]. Dzięki temu,
+    że się nie nakładają, kolizję z dowolnym terminem wystarczy sprawdzić
+    dla ostatniej rezerwacji rozpoczynającej się przed jego końcem, co
+    daje wyszukiwanie binarne w O(log n).
+
+    Zmiana tworzy nowe listy i podmienia je jednym przypisaniem
+    (kopiowanie przy zapisie - wstawienie w środek listy i tak kosztuje
+    O(n)), więc odczyty nie potrzebują zamka i zawsze widzą spójny stan.
+    Zapisy tego samego kalendarza muszą być szeregowane przez wywołującego.
+    """
+
+    def __init__(self) -> None:
+        self._state: Tuple[List[date], List[date], List[str]] = ([], [], [])
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    @staticmethod
+    def _conflict_index(
+        starts: List[date], ends: List[date], start_date: date, end_date: date
+    ) -> int:
+        i = bisect_right(starts, end_date) - 1
+        if i >= 0 and ends[i] >= start_date:
+            return i
+        return -1
+
+    def _position(self, rental_id: str, start_date: date) -> int:
+        starts, _, rental_ids = self._state
+        i = bisect_left(starts, start_date)
+        if i < len(starts) and rental_ids[i] == rental_id:
+            return i
+        raise ValueError(f"Brak rezerwacji dla wypożyczenia {rental_id}")
+
+    def is_free(self, start_date: date, end_date: date) -> bool:
+        starts, ends, _ = self._state
+        return self._conflict_index(starts, ends, start_date, end_date) < 0
+
+    def get_conflict(self, start_date: date, end_date: date) -> Optional[str]:
+        starts, ends, rental_ids = self._state
+        i = self._conflict_index(starts, ends, start_date, end_date)
+        return rental_ids[i] if i >= 0 else None
+
+    def book(self, rental_id: str, start_date: date, end_date: date) -> None:
+        if start_date > end_date:
+            raise ValueError(
+                "Data rozpoczęcia nie może być późniejsza niż data zakończenia"
+            )
+        starts, ends, rental_ids = self._state
+        if self._conflict_index(starts, ends, start_date, end_date) >= 0:
+            raise ValueError("Termin koliduje z istniejącą rezerwacją")
+
+        i = bisect_left(starts, start_date)
+        self._state = (
+            starts[:i] + [start_date] + starts[i:],
+            ends[:i] + [end_date] + ends[i:],
+            rental_ids[:i] + [rental_id] + rental_ids[i:],
+        )
+
+    def release(self, rental_id: str, start_date: date) -> None:
+        i = self._position(rental_id, start_date)
+        starts, ends, rental_ids = self._state
+        self._state = (
+            starts[:i] + starts[i + 1:],
+            ends[:i] + ends[i + 1:],
+            rental_ids[:i] + rental_ids[i + 1:],
+        )
+
+    def shorten(self, rental_id: str, start_date: date, new_end: date) -> None:
+        i = self._position(rental_id, start_date)
+        starts, ends, rental_ids = self._state
+        if start_date <= new_end < ends[i]:
+            ends = list(ends)
+            ends[i] = new_end
+            self._state = (starts, ends, rental_ids)
+
+    def bookings(self) -> List[tuple]:
+        starts, ends, rental_ids = self._state
+        return list(zip(rental_ids, starts, ends))
+
+
+class AvailabilityIndex:
+    """Kalendarze rezerwacji wszystkich pojazdów, kluczowane ID pojazdu."""
+
+    def __init__(self) -> None:
+        self._calendars: Dict[str, BookingCalendar] = {}
+
+    def calendar(self, vehicle_id: str) -> BookingCalendar:
+        calendar = self._calendars.get(vehicle_id)
+        if calendar is None:
+            calendar = self._calendars.setdefault(
+                vehicle_id, BookingCalendar()
+            )
+        return calendar
+
+    def is_available(
+        self, vehicle_id: str, start_date: date, end_date: date
+    ) -> bool:
+        calendar = self._calendars.get(vehicle_id)
+        return calendar is None or calendar.is_free(start_date, end_date)
+
+    def book(
+        self,
+        vehicle_id: str,
+        rental_id: str,
+        start_date: date,
+        end_date: date,
+    ) -> None:
+        self.calendar(vehicle_id).book(rental_id, start_date, end_date)
+
+    def release(
+        self, vehicle_id: str, rental_id: str, start_date: date
+    ) -> None:
+        self.calendar(vehicle_id).release(rental_id, start_date)
+
+    def shorten(
+        self,
+        vehicle_id: str,
+        rental_id: str,
+        start_date: date,
+        new_end: date,
+    ) -> None:
+        self.calendar(vehicle_id).shorten(rental_id, start_date, new_end)
+
+    def free_vehicle_ids(
+        self, vehicle_ids: Iterable[str], start_date: date, end_date: date
+    ) -> List[str]:
+        calendars = self._calendars
+        return [
+            vehicle_id
+            for vehicle_id in vehicle_ids
+            if vehicle_id not in calendars
+            or calendars[vehicle_id].is_free(start_date, end_date)
+        ]
@@ -0,0 +1,309 @@
+import csv
+import json
+import math
+import os
+from datetime import date
+from enum import Enum
+from operator import itemgetter
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+)
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class RowError(NamedTuple):
+    line: int
+    message: str
+
+
+class BulkLoadResult:
+    """Wynik importu hurtowego: liczba wczytanych rekordów i błędy
+    odrzuconych wierszy (numer wiersza w pliku i komunikat)."""
+
+    def __init__(self) -> None:
+        self.loaded = 0
+        self.errors: List[RowError] = []
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    def __repr__(self) -> str:
+        return (
+            f"BulkLoadResult(loaded={self.loaded}, failed={self.failed})"
+        )
+
+
+class Chunk:
+    """Porcja rekordów z pliku, walidowana kolumnami.
+
+    Metody konwertujące zwracają całą kolumnę naraz. Szybka ścieżka
+    sprawdza typy i konwertuje wartości funkcjami wbudowanymi (map, min,
+    max), a dopiero gdy się nie powiedzie, wartości są sprawdzane po
+    kolei. Wiersz z błędem ma w kolumnie wartość None, a komunikat trafia
+    do errors (pierwszy błąd danego wiersza).
+    """
+
+    def __init__(
+        self,
+        lines: List[int],
+        rows: List[Any],
+        header: Optional[Dict[str, int]] = None,
+    ) -> None:
+        # Wiersze CSV to listy wartości z nagłówkiem header, a wiersze
+        # NDJSON to słowniki.
+        self.lines = lines
+        self.rows = rows
+        self.header = header
+        self.errors: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def reject(self, index: int, message: str) -> None:
+        self.errors.setdefault(index, message)
+
+    def row_errors(self) -> List[RowError]:
+        return [
+            RowError(self.lines[i], message)
+            for i, message in sorted(self.errors.items())
+        ]
+
+    def column(self, field: str) -> List[Any]:
+        if self.header is None:
+            return [row.get(field) for row in self.rows]
+        index = self.header.get(field)
+        if index is None:
+            return [None] * len(self.rows)
+        return list(map(itemgetter(index), self.rows))
+
+    def present(self, field: str) -> List[bool]:
+        """Maska wierszy, w których pole ma wartość (nie jest puste)."""
+        return [v is not None and v != "" for v in self.column(field)]
+
+    def _convert(
+        self,
+        field: str,
+        types: Sequence[type],
+        convert: Any,
+        message: str,
+        mask: Optional[List[bool]] = None,
+    ) -> List[Any]:
+        values = self.column(field)
+        if mask is None:
+            indices: Sequence[int] = range(len(values))
+        else:
+            indices = [i for i, m in enumerate(mask) if m]
+            values = [values[i] for i in indices]
+
+        converted = None
+        if set(map(type, values)) <= set(types):
+            try:
+                converted = list(map(convert, values))
+            except (TypeError, ValueError):
+                pass
+        if converted is None:
+            converted = []
+            for i, v in zip(indices, values):
+                try:
+                    if type(v) not in types:
+                        raise ValueError
+                    converted.append(convert(v))
+                except (TypeError, ValueError):
+                    self.reject(i, message)
+                    converted.append(None)
+
+        if mask is None:
+            return converted
+        result: List[Any] = [None] * len(self.rows)
+        for i, v in zip(indices, converted):
+            result[i] = v
+        return result
+
+    def strings(
+        self, field: str, mask: Optional[List[bool]] = None
+    ) -> List[Optional[str]]:
+        message = f"Pole {field} musi być niepustym stringiem"
+        values = self._convert(field, (str,), str, message, mask)
+        if "" in values:
+            for i, v in enumerate(values):
+                if v == "":
+                    self.reject(i, message)
+                    values[i] = None
+        return values
+
+    def ints(
+        self, field: str, mask: Optional[List[bool]] = None
+    ) -> List[Optional[int]]:
+        return self._convert(
+            field,
+            (str, int),
+            int,
+            f"Pole {field} musi być liczbą całkowitą",
+            mask,
+        )
+
+    def floats(
+        self, field: str, mask: Optional[List[bool]] = None
+    ) -> List[Optional[float]]:
+        message = f"Pole {field} musi być liczbą"
+        values = self._convert(field, (str, int, float), float, message, mask)
+        if not all(map(math.isfinite, filter(None, values))):
+            for i, v in enumerate(values):
+                if v is not None and not math.isfinite(v):
+                    self.reject(i, message)
+                    values[i] = None
+        return values
+
+    def dates(
+        self, field: str, mask: Optional[List[bool]] = None
+    ) -> List[Optional[date]]:
+        return self._convert(
+            field,
+            (str,),
+            date.fromisoformat,
+            f"Pole {field} musi być datą w formacie RRRR-MM-DD",
+            mask,
+        )
+
+    def string_lists(self, field: str) -> List[Optional[List[str]]]:
+        # W CSV lista jest zapisana jako wartości rozdzielone średnikami.
+        return self._convert(
+            field,
+            (str, list),
+            _string_list,
+            f"Pole {field} musi być listą stringów",
+        )
+
+    def enums(
+        self, field: str, enum: Type[Enum], default: Any = None
+    ) -> List[Any]:
+        members = {member.value: member for member in enum}
+        values = self.column(field)
+        if default is not None:
+            members[None] = members[""] = default
+        result = [
+            members.get(v) if type(v) is str or v is None else None
+            for v in values
+        ]
+        if None in result:
+            for i, member in enumerate(result):
+                if member is None:
+                    self.reject(i, f"Nieznana wartość pola {field}")
+        return result
+
+    def check_range(
+        self,
+        values: List[Any],
+        low: Any,
+        high: Any,
+        message: str,
+    ) -> None:
+        """Odrzuca wiersze z wartością spoza przedziału [low, high]."""
+        present = [v for v in values if v is not None]
+        if not present or (
+            (low is None or min(present) >= low)
+            and (high is None or max(present) <= high)
+        ):
+            return
+        for i, v in enumerate(values):
+            if v is not None and (
+                (low is not None and v < low)
+                or (high is not None and v > high)
+            ):
+                self.reject(i, message)
+
+
+def _string_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [item for item in value.split(";") if item]
+    if not all(isinstance(item, str) for item in value):
+        raise ValueError
+    return value
+
+
+def detect_format(path: str, file_format: Optional[str] = None) -> str:
+    if file_format is None:
+        file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise ValueError(
+                "Nie można ustalić formatu pliku - podaj 'csv' lub 'ndjson'"
+            )
+    if file_format not in ("csv", "ndjson"):
+        raise ValueError("Format pliku musi być 'csv' lub 'ndjson'")
+    return file_format
+
+
+def read_chunks(
+    path: str,
+    file_format: Optional[str] = None,
+    chunk_size: int = 10_000,
+    errors: Optional[List[RowError]] = None,
+) -> Iterator[Chunk]:
+    """Strumieniowo czyta plik CSV (z nagłówkiem) lub NDJSON (jeden obiekt
+    JSON w wierszu) porcjami po chunk_size rekordów.
+
+    Puste wiersze są pomijane, a wiersze, których nie da się odczytać,
+    trafiają do listy errors.
+    """
+    if not path or not isinstance(path, str):
+        raise ValueError("Ścieżka pliku musi być niepustym stringiem")
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise ValueError(
+            "Rozmiar porcji musi być dodatnią liczbą całkowitą"
+        )
+    file_format = detect_format(path, file_format)
+    if errors is None:
+        errors = []
+
+    with open(path, newline="", encoding="utf-8") as f:
+        header: Optional[Dict[str, int]] = None
+        if file_format == "csv":
+            reader = csv.reader(f)
+            names = next(reader, [])
+            header = {name: i for i, name in enumerate(names)}
+            records: Iterator[Any] = (
+                (reader.line_num, row) for row in reader if row
+            )
+        else:
+            records = (
+                (line_number, line)
+                for line_number, line in enumerate(f, start=1)
+                if line.strip()
+            )
+
+        lines: List[int] = []
+        rows: List[Any] = []
+        for line_number, row in records:
+            if header is not None:
+                if len(row) != len(header):
+                    errors.append(
+                        RowError(line_number, "Niepoprawna liczba kolumn")
+                    )
+                    continue
+            else:
+                try:
+                    row = json.loads(row)
+                except ValueError:
+                    row = None
+                if not isinstance(row, dict):
+                    errors.append(
+                        RowError(line_number, "Niepoprawny obiekt JSON")
+                    )
+                    continue
+
+            lines.append(line_number)
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield Chunk(lines, rows, header)
+                lines, rows = [], []
+        if rows:
+            yield Chunk(lines, rows, header)
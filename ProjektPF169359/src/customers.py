@@ -1,7 +1,15 @@
+import re
+import threading
 from enum import Enum
-from typing import Optional, Dict, List
+from typing import Any, Callable, Optional, Dict, List, Set, Tuple
 from datetime import datetime, date
 
+from src import bulk
+from src.storage import Storage
+from src.text import fold_name
+from src.trie import PrefixTrie
+from src.trigram import TrigramIndex
+
 
 class CustomerCategory(Enum):
     STANDARD = "standard"
@@ -36,6 +44,23 @@ class DrivingLicense:
         self.expiry_date = expiry_date
         self.categories = categories
 
+    @classmethod
+    def _unchecked(
+        cls,
+        license_number: str,
+        issue_date: date,
+        expiry_date: date,
+        categories: List[str],
+    ) -> "DrivingLicense":
+        """Tworzy prawo jazdy z danych zwalidowanych już przez import
+        hurtowy, z pominięciem walidacji w __init__."""
+        license = cls.__new__(cls)
+        license.license_number = license_number
+        license.issue_date = issue_date
+        license.expiry_date = expiry_date
+        license.categories = categories
+        return license
+
     def is_valid(self, check_date: Optional[date] = None) -> bool:
         if check_date is None:
             check_date = date.today()
@@ -86,7 +111,74 @@ class Customer:
         self.driving_license = driving_license
         self.registration_date = datetime.now().date()
         self.category = CustomerCategory.STANDARD
-        self.rental_history: List[str] = []
+        self._rental_history: Optional[List[str]] = None
+
+    @classmethod
+    def _unchecked(
+        cls,
+        customer_id: str,
+        first_name: str,
+        last_name: str,
+        email: str,
+        phone: str,
+        address: str,
+        driving_license: DrivingLicense,
+        registration_date: date,
+        category: CustomerCategory,
+    ) -> "Customer":
+        """Tworzy klienta z danych zwalidowanych już przez import hurtowy,
+        z pominięciem walidacji w __init__."""
+        customer = cls.__new__(cls)
+        customer.customer_id = customer_id
+        customer.first_name = first_name
+        customer.last_name = last_name
+        customer.email = email
+        customer.phone = phone
+        customer.address = address
+        customer.driving_license = driving_license
+        customer.registration_date = registration_date
+        customer.category = category
+        customer._rental_history = None
+        return customer
+
+    # Kategoria jest właściwością, żeby rejestr mógł aktualizować indeks
+    # kategorii (albo zapisać klienta w magazynie) także przy zmianie
+    # bezpośredniej (upgrade_category lub przypisanie), bez wywołania
+    # update_customer.
+    @property
+    def category(self) -> CustomerCategory:
+        return self._category
+
+    @category.setter
+    def category(self, value: CustomerCategory) -> None:
+        self._category = value
+        listener = self.__dict__.get("_category_listener")
+        if listener is not None:
+            listener(self)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Powiązanie z rejestrem nie jest częścią stanu klienta.
+        state = self.__dict__.copy()
+        state.pop("_category_listener", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Migawki sprzed wprowadzenia właściwości zapisują "category".
+        if "category" in state:
+            state["_category"] = state.pop("category")
+        self.__dict__.update(state)
+
+    # Klient zachowuje __dict__ (metody bywają podmieniane na instancji),
+    # ale historię wypożyczeń tworzy dopiero przy pierwszym użyciu.
+    @property
+    def rental_history(self) -> List[str]:
+        if self._rental_history is None:
+            self._rental_history = []
+        return self._rental_history
+
+    @rental_history.setter
+    def rental_history(self, value: List[str]) -> None:
+        self._rental_history = value
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name} (ID: {self.customer_id})"
@@ -110,43 +202,491 @@ class Customer:
         self.rental_history.append(rental_id)
 
 
+def customers_from_chunk(
+    chunk: bulk.Chunk, today: date
+) -> List[Optional[Customer]]:
+    """Waliduje porcję kolumnami i tworzy klientów; dla odrzuconych
+    wierszy zwraca None."""
+    license_numbers = chunk.strings("license_number")
+    issue_dates = chunk.dates("license_issue_date")
+    expiry_dates = chunk.dates("license_expiry_date")
+    categories = chunk.string_lists("license_categories")
+    for i, (issued, expires) in enumerate(zip(issue_dates, expiry_dates)):
+        if issued is not None and expires is not None and issued > expires:
+            chunk.reject(i, "Data wydania nie może być późniejsza")
+
+    registered = chunk.present("registration_date")
+    registration_dates = chunk.dates("registration_date", registered)
+    columns = (
+        chunk.strings("customer_id"),
+        chunk.strings("first_name"),
+        chunk.strings("last_name"),
+        chunk.strings("email"),
+        chunk.strings("phone"),
+        chunk.strings("address"),
+    )
+    customer_categories = chunk.enums(
+        "category", CustomerCategory, CustomerCategory.STANDARD
+    )
+
+    errors = chunk.errors
+    customers: List[Optional[Customer]] = []
+    for i, values in enumerate(zip(*columns)):
+        if i in errors:
+            customers.append(None)
+            continue
+        license = DrivingLicense._unchecked(
+            license_numbers[i], issue_dates[i], expiry_dates[i], categories[i]
+        )
+        customers.append(
+            Customer._unchecked(
+                *values,
+                license,
+                registration_dates[i] if registered[i] else today,
+                customer_categories[i],
+            )
+        )
+    return customers
+
+
+def _name_keys(customer: Customer) -> Tuple[str, ...]:
+    """Znormalizowane nazwisko, imię i nazwisko w obu kolejnościach,
+    imię oraz część adresu e-mail przed znakiem @ (domena jest wspólna
+    dla wielu klientów i tylko zawyżałaby podobieństwo)."""
+    return (
+        fold_name(customer.last_name),
+        fold_name(customer.last_name, customer.first_name),
+        fold_name(customer.first_name, customer.last_name),
+        fold_name(customer.first_name),
+        fold_name(customer.email.partition("@")[0]),
+    )
+
+
+_PHONE_SEPARATORS = re.compile(r"[\s()./-]")
+
+# Pola, których wartość może mieć tylko jeden klient, i ich postać
+# normalna używana w indeksach (np. "+48 500-100-200" to "+48500100200").
+UNIQUE_FIELDS: Dict[str, Callable[[str], str]] = {
+    "email": lambda email: email.strip().casefold(),
+    "phone": lambda phone: _PHONE_SEPARATORS.sub("", phone),
+    "license_number": lambda number: "".join(number.split()).upper(),
+}
+
+_UNIQUE_LABELS = {
+    "email": "adresem e-mail",
+    "phone": "numerem telefonu",
+    "license_number": "numerem prawa jazdy",
+}
+
+
+def unique_keys(customer: Customer) -> Dict[str, str]:
+    """Znormalizowane wartości pól unikalnych klienta."""
+    values = {
+        "email": customer.email,
+        "phone": customer.phone,
+        "license_number": customer.driving_license.license_number,
+    }
+    return {
+        field: normalize(values[field])
+        for field, normalize in UNIQUE_FIELDS.items()
+    }
+
+
 class CustomerRegistry:
-    def __init__(self) -> None:
+    """Rejestr klientów.
+
+    Zmiany są szeregowane zamkiem rejestru, a zapytania iterują po
+    migawce słownika klientów, więc mogą działać równolegle ze zmianami.
+
+    Bez magazynu rejestr utrzymuje indeks nazwisk (bez rozróżniania
+    wielkości liter i polskich znaków) oraz drzewo prefiksowe imion
+    i nazwisk do podpowiedzi przy wpisywaniu, a także indeks trójek
+    znaków imion, nazwisk i adresów e-mail do wyszukiwania z literówkami.
+    Indeksy są aktualizowane przy rejestracji, aktualizacji i usunięciu
+    klienta, więc zmiana imienia, nazwiska lub adresu e-mail wymaga
+    wywołania update_customer.
+
+    Bez magazynu rejestr grupuje też klientów według kategorii. Zmiana
+    Customer.category (np. przez upgrade_category) od razu przenosi
+    klienta do nowej grupy, więc get_customers_by_category odczytuje
+    tylko klientów danej kategorii, a count_customers_by_category
+    liczy ich w czasie O(1) na kategorię. Klient może być w ten sposób
+    powiązany tylko z jednym rejestrem naraz.
+
+    Adres e-mail, telefon i numer prawa jazdy (UNIQUE_FIELDS) są
+    unikalne: rejestr odrzuca klienta, którego wartość ma już inny
+    klient, i wyszukuje klientów po nich w czasie O(1) - bez magazynu
+    w indeksach haszowych, a z magazynem w jego indeksach.
+    """
+
+    def __init__(self, storage: Optional[Storage] = None) -> None:
+        if storage is not None and not isinstance(storage, Storage):
+            raise TypeError("Magazyn musi być instancją klasy Storage")
+
+        # Z magazynem słownik przechowuje tylko wczytanych klientów.
         self.customers: Dict[str, Customer] = {}
+        self.storage = storage
+        self.journal = None
+        self._lock = threading.RLock()
+        self._by_last_name: Dict[str, Dict[str, Customer]] = {}
+        self._name_trie = PrefixTrie()
+        self._trigrams = TrigramIndex()
+        # Postać normalna wartości pola unikalnego -> ID klienta.
+        self._unique: Dict[str, Dict[str, str]] = {
+            field: {} for field in UNIQUE_FIELDS
+        }
+        self._by_category: Dict[CustomerCategory, Dict[str, Customer]] = {
+            category: {} for category in CustomerCategory
+        }
+        # Klucze, pod którymi klient jest w indeksach.
+        self._indexed_keys: Dict[str, Tuple[str, ...]] = {}
+        self._indexed_categories: Dict[str, CustomerCategory] = {}
+        # Jedna metoda związana wspólna dla wszystkich klientów.
+        self._category_listener = self._index_category
+        if storage is not None:
+            # Także klienci wczytani przez magazyn z wypożyczeniem.
+            storage.customer_listener = self._category_listener
+
+    def _record(self, operation: str, *args) -> None:
+        if self.journal is not None:
+            self.journal.record(operation, args)
+
+    def _load(self, customer_id: str) -> Optional[Customer]:
+        customer = self.customers.get(customer_id)
+        if customer is None and self.storage is not None:
+            customer = self.storage.load_customer(customer_id)
+            if customer is not None:
+                self.customers[customer_id] = customer
+                self._index(customer)
+        return customer
+
+    def _index(self, customer: Customer) -> None:
+        customer._category_listener = self._category_listener
+        if self.storage is not None:
+            return
+        self._index_category(customer)
+        customer_id = customer.customer_id
+        keys = _name_keys(customer) + tuple(unique_keys(customer).values())
+        if self._indexed_keys.get(customer_id) == keys:
+            return
+        self._unindex(customer_id)
+        last_name, last_first, first_last, first_name, email, *unique = keys
+        self._by_last_name.setdefault(last_name, {})[customer_id] = customer
+        for name in (last_first, first_last):
+            self._name_trie.add(name, customer_id, customer)
+        for term in {last_name, first_last, first_name, email}:
+            self._trigrams.add(term, customer_id, customer)
+        for field, key in zip(UNIQUE_FIELDS, unique):
+            self._unique[field][key] = customer_id
+        self._indexed_keys[customer_id] = keys
+
+    def _index_category(self, customer: Customer) -> None:
+        customer_id = customer.customer_id
+        category = customer.category
+        if self.storage is not None:
+            # Magazyn sam liczy klientów według kategorii, więc zmiana
+            # kategorii musi od razu trafić do niego. Klient wczytany
+            # przez magazyn z wypożyczeniem nie musi być jeszcze
+            # w słowniku rejestru.
+            with self._lock:
+                if self._load(customer_id) is customer:
+                    self.storage.save_customer(customer)
+            return
+        with self._lock:
+            previous = self._indexed_categories.get(customer_id)
+            if previous is category:
+                return
+            if previous is not None:
+                del self._by_category[previous][customer_id]
+            self._by_category[category][customer_id] = customer
+            self._indexed_categories[customer_id] = category
+
+    def _unindex_category(self, customer: Customer) -> None:
+        category = self._indexed_categories.pop(customer.customer_id, None)
+        if category is not None:
+            del self._by_category[category][customer.customer_id]
+        if customer.__dict__.get("_category_listener") is (
+            self._category_listener
+        ):
+            del customer._category_listener
+
+    def _unindex(self, customer_id: str) -> None:
+        keys = self._indexed_keys.pop(customer_id, None)
+        if keys is None:
+            return
+        last_name, last_first, first_last, first_name, email, *unique = keys
+        same_name = self._by_last_name[last_name]
+        del same_name[customer_id]
+        if not same_name:
+            del self._by_last_name[last_name]
+        for name in (last_first, first_last):
+            self._name_trie.remove(name, customer_id)
+        for term in {last_name, first_last, first_name, email}:
+            self._trigrams.remove(term, customer_id)
+        for field, key in zip(UNIQUE_FIELDS, unique):
+            if self._unique[field].get(key) == customer_id:
+                del self._unique[field][key]
+
+    def _owners(self, field: str, keys: List[str]) -> Dict[str, str]:
+        """ID klientów, którzy mają podane wartości pola unikalnego."""
+        if self.storage is not None:
+            return self.storage.customer_ids_by_key(field, keys)
+        index = self._unique[field]
+        return {key: index[key] for key in keys if key in index}
+
+    def _check_unique(self, customer: Customer) -> None:
+        for field, key in unique_keys(customer).items():
+            owner = self._owners(field, [key]).get(key)
+            if owner is not None and owner != customer.customer_id:
+                raise ValueError(
+                    f"Klient z {_UNIQUE_LABELS[field]} {key} już istnieje "
+                    "w rejestrze"
+                )
+
+    def _store(self, customers: List[Customer]) -> None:
+        with self._lock:
+            self.customers.update((c.customer_id, c) for c in customers)
+            for customer in customers:
+                self._index(customer)
 
     def register_customer(self, customer: Customer) -> None:
         if not isinstance(customer, Customer):
             raise TypeError("Obiekt musi być instancją klasy Customer")
 
-        if customer.customer_id in self.customers:
-            raise ValueError(
-                f"Klient o ID {customer.customer_id} już istnieje w rejestrze"
+        with self._lock:
+            if self._load(customer.customer_id) is not None:
+                raise ValueError(
+                    f"Klient o ID {customer.customer_id} już istnieje "
+                    "w rejestrze"
+                )
+            self._check_unique(customer)
+            self.customers[customer.customer_id] = customer
+            self._index(customer)
+            if self.storage is not None:
+                self.storage.save_customer(customer)
+            self._record("register_customer", customer)
+
+    def load_customers(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        chunk_size: int = 10_000,
+    ) -> bulk.BulkLoadResult:
+        """Hurtowo wczytuje klientów z pliku CSV lub NDJSON.
+
+        Plik jest czytany porcjami po chunk_size rekordów, więc zużycie
+        pamięci przez import nie zależy od rozmiaru pliku. Pola to
+        argumenty konstruktora Customer, dane prawa jazdy (license_number,
+        license_issue_date, license_expiry_date, license_categories -
+        w CSV rozdzielone średnikami) oraz opcjonalnie category
+        i registration_date. Błędne wiersze są pomijane i zgłaszane
+        w wyniku zamiast przerywać import.
+        """
+        result = bulk.BulkLoadResult()
+        today = datetime.now().date()
+        for chunk in bulk.read_chunks(
+            path, file_format, chunk_size, result.errors
+        ):
+            customers = customers_from_chunk(chunk, today)
+            with self._lock:
+                batch = self._insert_new(chunk, customers)
+            result.errors.extend(chunk.row_errors())
+            result.loaded += len(batch)
+        result.errors.sort()
+        return result
+
+    def _insert_new(
+        self, chunk: bulk.Chunk, customers: List[Optional[Customer]]
+    ) -> List[Customer]:
+        valid = [c for c in customers if c is not None]
+        seen = self._existing_ids([c.customer_id for c in valid])
+        keys = [unique_keys(c) for c in valid]
+        # Wartości pól unikalnych zajęte w rejestrze lub przez wcześniejsze
+        # wiersze pliku.
+        taken = {
+            field: set(self._owners(field, [k[field] for k in keys]))
+            for field in UNIQUE_FIELDS
+        }
+        batch: List[Customer] = []
+        rows = (i for i, c in enumerate(customers) if c is not None)
+        for i, customer, customer_keys in zip(rows, valid, keys):
+            customer_id = customer.customer_id
+            if customer_id in seen:
+                chunk.reject(i, f"Klient o ID {customer_id} już istnieje")
+                continue
+            duplicate = next(
+                (f for f, k in customer_keys.items() if k in taken[f]), None
             )
-        self.customers[customer.customer_id] = customer
+            if duplicate is not None:
+                chunk.reject(
+                    i,
+                    f"Klient z {_UNIQUE_LABELS[duplicate]} "
+                    f"{customer_keys[duplicate]} już istnieje",
+                )
+                continue
+            seen.add(customer_id)
+            for field, key in customer_keys.items():
+                taken[field].add(key)
+            batch.append(customer)
+
+        if batch:
+            if self.storage is not None:
+                # Klienci trafiają tylko do magazynu i są wczytywani
+                # z niego dopiero, gdy okażą się potrzebni.
+                self.storage.save_customers(batch)
+            else:
+                self._store(batch)
+            self._record("register_customers", batch)
+        return batch
+
+    def _existing_ids(self, customer_ids: List[str]) -> Set[str]:
+        customers = self.customers
+        existing = {i for i in customer_ids if i in customers}
+        if self.storage is not None:
+            existing |= self.storage.existing_customer_ids(customer_ids)
+        return existing
+
+    def update_customer(self, customer: Customer) -> None:
+        if not isinstance(customer, Customer):
+            raise TypeError("Obiekt musi być instancją klasy Customer")
+
+        with self._lock:
+            if self._load(customer.customer_id) is not customer:
+                raise ValueError(
+                    f"Klient o ID {customer.customer_id} nie jest "
+                    "zarejestrowany"
+                )
+            self._check_unique(customer)
+            self._index(customer)
+            if self.storage is not None:
+                self.storage.save_customer(customer)
+            self._record("update_customer", customer)
 
     def remove_customer(self, customer_id: str) -> None:
         if not customer_id or not isinstance(customer_id, str):
             raise ValueError("ID klienta musi być niepustym stringiem")
 
-        if customer_id not in self.customers:
-            raise ValueError(f"Klient o ID {customer_id} nie istnieje")
-        del self.customers[customer_id]
+        with self._lock:
+            customer = self._load(customer_id)
+            if customer is None:
+                raise ValueError(f"Klient o ID {customer_id} nie istnieje")
+            del self.customers[customer_id]
+            self._unindex(customer_id)
+            self._unindex_category(customer)
+            if self.storage is not None:
+                self.storage.delete_customer(customer_id)
+            self._record("remove_customer", customer_id)
 
     def get_customer(self, customer_id: str) -> Optional[Customer]:
         if not customer_id or not isinstance(customer_id, str):
             raise ValueError("ID klienta musi być niepustym stringiem")
 
-        return self.customers.get(customer_id)
+        return self._load(customer_id)
+
+    def _find_unique(
+        self, field: str, value: str, label: str
+    ) -> Optional[Customer]:
+        if not value or not isinstance(value, str):
+            raise ValueError(f"{label} musi być niepustym stringiem")
+
+        key = UNIQUE_FIELDS[field](value)
+        customer_id = self._owners(field, [key]).get(key)
+        return None if customer_id is None else self._load(customer_id)
+
+    def get_customer_by_email(self, email: str) -> Optional[Customer]:
+        return self._find_unique("email", email, "Email")
+
+    def get_customer_by_phone(self, phone: str) -> Optional[Customer]:
+        return self._find_unique("phone", phone, "Telefon")
+
+    def get_customer_by_license_number(
+        self, license_number: str
+    ) -> Optional[Customer]:
+        return self._find_unique(
+            "license_number", license_number, "Numer prawa jazdy"
+        )
 
     def find_customers_by_last_name(self, last_name: str) -> List[Customer]:
         if not last_name or not isinstance(last_name, str):
             raise ValueError("Nazwisko musi być niepustym stringiem")
 
-        return [
-            c
-            for c in self.customers.values()
-            if c.last_name.lower() == last_name.lower()
-        ]
+        if self.storage is not None:
+            return [
+                self._load(customer_id)
+                for customer_id in self.storage.customer_ids(
+                    last_name=last_name
+                )
+            ]
+        same_name = self._by_last_name.get(fold_name(last_name))
+        return list(same_name.values()) if same_name else []
+
+    def find_customers_by_name_prefix(
+        self, prefix: str, limit: int = 10
+    ) -> List[Customer]:
+        """Podpowiedzi dla wpisywanego imienia i nazwiska.
+
+        Zwraca do limit klientów, których imię i nazwisko - w dowolnej
+        kolejności - zaczyna się od prefix, uporządkowanych alfabetycznie
+        bez rozróżniania wielkości liter i polskich znaków.
+        """
+        if not prefix or not isinstance(prefix, str):
+            raise ValueError("Prefiks musi być niepustym stringiem")
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError("Limit musi być dodatnią liczbą całkowitą")
+
+        # Spacja na końcu oznacza, że słowo zostało wpisane w całości.
+        key = fold_name(prefix) + (" " if prefix[-1].isspace() else "")
+        if self.storage is not None:
+            return [
+                self._load(customer_id)
+                for customer_id in self.storage.customer_ids_by_name_prefix(
+                    key, limit
+                )
+            ]
+
+        with self._lock:
+            found: Dict[str, Customer] = {}
+            for _, customer in self._name_trie.items(key):
+                # Klient pasujący w obu kolejnościach pojawia się dwa razy.
+                found.setdefault(customer.customer_id, customer)
+                if len(found) == limit:
+                    break
+            return list(found.values())
+
+    def find_customers_fuzzy(
+        self, query: str, limit: int = 10, threshold: float = 0.3
+    ) -> List[Customer]:
+        """Wyszukiwanie odporne na literówki (np. "Nowack", "Kowalsky").
+
+        Zapytanie jest porównywane z imieniem, nazwiskiem, imieniem
+        i nazwiskiem razem oraz adresem e-mail bez domeny miarą
+        podobieństwa trójek znaków (src.trigram). Zwraca do limit klientów
+        o podobieństwie co najmniej threshold, od najbardziej podobnych.
+        """
+        if not query or not isinstance(query, str):
+            raise ValueError("Zapytanie musi być niepustym stringiem")
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError("Limit musi być dodatnią liczbą całkowitą")
+        if not isinstance(threshold, (int, float)) or not 0 < threshold <= 1:
+            raise ValueError("Próg podobieństwa musi być w zakresie (0, 1]")
+
+        if self.storage is not None:
+            return [
+                self._load(customer_id)
+                for customer_id in self.storage.customer_ids_by_similarity(
+                    query, threshold, limit
+                )
+            ]
+
+        found: Dict[str, Customer] = {}
+        with self._lock:
+            for _, _, customers in self._trigrams.search(query, threshold):
+                # Pierwsze trafienie klienta ma jego najwyższe podobieństwo.
+                for customer_id, customer in customers.items():
+                    found.setdefault(customer_id, customer)
+                    if len(found) == limit:
+                        return list(found.values())
+        return list(found.values())
 
     def get_customers_by_category(
         self, category: CustomerCategory
@@ -154,7 +694,24 @@ class CustomerRegistry:
         if not isinstance(category, CustomerCategory):
             raise ValueError("Kategoria musi być instancją CustomerCategory")
 
-        return [c for c in self.customers.values() if c.category == category]
+        if self.storage is not None:
+            return [
+                self._load(customer_id)
+                for customer_id in self.storage.customer_ids(
+                    category=category
+                )
+            ]
+        return list(self._by_category[category].values())
 
     def count_customers(self) -> int:
+        if self.storage is not None:
+            return self.storage.count_customers()
         return len(self.customers)
+
+    def count_customers_by_category(self) -> Dict[CustomerCategory, int]:
+        if self.storage is not None:
+            return self.storage.count_customers_by_category()
+        return {
+            category: len(customers)
+            for category, customers in self._by_category.items()
+        }
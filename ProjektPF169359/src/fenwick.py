@@ -0,0 +1,67 @@
+from typing import List
+
+
+class DailyFenwickTree:
+    """Drzewo Fenwicka nad kolejnymi dniami (ordinalami dat).
+
+    Przechowuje wartość przypisaną do każdego dnia i pozwala w O(log d)
+    dodać wartość do dnia oraz policzyć sumę wszystkich dni do danego
+    dnia włącznie. Zakres dni rozszerza się automatycznie.
+    """
+
+    def __init__(self) -> None:
+        self._offset = 0
+        self._values: List[float] = []
+        self._tree: List[float] = [0]
+
+    def add(self, day: int, amount: float) -> None:
+        i = day - self._offset
+        if i < 0 or i >= len(self._values):
+            self._grow(day)
+            i = day - self._offset
+
+        self._values[i] += amount
+        tree = self._tree
+        n = len(tree)
+        i += 1
+        while i < n:
+            tree[i] += amount
+            i += i & -i
+
+    def prefix_sum(self, day: int) -> float:
+        i = min(day - self._offset + 1, len(self._values))
+        tree = self._tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _grow(self, day: int) -> None:
+        if self._values:
+            low = min(self._offset, day)
+            high = max(self._offset + len(self._values) - 1, day)
+        else:
+            low = high = day
+        # Zapas po stronie, w którą rośnie zakres, amortyzuje przebudowy.
+        slack = max((high - low + 1) // 2, 32)
+        if self._values and day < self._offset:
+            low -= slack
+        else:
+            high += slack
+
+        values = [0] * (high - low + 1)
+        shift = self._offset - low
+        for i, value in enumerate(self._values):
+            values[i + shift] = value
+
+        tree = [0] + values
+        n = len(tree)
+        for i in range(1, n):
+            parent = i + (i & -i)
+            if parent < n:
+                tree[parent] += tree[i]
+
+        self._offset = low
+        self._values = values
+        self._tree = tree
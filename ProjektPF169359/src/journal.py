@@ -0,0 +1,318 @@
+import os
+import pickle
+import re
+import struct
+import threading
+import zlib
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+from src.customers import CustomerRegistry
+from src.rental import Rental, RentalManager
+from src.vehicles import VehicleInventory
+
+# Nagłówek rekordu: długość danych i ich suma kontrolna CRC32.
+_HEADER = struct.Struct(">II")
+_SEGMENT = re.compile(r"^journal-(\d{8})\.log$")
+_SNAPSHOT = "snapshot.pickle"
+
+
+class JournalError(Exception):
+    pass
+
+
+class MutationLog:
+    """Plik z dopisywanymi na końcu rekordami (operacja, argumenty).
+
+    Każdy rekord ma nagłówek z długością i sumą CRC32, więc urwany lub
+    uszkodzony koniec pliku (np. po awarii w trakcie zapisu) jest
+    wykrywany przy odczycie i obcinany.
+    """
+
+    def __init__(self, path: str, fsync: bool = False) -> None:
+        self.path = path
+        self.fsync = fsync
+        self._file: BinaryIO = open(path, "ab")
+
+    def append(self, operation: str, args: Tuple[Any, ...]) -> None:
+        payload = pickle.dumps((operation, args), pickle.HIGHEST_PROTOCOL)
+        self._file.write(
+            _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        )
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    @staticmethod
+    def read(path: str) -> Iterator[Tuple[str, Tuple[Any, ...]]]:
+        valid_size = 0
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                size, checksum = _HEADER.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size or zlib.crc32(payload) != checksum:
+                    break
+                valid_size = f.tell()
+                yield pickle.loads(payload)
+
+        if valid_size < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(valid_size)
+
+
+class Journal:
+    """Trwałość stanu przez dziennik zmian i okresowe migawki.
+
+    Rejestr klientów, inwentarz i menedżer wypożyczeń zapisują do
+    dziennika każdą zmianę wykonaną przez swoje metody. Dziennik dzieli
+    się na kolejne segmenty; migawka zapisuje cały stan i pozwala usunąć
+    segmenty, które obejmuje, więc odtworzenie stanu to wczytanie
+    migawki i powtórzenie tylko najnowszych rekordów.
+
+    Zmiany wykonane bezpośrednio na obiektach (np. Vehicle.change_status)
+    nie trafiają do dziennika - należy użyć odpowiednich metod
+    menedżerów, np. VehicleInventory.change_vehicle_status lub
+    CustomerRegistry.update_customer.
+
+    Zapis rekordów jest bezpieczny przy wielu wątkach. Migawka nie
+    zatrzymuje jednak zmian w menedżerach, więc przy współbieżnych
+    zapisach należy wywoływać snapshot() tylko wtedy, gdy żadna zmiana
+    nie jest w toku (i nie używać snapshot_every).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_every: Optional[int] = None,
+        fsync: bool = False,
+    ) -> None:
+        if not directory or not isinstance(directory, str):
+            raise ValueError("Katalog dziennika musi być niepustym stringiem")
+        if snapshot_every is not None and (
+            not isinstance(snapshot_every, int) or snapshot_every <= 0
+        ):
+            raise ValueError(
+                "Częstotliwość migawek musi być dodatnią liczbą całkowitą"
+            )
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.registry: Optional[CustomerRegistry] = None
+        self.inventory: Optional[VehicleInventory] = None
+        self.manager: Optional[RentalManager] = None
+        self._log: Optional[MutationLog] = None
+        self._segment = 0
+        self._records_since_snapshot = 0
+        self._lock = threading.RLock()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"journal-{segment:08d}.log")
+
+    def _segments(self) -> List[int]:
+        return sorted(
+            int(match.group(1))
+            for match in map(_SEGMENT.match, os.listdir(self.directory))
+            if match
+        )
+
+    def open(
+        self,
+        registry: CustomerRegistry,
+        inventory: VehicleInventory,
+        manager: RentalManager,
+    ) -> None:
+        """Odtwarza zapisany stan w pustych menedżerach i podłącza do
+        nich dziennik."""
+        if not isinstance(registry, CustomerRegistry):
+            raise ValueError("Rejestr musi być instancją CustomerRegistry")
+        if not isinstance(inventory, VehicleInventory):
+            raise ValueError("Inwentarz musi być instancją VehicleInventory")
+        if not isinstance(manager, RentalManager):
+            raise ValueError("Menedżer musi być instancją RentalManager")
+        if any(m.storage is not None for m in (registry, inventory, manager)):
+            raise JournalError(
+                "Dziennika nie można używać razem z magazynem danych"
+            )
+        if registry.customers or inventory.vehicles or manager.rentals:
+            raise JournalError(
+                "Stan można odtworzyć tylko w pustych obiektach"
+            )
+        if self._log is not None:
+            raise JournalError("Dziennik jest już otwarty")
+
+        self.registry, self.inventory, self.manager = (
+            registry,
+            inventory,
+            manager,
+        )
+        covered = self._load_snapshot()
+        for segment in self._segments():
+            if segment <= covered:
+                continue
+            for operation, args in MutationLog.read(
+                self._segment_path(segment)
+            ):
+                self._apply(operation, args)
+                self._records_since_snapshot += 1
+
+        self._segment = max(self._segments() + [covered + 1])
+        self._log = MutationLog(self._segment_path(self._segment), self.fsync)
+        registry.journal = inventory.journal = manager.journal = self
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        for m in (self.registry, self.inventory, self.manager):
+            if m is not None:
+                m.journal = None
+
+    def record(self, operation: str, args: Tuple[Any, ...]) -> None:
+        with self._lock:
+            if self._log is None:
+                raise JournalError("Dziennik nie jest otwarty")
+
+            self._log.append(operation, args)
+            self._records_since_snapshot += 1
+            if (
+                self.snapshot_every is not None
+                and self._records_since_snapshot >= self.snapshot_every
+            ):
+                self.snapshot()
+
+    def snapshot(self) -> None:
+        """Zapisuje migawkę stanu i usuwa objęte nią segmenty dziennika."""
+        with self._lock:
+            self._snapshot()
+
+    def _snapshot(self) -> None:
+        if self._log is None:
+            raise JournalError("Dziennik nie jest otwarty")
+
+        covered = self._segment
+        self._log.close()
+        self._segment += 1
+        self._log = MutationLog(self._segment_path(self._segment), self.fsync)
+
+        state = {
+            "covered_segment": covered,
+            "customers": list(self.registry.customers.values()),
+            "vehicles": list(self.inventory.vehicles.values()),
+            "rentals": list(self.manager.rentals.values()),
+            "reviews": list(self.manager.reviews),
+        }
+        path = os.path.join(self.directory, _SNAPSHOT)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for segment in self._segments():
+            if segment <= covered:
+                os.remove(self._segment_path(segment))
+        self._records_since_snapshot = 0
+
+    def _load_snapshot(self) -> int:
+        path = os.path.join(self.directory, _SNAPSHOT)
+        if not os.path.exists(path):
+            return 0
+
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        # Stan z migawki był już sprawdzony przy zapisie, więc jak przy
+        # register_customers i add_vehicles trafia od razu do słowników
+        # i indeksów, bez kontroli unikalności i zapisu do dziennika.
+        self.registry._store(state["customers"])
+        self.inventory.vehicles.update(
+            (vehicle.vehicle_id, vehicle) for vehicle in state["vehicles"]
+        )
+        for rental in state["rentals"]:
+            self.manager._insert_rental(rental)
+        for review in state["reviews"]:
+            self.manager._insert_review(review)
+        return state["covered_segment"]
+
+    def _apply(self, operation: str, args: Tuple[Any, ...]) -> None:
+        registry, inventory, manager = (
+            self.registry,
+            self.inventory,
+            self.manager,
+        )
+        if operation == "register_customer":
+            registry.register_customer(*args)
+        elif operation == "register_customers":
+            registry._store(args[0])
+        elif operation == "update_customer":
+            customer = args[0]
+            target = registry.customers[customer.customer_id]
+            _copy_state(customer, target)
+            registry._index(target)
+        elif operation == "remove_customer":
+            registry.remove_customer(*args)
+        elif operation == "add_vehicle":
+            inventory.add_vehicle(*args)
+        elif operation == "add_vehicles":
+            inventory.vehicles.update((v.vehicle_id, v) for v in args[0])
+        elif operation == "update_vehicle":
+            vehicle = args[0]
+            _copy_state(vehicle, inventory.vehicles[vehicle.vehicle_id])
+        elif operation == "change_vehicle_status":
+            inventory.change_vehicle_status(*args)
+        elif operation == "remove_vehicle":
+            inventory.remove_vehicle(*args)
+        elif operation == "create_rental":
+            (
+                rental_id,
+                customer_id,
+                vehicle_id,
+                start_date,
+                end_date,
+                daily_rate,
+                vehicle_status,
+            ) = args
+            customer = registry.customers[customer_id]
+            vehicle = inventory.vehicles[vehicle_id]
+            rental = Rental(
+                rental_id, customer, vehicle, start_date, end_date, daily_rate
+            )
+            vehicle.change_status(vehicle_status)
+            customer.add_rental_to_history(rental_id)
+            manager._insert_rental(rental)
+        elif operation == "complete_rental":
+            manager.complete_rental(*args)
+        elif operation == "cancel_rental":
+            rental_id, vehicle_status = args
+            manager.cancel_rental(rental_id)
+            manager.rentals[rental_id].vehicle.change_status(vehicle_status)
+        elif operation == "start_rental":
+            manager._start_rental(manager.rentals[args[0]])
+        elif operation == "mark_overdue":
+            rental_id, current_date = args
+            rental = manager.rentals[rental_id]
+            manager._mark_overdue(rental, current_date)
+        elif operation == "add_charge":
+            manager.add_charge(*args)
+        elif operation == "add_review":
+            manager._insert_review(args[0])
+        else:
+            raise JournalError(f"Nieznana operacja w dzienniku: {operation}")
+
+
+def _copy_state(source: Any, target: Any) -> None:
+    """Przepisuje stan obiektu, zachowując tożsamość obiektu docelowego,
+    do którego mogą odwoływać się wypożyczenia."""
+    for cls in type(source).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name != "__weakref__" and hasattr(source, name):
+                setattr(target, name, getattr(source, name))
+    if hasattr(source, "__dict__"):
+        target.__dict__.update(source.__dict__)
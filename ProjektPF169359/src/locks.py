@@ -0,0 +1,44 @@
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Hashable, Iterable, Iterator
+
+
+class KeyedLocks:
+    """Osobne zamki dla kluczy (np. ID pojazdów), tworzone przy pierwszym
+    użyciu.
+
+    Operacje na różnych kluczach nie blokują się nawzajem, a operacje na
+    tym samym kluczu są szeregowane. Zamki są wielowejściowe (RLock), więc
+    wątek trzymający zamek klucza może wywołać metodę, która bierze go
+    ponownie.
+
+    Wątek, który potrzebuje kilku zamków naraz, powinien brać je przez
+    many(), czyli zawsze w tej samej kolejności, i przed zamkami
+    wspólnych zasobów (np. transakcją magazynu) - inaczej dwa wątki
+    mogą czekać na siebie nawzajem.
+    """
+
+    def __init__(self) -> None:
+        self._locks: Dict[Hashable, Any] = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, key: Hashable) -> Any:
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.get(key)
+                if lock is None:
+                    lock = self._locks[key] = threading.RLock()
+        return lock
+
+    @contextmanager
+    def many(self, keys: Iterable[Hashable]) -> Iterator[None]:
+        """Trzyma zamki wszystkich kluczy, biorąc je w kolejności
+        rosnącej (klucze muszą być porównywalne)."""
+        with ExitStack() as stack:
+            for key in sorted(set(keys)):
+                stack.enter_context(self(key))
+            yield
+
+    def __len__(self) -> int:
+        return len(self._locks)
@@ -0,0 +1,264 @@
+import functools
+import json
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Liczba bitów podkubełka: każdy przedział [2^k, 2^(k+1)) dzielony jest na
+# 128 kubełków, więc wartość jest zapisana z błędem względnym poniżej 1%.
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Granice kubełków histogramu eksportowanego do Prometheusa (sekundy).
+PROMETHEUS_BUCKETS = tuple(
+    base * 10.0**exponent
+    for exponent in range(-6, 1)
+    for base in (1, 2.5, 5)
+) + (10.0,)
+
+
+class LatencyHistogram:
+    """Histogram czasów w stylu HDR (High Dynamic Range).
+
+    Kubełki są liniowe wewnątrz kolejnych potęg dwójki, więc zapis
+    wartości to kilka operacji na bitach, a histogram obejmuje zakres od
+    nanosekund do minut przy stałym błędzie względnym i rozmiarze
+    zależnym tylko od liczby zajętych kubełków.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self._counts: Dict[int, int] = {}
+
+    @staticmethod
+    def _index(value: int) -> int:
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS - 1)
+        return shift * SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def _bounds(index: int) -> Tuple[int, int]:
+        """Najmniejsza i największa wartość zapisywana w kubełku."""
+        shift = max(0, (index >> SUB_BUCKET_BITS) - 1)
+        low = (index - shift * SUB_BUCKETS) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, value: int) -> None:
+        if not isinstance(value, int) or value < 0:
+            raise ValueError("Wartość musi być nieujemną liczbą całkowitą")
+
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Największa wartość kubełka, do którego sięga percentyl."""
+        if not 0 <= percentile <= 100:
+            raise ValueError("Percentyl musi być w zakresie 0-100")
+        if self.count == 0:
+            return 0
+
+        target = max(1, math.ceil(percentile * self.count / 100))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(self._bounds(index)[1], self.max)
+        return self.max
+
+    def count_at_or_below(self, value: int) -> int:
+        """Liczba zapisanych wartości nie większych niż value (z
+        dokładnością do kubełka)."""
+        limit = self._index(value)
+        return sum(c for i, c in self._counts.items() if i <= limit)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def copy(self) -> "LatencyHistogram":
+        histogram = LatencyHistogram()
+        histogram.count = self.count
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        histogram._counts = dict(self._counts)
+        return histogram
+
+
+class OperationStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def copy(self) -> "OperationStats":
+        stats = OperationStats()
+        stats.calls = self.calls
+        stats.errors = self.errors
+        stats.latency = self.latency.copy()
+        return stats
+
+
+def public_methods(obj: Any) -> List[str]:
+    """Nazwy publicznych metod klasy obiektu (razem z dziedziczonymi)."""
+    names = set()
+    for cls in type(obj).__mro__[:-1]:
+        names.update(
+            name
+            for name, member in vars(cls).items()
+            if not name.startswith("_") and callable(member)
+        )
+    return sorted(names)
+
+
+class Metrics:
+    """Liczniki wywołań i błędów oraz histogramy czasów operacji.
+
+    Pomiar jest opcjonalny: instrument() podmienia publiczne metody
+    wskazanych obiektów (np. menedżerów) na wersje mierzące czas,
+    a uninstrument() przywraca oryginały. Obiekty nieinstrumentowane nie
+    ponoszą żadnego narzutu. Liczone są wszystkie wywołania metod
+    instrumentowanego obiektu, także te wykonywane przez jego inne
+    metody (np. get_rental wywoływane przez complete_rental).
+    """
+
+    def __init__(self) -> None:
+        self._operations: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+        self._instrumented: Dict[int, Tuple[Any, List[str]]] = {}
+
+    def record(self, operation: str, duration_ns: int, error: bool) -> None:
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = OperationStats()
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+            stats.latency.record(duration_ns)
+
+    def _wrap(self, operation: str, method: Callable[..., Any]) -> Any:
+        record = self.record
+        clock = time.perf_counter_ns
+
+        @functools.wraps(method)
+        def measured(*args: Any, **kwargs: Any) -> Any:
+            started = clock()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException:
+                record(operation, clock() - started, True)
+                raise
+            record(operation, clock() - started, False)
+            return result
+
+        return measured
+
+    def instrument(self, *targets: Any) -> None:
+        for target in targets:
+            if id(target) in self._instrumented:
+                continue
+            prefix = type(target).__name__
+            names = public_methods(target)
+            for name in names:
+                setattr(
+                    target,
+                    name,
+                    self._wrap(f"{prefix}.{name}", getattr(target, name)),
+                )
+            self._instrumented[id(target)] = (target, names)
+
+    def uninstrument(self, *targets: Any) -> None:
+        for target in targets or [
+            t for t, _ in list(self._instrumented.values())
+        ]:
+            entry = self._instrumented.pop(id(target), None)
+            if entry is None:
+                continue
+            for name in entry[1]:
+                target.__dict__.pop(name, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations.clear()
+
+    def operations(self) -> Dict[str, OperationStats]:
+        """Kopia statystyk, spójna mimo równoległych pomiarów."""
+        with self._lock:
+            return {
+                name: stats.copy() for name, stats in self._operations.items()
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Stan liczników jako słownik gotowy do zapisu w JSON (czasy
+        w mikrosekundach)."""
+        result = {}
+        for name, stats in sorted(self.operations().items()):
+            latency = stats.latency
+            result[name] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "mean_us": latency.mean() / 1000,
+                "min_us": (latency.min or 0) / 1000,
+                "max_us": (latency.max or 0) / 1000,
+                **{
+                    f"p{label}_us": latency.value_at_percentile(p) / 1000
+                    for label, p in (
+                        ("50", 50),
+                        ("90", 90),
+                        ("99", 99),
+                        ("999", 99.9),
+                    )
+                },
+            }
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, namespace: str = "rental") -> str:
+        """Eksport w formacie tekstowym Prometheusa."""
+        operations = sorted(self.operations().items())
+        lines = [
+            f"# HELP {namespace}_calls_total Liczba wywołań operacji.",
+            f"# TYPE {namespace}_calls_total counter",
+        ]
+        lines.extend(
+            f'{namespace}_calls_total{{operation="{name}"}} {s.calls}'
+            for name, s in operations
+        )
+        lines.append(
+            f"# HELP {namespace}_errors_total Liczba wywołań zakończonych "
+            "wyjątkiem."
+        )
+        lines.append(f"# TYPE {namespace}_errors_total counter")
+        lines.extend(
+            f'{namespace}_errors_total{{operation="{name}"}} {s.errors}'
+            for name, s in operations
+        )
+        metric = f"{namespace}_latency_seconds"
+        lines.append(f"# HELP {metric} Czas wykonania operacji.")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, stats in operations:
+            lines.extend(_histogram_lines(metric, name, stats.latency))
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(
+    metric: str, operation: str, latency: LatencyHistogram
+) -> Iterable[str]:
+    label = f'operation="{operation}"'
+    for bound in PROMETHEUS_BUCKETS:
+        count = latency.count_at_or_below(int(bound * 1e9))
+        yield f'{metric}_bucket{{{label},le="{bound:g}"}} {count}'
+    yield f'{metric}_bucket{{{label},le="+Inf"}} {latency.count}'
+    yield f"{metric}_sum{{{label}}} {latency.total / 1e9}"
+    yield f"{metric}_count{{{label}}} {latency.count}"
@@ -0,0 +1,358 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from src.customers import CustomerCategory
+from src.vehicles import Vehicle
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - zależy od środowiska
+    np = None
+
+
+# Mnożniki dziennej stawki dla kategorii klientów.
+CATEGORY_DISCOUNTS = {
+    CustomerCategory.SILVER: 0.95,
+    CustomerCategory.GOLD: 0.9,
+    CustomerCategory.PLATINUM: 0.85,
+}
+
+# Opłata za dzień opóźnienia zwrotu jako wielokrotność stawki dziennej.
+LATE_FEE_FACTOR = 1.5
+
+CATEGORY_CODES = {
+    category: code for code, category in enumerate(CustomerCategory)
+}
+
+Dates = Union[date, Sequence[date]]
+
+
+class Quote(NamedTuple):
+    """Wycena: liczby dla pojedynczego wypożyczenia albo tablice NumPy
+    z elementem na każdą wycenianą kombinację pojazdu, kategorii klienta
+    i terminu."""
+
+    days: Any
+    daily_rate: Any
+    base_cost: Any
+    discount: Any
+    late_fee: Any
+    total: Any
+
+
+class QuoteCache:
+    """Ograniczona pamięć podręczna wycen usuwająca najdawniej używane
+    (LRU).
+
+    Każdy wpis pamięta stawkę, od której został policzony. Odczyt
+    porównuje ją z bieżącą stawką, więc zmiana Vehicle.daily_rate
+    unieważnia dokładnie wpisy tego pojazdu - bez powiadomień ze strony
+    pojazdu, także gdy stawkę zmieniono bezpośrednio w obiekcie.
+    Liczniki hits, misses i invalidations pozwalają dobrać rozmiar.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Rozmiar pamięci podręcznej musi być dodatni")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Quote]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Any) -> Optional[Quote]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                del self._entries[key]
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, version: Any, quote: Quote) -> None:
+        with self._lock:
+            self._entries[key] = (version, quote)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class PricingEngine:
+    """Cennik wypożyczeń: rabaty dla kategorii klientów i opłata za
+    opóźniony zwrot.
+
+    Pojedyncze stawki (discounted_rate, late_fee) liczone są w czystym
+    Pythonie i używa ich RentalManager. quote() wycenia naraz wiele
+    kombinacji (stawka, kategoria, termin) na tablicach NumPy, bez
+    tworzenia obiektów wypożyczeń - np. ceny wszystkich dostępnych
+    pojazdów na stronie wyszukiwania. Argumenty skalarne są rozszerzane
+    do długości pozostałych.
+
+    Koszt bazowy to liczba dni razy cennikowa stawka pojazdu, rabat to
+    kwota odejmowana za kategorię klienta, a opłata za opóźnienie liczona
+    jest od stawki po rabacie, tak jak przy zakończeniu wypożyczenia.
+
+    quote_vehicle() wycenia jeden pojazd i zapamiętuje wynik w QuoteCache
+    (cache_size=0 wyłącza pamięć podręczną). Rabaty i mnożnik opłaty są
+    stałe dla danego cennika, więc wynik zależy tylko od klucza (pojazd,
+    kategoria, termin, dni opóźnienia) i stawki pojazdu. Zmiana kategorii
+    klienta (Customer.upgrade_category) nie unieważnia wpisów - kolejne
+    zapytanie dla tego klienta trafia po prostu pod klucz nowej kategorii.
+    """
+
+    def __init__(
+        self,
+        discounts: Optional[Mapping[CustomerCategory, float]] = None,
+        late_fee_factor: float = LATE_FEE_FACTOR,
+        cache_size: int = 4096,
+    ) -> None:
+        if discounts is None:
+            discounts = CATEGORY_DISCOUNTS
+        for category, factor in discounts.items():
+            if not isinstance(category, CustomerCategory):
+                raise ValueError(
+                    "Kategoria musi być instancją CustomerCategory"
+                )
+            if not isinstance(factor, (int, float)) or not 0 < factor <= 1:
+                raise ValueError("Mnożnik stawki musi być w zakresie (0, 1]")
+        if not isinstance(late_fee_factor, (int, float)) or (
+            late_fee_factor < 0
+        ):
+            raise ValueError(
+                "Mnożnik opłaty za opóźnienie nie może być ujemny"
+            )
+
+        self._discounts = MappingProxyType(dict(discounts))
+        self._late_fee_factor = late_fee_factor
+        self.cache = QuoteCache(cache_size) if cache_size else None
+
+    @property
+    def discounts(self) -> Mapping[CustomerCategory, float]:
+        return self._discounts
+
+    @property
+    def late_fee_factor(self) -> float:
+        return self._late_fee_factor
+
+    def discount_factor(self, category: CustomerCategory) -> float:
+        return self.discounts.get(category, 1)
+
+    def discounted_rate(
+        self, daily_rate: float, category: CustomerCategory
+    ) -> float:
+        return daily_rate * self.discount_factor(category)
+
+    def late_fee(self, daily_rate: float, delay_days: int) -> float:
+        return delay_days * daily_rate * self.late_fee_factor
+
+    @staticmethod
+    def _ordinals(dates: Dates, field: str) -> Any:
+        if isinstance(dates, date):
+            return np.int64(dates.toordinal())
+        try:
+            days = np.asarray(dates, dtype="datetime64[D]")
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"{field} musi być datą lub sekwencją dat"
+            ) from None
+        if days.ndim != 1 or np.isnat(days).any():
+            raise ValueError(f"{field} musi być datą lub sekwencją dat")
+        return days.astype(np.int64)
+
+    def _category_factors(
+        self,
+        categories: Union[CustomerCategory, Sequence[CustomerCategory]],
+    ) -> Any:
+        if isinstance(categories, CustomerCategory):
+            return np.float64(self.discount_factor(categories))
+        try:
+            codes = np.fromiter(
+                (CATEGORY_CODES[c] for c in categories),
+                dtype=np.intp,
+                count=len(categories),
+            )
+        except (KeyError, TypeError):
+            raise ValueError(
+                "Kategorie muszą być instancjami CustomerCategory"
+            ) from None
+        # Mnożniki indeksowane kodem kategorii z CATEGORY_CODES.
+        table = np.array(
+            [self.discount_factor(c) for c in CATEGORY_CODES],
+            dtype=np.float64,
+        )
+        return table[codes]
+
+    def quote(
+        self,
+        daily_rates: Union[float, Sequence[float]],
+        categories: Union[CustomerCategory, Sequence[CustomerCategory]],
+        start_dates: Dates,
+        end_dates: Dates,
+        late_days: Union[int, Sequence[int]] = 0,
+    ) -> Quote:
+        """Wycenia wiele wypożyczeń jednym wywołaniem na tablicach.
+
+        late_days to zakładana liczba dni opóźnienia zwrotu, dla której
+        wyliczana jest prognozowana opłata.
+        """
+        if np is None:
+            raise ImportError("Wycena wsadowa wymaga biblioteki numpy")
+
+        rates = np.asarray(daily_rates, dtype=np.float64)
+        if rates.ndim > 1 or not (rates > 0).all():
+            raise ValueError("Dzienne stawki muszą być dodatnimi liczbami")
+        delays = np.asarray(late_days, dtype=np.int64)
+        if delays.ndim > 1 or (delays < 0).any():
+            raise ValueError("Liczba dni opóźnienia nie może być ujemna")
+        factors = self._category_factors(categories)
+        starts = self._ordinals(start_dates, "Data rozpoczęcia")
+        ends = self._ordinals(end_dates, "Data zakończenia")
+
+        try:
+            rates, factors, starts, ends, delays = np.broadcast_arrays(
+                rates, factors, starts, ends, delays
+            )
+        except ValueError:
+            raise ValueError(
+                "Sekwencje argumentów muszą mieć tę samą długość"
+            ) from None
+        if (starts > ends).any():
+            raise ValueError(
+                "Data rozpoczęcia nie może być późniejsza niż data zakończenia"
+            )
+
+        days = ends - starts + 1
+        base_cost = days * rates
+        discounted = rates * factors
+        discount = base_cost - days * discounted
+        late_fee = delays * discounted * self.late_fee_factor
+        return Quote(
+            days=days,
+            daily_rate=discounted,
+            base_cost=base_cost,
+            discount=discount,
+            late_fee=late_fee,
+            total=base_cost - discount + late_fee,
+        )
+
+    def quote_one(
+        self,
+        daily_rate: float,
+        category: CustomerCategory,
+        start_date: date,
+        end_date: date,
+        late_days: int = 0,
+    ) -> Quote:
+        """Wycena pojedynczego wypożyczenia bez użycia NumPy."""
+        if not isinstance(daily_rate, (int, float)) or daily_rate <= 0:
+            raise ValueError("Dzienna stawka musi być dodatnią liczbą")
+        if not isinstance(category, CustomerCategory):
+            raise ValueError("Kategoria musi być instancją CustomerCategory")
+        if not isinstance(start_date, date) or not isinstance(
+            end_date, date
+        ):
+            raise ValueError("Daty muszą być instancjami datetime.date")
+        if start_date > end_date:
+            raise ValueError(
+                "Data rozpoczęcia nie może być późniejsza niż data zakończenia"
+            )
+        if not isinstance(late_days, int) or late_days < 0:
+            raise ValueError("Liczba dni opóźnienia nie może być ujemna")
+
+        days = (end_date - start_date).days + 1
+        base_cost = days * daily_rate
+        discounted = self.discounted_rate(daily_rate, category)
+        discount = base_cost - days * discounted
+        late_fee = self.late_fee(discounted, late_days)
+        return Quote(
+            days=days,
+            daily_rate=discounted,
+            base_cost=base_cost,
+            discount=discount,
+            late_fee=late_fee,
+            total=base_cost - discount + late_fee,
+        )
+
+    def quote_vehicle(
+        self,
+        vehicle: Vehicle,
+        category: CustomerCategory,
+        start_date: date,
+        end_date: date,
+        late_days: int = 0,
+    ) -> Quote:
+        """Wycena wypożyczenia pojazdu z użyciem pamięci podręcznej."""
+        if not isinstance(vehicle, Vehicle):
+            raise ValueError("Pojazd musi być instancją klasy Vehicle")
+        if self.cache is None:
+            return self.quote_one(
+                vehicle.daily_rate, category, start_date, end_date, late_days
+            )
+
+        key = (vehicle.vehicle_id, category, start_date, end_date, late_days)
+        rate = vehicle.daily_rate
+        quote = self.cache.get(key, rate)
+        if quote is None:
+            quote = self.quote_one(
+                rate, category, start_date, end_date, late_days
+            )
+            self.cache.put(key, rate, quote)
+        return quote
+
+    def quote_vehicles(
+        self,
+        vehicles: Sequence[Vehicle],
+        category: CustomerCategory,
+        start_date: date,
+        end_date: date,
+        late_days: int = 0,
+    ) -> Quote:
+        """Ceny wypożyczenia pojazdów w jednym terminie dla klienta danej
+        kategorii."""
+        if np is None:
+            raise ImportError("Wycena wsadowa wymaga biblioteki numpy")
+
+        rates = np.fromiter(
+            (v.daily_rate for v in vehicles),
+            dtype=np.float64,
+            count=len(vehicles),
+        )
+        return self.quote(rates, category, start_date, end_date, late_days)
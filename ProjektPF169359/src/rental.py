@@ -1,10 +1,32 @@
+from contextlib import contextmanager, nullcontext
 from enum import Enum
-from typing import Dict, List, Optional, Any
-from datetime import date
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from datetime import date, timedelta
+import heapq
+import itertools
+import operator
+import os
+import threading
 import uuid
-from src.reviews import Review
-from src.vehicles import Vehicle, VehicleStatus
-from src.customers import Customer, CustomerCategory
+from src.availability import AvailabilityIndex
+from src.fenwick import DailyFenwickTree
+from src.locks import KeyedLocks
+from src.pricing import LATE_FEE_FACTOR, PricingEngine
+from src.reviews import Review, ReviewSearchIndex
+from src.storage import Storage
+from src.vehicles import Vehicle, VehicleInventory, VehicleStatus
+from src.customers import Customer
 
 
 class RentalStatus(Enum):
@@ -18,7 +40,28 @@ class RentalException(Exception):
     pass
 
 
+# Wypożyczenia, w których pojazd nie został jeszcze zwrócony.
+UNRETURNED_STATUSES = (RentalStatus.ACTIVE, RentalStatus.OVERDUE)
+
+
 class Rental:
+    # Sloty zamiast __dict__ oraz leniwie tworzone listy opinii i słowniki
+    # opłat - większość wypożyczeń nigdy ich nie używa.
+    __slots__ = (
+        "rental_id",
+        "customer",
+        "vehicle",
+        "start_date",
+        "end_date",
+        "daily_rate",
+        "status",
+        "actual_return_date",
+        "total_cost",
+        "_reviews",
+        "_additional_charges",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         rental_id: str,
@@ -55,11 +98,31 @@ class Rental:
         self.start_date = start_date
         self.end_date = end_date
         self.daily_rate = daily_rate
-        self.reviews: list[Review] = []
         self.status = RentalStatus.ACTIVE
         self.actual_return_date: Optional[date] = None
         self.total_cost: Optional[float] = None
-        self.additional_charges: Dict[str, float] = {}
+        self._reviews: Optional[List[Review]] = None
+        self._additional_charges: Optional[Dict[str, float]] = None
+
+    @property
+    def reviews(self) -> List[Review]:
+        if self._reviews is None:
+            self._reviews = []
+        return self._reviews
+
+    @reviews.setter
+    def reviews(self, value: List[Review]) -> None:
+        self._reviews = value
+
+    @property
+    def additional_charges(self) -> Dict[str, float]:
+        if self._additional_charges is None:
+            self._additional_charges = {}
+        return self._additional_charges
+
+    @additional_charges.setter
+    def additional_charges(self, value: Dict[str, float]) -> None:
+        self._additional_charges = value
 
     def calculate_duration(self) -> int:
         delta = self.end_date - self.start_date
@@ -76,11 +139,22 @@ class Rental:
                 "Data sprawdzenia musi być instancją datetime.date"
             )
 
-        if self.status != RentalStatus.ACTIVE:
+        if self.status not in (RentalStatus.ACTIVE, RentalStatus.OVERDUE):
             return False
 
         return current_date > self.end_date
 
+    def mark_overdue(self, current_date: Optional[date] = None) -> None:
+        if self.status != RentalStatus.ACTIVE or not self.is_overdue(
+            current_date
+        ):
+            raise RentalException(
+                "Tylko aktywne wypożyczenie po terminie zwrotu"
+                " może zostać oznaczone jako przeterminowane"
+            )
+
+        self.status = RentalStatus.OVERDUE
+
     def add_charge(self, description: str, amount: float) -> None:
         if not description or not isinstance(description, str):
             raise ValueError("Opis opłaty musi być niepustym stringiem")
@@ -89,11 +163,13 @@ class Rental:
 
         self.additional_charges[description] = amount
 
-    def complete(self, return_date: date) -> float:
+    def complete(
+        self, return_date: date, late_fee_factor: float = LATE_FEE_FACTOR
+    ) -> float:
         if not isinstance(return_date, date):
             raise ValueError("Data zwrotu musi być instancją datetime.date")
 
-        if self.status != RentalStatus.ACTIVE:
+        if self.status not in (RentalStatus.ACTIVE, RentalStatus.OVERDUE):
             raise RentalException(
                 "Nie można zakończyć wypożyczenia, które nie jest aktywne"
             )
@@ -102,11 +178,15 @@ class Rental:
         self.status = RentalStatus.COMPLETED
 
         base_cost = self.calculate_base_cost()
-        total_additional_charges = sum(self.additional_charges.values())
+        total_additional_charges = (
+            sum(self._additional_charges.values())
+            if self._additional_charges
+            else 0
+        )
 
         if return_date > self.end_date:
             delay_days = (return_date - self.end_date).days
-            late_fee = delay_days * self.daily_rate * 1.5
+            late_fee = delay_days * self.daily_rate * late_fee_factor
             self.add_charge("Opłata za opóźnienie", late_fee)
             total_additional_charges += late_fee
 
@@ -134,42 +214,345 @@ class Rental:
         )
 
 
-class RentalManager:
+class RentalAggregates:
+    """Dzienne agregaty wypożyczeń pozwalające budować raport z sum
+    prefiksowych zamiast przeglądać wszystkie wypożyczenia.
+
+    Wypożyczenie należy do okresu [S, E], gdy rozpoczęło się najpóźniej
+    w dniu E i nie zostało zwrócone przed dniem S. Dla każdego statusu
+    sumowane są liczba i długość wypożyczeń według dnia rozpoczęcia,
+    a dla zakończonych dodatkowo według dnia zwrotu - wtedy liczba
+    zakończonych w okresie to różnica dwóch sum prefiksowych.
+    """
+
     def __init__(self) -> None:
+        self._started_count = {s: DailyFenwickTree() for s in RentalStatus}
+        self._started_days = {s: DailyFenwickTree() for s in RentalStatus}
+        self._started_revenue = DailyFenwickTree()
+        self._started_late = DailyFenwickTree()
+        self._returned_count = DailyFenwickTree()
+        self._returned_days = DailyFenwickTree()
+        self._returned_revenue = DailyFenwickTree()
+        self._returned_late = DailyFenwickTree()
+
+    def add(self, rental: Rental) -> None:
+        self._apply(rental, 1)
+
+    def remove(self, rental: Rental) -> None:
+        self._apply(rental, -1)
+
+    def _apply(self, rental: Rental, sign: int) -> None:
+        started = rental.start_date.toordinal()
+        duration = rental.calculate_duration()
+        self._started_count[rental.status].add(started, sign)
+        self._started_days[rental.status].add(started, sign * duration)
+
+        if rental.status != RentalStatus.COMPLETED:
+            return
+
+        returned = rental.actual_return_date.toordinal()
+        revenue = sign * (rental.total_cost or 0)
+        late = sign if rental.actual_return_date > rental.end_date else 0
+        self._started_revenue.add(started, revenue)
+        self._started_late.add(started, late)
+        self._returned_count.add(returned, sign)
+        self._returned_days.add(returned, sign * duration)
+        self._returned_revenue.add(returned, revenue)
+        self._returned_late.add(returned, late)
+
+    def report(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        last_day = end_date.toordinal()
+        # Zakończone przed początkiem okresu nie należą do raportu.
+        before = start_date.toordinal() - 1
+
+        counts = {
+            s: tree.prefix_sum(last_day)
+            for s, tree in self._started_count.items()
+        }
+        counts[RentalStatus.COMPLETED] -= self._returned_count.prefix_sum(
+            before
+        )
+        total_days = sum(
+            tree.prefix_sum(last_day) for tree in self._started_days.values()
+        ) - self._returned_days.prefix_sum(before)
+        late_returns = self._started_late.prefix_sum(
+            last_day
+        ) - self._returned_late.prefix_sum(before)
+        total_revenue = self._started_revenue.prefix_sum(
+            last_day
+        ) - self._returned_revenue.prefix_sum(before)
+
+        total_rentals = sum(counts.values())
+        return {
+            "period_start": start_date,
+            "period_end": end_date,
+            "total_rentals": total_rentals,
+            "completed_rentals": counts[RentalStatus.COMPLETED],
+            "active_rentals": counts[RentalStatus.ACTIVE],
+            "cancelled_rentals": counts[RentalStatus.CANCELLED],
+            "overdue_rentals": counts[RentalStatus.OVERDUE] + late_returns,
+            "total_revenue": total_revenue,
+            "average_rental_duration": (
+                total_days / total_rentals if total_rentals > 0 else 0
+            ),
+        }
+
+
+class DueDateHeap:
+    """Kopiec aktywnych wypożyczeń uporządkowany według daty zakończenia
+    (albo innej daty wskazanej przez key, np. daty rozpoczęcia).
+
+    Zakończenie lub anulowanie nie usuwa wpisu z kopca, tylko unieważnia
+    go (usuwanie leniwe). Wyszukanie przeterminowanych zdejmuje ze
+    szczytu wszystkie wpisy zakończone przed zadaną datą, a aktualne
+    odkłada z powrotem, więc kosztuje O(k log n) dla k przeterminowanych
+    - nieaktualne wpisy są zdejmowane tylko raz. Gdy nieaktualne stanowią
+    większość kopca, jest on przebudowywany.
+    """
+
+    def __init__(
+        self,
+        key: Callable[[Rental], date] = operator.attrgetter("end_date"),
+    ) -> None:
+        self._key = key
+        self._heap: List[Tuple[date, int, Rental]] = []
+        self._live: Dict[str, Tuple[date, int, Rental]] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def push(self, rental: Rental) -> None:
+        entry = (self._key(rental), next(self._sequence), rental)
+        self._live[rental.rental_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def discard(self, rental: Rental) -> None:
+        if self._live.pop(rental.rental_id, None) is None:
+            return
+        if len(self._heap) > 2 * len(self._live) + 32:
+            self._heap = list(self._live.values())
+            heapq.heapify(self._heap)
+
+    def due_before(self, current_date: date) -> List[Rental]:
+        """Wypożyczenia z datą (zakończenia) przed current_date, od
+        najdawniejszej."""
+        heap = self._heap
+        found = []
+        while heap and heap[0][0] < current_date:
+            entry = heapq.heappop(heap)
+            if self._live.get(entry[2].rental_id) is entry:
+                found.append(entry)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [entry[2] for entry in found]
+
+
+class RentalManager:
+    """Menedżer wypożyczeń.
+
+    Bez magazynu wszystkie wypożyczenia są w pamięci, a zapytania
+    obsługują indeksy w pamięci. Z magazynem (Storage) każda zmiana jest
+    w nim zapisywana, słownik rentals przechowuje tylko wczytane
+    wypożyczenia, a zapytania wykonuje magazyn.
+
+    Menedżer może być używany z wielu wątków. Rezerwacja, zakończenie
+    i anulowanie wypożyczenia trzymają zamek pojazdu, więc sprawdzenie
+    kalendarza i rezerwacja są atomowe, a operacje na różnych pojazdach
+    biegną równolegle. Wspólne indeksy są aktualizowane pod krótkim
+    zamkiem indeksów, a zapytania o dostępność czytają kalendarze bez
+    zamków.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[Storage] = None,
+        pricing: Optional[PricingEngine] = None,
+    ) -> None:
+        if storage is not None and not isinstance(storage, Storage):
+            raise TypeError("Magazyn musi być instancją klasy Storage")
+        if pricing is not None and not isinstance(pricing, PricingEngine):
+            raise TypeError("Cennik musi być instancją klasy PricingEngine")
+
+        self.storage = storage
+        self.pricing = pricing if pricing is not None else PricingEngine()
         self.rentals: Dict[str, Rental] = {}
         self.reviews: List[Review] = []
+        self._rentals_by_customer: Dict[str, List[Rental]] = {}
+        self._rentals_by_vehicle: Dict[str, List[Rental]] = {}
+        self._rentals_by_status: Dict[RentalStatus, Dict[str, Rental]] = {
+            status: {} for status in RentalStatus
+        }
+        self.availability = AvailabilityIndex()
+        self._aggregates = RentalAggregates()
+        self._due_dates = DueDateHeap()
+        # Aktywne wypożyczenia według daty rozpoczęcia - kandydaci do
+        # wydania pojazdu przez start_rentals.
+        self._start_dates = DueDateHeap(operator.attrgetter("start_date"))
+        # ID pojazdu -> niezwrócone wypożyczenia (UNRETURNED_STATUSES).
+        # Krotki są podmieniane przy zmianie, jak w kalendarzach rezerwacji,
+        # więc zapytania o dostępność czytają je bez zamka.
+        self._unreturned: Dict[str, Tuple[Rental, ...]] = {}
+        self._reviews_by_customer: Dict[str, List[Review]] = {}
+        self._reviews_by_rental: Dict[str, List[Review]] = {}
+        # Suma i liczba ocen klienta pozwalają liczyć średnią w O(1).
+        self._rating_totals: Dict[str, List[int]] = {}
+        self.review_index = ReviewSearchIndex()
+        self._review_index_loaded = storage is None
+        self.journal: Optional[Any] = None
+        self._vehicle_locks = KeyedLocks()
+        self._index_lock = threading.RLock()
+
+    def _record(self, operation: str, *args: Any) -> None:
+        if self.journal is not None:
+            self.journal.record(operation, args)
+
+    def _insert_rental(self, rental: Rental) -> None:
+        self.rentals[rental.rental_id] = rental
+        if self.storage is not None:
+            self.storage.save_rental(rental)
+            self.storage.save_vehicle(rental.vehicle)
+            return
+
+        if rental.status != RentalStatus.CANCELLED:
+            booked_until = rental.end_date
+            if rental.actual_return_date is not None:
+                booked_until = min(booked_until, rental.actual_return_date)
+            self.availability.book(
+                rental.vehicle.vehicle_id,
+                rental.rental_id,
+                rental.start_date,
+                booked_until,
+            )
+        self._index_rental(rental)
+
+    def _insert_review(self, review: Review) -> None:
+        if self.storage is not None:
+            self.storage.save_review(review)
+            with self._index_lock:
+                if self._review_index_loaded:
+                    self.review_index.add(review)
+        else:
+            with self._index_lock:
+                self.reviews.append(review)
+                self._index_review(review)
+
+    def _index_rental(self, rental: Rental) -> None:
+        with self._index_lock:
+            self._rentals_by_customer.setdefault(
+                rental.customer.customer_id, []
+            ).append(rental)
+            self._rentals_by_vehicle.setdefault(
+                rental.vehicle.vehicle_id, []
+            ).append(rental)
+            self._rentals_by_status[rental.status][rental.rental_id] = rental
+            if rental.status == RentalStatus.ACTIVE:
+                self._due_dates.push(rental)
+                self._start_dates.push(rental)
+            if rental.status in UNRETURNED_STATUSES:
+                vehicle_id = rental.vehicle.vehicle_id
+                self._unreturned[vehicle_id] = self._unreturned.get(
+                    vehicle_id, ()
+                ) + (rental,)
+            self._aggregates.add(rental)
+
+    def _reindex_status(
+        self, rental: Rental, previous_status: RentalStatus
+    ) -> None:
+        if previous_status == rental.status:
+            return
+        self._rentals_by_status[previous_status].pop(rental.rental_id, None)
+        self._rentals_by_status[rental.status][rental.rental_id] = rental
+        if previous_status == RentalStatus.ACTIVE:
+            self._due_dates.discard(rental)
+            self._start_dates.discard(rental)
+        if rental.status not in UNRETURNED_STATUSES:
+            self._forget_unreturned(rental)
+
+    def _forget_unreturned(self, rental: Rental) -> None:
+        vehicle_id = rental.vehicle.vehicle_id
+        remaining = tuple(
+            r for r in self._unreturned.get(vehicle_id, ()) if r is not rental
+        )
+        if remaining:
+            self._unreturned[vehicle_id] = remaining
+        else:
+            self._unreturned.pop(vehicle_id, None)
+
+    def _held(self, vehicle_id: str, end_date: date, today: date) -> bool:
+        """Czy pojazd zajmuje w terminie kończącym się end_date wypożyczenie
+        niezwrócone po terminie - trwa ono do zwrotu, a nie do end_date."""
+        return any(
+            rental.end_date < today and rental.start_date <= end_date
+            for rental in self._unreturned.get(vehicle_id, ())
+        )
 
-    def create_rental(
+    def _transition(self, rental: Rental, action: Callable[[], Any]) -> Any:
+        if self.storage is not None:
+            result = action()
+            # Wypożyczenie i status pojazdu zapisywane są razem albo wcale.
+            with self.storage.transaction():
+                self.storage.save_rental(rental)
+                self.storage.save_vehicle(rental.vehicle)
+            return result
+
+        with self._index_lock:
+            previous_status = rental.status
+            self._aggregates.remove(rental)
+            try:
+                result = action()
+            finally:
+                self._aggregates.add(rental)
+            self._reindex_status(rental, previous_status)
+        return result
+
+    def _is_free(
+        self, vehicle_id: str, start_date: date, end_date: date, today: date
+    ) -> bool:
+        if self.storage is not None:
+            return not self.storage.is_vehicle_booked(
+                vehicle_id, start_date, end_date, today
+            )
+        return self.availability.is_available(
+            vehicle_id, start_date, end_date
+        ) and not self._held(vehicle_id, end_date, today)
+
+    def _transaction(self) -> ContextManager[Any]:
+        if self.storage is not None:
+            return self.storage.transaction()
+        return nullcontext()
+
+    @contextmanager
+    def _discarding(
+        self, opened: List[Tuple[Rental, VehicleStatus]]
+    ) -> Iterator[None]:
+        """Gdy transakcja magazynu została wycofana, cofa w pamięci
+        wypożyczenia z listy opened (z wcześniejszymi statusami pojazdów)."""
+        try:
+            yield
+        except BaseException:
+            if self.storage is not None:
+                for rental, vehicle_status in reversed(opened):
+                    self._discard_rental(rental, vehicle_status)
+            raise
+
+    def _load_rentals(self, rental_ids: List[str]) -> List[Rental]:
+        return [self.get_rental(rental_id) for rental_id in rental_ids]
+
+    def _check_booking(
         self,
         customer: Customer,
         vehicle: Vehicle,
         start_date: date,
         end_date: date,
-    ) -> Rental:
-        if not isinstance(customer, Customer):
-            raise ValueError("Klient musi być instancją klasy Customer")
-        if not isinstance(vehicle, Vehicle):
-            raise ValueError("Pojazd musi być instancją klasy Vehicle")
-        if not isinstance(start_date, date):
-            raise ValueError(
-                "Data rozpoczęcia musi być instancją datetime.date"
-            )
-        if not isinstance(end_date, date):
-            raise ValueError(
-                "Data zakończenia musi być instancją datetime.date"
-            )
-
-        if not customer.can_rent():
-            raise RentalException(
-                "Klient nie może wypożyczyć pojazdu - nieważne prawo jazdy"
-            )
-
+        today: date,
+    ) -> None:
         if customer.driving_license.expiry_date < end_date:
             raise RentalException(
                 "Prawo jazdy klienta wygasa przed końcem okresu wypożyczenia"
             )
 
-        if not vehicle.is_available():
+        if not self._is_bookable(vehicle, start_date, today):
             raise RentalException(
                 f"Pojazd {vehicle.vehicle_id} nie jest dostępny"
             )
@@ -179,37 +562,239 @@ class RentalManager:
                 "Data rozpoczęcia nie może być późniejsza niż data zakończenia"
             )
 
-        if start_date < date.today():
+        if start_date < today:
             raise RentalException(
                 "Data rozpoczęcia nie może być wcześniejsza niż dzisiejsza"
             )
 
-        daily_rate = vehicle.daily_rate
-        if customer.category == CustomerCategory.SILVER:
-            daily_rate *= 0.95
-        elif customer.category == CustomerCategory.GOLD:
-            daily_rate *= 0.9
-        elif customer.category == CustomerCategory.PLATINUM:
-            daily_rate *= 0.85
+        if not self._is_free(
+            vehicle.vehicle_id, start_date, end_date, today
+        ):
+            raise RentalException(
+                f"Pojazd {vehicle.vehicle_id} jest już zarezerwowany "
+                f"w terminie {start_date} - {end_date}"
+            )
 
-        rental_id = str(uuid.uuid4())
+    def _open_rental(
+        self,
+        rental_id: str,
+        customer: Customer,
+        vehicle: Vehicle,
+        start_date: date,
+        end_date: date,
+        today: date,
+    ) -> Rental:
+        daily_rate = self.pricing.discounted_rate(
+            vehicle.daily_rate, customer.category
+        )
         rental = Rental(
             rental_id, customer, vehicle, start_date, end_date, daily_rate
         )
 
-        vehicle.change_status(VehicleStatus.RENTED)
+        vehicle_status = vehicle.status
+        if start_date <= today:
+            vehicle.change_status(VehicleStatus.RENTED)
+
+        try:
+            with self._index_lock:
+                customer.add_rental_to_history(rental_id)
+
+            self._insert_rental(rental)
+            self._record(
+                "create_rental",
+                rental_id,
+                customer.customer_id,
+                vehicle.vehicle_id,
+                start_date,
+                end_date,
+                daily_rate,
+                vehicle.status,
+            )
+        except BaseException:
+            self._discard_rental(rental, vehicle_status)
+            raise
 
-        customer.add_rental_to_history(rental_id)
+        return rental
 
-        self.rentals[rental_id] = rental
+    def _discard_rental(
+        self, rental: Rental, vehicle_status: VehicleStatus
+    ) -> None:
+        """Cofa w pamięci skutki _open_rental, gdy zapis do magazynu lub
+        dziennika się nie powiódł (także dla częściowo otwartego
+        wypożyczenia) albo transakcja magazynu została wycofana."""
+        rental_id = rental.rental_id
+        rental.vehicle.status = vehicle_status
+        with self._index_lock:
+            history = rental.customer.rental_history
+            if rental_id in history:
+                history.remove(rental_id)
+            if self.rentals.pop(rental_id, None) is None:
+                return
+            if self._rentals_by_status[rental.status].pop(
+                rental_id, None
+            ) is None:
+                # Z magazynem (albo przed indeksowaniem) nie ma indeksów
+                # w pamięci do poprawienia.
+                return
+            self._rentals_by_customer[rental.customer.customer_id].remove(
+                rental
+            )
+            self._rentals_by_vehicle[rental.vehicle.vehicle_id].remove(
+                rental
+            )
+            self._due_dates.discard(rental)
+            self._start_dates.discard(rental)
+            self._forget_unreturned(rental)
+            self._aggregates.remove(rental)
+            self.availability.release(
+                rental.vehicle.vehicle_id, rental_id, rental.start_date
+            )
 
-        return rental
+    def create_rental(
+        self,
+        customer: Customer,
+        vehicle: Vehicle,
+        start_date: date,
+        end_date: date,
+    ) -> Rental:
+        if not isinstance(customer, Customer):
+            raise ValueError("Klient musi być instancją klasy Customer")
+        if not isinstance(vehicle, Vehicle):
+            raise ValueError("Pojazd musi być instancją klasy Vehicle")
+        if not isinstance(start_date, date):
+            raise ValueError(
+                "Data rozpoczęcia musi być instancją datetime.date"
+            )
+        if not isinstance(end_date, date):
+            raise ValueError(
+                "Data zakończenia musi być instancją datetime.date"
+            )
+
+        if not customer.can_rent():
+            raise RentalException(
+                "Klient nie może wypożyczyć pojazdu - nieważne prawo jazdy"
+            )
+
+        with self._vehicle_locks(vehicle.vehicle_id):
+            today = date.today()
+            self._check_booking(
+                customer, vehicle, start_date, end_date, today
+            )
+            return self._open_rental(
+                str(uuid.uuid4()),
+                customer,
+                vehicle,
+                start_date,
+                end_date,
+                today,
+            )
+
+    def create_rentals(
+        self, requests: Iterable[Tuple[Customer, Vehicle, date, date]]
+    ) -> List[Union[Rental, Exception]]:
+        """Tworzy wiele wypożyczeń naraz z krotek (klient, pojazd, data
+        rozpoczęcia, data zakończenia).
+
+        Zwraca listę wyników w kolejności zgłoszeń: utworzone Rental
+        albo wyjątek (ValueError lub RentalException), który dla danego
+        zgłoszenia zgłosiłoby create_rental. Odczyt daty, sprawdzenie
+        ważności prawa jazdy klienta i losowanie identyfikatorów są
+        wykonywane raz dla całej partii. Zgłoszenia są rozpatrywane po
+        kolei, więc kolizję z wcześniejszym zgłoszeniem tej samej partii
+        wykrywa zwykłe sprawdzenie kalendarza rezerwacji.
+
+        Inny błąd (np. zapisu do magazynu) przerywa partię i jest
+        zgłaszany dalej. Z magazynem cała partia jest jedną transakcją,
+        więc wtedy cofane są też zmiany w pamięci po wcześniejszych
+        zgłoszeniach partii.
+        """
+        if isinstance(requests, (str, bytes)):
+            raise ValueError("Zgłoszenia muszą być kolekcją krotek")
+        requests = list(requests)
+        today = date.today()
+        random_bytes = os.urandom(16 * len(requests))
+        valid_licenses: Dict[int, bool] = {}
+        results: List[Union[Rental, Exception]] = []
+        # Utworzone wypożyczenia i wcześniejsze statusy ich pojazdów.
+        opened: List[Tuple[Rental, VehicleStatus]] = []
+
+        # Zamki pojazdów przed transakcją magazynu, jak w create_rental -
+        # odwrotna kolejność zakleszczyłaby się z równoległym zapisem.
+        vehicle_ids = set()
+        for request in requests:
+            try:
+                vehicle = request[1]
+            except (TypeError, LookupError):
+                continue
+            if isinstance(vehicle, Vehicle):
+                vehicle_ids.add(vehicle.vehicle_id)
+
+        with self._vehicle_locks.many(vehicle_ids), self._discarding(
+            opened
+        ), self._transaction():
+            for i, request in enumerate(requests):
+                try:
+                    customer, vehicle, start_date, end_date = request
+                    if not isinstance(customer, Customer):
+                        raise ValueError(
+                            "Klient musi być instancją klasy Customer"
+                        )
+                    if not isinstance(vehicle, Vehicle):
+                        raise ValueError(
+                            "Pojazd musi być instancją klasy Vehicle"
+                        )
+                    if not isinstance(start_date, date) or not isinstance(
+                        end_date, date
+                    ):
+                        raise ValueError(
+                            "Daty muszą być instancjami datetime.date"
+                        )
+
+                    license = customer.driving_license
+                    valid = valid_licenses.get(id(license))
+                    if valid is None:
+                        valid = valid_licenses[id(license)] = (
+                            license.is_valid(today)
+                        )
+                    if not valid:
+                        raise RentalException(
+                            "Klient nie może wypożyczyć pojazdu"
+                            " - nieważne prawo jazdy"
+                        )
+
+                    rental_id = str(
+                        uuid.UUID(
+                            bytes=random_bytes[16 * i:16 * i + 16], version=4
+                        )
+                    )
+                    self._check_booking(
+                        customer, vehicle, start_date, end_date, today
+                    )
+                    vehicle_status = vehicle.status
+                    rental = self._open_rental(
+                        rental_id,
+                        customer,
+                        vehicle,
+                        start_date,
+                        end_date,
+                        today,
+                    )
+                    opened.append((rental, vehicle_status))
+                    results.append(rental)
+                except (TypeError, ValueError, RentalException) as e:
+                    results.append(e)
+        return results
 
     def get_rental(self, rental_id: str) -> Optional[Rental]:
         if not rental_id or not isinstance(rental_id, str):
             raise ValueError("ID wypożyczenia musi być niepustym stringiem")
 
-        return self.rentals.get(rental_id)
+        rental = self.rentals.get(rental_id)
+        if rental is None and self.storage is not None:
+            rental = self.storage.load_rental(rental_id)
+            if rental is not None:
+                self.rentals[rental_id] = rental
+        return rental
 
     def complete_rental(self, rental_id: str, return_date: date) -> float:
         if not rental_id or not isinstance(rental_id, str):
@@ -229,7 +814,22 @@ class RentalManager:
                 "niż data rozpoczęcia wypożyczenia"
             )
 
-        return rental.complete(return_date)
+        with self._vehicle_locks(rental.vehicle.vehicle_id):
+            total_cost = self._transition(
+                rental,
+                lambda: rental.complete(
+                    return_date, self.pricing.late_fee_factor
+                ),
+            )
+            if self.storage is None:
+                self.availability.shorten(
+                    rental.vehicle.vehicle_id,
+                    rental.rental_id,
+                    rental.start_date,
+                    return_date,
+                )
+            self._record("complete_rental", rental_id, return_date)
+        return total_cost
 
     def cancel_rental(self, rental_id: str) -> None:
         if not rental_id or not isinstance(rental_id, str):
@@ -241,43 +841,274 @@ class RentalManager:
                 f"Wypożyczenie o ID {rental_id} nie istnieje"
             )
 
-        rental.cancel()
+        with self._vehicle_locks(rental.vehicle.vehicle_id):
+            vehicle_status = rental.vehicle.status
+            # Rezerwacja, która jeszcze się nie rozpoczęła, nie zajmowała
+            # pojazdu, więc jego bieżący status pozostaje bez zmian.
+            restore_status = rental.start_date > date.today()
+
+            def cancel() -> None:
+                rental.cancel()
+                if restore_status:
+                    rental.vehicle.change_status(vehicle_status)
+
+            self._transition(rental, cancel)
+            if self.storage is None:
+                self.availability.release(
+                    rental.vehicle.vehicle_id,
+                    rental.rental_id,
+                    rental.start_date,
+                )
+            self._record("cancel_rental", rental_id, rental.vehicle.status)
 
-    def get_active_rentals(self) -> List[Rental]:
+    def add_charge(
+        self, rental_id: str, description: str, amount: float
+    ) -> None:
+        rental = self.get_rental(rental_id)
+        if not rental:
+            raise RentalException(
+                f"Wypożyczenie o ID {rental_id} nie istnieje"
+            )
+
+        with self._vehicle_locks(rental.vehicle.vehicle_id):
+            rental.add_charge(description, amount)
+            if self.storage is not None:
+                self.storage.save_rental(rental)
+            self._record("add_charge", rental_id, description, amount)
+
+    @staticmethod
+    def _is_bookable(vehicle: Vehicle, start_date: date, today: date) -> bool:
+        if vehicle.status == VehicleStatus.OUT_OF_SERVICE:
+            return False
+        # Status pojazdu opisuje jego stan dzisiaj, więc ma znaczenie tylko
+        # dla wypożyczeń rozpoczynających się od razu. Przyszłe terminy
+        # rozstrzyga kalendarz rezerwacji razem z wypożyczeniami
+        # niezwróconymi po terminie (_is_free).
+        return start_date > today or vehicle.is_available()
+
+    def is_vehicle_available(
+        self, vehicle: Vehicle, start_date: date, end_date: date
+    ) -> bool:
+        if not isinstance(vehicle, Vehicle):
+            raise ValueError("Pojazd musi być instancją klasy Vehicle")
+        if not isinstance(start_date, date) or not isinstance(end_date, date):
+            raise ValueError("Daty muszą być instancjami datetime.date")
+        if start_date > end_date:
+            raise ValueError(
+                "Data rozpoczęcia nie może być późniejsza niż data zakończenia"
+            )
+
+        today = date.today()
+        return self._is_bookable(
+            vehicle, start_date, today
+        ) and self._is_free(vehicle.vehicle_id, start_date, end_date, today)
+
+    def find_available_vehicles(
+        self, inventory: VehicleInventory, start_date: date, end_date: date
+    ) -> List[Vehicle]:
+        if not isinstance(inventory, VehicleInventory):
+            raise ValueError(
+                "Inwentarz musi być instancją klasy VehicleInventory"
+            )
+        if not isinstance(start_date, date) or not isinstance(end_date, date):
+            raise ValueError("Daty muszą być instancjami datetime.date")
+        if start_date > end_date:
+            raise ValueError(
+                "Data rozpoczęcia nie może być późniejsza niż data zakończenia"
+            )
+
+        today = date.today()
+        candidates = {
+            vehicle.vehicle_id: vehicle
+            for vehicle in inventory.iter_vehicles()
+            if self._is_bookable(vehicle, start_date, today)
+        }
+        if self.storage is not None:
+            booked = self.storage.booked_vehicle_ids(
+                start_date, end_date, today
+            )
+            return [v for i, v in candidates.items() if i not in booked]
         return [
-            r
-            for r in self.rentals.values()
-            if r.status == RentalStatus.ACTIVE
+            candidates[vehicle_id]
+            for vehicle_id in self.availability.free_vehicle_ids(
+                candidates, start_date, end_date
+            )
+            if not self._held(vehicle_id, end_date, today)
         ]
 
+    def get_active_rentals(self) -> List[Rental]:
+        if self.storage is not None:
+            return self._load_rentals(
+                self.storage.rental_ids(status=RentalStatus.ACTIVE)
+            )
+        return list(self._rentals_by_status[RentalStatus.ACTIVE].values())
+
     def get_overdue_rentals(
         self, current_date: Optional[date] = None
     ) -> List[Rental]:
         if current_date is None:
             current_date = date.today()
-        return [
-            r for r in self.rentals.values() if r.is_overdue(current_date)
-        ]
+        if not isinstance(current_date, date):
+            raise ValueError(
+                "Data sprawdzenia musi być instancją datetime.date"
+            )
+        if self.storage is not None:
+            overdue = self._load_rentals(
+                self.storage.rental_ids(
+                    status=RentalStatus.OVERDUE, ending_before=current_date
+                )
+                + self.storage.rental_ids(
+                    status=RentalStatus.ACTIVE, ending_before=current_date
+                )
+            )
+        else:
+            # Oznaczone przez mark_overdue_rentals i aktywne, których
+            # jeszcze nie oznaczono.
+            with self._index_lock:
+                overdue = [
+                    r
+                    for r in self._rentals_by_status[
+                        RentalStatus.OVERDUE
+                    ].values()
+                    if r.end_date < current_date
+                ] + self._due_dates.due_before(current_date)
+        overdue.sort(key=lambda r: r.end_date)
+        return overdue
+
+    def _mark_overdue(self, rental: Rental, current_date: date) -> bool:
+        with self._vehicle_locks(rental.vehicle.vehicle_id):
+            # Wypożyczenie mogło zostać zakończone lub anulowane po
+            # wybraniu kandydatów.
+            if not (
+                rental.status == RentalStatus.ACTIVE
+                and rental.is_overdue(current_date)
+            ):
+                return False
+            self._transition(
+                rental, lambda: rental.mark_overdue(current_date)
+            )
+            self._record("mark_overdue", rental.rental_id, current_date)
+        return True
+
+    def mark_overdue_rentals(
+        self, current_date: Optional[date] = None
+    ) -> List[Rental]:
+        """Zmienia status aktywnych wypożyczeń, których termin zwrotu minął
+        przed current_date, na OVERDUE i zwraca oznaczone wypożyczenia.
+
+        Kandydatów wskazuje kopiec terminów zwrotu, więc koszt zależy od
+        liczby przeterminowanych, a nie wszystkich wypożyczeń. Metodę
+        wywołuje okresowo OverdueSweeper (src.sweeper).
+        """
+        if current_date is None:
+            current_date = date.today()
+        if not isinstance(current_date, date):
+            raise ValueError(
+                "Data sprawdzenia musi być instancją datetime.date"
+            )
+
+        if self.storage is not None:
+            candidates = self._load_rentals(
+                self.storage.rental_ids(
+                    status=RentalStatus.ACTIVE, ending_before=current_date
+                )
+            )
+        else:
+            with self._index_lock:
+                candidates = self._due_dates.due_before(current_date)
+
+        vehicle_ids = [rental.vehicle.vehicle_id for rental in candidates]
+        with self._vehicle_locks.many(vehicle_ids), self._transaction():
+            return [
+                rental
+                for rental in candidates
+                if self._mark_overdue(rental, current_date)
+            ]
+
+    def _start_rental(self, rental: Rental) -> bool:
+        with self._vehicle_locks(rental.vehicle.vehicle_id):
+            # Wypożyczenie mogło zostać zakończone lub anulowane, a pojazd
+            # wydany lub wycofany po wybraniu kandydatów.
+            if (
+                rental.status != RentalStatus.ACTIVE
+                or not rental.vehicle.is_available()
+            ):
+                return False
+            self._transition(
+                rental,
+                lambda: rental.vehicle.change_status(VehicleStatus.RENTED),
+            )
+            if self.storage is None:
+                with self._index_lock:
+                    self._start_dates.discard(rental)
+            self._record("start_rental", rental.rental_id)
+        return True
+
+    def start_rentals(
+        self, current_date: Optional[date] = None
+    ) -> List[Rental]:
+        """Wydaje pojazdy (status RENTED) aktywnych wypożyczeń, które
+        rozpoczęły się najpóźniej current_date, i zwraca te wypożyczenia.
+
+        Rezerwacja na przyszły termin nie zmienia statusu pojazdu, więc
+        robi to ta metoda, gdy termin nadejdzie. Wydawany jest tylko
+        dostępny pojazd - np. pojazd w serwisie zostanie wydany przy
+        kolejnym wywołaniu po powrocie z serwisu. Metodę wywołuje okresowo
+        OverdueSweeper (src.sweeper).
+        """
+        if current_date is None:
+            current_date = date.today()
+        if not isinstance(current_date, date):
+            raise ValueError(
+                "Data sprawdzenia musi być instancją datetime.date"
+            )
+
+        if self.storage is not None:
+            candidates = self._load_rentals(
+                self.storage.rental_ids(
+                    status=RentalStatus.ACTIVE,
+                    started_by=current_date,
+                    vehicle_status=VehicleStatus.AVAILABLE,
+                )
+            )
+        else:
+            with self._index_lock:
+                candidates = []
+                for rental in self._start_dates.due_before(
+                    current_date + timedelta(days=1)
+                ):
+                    if rental.vehicle.status == VehicleStatus.RENTED:
+                        # Wydany już przy rezerwacji rozpoczynającej się
+                        # od razu.
+                        self._start_dates.discard(rental)
+                    elif rental.vehicle.is_available():
+                        candidates.append(rental)
+
+        vehicle_ids = [rental.vehicle.vehicle_id for rental in candidates]
+        with self._vehicle_locks.many(vehicle_ids), self._transaction():
+            return [
+                rental for rental in candidates if self._start_rental(rental)
+            ]
 
     def get_customer_rentals(self, customer_id: str) -> List[Rental]:
         if not customer_id or not isinstance(customer_id, str):
             raise ValueError("ID klienta musi być niepustym stringiem")
 
-        return [
-            r
-            for r in self.rentals.values()
-            if r.customer.customer_id == customer_id
-        ]
+        if self.storage is not None:
+            return self._load_rentals(
+                self.storage.rental_ids(customer_id=customer_id)
+            )
+        return list(self._rentals_by_customer.get(customer_id, []))
 
     def get_vehicle_rental_history(self, vehicle_id: str) -> List[Rental]:
         if not vehicle_id or not isinstance(vehicle_id, str):
             raise ValueError("ID pojazdu musi być niepustym stringiem")
 
-        return [
-            r
-            for r in self.rentals.values()
-            if r.vehicle.vehicle_id == vehicle_id
-        ]
+        if self.storage is not None:
+            return self._load_rentals(
+                self.storage.rental_ids(vehicle_id=vehicle_id)
+            )
+        return list(self._rentals_by_vehicle.get(vehicle_id, []))
 
     def add_review(
         self, rental_id: str, rating: int, comment: str, review_date: date
@@ -302,17 +1133,49 @@ class RentalManager:
             review_date=review_date,
         )
 
-        self.reviews.append(review)
+        self._insert_review(review)
+        self._record("add_review", review)
         return review
 
+    def _index_review(self, review: Review) -> None:
+        self._reviews_by_customer.setdefault(review.customer_id, []).append(
+            review
+        )
+        self._reviews_by_rental.setdefault(review.rental_id, []).append(
+            review
+        )
+        totals = self._rating_totals.setdefault(review.customer_id, [0, 0])
+        totals[0] += review.rating
+        totals[1] += 1
+        self.review_index.add(review)
+
     def get_reviews_for_customer(self, customer_id: str) -> list[Review]:
-        return [r for r in self.reviews if r.customer_id == customer_id]
+        if self.storage is not None:
+            return self.storage.load_reviews(customer_id=customer_id)
+        return list(self._reviews_by_customer.get(customer_id, []))
+
+    def get_reviews_for_rental(self, rental_id: str) -> list[Review]:
+        if self.storage is not None:
+            return self.storage.load_reviews(rental_id=rental_id)
+        return list(self._reviews_by_rental.get(rental_id, []))
+
+    def search_reviews(
+        self, keywords: List[str], match_all: bool = False
+    ) -> List[Review]:
+        with self._index_lock:
+            if not self._review_index_loaded:
+                # Indeks opinii z magazynu budowany jest przy pierwszym
+                # użyciu.
+                for review in self.storage.load_reviews():
+                    self.review_index.add(review)
+                self._review_index_loaded = True
+            return self.review_index.search(keywords, match_all)
 
     def get_average_rating_for_customer(self, customer_id: str) -> float:
-        reviews = self.get_reviews_for_customer(customer_id)
-        return (
-            sum(r.rating for r in reviews) / len(reviews) if reviews else 0.0
-        )
+        if self.storage is not None:
+            return self.storage.average_rating(customer_id)
+        totals = self._rating_totals.get(customer_id)
+        return totals[0] / totals[1] if totals else 0.0
 
     def generate_rental_report(
         self, start_date: date, end_date: date
@@ -328,67 +1191,7 @@ class RentalManager:
                 "Data początkowa nie może być późniejsza niż data końcowa"
             )
 
-        relevant_rentals = [
-            r
-            for r in self.rentals.values()
-            if (
-                r.start_date <= end_date
-                and (
-                    r.actual_return_date is None
-                    or r.actual_return_date >= start_date
-                )
-            )
-        ]
-
-        total_revenue = sum(
-            r.total_cost or 0
-            for r in relevant_rentals
-            if r.status == RentalStatus.COMPLETED
-        )
-        total_rentals = len(relevant_rentals)
-        avg_duration = (
-            sum(r.calculate_duration() for r in relevant_rentals)
-            / total_rentals
-            if total_rentals > 0
-            else 0
-        )
-
-        completed_rentals = [
-            r for r in relevant_rentals if r.status == RentalStatus.COMPLETED
-        ]
-        overdue_rentals = [
-            r
-            for r in relevant_rentals
-            if r.status == RentalStatus.OVERDUE
-            or (
-                r.status == RentalStatus.COMPLETED
-                and r.actual_return_date
-                and r.actual_return_date > r.end_date
-            )
-        ]
-
-        report = {
-            "period_start": start_date,
-            "period_end": end_date,
-            "total_rentals": total_rentals,
-            "completed_rentals": len(completed_rentals),
-            "active_rentals": len(
-                [
-                    r
-                    for r in relevant_rentals
-                    if r.status == RentalStatus.ACTIVE
-                ]
-            ),
-            "cancelled_rentals": len(
-                [
-                    r
-                    for r in relevant_rentals
-                    if r.status == RentalStatus.CANCELLED
-                ]
-            ),
-            "overdue_rentals": len(overdue_rentals),
-            "total_revenue": total_revenue,
-            "average_rental_duration": avg_duration,
-        }
-
-        return report
+        if self.storage is not None:
+            return self.storage.rental_report(start_date, end_date)
+        with self._index_lock:
+            return self._aggregates.report(start_date, end_date)
@@ -0,0 +1,121 @@
+from datetime import date
+from typing import Any, Dict, Iterable
+
+from src.rental import Rental, RentalManager, RentalStatus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - zależy od środowiska
+    np = None
+
+
+STATUS_CODES = {status: code for code, status in enumerate(RentalStatus)}
+
+# Brak daty zwrotu traktujemy jak zwrot w nieskończonej przyszłości.
+NOT_RETURNED = 2**62
+
+
+class RentalColumns:
+    """Kolumnowa migawka wypożyczeń w tablicach NumPy.
+
+    Daty są zapisane jako ordinale dni, status jako kod z STATUS_CODES,
+    a brak kosztu całkowitego jako NaN. Migawka nie śledzi późniejszych
+    zmian - służy do analiz ad hoc i raportów liczonych jednym
+    przebiegiem wektorowych masek.
+    """
+
+    def __init__(self, rentals: Iterable[Rental]) -> None:
+        if np is None:
+            raise ImportError(
+                "Kolumnowa migawka wypożyczeń wymaga biblioteki numpy"
+            )
+
+        start, end, returned, status, daily_rate, total_cost = (
+            [] for _ in range(6)
+        )
+        codes = STATUS_CODES
+        for r in rentals:
+            start.append(r.start_date.toordinal())
+            end.append(r.end_date.toordinal())
+            returned.append(
+                r.actual_return_date.toordinal()
+                if r.actual_return_date is not None
+                else NOT_RETURNED
+            )
+            status.append(codes[r.status])
+            daily_rate.append(r.daily_rate)
+            total_cost.append(
+                r.total_cost if r.total_cost is not None else float("nan")
+            )
+
+        self.start = np.array(start, dtype=np.int64)
+        self.end = np.array(end, dtype=np.int64)
+        self.actual_return = np.array(returned, dtype=np.int64)
+        self.status = np.array(status, dtype=np.int8)
+        self.daily_rate = np.array(daily_rate, dtype=np.float64)
+        self.total_cost = np.array(total_cost, dtype=np.float64)
+
+    @classmethod
+    def from_manager(cls, manager: RentalManager) -> "RentalColumns":
+        if not isinstance(manager, RentalManager):
+            raise ValueError("Menedżer musi być instancją RentalManager")
+
+        return cls(manager.rentals.values())
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def period_mask(self, start_date: date, end_date: date) -> Any:
+        return (self.start <= end_date.toordinal()) & (
+            self.actual_return >= start_date.toordinal()
+        )
+
+    def status_mask(self, status: RentalStatus) -> Any:
+        return self.status == STATUS_CODES[status]
+
+    def durations(self) -> Any:
+        return self.end - self.start + 1
+
+    def generate_rental_report(
+        self, start_date: date, end_date: date
+    ) -> Dict[str, Any]:
+        if not isinstance(start_date, date):
+            raise ValueError(
+                "Data początkowa musi być instancją datetime.date"
+            )
+        if not isinstance(end_date, date):
+            raise ValueError("Data końcowa musi być instancją datetime.date")
+        if start_date > end_date:
+            raise ValueError(
+                "Data początkowa nie może być późniejsza niż data końcowa"
+            )
+
+        relevant = self.period_mask(start_date, end_date)
+        completed = relevant & self.status_mask(RentalStatus.COMPLETED)
+        overdue = relevant & self.status_mask(RentalStatus.OVERDUE)
+        late = completed & (self.actual_return > self.end)
+
+        total_rentals = int(np.count_nonzero(relevant))
+        return {
+            "period_start": start_date,
+            "period_end": end_date,
+            "total_rentals": total_rentals,
+            "completed_rentals": int(np.count_nonzero(completed)),
+            "active_rentals": int(
+                np.count_nonzero(
+                    relevant & self.status_mask(RentalStatus.ACTIVE)
+                )
+            ),
+            "cancelled_rentals": int(
+                np.count_nonzero(
+                    relevant & self.status_mask(RentalStatus.CANCELLED)
+                )
+            ),
+            "overdue_rentals": int(np.count_nonzero(overdue | late)),
+            "total_revenue": float(self.total_cost[completed].sum()),
+            "average_rental_duration": (
+                float(self.durations()[relevant].mean())
+                if total_rentals > 0
+                else 0
+            ),
+        }
@@ -1,7 +1,20 @@
+from bisect import bisect_left, insort
+from collections import deque
 from datetime import date
+from typing import Dict, Iterable, List, Set
+
+from src.text import tokenize
 
 
 class Review:
+    __slots__ = (
+        "rental_id",
+        "customer_id",
+        "rating",
+        "comment",
+        "review_date",
+    )
+
     def __init__(
         self,
         rental_id: str,
@@ -30,6 +43,172 @@ class Review:
         comment_lower = self.comment.lower()
         return any(keyword.lower() in comment_lower for keyword in keywords)
 
+    def matched_keywords(self, matcher: "KeywordMatcher") -> List[str]:
+        """Słowa kluczowe dopasowania występujące w komentarzu."""
+        return matcher.find(self.comment)
+
     def __str__(self) -> str:
         return (f'[{self.review_date}] {self.customer_id}: '
                 f'{self.rating}/5 - "{self.comment}"')
+
+
+class KeywordMatcher:
+    """Automat Aho-Corasick wyszukujący wiele słów kluczowych naraz.
+
+    Automat budowany jest raz dla listy słów kluczowych i może być
+    używany dla dowolnej liczby komentarzy. Każdy komentarz jest
+    przeglądany jednokrotnie, niezależnie od liczby słów kluczowych.
+    Podobnie jak Review.contains_keywords, dopasowanie ignoruje wielkość
+    liter i znajduje słowa kluczowe także wewnątrz dłuższych słów.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        if isinstance(keywords, str):
+            raise ValueError("Słowa kluczowe muszą być listą stringów")
+
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        seen: Dict[str, int] = {}
+        for keyword in keywords:
+            if not keyword or not isinstance(keyword, str):
+                raise ValueError("Słowo kluczowe musi być niepustym stringiem")
+            pattern = keyword.lower()
+            if pattern in seen:
+                continue
+            seen[pattern] = len(self.keywords)
+            self.keywords.append(keyword)
+            self._insert(pattern, seen[pattern])
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, keyword_index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(keyword_index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[target]
+                )
+
+    def _scan(self, text: str) -> Iterable[List[int]]:
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield output[state]
+
+    def find(self, text: str) -> List[str]:
+        """Słowa kluczowe występujące w tekście, w kolejności z listy."""
+        found: Set[int] = set()
+        for hits in self._scan(text):
+            found.update(hits)
+            if len(found) == len(self.keywords):
+                break
+        return [self.keywords[i] for i in sorted(found)]
+
+    def matches(self, text: str) -> bool:
+        """Czy tekst zawiera choć jedno słowo kluczowe."""
+        return next(iter(self._scan(text)), None) is not None
+
+
+class ReviewSearchIndex:
+    """Odwrócony indeks słów występujących w komentarzach opinii.
+
+    Słowa są sprowadzane do małych liter bez polskich znaków, więc
+    "Brudny" i "brudny" oraz "awaria" i "AWARIĄ" trafiają do tych samych
+    list. Słowo kluczowe pasuje do każdego słowa, które się od niego
+    zaczyna ("czyst" znajdzie "czysty"), a wyszukiwanie odwiedza tylko
+    opinie z pasującymi słowami.
+    """
+
+    def __init__(self) -> None:
+        self._reviews: List[Review] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._reviews)
+
+    def add(self, review: Review) -> None:
+        if not isinstance(review, Review):
+            raise ValueError("Opinia musi być instancją klasy Review")
+
+        review_id = len(self._reviews)
+        self._reviews.append(review)
+        for token in set(tokenize(review.comment)):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                insort(self._vocabulary, token)
+            postings.add(review_id)
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        vocabulary = self._vocabulary
+        matches: Set[int] = set()
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            matches |= self._postings[vocabulary[i]]
+            i += 1
+        return matches
+
+    def _keyword_matches(self, keyword: str) -> Set[int]:
+        tokens = tokenize(keyword)
+        if not tokens:
+            return set()
+
+        # Słowo kluczowe złożone z kilku słów wymaga wszystkich z nich.
+        matches = self._prefix_matches(tokens[0])
+        for token in tokens[1:]:
+            if not matches:
+                break
+            matches &= self._prefix_matches(token)
+        return matches
+
+    def search(
+        self, keywords: Iterable[str], match_all: bool = False
+    ) -> List[Review]:
+        """Opinie zawierające dowolne (lub wszystkie) słowa kluczowe."""
+        if isinstance(keywords, str):
+            raise ValueError("Słowa kluczowe muszą być listą stringów")
+
+        result = None
+        for keyword in keywords:
+            if not isinstance(keyword, str):
+                raise ValueError("Słowa kluczowe muszą być listą stringów")
+            matches = self._keyword_matches(keyword)
+            if result is None:
+                result = matches
+            elif match_all:
+                result &= matches
+            else:
+                result |= matches
+            if match_all and not result:
+                break
+
+        if not result:
+            return []
+        return [self._reviews[i] for i in sorted(result)]
@@ -0,0 +1,241 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from src.customers import Customer, CustomerRegistry
+from src.rental import Rental, RentalManager
+from src.reviews import Review
+from src.vehicles import Vehicle, VehicleInventory, VehicleStatus
+
+
+class RentalService:
+    """Asynchroniczna fasada nad rejestrem klientów, inwentarzem
+    i menedżerem wypożyczeń.
+
+    Każda operacja wykonuje się w puli wątków (executor), więc nie blokuje
+    pętli zdarzeń nawet wtedy, gdy menedżery korzystają z magazynu danych.
+    Identyczne zapytania odczytu wywołane równocześnie są łączone: wykonuje
+    się tylko pierwsze, a pozostałe czekają na jego wynik. Połączone
+    wywołania dostają ten sam obiekt wyniku, którego nie należy
+    modyfikować. Operacje zmieniające stan nigdy nie są łączone,
+    a odczyt wywołany po zakończonym zapisie nie dołącza do zapytania
+    rozpoczętego przed nim, więc zawsze widzi skutki tego zapisu.
+
+    Usługa jest związana z jedną pętlą zdarzeń.
+    """
+
+    def __init__(
+        self,
+        registry: CustomerRegistry,
+        inventory: VehicleInventory,
+        manager: RentalManager,
+        executor: Optional[Executor] = None,
+        coalesce: bool = True,
+    ) -> None:
+        if not isinstance(registry, CustomerRegistry):
+            raise ValueError("Rejestr musi być instancją CustomerRegistry")
+        if not isinstance(inventory, VehicleInventory):
+            raise ValueError("Inwentarz musi być instancją VehicleInventory")
+        if not isinstance(manager, RentalManager):
+            raise ValueError("Menedżer musi być instancją RentalManager")
+
+        self.registry = registry
+        self.inventory = inventory
+        self.manager = manager
+        self.executor = executor
+        self.coalesce = coalesce
+        self.coalesced_reads = 0
+        self._pending: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._writes = 0
+
+    def _submit(
+        self, func: Callable[..., Any], *args: Any
+    ) -> "asyncio.Future[Any]":
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self.executor, functools.partial(func, *args)
+        )
+
+    async def _write(self, func: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return await self._submit(func, *args)
+        finally:
+            # Nowa generacja zapisów: kolejne odczyty nie dołączą do
+            # zapytań rozpoczętych przed zapisem.
+            self._writes += 1
+
+    async def _read(
+        self, key: Hashable, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        if not self.coalesce:
+            return await self._submit(func, *args)
+
+        key = (self._writes, key)
+        future = self._pending.get(key)
+        if future is None:
+            future = self._submit(func, *args)
+            self._pending[key] = future
+
+            def forget(done: "asyncio.Future[Any]") -> None:
+                if self._pending.get(key) is done:
+                    del self._pending[key]
+
+            future.add_done_callback(forget)
+        else:
+            self.coalesced_reads += 1
+        # Anulowanie jednego z oczekujących nie może przerwać zapytania,
+        # na które czekają pozostali.
+        return await asyncio.shield(future)
+
+    def _book(
+        self,
+        customer_id: str,
+        vehicle_id: str,
+        start_date: date,
+        end_date: date,
+    ) -> Rental:
+        customer = self.registry.get_customer(customer_id)
+        if customer is None:
+            raise ValueError(f"Klient o ID {customer_id} nie istnieje")
+        vehicle = self.inventory.get_vehicle(vehicle_id)
+        if vehicle is None:
+            raise ValueError(
+                f"Pojazd o ID {vehicle_id} nie istnieje w inwentarzu"
+            )
+        return self.manager.create_rental(
+            customer, vehicle, start_date, end_date
+        )
+
+    async def create_rental(
+        self,
+        customer_id: str,
+        vehicle_id: str,
+        start_date: date,
+        end_date: date,
+    ) -> Rental:
+        return await self._write(
+            self._book, customer_id, vehicle_id, start_date, end_date
+        )
+
+    async def complete_rental(
+        self, rental_id: str, return_date: date
+    ) -> float:
+        return await self._write(
+            self.manager.complete_rental, rental_id, return_date
+        )
+
+    async def cancel_rental(self, rental_id: str) -> None:
+        await self._write(self.manager.cancel_rental, rental_id)
+
+    async def add_charge(
+        self, rental_id: str, description: str, amount: float
+    ) -> None:
+        await self._write(
+            self.manager.add_charge, rental_id, description, amount
+        )
+
+    async def mark_overdue_rentals(
+        self, current_date: Optional[date] = None
+    ) -> List[Rental]:
+        return await self._write(
+            self.manager.mark_overdue_rentals, current_date
+        )
+
+    async def start_rentals(
+        self, current_date: Optional[date] = None
+    ) -> List[Rental]:
+        return await self._write(self.manager.start_rentals, current_date)
+
+    async def add_review(
+        self, rental_id: str, rating: int, comment: str, review_date: date
+    ) -> Review:
+        return await self._write(
+            self.manager.add_review, rental_id, rating, comment, review_date
+        )
+
+    async def get_customer(self, customer_id: str) -> Optional[Customer]:
+        return await self._read(
+            ("customer", customer_id),
+            self.registry.get_customer,
+            customer_id,
+        )
+
+    async def get_vehicle(self, vehicle_id: str) -> Optional[Vehicle]:
+        return await self._read(
+            ("vehicle", vehicle_id), self.inventory.get_vehicle, vehicle_id
+        )
+
+    async def get_rental(self, rental_id: str) -> Optional[Rental]:
+        return await self._read(
+            ("rental", rental_id), self.manager.get_rental, rental_id
+        )
+
+    async def get_customer_rentals(self, customer_id: str) -> List[Rental]:
+        return await self._read(
+            ("customer_rentals", customer_id),
+            self.manager.get_customer_rentals,
+            customer_id,
+        )
+
+    async def get_vehicle_rental_history(
+        self, vehicle_id: str
+    ) -> List[Rental]:
+        return await self._read(
+            ("vehicle_rentals", vehicle_id),
+            self.manager.get_vehicle_rental_history,
+            vehicle_id,
+        )
+
+    async def get_active_rentals(self) -> List[Rental]:
+        return await self._read(
+            ("active_rentals",), self.manager.get_active_rentals
+        )
+
+    async def get_overdue_rentals(
+        self, current_date: Optional[date] = None
+    ) -> List[Rental]:
+        return await self._read(
+            ("overdue_rentals", current_date),
+            self.manager.get_overdue_rentals,
+            current_date,
+        )
+
+    async def find_available_vehicles(
+        self, start_date: date, end_date: date
+    ) -> List[Vehicle]:
+        return await self._read(
+            ("available_vehicles", start_date, end_date),
+            self.manager.find_available_vehicles,
+            self.inventory,
+            start_date,
+            end_date,
+        )
+
+    async def count_vehicles_by_status(self) -> Dict[VehicleStatus, int]:
+        return await self._read(
+            ("vehicle_counts",), self.inventory.count_vehicles_by_status
+        )
+
+    async def search_reviews(
+        self, keywords: List[str], match_all: bool = False
+    ) -> List[Review]:
+        if not isinstance(keywords, list):
+            raise ValueError("Słowa kluczowe muszą być listą")
+        return await self._read(
+            ("reviews", tuple(keywords), match_all),
+            self.manager.search_reviews,
+            keywords,
+            match_all,
+        )
+
+    async def generate_rental_report(
+        self, start_date: date, end_date: date
+    ) -> Dict[str, Any]:
+        return await self._read(
+            ("report", start_date, end_date),
+            self.manager.generate_rental_report,
+            start_date,
+            end_date,
+        )
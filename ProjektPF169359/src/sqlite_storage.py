@@ -0,0 +1,1073 @@
+import functools
+import json
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import date
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from src.customers import (
+    Customer,
+    CustomerCategory,
+    DrivingLicense,
+    UNIQUE_FIELDS,
+    unique_keys,
+)
+from src.rental import Rental, RentalStatus
+from src.reviews import Review
+from src.storage import Storage
+from src.text import fold_name
+from src.trigram import (
+    COMMON_GRAM_TERMS,
+    rarest_grams,
+    similarity,
+    trigrams,
+)
+from src.vehicles import Car, Vehicle, VehicleStatus, VehicleType
+
+
+# Kolumny z postacią normalną pól unikalnych klienta (UNIQUE_FIELDS).
+_KEY_COLUMNS = {
+    "email": "email_key",
+    "phone": "phone_key",
+    "license_number": "license_key",
+}
+
+# Kolumny z kluczami fold_name nazwiska i imienia w obu kolejnościach.
+_NAME_KEY_COLUMNS = ("last_first_key", "first_last_key")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    last_name_lower TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    address TEXT NOT NULL,
+    license_number TEXT NOT NULL,
+    license_issue_date TEXT NOT NULL,
+    license_expiry_date TEXT NOT NULL,
+    license_categories TEXT NOT NULL,
+    registration_date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS customers_last_name
+    ON customers (last_name_lower);
+CREATE INDEX IF NOT EXISTS customers_category ON customers (category);
+
+CREATE TABLE IF NOT EXISTS customer_terms (
+    term TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    PRIMARY KEY (term, customer_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS customer_terms_customer
+    ON customer_terms (customer_id);
+CREATE TABLE IF NOT EXISTS term_trigrams (
+    gram TEXT NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (gram, term)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS trigram_counts (
+    gram TEXT PRIMARY KEY,
+    terms INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS vehicles (
+    vehicle_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    registration_number TEXT NOT NULL,
+    daily_rate REAL NOT NULL,
+    vehicle_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    doors INTEGER,
+    fuel_type TEXT,
+    transmission TEXT,
+    maintenance_history TEXT NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS vehicles_status
+    ON vehicles (status, vehicle_type);
+
+CREATE TABLE IF NOT EXISTS rentals (
+    rental_id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    vehicle_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    booked_until TEXT,
+    daily_rate REAL NOT NULL,
+    status TEXT NOT NULL,
+    actual_return_date TEXT,
+    total_cost REAL,
+    additional_charges TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rentals_customer ON rentals (customer_id);
+CREATE INDEX IF NOT EXISTS rentals_vehicle
+    ON rentals (vehicle_id, start_date);
+CREATE INDEX IF NOT EXISTS rentals_status ON rentals (status, end_date);
+CREATE INDEX IF NOT EXISTS rentals_start_date ON rentals (start_date);
+CREATE INDEX IF NOT EXISTS rentals_return_date
+    ON rentals (actual_return_date);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rental_id TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    comment TEXT NOT NULL,
+    review_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_customer ON reviews (customer_id);
+CREATE INDEX IF NOT EXISTS reviews_rental ON reviews (rental_id);
+"""
+
+# Wypożyczenia zajmujące pojazd w terminie [:start, :end]. Niezwrócone
+# po terminie (przed :today) zajmują pojazd do zwrotu.
+_BOOKED_IN_PERIOD = (
+    "booked_until IS NOT NULL AND start_date <= :end "
+    "AND (booked_until >= :start OR status IN ('active', 'overdue') "
+    "AND end_date < :today)"
+)
+
+
+def _search_terms(first_name: str, last_name: str, email: str) -> Set[str]:
+    """Znormalizowane teksty klienta porównywane z zapytaniem wyszukiwania
+    z literówkami: nazwisko, imię i nazwisko, imię oraz e-mail bez domeny
+    (patrz customers._name_keys)."""
+    return {
+        fold_name(last_name),
+        fold_name(first_name, last_name),
+        fold_name(first_name),
+        fold_name(email.partition("@")[0]),
+    }
+
+
+def _period(
+    start_date: date, end_date: date, today: Optional[date]
+) -> Dict[str, str]:
+    """Parametry zapytania z _BOOKED_IN_PERIOD."""
+    if today is None:
+        today = date.today()
+    return {
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "today": today.isoformat(),
+    }
+
+
+def _booked_until(rental: Rental) -> Optional[str]:
+    if rental.status == RentalStatus.CANCELLED:
+        return None
+    if rental.actual_return_date is not None:
+        return min(rental.end_date, rental.actual_return_date).isoformat()
+    return rental.end_date.isoformat()
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _locked(method: F) -> F:
+    """Wykonuje metodę pod zamkiem magazynu (np. wczytanie z mapą
+    tożsamości, żeby dwa wątki nie utworzyły dwóch kopii obiektu)."""
+
+    @functools.wraps(method)
+    def wrapper(self: "SQLiteStorage", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+class SQLiteStorage(Storage):
+    """Magazyn w lokalnej bazie SQLite (plik lub ":memory:").
+
+    Wczytane obiekty są zapamiętywane w mapie tożsamości, więc rejestr,
+    inwentarz i menedżer wypożyczeń współdzielą te same instancje.
+    Usunięcie klienta lub pojazdu tylko oznacza rekord jako usunięty,
+    żeby historyczne wypożyczenia dało się nadal wczytać.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        if not path or not isinstance(path, str):
+            raise ValueError("Ścieżka bazy musi być niepustym stringiem")
+
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function(
+            "fold_name", -1, fold_name, deterministic=True
+        )
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._customers: Any = weakref.WeakValueDictionary()
+        self._vehicles: Any = weakref.WeakValueDictionary()
+        self._rentals: Any = weakref.WeakValueDictionary()
+        # Połączenie jest współdzielone przez wątki; zamek szereguje
+        # zapytania i obejmuje całe transakcje.
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+
+    def _migrate(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Wersja 1: last_name_lower przechowuje klucz fold_name
+            # (bez polskich znaków) zamiast nazwiska małymi literami.
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE customers SET last_name_lower = "
+                    "fold_name(last_name)"
+                )
+                self._conn.execute("PRAGMA user_version = 1")
+        if version < 2:
+            # Wersja 2: indeksowane kolumny pól unikalnych klienta.
+            existing = {
+                row["name"]
+                for row in self._conn.execute("PRAGMA table_info(customers)")
+            }
+            with self._conn:
+                for column in _KEY_COLUMNS.values():
+                    if column not in existing:
+                        self._conn.execute(
+                            f"ALTER TABLE customers ADD COLUMN {column} "
+                            "TEXT NOT NULL DEFAULT ''"
+                        )
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS customers_{column} "
+                        f"ON customers ({column})"
+                    )
+                rows = self._conn.execute(
+                    "SELECT customer_id, email, phone, license_number "
+                    "FROM customers"
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE customers SET "
+                    + ", ".join(f"{c} = ?" for c in _KEY_COLUMNS.values())
+                    + " WHERE customer_id = ?",
+                    [
+                        [
+                            UNIQUE_FIELDS[field](row[field])
+                            for field in _KEY_COLUMNS
+                        ]
+                        + [row["customer_id"]]
+                        for row in rows
+                    ],
+                )
+                self._conn.execute("PRAGMA user_version = 2")
+        if version < 3:
+            # Wersja 3: indeksowane klucze imienia i nazwiska dla
+            # wyszukiwania po prefiksie.
+            existing = {
+                row["name"]
+                for row in self._conn.execute("PRAGMA table_info(customers)")
+            }
+            with self._conn:
+                for column in _NAME_KEY_COLUMNS:
+                    if column not in existing:
+                        self._conn.execute(
+                            f"ALTER TABLE customers ADD COLUMN {column} "
+                            "TEXT NOT NULL DEFAULT ''"
+                        )
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS customers_{column} "
+                        f"ON customers ({column})"
+                    )
+                self._conn.execute(
+                    "UPDATE customers SET "
+                    "last_first_key = fold_name(last_name, first_name), "
+                    "first_last_key = fold_name(first_name, last_name)"
+                )
+                self._conn.execute("PRAGMA user_version = 3")
+        if version < 5:
+            # Wersja 4: indeks trójek znaków dla wyszukiwania
+            # z literówkami. Wersja 5: indeksowany jest e-mail bez domeny,
+            # a częste trójki (trigram_counts) nie mają list tekstów.
+            with self._conn:
+                self._conn.execute("DELETE FROM customer_terms")
+                self._conn.execute("DELETE FROM term_trigrams")
+                self._conn.execute("DELETE FROM trigram_counts")
+                rows = self._conn.execute(
+                    "SELECT customer_id, first_name, last_name, email "
+                    "FROM customers WHERE removed = 0"
+                ).fetchall()
+                self._replace_terms(
+                    [row["customer_id"] for row in rows],
+                    {
+                        (term, row["customer_id"])
+                        for row in rows
+                        for term in _search_terms(
+                            row["first_name"], row["last_name"], row["email"]
+                        )
+                    },
+                )
+                self._conn.execute("PRAGMA user_version = 5")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # Zagnieżdżone transakcje są częścią najbardziej zewnętrznej, która
+        # jako jedyna zatwierdza lub wycofuje zmiany. Inne wątki czekają
+        # na zakończenie transakcji.
+        with self._lock:
+            self._transaction_depth += 1
+            try:
+                yield
+            except BaseException:
+                if self._transaction_depth == 1:
+                    self._conn.rollback()
+                raise
+            else:
+                if self._transaction_depth == 1:
+                    self._conn.commit()
+            finally:
+                self._transaction_depth -= 1
+
+    def _execute(self, sql: str, params: Any = ()) -> None:
+        with self.transaction():
+            self._conn.execute(sql, params)
+
+    def _upsert(self, table: str, values: Dict[str, Any]) -> None:
+        self._upsert_many(table, [values])
+
+    def _upsert_many(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        # W przeciwieństwie do INSERT OR REPLACE zachowuje rowid, a więc
+        # i kolejność dodania rekordu.
+        columns = list(rows[0])
+        key = columns[0]
+        with self.transaction():
+            self._conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT ({key}) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in columns[1:]),
+                [list(values.values()) for values in rows],
+            )
+
+    def _fetch(self, sql: str, params: Any = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _fetch_one(
+        self, sql: str, params: Any = ()
+    ) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _column(self, sql: str, params: Any = ()) -> List[Any]:
+        return [row[0] for row in self._fetch(sql, params)]
+
+    def _existing_ids(self, table: str, key: str, ids: List[str]) -> Set[str]:
+        existing: Set[str] = set()
+        # Porcje poniżej limitu parametrów zapytania SQLite.
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            existing.update(
+                self._column(
+                    f"SELECT {key} FROM {table} WHERE removed = 0 "
+                    f"AND {key} IN ({', '.join('?' for _ in part)})",
+                    part,
+                )
+            )
+        return existing
+
+    # Klienci
+
+    def save_customer(self, customer: Customer) -> None:
+        with self.transaction():
+            self._upsert("customers", self._customer_row(customer))
+            self._index_terms([customer])
+        self._customers[customer.customer_id] = customer
+
+    def save_customers(self, customers: List[Customer]) -> None:
+        with self.transaction():
+            self._upsert_many(
+                "customers", [self._customer_row(c) for c in customers]
+            )
+            self._index_terms(customers)
+
+    def _index_terms(self, customers: List[Customer]) -> None:
+        self._replace_terms(
+            [c.customer_id for c in customers],
+            {
+                (term, c.customer_id)
+                for c in customers
+                for term in _search_terms(c.first_name, c.last_name, c.email)
+            },
+        )
+
+    def _replace_terms(
+        self, customer_ids: List[str], pairs: Set[Tuple[str, str]]
+    ) -> None:
+        """Zastępuje pary (tekst, klient) klientów w indeksie trójek.
+
+        Jak w TrigramIndex trójki są indeksowane dla tekstów, a nie
+        klientów, więc wspólne nazwisko ma jedną listę trójek. Tekst
+        jest w term_trigrams, dopóki ma go choć jeden klient, ale tylko
+        pod trójkami, które nie są częste (patrz _count_grams).
+        """
+        old: Set[Tuple[str, str]] = set()
+        for i in range(0, len(customer_ids), 500):
+            part = customer_ids[i:i + 500]
+            old.update(
+                (row[0], row[1])
+                for row in self._conn.execute(
+                    "SELECT term, customer_id FROM customer_terms "
+                    f"WHERE customer_id IN ({', '.join('?' for _ in part)})",
+                    part,
+                )
+            )
+        removed = old - pairs
+        added = pairs - old
+        added_terms = list({term for term, _ in added})
+        indexed: Set[str] = set()
+        for i in range(0, len(added_terms), 500):
+            part = added_terms[i:i + 500]
+            indexed.update(
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT term FROM customer_terms "
+                    f"WHERE term IN ({', '.join('?' for _ in part)})",
+                    part,
+                )
+            )
+        new_terms = [term for term in added_terms if term not in indexed]
+
+        self._conn.executemany(
+            "DELETE FROM customer_terms WHERE term = ? AND customer_id = ?",
+            removed,
+        )
+        # Wstawianie w kolejności klucza głównego jest przy dużych
+        # porcjach kilka razy szybsze.
+        self._conn.executemany(
+            "INSERT INTO customer_terms (term, customer_id) VALUES (?, ?)",
+            sorted(added),
+        )
+        unused = [
+            term
+            for term in {term for term, _ in removed}
+            if self._conn.execute(
+                "SELECT 1 FROM customer_terms WHERE term = ? LIMIT 1",
+                (term,),
+            ).fetchone()
+            is None
+        ]
+        # Przy dużych porcjach trójki nie mieszczą się w pamięci podręcznej
+        # trigrams(), więc są liczone raz dla każdego tekstu.
+        added_grams = {term: trigrams(term) for term in new_terms}
+        removed_grams = {term: trigrams(term) for term in unused}
+        common = self._count_grams(added_grams, removed_grams)
+        self._conn.executemany(
+            "INSERT INTO term_trigrams (gram, term) VALUES (?, ?)",
+            sorted(
+                (gram, term)
+                for term, grams in added_grams.items()
+                for gram in grams
+                if gram not in common
+            ),
+        )
+        self._conn.executemany(
+            "DELETE FROM term_trigrams WHERE gram = ? AND term = ?",
+            (
+                (gram, term)
+                for term, grams in removed_grams.items()
+                for gram in grams
+                if gram not in common
+            ),
+        )
+
+    def _count_grams(
+        self,
+        added: Dict[str, FrozenSet[str]],
+        removed: Dict[str, FrozenSet[str]],
+    ) -> Set[str]:
+        """Aktualizuje liczby tekstów z trójkami dla dodanych i usuniętych
+        tekstów (tekst -> jego trójki) i zwraca te z ich trójek, które
+        są częste.
+
+        Trójka częstsza niż COMMON_GRAM_TERMS traci listę tekstów i nie
+        wybiera kandydatów (patrz rarest_grams). Jej liczba przestaje być
+        aktualizowana, więc pozostaje częsta do przebudowy indeksu.
+        """
+        delta: Dict[str, int] = {}
+        for grams in added.values():
+            for gram in grams:
+                delta[gram] = delta.get(gram, 0) + 1
+        for grams in removed.values():
+            for gram in grams:
+                delta[gram] = delta.get(gram, 0) - 1
+        grams = list(delta)
+        counts: Dict[str, int] = {}
+        for i in range(0, len(grams), 500):
+            part = grams[i:i + 500]
+            counts.update(
+                (row[0], row[1])
+                for row in self._conn.execute(
+                    "SELECT gram, terms FROM trigram_counts "
+                    f"WHERE gram IN ({', '.join('?' for _ in part)})",
+                    part,
+                )
+            )
+
+        common: Set[str] = set()
+        changed: List[Tuple[str, int]] = []
+        for gram, change in delta.items():
+            before = counts.get(gram, 0)
+            if before > COMMON_GRAM_TERMS:
+                common.add(gram)
+                continue
+            after = before + change
+            changed.append((gram, after))
+            if after > COMMON_GRAM_TERMS:
+                common.add(gram)
+                self._conn.execute(
+                    "DELETE FROM term_trigrams WHERE gram = ?", (gram,)
+                )
+        self._conn.executemany(
+            "INSERT INTO trigram_counts (gram, terms) VALUES (?, ?) "
+            "ON CONFLICT (gram) DO UPDATE SET terms = excluded.terms",
+            sorted(item for item in changed if item[1] > 0),
+        )
+        self._conn.executemany(
+            "DELETE FROM trigram_counts WHERE gram = ?",
+            ((gram,) for gram, terms in changed if terms <= 0),
+        )
+        return common
+
+    @staticmethod
+    def _customer_row(customer: Customer) -> Dict[str, Any]:
+        license = customer.driving_license
+        keys = unique_keys(customer)
+        return {
+            "customer_id": customer.customer_id,
+            "first_name": customer.first_name,
+            "last_name": customer.last_name,
+            # Kolumna przechowuje klucz fold_name, nie tylko małe litery.
+            "last_name_lower": fold_name(customer.last_name),
+            "last_first_key": fold_name(
+                customer.last_name, customer.first_name
+            ),
+            "first_last_key": fold_name(
+                customer.first_name, customer.last_name
+            ),
+            "email": customer.email,
+            "phone": customer.phone,
+            "address": customer.address,
+            "license_number": license.license_number,
+            "license_issue_date": license.issue_date.isoformat(),
+            "license_expiry_date": license.expiry_date.isoformat(),
+            "license_categories": json.dumps(license.categories),
+            "registration_date": customer.registration_date.isoformat(),
+            "category": customer.category.value,
+            "removed": 0,
+            **{_KEY_COLUMNS[field]: key for field, key in keys.items()},
+        }
+
+    def delete_customer(self, customer_id: str) -> None:
+        with self.transaction():
+            self._conn.execute(
+                "UPDATE customers SET removed = 1 WHERE customer_id = ?",
+                (customer_id,),
+            )
+            self._replace_terms([customer_id], set())
+
+    @_locked
+    def load_customer(
+        self, customer_id: str, include_removed: bool = False
+    ) -> Optional[Customer]:
+        row = self._fetch_one(
+            "SELECT * FROM customers WHERE customer_id = ?", (customer_id,)
+        )
+        if row is None or (row["removed"] and not include_removed):
+            return None
+
+        customer = self._customers.get(customer_id)
+        if customer is not None:
+            return customer
+
+        license = DrivingLicense(
+            row["license_number"],
+            date.fromisoformat(row["license_issue_date"]),
+            date.fromisoformat(row["license_expiry_date"]),
+            json.loads(row["license_categories"]),
+        )
+        customer = Customer(
+            row["customer_id"],
+            row["first_name"],
+            row["last_name"],
+            row["email"],
+            row["phone"],
+            row["address"],
+            license,
+        )
+        customer.registration_date = date.fromisoformat(
+            row["registration_date"]
+        )
+        customer.category = CustomerCategory(row["category"])
+        if self.customer_listener is not None:
+            customer._category_listener = self.customer_listener
+        customer.rental_history = self._column(
+            "SELECT rental_id FROM rentals WHERE customer_id = ? "
+            "ORDER BY rowid",
+            (customer_id,),
+        )
+        self._customers[customer_id] = customer
+        return customer
+
+    def customer_ids(
+        self,
+        last_name: Optional[str] = None,
+        category: Optional[CustomerCategory] = None,
+    ) -> List[str]:
+        sql = "SELECT customer_id FROM customers WHERE removed = 0"
+        params: List[Any] = []
+        if last_name is not None:
+            sql += " AND last_name_lower = ?"
+            params.append(fold_name(last_name))
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category.value)
+        return self._column(sql + " ORDER BY rowid", params)
+
+    def customer_ids_by_name_prefix(
+        self, prefix: str, limit: int
+    ) -> List[str]:
+        # Każda kolejność jest czytana z indeksu po kolei i najwyżej limit
+        # wierszy: klient spoza pierwszych limit wierszy obu kolejności
+        # ma przed sobą co najmniej limit innych klientów.
+        matches = " UNION ALL ".join(
+            f"SELECT * FROM (SELECT customer_id, rowid AS position,"
+            f" {column} AS name FROM customers"
+            f" WHERE {column} >= :prefix AND {column} < :end"
+            f" AND removed = 0 ORDER BY {column}, rowid LIMIT :limit)"
+            for column in _NAME_KEY_COLUMNS
+        )
+        return self._column(
+            f"SELECT customer_id FROM ({matches})"
+            " GROUP BY customer_id ORDER BY MIN(name), MIN(position)"
+            " LIMIT :limit",
+            # Klucze zaczynające się od prefiksu leżą w przedziale
+            # [prefix, prefix + największy znak Unicode).
+            {"prefix": prefix, "end": prefix + "\U0010ffff", "limit": limit},
+        )
+
+    def customer_ids_by_similarity(
+        self, query: str, threshold: float, limit: int
+    ) -> List[str]:
+        # Jak w TrigramIndex.search podobieństwo liczone jest tylko dla
+        # tekstów z list najrzadszych trójek zapytania.
+        grams = trigrams(query)
+        if not grams:
+            return []
+        with self._lock:
+            counts = dict(
+                self._fetch(
+                    "SELECT gram, terms FROM trigram_counts "
+                    "WHERE gram IN (SELECT value FROM json_each(?))",
+                    (json.dumps(list(grams)),),
+                )
+            )
+            rare = rarest_grams(
+                grams,
+                threshold,
+                lambda gram: counts.get(gram, 0),
+                COMMON_GRAM_TERMS,
+            )
+            by_score: Dict[float, List[str]] = {}
+            for term in self._column(
+                "SELECT DISTINCT term FROM term_trigrams "
+                "WHERE gram IN (SELECT value FROM json_each(?))",
+                (json.dumps(rare),),
+            ):
+                score = similarity(query, term)
+                if score >= threshold:
+                    by_score.setdefault(score, []).append(term)
+
+            # Klient trafia do wyniku z najwyższym podobieństwem swoich
+            # tekstów; przy równym podobieństwie decyduje kolejność dodania.
+            found: Dict[str, None] = {}
+            for score in sorted(by_score, reverse=True):
+                for customer_id in self._column(
+                    "SELECT customer_id FROM customers WHERE removed = 0"
+                    " AND customer_id IN (SELECT customer_id"
+                    "  FROM customer_terms WHERE term IN"
+                    "  (SELECT value FROM json_each(?)))"
+                    " ORDER BY rowid LIMIT ?",
+                    (json.dumps(by_score[score]), limit + len(found)),
+                ):
+                    found.setdefault(customer_id)
+                    if len(found) == limit:
+                        return list(found)
+            return list(found)
+
+    def customer_ids_by_key(
+        self, field: str, keys: List[str]
+    ) -> Dict[str, str]:
+        column = _KEY_COLUMNS[field]
+        owners: Dict[str, str] = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            owners.update(
+                (row[0], row[1])
+                for row in self._fetch(
+                    f"SELECT {column}, customer_id FROM customers "
+                    f"WHERE removed = 0 "
+                    f"AND {column} IN ({', '.join('?' for _ in part)})",
+                    part,
+                )
+            )
+        return owners
+
+    def existing_customer_ids(self, customer_ids: List[str]) -> Set[str]:
+        return self._existing_ids("customers", "customer_id", customer_ids)
+
+    def count_customers(self) -> int:
+        return self._column(
+            "SELECT COUNT(*) FROM customers WHERE removed = 0"
+        )[0]
+
+    def count_customers_by_category(self) -> Dict[CustomerCategory, int]:
+        counts = {category: 0 for category in CustomerCategory}
+        for row in self._fetch(
+            "SELECT category, COUNT(*) FROM customers WHERE removed = 0 "
+            "GROUP BY category"
+        ):
+            counts[CustomerCategory(row[0])] = row[1]
+        return counts
+
+    # Pojazdy
+
+    def save_vehicle(self, vehicle: Vehicle) -> None:
+        self._upsert("vehicles", self._vehicle_row(vehicle))
+        self._vehicles[vehicle.vehicle_id] = vehicle
+
+    def save_vehicles(self, vehicles: List[Vehicle]) -> None:
+        self._upsert_many(
+            "vehicles", [self._vehicle_row(v) for v in vehicles]
+        )
+
+    @staticmethod
+    def _vehicle_row(vehicle: Vehicle) -> Dict[str, Any]:
+        is_car = isinstance(vehicle, Car)
+        return {
+            "vehicle_id": vehicle.vehicle_id,
+            "kind": "car" if is_car else "vehicle",
+            "make": vehicle.make,
+            "model": vehicle.model,
+            "year": vehicle.year,
+            "registration_number": vehicle.registration_number,
+            "daily_rate": vehicle.daily_rate,
+            "vehicle_type": vehicle.vehicle_type.value,
+            "status": vehicle.status.value,
+            "doors": vehicle.doors if is_car else None,
+            "fuel_type": vehicle.fuel_type if is_car else None,
+            "transmission": vehicle.transmission if is_car else None,
+            "maintenance_history": json.dumps(
+                [
+                    dict(record, date=record["date"].isoformat())
+                    for record in vehicle.maintenance_history
+                ]
+            ),
+            "removed": 0,
+        }
+
+    def delete_vehicle(self, vehicle_id: str) -> None:
+        self._execute(
+            "UPDATE vehicles SET removed = 1 WHERE vehicle_id = ?",
+            (vehicle_id,),
+        )
+
+    @_locked
+    def load_vehicle(
+        self, vehicle_id: str, include_removed: bool = False
+    ) -> Optional[Vehicle]:
+        row = self._fetch_one(
+            "SELECT * FROM vehicles WHERE vehicle_id = ?", (vehicle_id,)
+        )
+        if row is None or (row["removed"] and not include_removed):
+            return None
+
+        vehicle = self._vehicles.get(vehicle_id)
+        if vehicle is not None:
+            return vehicle
+
+        args = (
+            row["vehicle_id"],
+            row["make"],
+            row["model"],
+            row["year"],
+            row["registration_number"],
+            row["daily_rate"],
+            VehicleType(row["vehicle_type"]),
+        )
+        if row["kind"] == "car":
+            vehicle = Car(
+                *args, row["doors"], row["fuel_type"], row["transmission"]
+            )
+        else:
+            vehicle = Vehicle(*args)
+        vehicle.status = VehicleStatus(row["status"])
+        history = json.loads(row["maintenance_history"])
+        if history:
+            vehicle.maintenance_history = [
+                dict(record, date=date.fromisoformat(record["date"]))
+                for record in history
+            ]
+        self._vehicles[vehicle_id] = vehicle
+        return vehicle
+
+    def vehicle_ids(
+        self,
+        status: Optional[VehicleStatus] = None,
+        vehicle_type: Optional[VehicleType] = None,
+    ) -> List[str]:
+        sql = "SELECT vehicle_id FROM vehicles WHERE removed = 0"
+        params: List[Any] = []
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status.value)
+        if vehicle_type is not None:
+            sql += " AND vehicle_type = ?"
+            params.append(vehicle_type.value)
+        return self._column(sql + " ORDER BY rowid", params)
+
+    def existing_vehicle_ids(self, vehicle_ids: List[str]) -> Set[str]:
+        return self._existing_ids("vehicles", "vehicle_id", vehicle_ids)
+
+    def count_vehicles_by_status(self) -> Dict[VehicleStatus, int]:
+        counts = {status: 0 for status in VehicleStatus}
+        for row in self._fetch(
+            "SELECT status, COUNT(*) FROM vehicles WHERE removed = 0 "
+            "GROUP BY status"
+        ):
+            counts[VehicleStatus(row[0])] = row[1]
+        return counts
+
+    # Wypożyczenia
+
+    def save_rental(self, rental: Rental) -> None:
+        self._upsert(
+            "rentals",
+            {
+                "rental_id": rental.rental_id,
+                "customer_id": rental.customer.customer_id,
+                "vehicle_id": rental.vehicle.vehicle_id,
+                "start_date": rental.start_date.isoformat(),
+                "end_date": rental.end_date.isoformat(),
+                "booked_until": _booked_until(rental),
+                "daily_rate": rental.daily_rate,
+                "status": rental.status.value,
+                "actual_return_date": (
+                    rental.actual_return_date.isoformat()
+                    if rental.actual_return_date is not None
+                    else None
+                ),
+                "total_cost": rental.total_cost,
+                "additional_charges": json.dumps(rental.additional_charges),
+            },
+        )
+        self._rentals[rental.rental_id] = rental
+
+    @_locked
+    def load_rental(self, rental_id: str) -> Optional[Rental]:
+        rental = self._rentals.get(rental_id)
+        if rental is not None:
+            return rental
+
+        row = self._fetch_one(
+            "SELECT * FROM rentals WHERE rental_id = ?", (rental_id,)
+        )
+        if row is None:
+            return None
+
+        rental = Rental(
+            row["rental_id"],
+            self.load_customer(row["customer_id"], include_removed=True),
+            self.load_vehicle(row["vehicle_id"], include_removed=True),
+            date.fromisoformat(row["start_date"]),
+            date.fromisoformat(row["end_date"]),
+            row["daily_rate"],
+        )
+        rental.status = RentalStatus(row["status"])
+        if row["actual_return_date"] is not None:
+            rental.actual_return_date = date.fromisoformat(
+                row["actual_return_date"]
+            )
+        rental.total_cost = row["total_cost"]
+        charges = json.loads(row["additional_charges"])
+        if charges:
+            rental.additional_charges = charges
+        self._rentals[rental_id] = rental
+        return rental
+
+    def rental_ids(
+        self,
+        customer_id: Optional[str] = None,
+        vehicle_id: Optional[str] = None,
+        status: Optional[RentalStatus] = None,
+        ending_before: Optional[date] = None,
+        started_by: Optional[date] = None,
+        vehicle_status: Optional[VehicleStatus] = None,
+    ) -> List[str]:
+        conditions = []
+        params: List[Any] = []
+        if customer_id is not None:
+            conditions.append("customer_id = ?")
+            params.append(customer_id)
+        if vehicle_id is not None:
+            conditions.append("vehicle_id = ?")
+            params.append(vehicle_id)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status.value)
+        if ending_before is not None:
+            conditions.append("end_date < ?")
+            params.append(ending_before.isoformat())
+        if started_by is not None:
+            conditions.append("start_date <= ?")
+            params.append(started_by.isoformat())
+        if vehicle_status is not None:
+            conditions.append(
+                "vehicle_id IN (SELECT vehicle_id FROM vehicles"
+                " WHERE status = ?)"
+            )
+            params.append(vehicle_status.value)
+
+        sql = "SELECT rental_id FROM rentals"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return self._column(sql + " ORDER BY rowid", params)
+
+    def is_vehicle_booked(
+        self,
+        vehicle_id: str,
+        start_date: date,
+        end_date: date,
+        today: Optional[date] = None,
+    ) -> bool:
+        row = self._fetch_one(
+            "SELECT 1 FROM rentals WHERE vehicle_id = :vehicle AND "
+            + _BOOKED_IN_PERIOD
+            + " LIMIT 1",
+            {
+                "vehicle": vehicle_id,
+                **_period(start_date, end_date, today),
+            },
+        )
+        return row is not None
+
+    def booked_vehicle_ids(
+        self, start_date: date, end_date: date, today: Optional[date] = None
+    ) -> Set[str]:
+        return set(
+            self._column(
+                "SELECT DISTINCT vehicle_id FROM rentals WHERE "
+                + _BOOKED_IN_PERIOD,
+                _period(start_date, end_date, today),
+            )
+        )
+
+    def rental_report(
+        self, start_date: date, end_date: date
+    ) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        total_days = 0
+        total_revenue = 0
+        late_returns = 0
+        for row in self._fetch(
+            "SELECT status, COUNT(*), "
+            "SUM(julianday(end_date) - julianday(start_date) + 1), "
+            "SUM(COALESCE(total_cost, 0)), "
+            "SUM(actual_return_date > end_date) "
+            "FROM rentals WHERE start_date <= ? AND "
+            "(actual_return_date IS NULL OR actual_return_date >= ?) "
+            "GROUP BY status",
+            (end_date.isoformat(), start_date.isoformat()),
+        ):
+            status, count, days, revenue, late = row
+            counts[status] = count
+            total_days += int(days)
+            if status == "completed":
+                total_revenue = revenue
+                late_returns = late
+
+        total_rentals = sum(counts.values())
+        return {
+            "period_start": start_date,
+            "period_end": end_date,
+            "total_rentals": total_rentals,
+            "completed_rentals": counts.get("completed", 0),
+            "active_rentals": counts.get("active", 0),
+            "cancelled_rentals": counts.get("cancelled", 0),
+            "overdue_rentals": counts.get("overdue", 0) + late_returns,
+            "total_revenue": total_revenue,
+            "average_rental_duration": (
+                total_days / total_rentals if total_rentals > 0 else 0
+            ),
+        }
+
+    # Opinie
+
+    def save_review(self, review: Review) -> None:
+        self._execute(
+            "INSERT INTO reviews (rental_id, customer_id, rating, comment, "
+            "review_date) VALUES (?, ?, ?, ?, ?)",
+            (
+                review.rental_id,
+                review.customer_id,
+                review.rating,
+                review.comment,
+                review.review_date.isoformat(),
+            ),
+        )
+
+    def load_reviews(
+        self,
+        customer_id: Optional[str] = None,
+        rental_id: Optional[str] = None,
+    ) -> List[Review]:
+        conditions = []
+        params: List[Any] = []
+        if customer_id is not None:
+            conditions.append("customer_id = ?")
+            params.append(customer_id)
+        if rental_id is not None:
+            conditions.append("rental_id = ?")
+            params.append(rental_id)
+
+        sql = (
+            "SELECT rental_id, customer_id, rating, comment, review_date "
+            "FROM reviews"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return [
+            Review(
+                row[0], row[1], row[2], row[3], date.fromisoformat(row[4])
+            )
+            for row in self._fetch(sql + " ORDER BY review_id", params)
+        ]
+
+    def average_rating(self, customer_id: str) -> float:
+        average = self._column(
+            "SELECT AVG(rating) FROM reviews WHERE customer_id = ?",
+            (customer_id,),
+        )[0]
+        return average if average is not None else 0.0
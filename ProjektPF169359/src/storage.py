@@ -0,0 +1,202 @@
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from datetime import date
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+if TYPE_CHECKING:
+    from src.customers import Customer, CustomerCategory
+    from src.rental import Rental, RentalStatus
+    from src.reviews import Review
+    from src.vehicles import Vehicle, VehicleStatus, VehicleType
+
+
+class Storage(ABC):
+    """Interfejs trwałego magazynu klientów, pojazdów, wypożyczeń i opinii.
+
+    CustomerRegistry, VehicleInventory i RentalManager z przekazanym
+    magazynem zapisują przez niego każdą zmianę i wczytują z niego
+    obiekty dopiero wtedy, gdy są potrzebne.
+    """
+
+    # Obserwator zmian kategorii dołączany do klientów wczytanych przez
+    # magazyn, także jako Rental.customer. Ustawia go CustomerRegistry.
+    customer_listener: Optional[Callable[["Customer"], None]] = None
+
+    @abstractmethod
+    def save_customer(self, customer: "Customer") -> None:
+        raise NotImplementedError
+
+    def save_customers(self, customers: List["Customer"]) -> None:
+        for customer in customers:
+            self.save_customer(customer)
+
+    @abstractmethod
+    def delete_customer(self, customer_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_customer(
+        self, customer_id: str, include_removed: bool = False
+    ) -> Optional["Customer"]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def customer_ids(
+        self,
+        last_name: Optional[str] = None,
+        category: Optional["CustomerCategory"] = None,
+    ) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def customer_ids_by_name_prefix(
+        self, prefix: str, limit: int
+    ) -> List[str]:
+        """Identyfikatory do limit klientów, których klucz fold_name
+        (nazwisko i imię albo imię i nazwisko) zaczyna się od prefix,
+        w kolejności kluczy."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def customer_ids_by_similarity(
+        self, query: str, threshold: float, limit: int
+    ) -> List[str]:
+        """Identyfikatory do limit klientów, których imię, nazwisko, imię
+        i nazwisko lub e-mail bez domeny są podobne do zapytania
+        (src.trigram) co najmniej w stopniu threshold, od najbardziej
+        podobnych."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def customer_ids_by_key(
+        self, field: str, keys: List[str]
+    ) -> Dict[str, str]:
+        """Mapa wartość -> ID klienta dla wartości pola unikalnego
+        (postać normalna z UNIQUE_FIELDS) zajętych przez klientów."""
+        raise NotImplementedError
+
+    def existing_customer_ids(self, customer_ids: List[str]) -> Set[str]:
+        return {i for i in customer_ids if self.load_customer(i) is not None}
+
+    @abstractmethod
+    def count_customers(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_customers_by_category(self) -> Dict["CustomerCategory", int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_vehicle(self, vehicle: "Vehicle") -> None:
+        raise NotImplementedError
+
+    def save_vehicles(self, vehicles: List["Vehicle"]) -> None:
+        for vehicle in vehicles:
+            self.save_vehicle(vehicle)
+
+    @abstractmethod
+    def delete_vehicle(self, vehicle_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_vehicle(
+        self, vehicle_id: str, include_removed: bool = False
+    ) -> Optional["Vehicle"]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def vehicle_ids(
+        self,
+        status: Optional["VehicleStatus"] = None,
+        vehicle_type: Optional["VehicleType"] = None,
+    ) -> List[str]:
+        raise NotImplementedError
+
+    def existing_vehicle_ids(self, vehicle_ids: List[str]) -> Set[str]:
+        return {i for i in vehicle_ids if self.load_vehicle(i) is not None}
+
+    @abstractmethod
+    def count_vehicles_by_status(self) -> Dict["VehicleStatus", int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_rental(self, rental: "Rental") -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_rental(self, rental_id: str) -> Optional["Rental"]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def rental_ids(
+        self,
+        customer_id: Optional[str] = None,
+        vehicle_id: Optional[str] = None,
+        status: Optional["RentalStatus"] = None,
+        ending_before: Optional[date] = None,
+        started_by: Optional[date] = None,
+        vehicle_status: Optional["VehicleStatus"] = None,
+    ) -> List[str]:
+        """Identyfikatory wypożyczeń spełniających wszystkie podane
+        warunki: zakończenie przed ending_before, rozpoczęcie najpóźniej
+        started_by, pojazd o statusie vehicle_status."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_vehicle_booked(
+        self,
+        vehicle_id: str,
+        start_date: date,
+        end_date: date,
+        today: Optional[date] = None,
+    ) -> bool:
+        """Czy pojazd jest zajęty w terminie [start_date, end_date].
+        Wypożyczenie niezwrócone po terminie (aktywne lub przeterminowane
+        z datą zakończenia przed today, domyślnie dzisiaj) zajmuje pojazd
+        do zwrotu."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def booked_vehicle_ids(
+        self, start_date: date, end_date: date, today: Optional[date] = None
+    ) -> Set[str]:
+        """ID pojazdów zajętych w terminie, jak w is_vehicle_booked."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def rental_report(
+        self, start_date: date, end_date: date
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_review(self, review: "Review") -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_reviews(
+        self,
+        customer_id: Optional[str] = None,
+        rental_id: Optional[str] = None,
+    ) -> List["Review"]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def average_rating(self, customer_id: str) -> float:
+        raise NotImplementedError
+
+    def transaction(self) -> ContextManager[Any]:
+        """Grupuje zapisy w jedną transakcję (jeśli magazyn to wspiera)."""
+        return nullcontext()
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,90 @@
+import threading
+from datetime import date
+from typing import Any, Callable, List, Optional
+
+from src.rental import Rental, RentalManager
+
+
+class OverdueSweeper:
+    """Okresowe wydawanie pojazdów rozpoczętych rezerwacji i oznaczanie
+    przeterminowanych wypożyczeń (status OVERDUE).
+
+    sweep() wywołuje dla bieżącej daty zwracanej przez clock
+    RentalManager.start_rentals, które wydaje pojazdy rezerwacji
+    rozpoczynających się tego dnia, a potem
+    RentalManager.mark_overdue_rentals. Może być wywoływane z zewnętrznego
+    harmonogramu. start() uruchamia wątek w tle, który robi to samo co
+    interval sekund, a stop() go zatrzymuje. Błąd pojedynczego przebiegu
+    nie kończy wątku - jest liczony w errors i zapamiętywany w last_error,
+    a kolejny przebieg ponawia próbę.
+    """
+
+    def __init__(
+        self,
+        manager: RentalManager,
+        interval: float = 60.0,
+        clock: Callable[[], date] = date.today,
+    ) -> None:
+        if not isinstance(manager, RentalManager):
+            raise ValueError("Menedżer musi być instancją RentalManager")
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError("Odstęp między przebiegami musi być dodatni")
+
+        self.manager = manager
+        self.interval = interval
+        self.clock = clock
+        self.sweeps = 0
+        self.started = 0
+        self.marked = 0
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep(self) -> List[Rental]:
+        with self._lock:
+            today = self.clock()
+            started = self.manager.start_rentals(today)
+            marked = self.manager.mark_overdue_rentals(today)
+            self.sweeps += 1
+            self.started += len(started)
+            self.marked += len(marked)
+        return marked
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.sweep()
+                self.last_error = None
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+            self._stopped.wait(self.interval)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Przeglądanie wypożyczeń już działa")
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="overdue-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Zatrzymuje wątek, czekając na koniec trwającego przebiegu."""
+        thread, self._thread = self._thread, None
+        self._stopped.set()
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self) -> "OverdueSweeper":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
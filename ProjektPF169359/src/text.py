@@ -0,0 +1,32 @@
+import re
+import unicodedata
+from typing import List
+
+# Litera "ł" nie rozkłada się w NFKD na "l" i znak diakrytyczny.
+_POLISH_LETTERS = str.maketrans(
+    "ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ"
+)
+_WORD = re.compile(r"\w+")
+
+
+def fold_text(text: str) -> str:
+    """Sprowadza tekst do małych liter bez polskich znaków diakrytycznych."""
+    folded = text.translate(_POLISH_LETTERS).casefold()
+    if folded.isascii():
+        return folded
+    return "".join(
+        c
+        for c in unicodedata.normalize("NFKD", folded)
+        if not unicodedata.combining(c)
+    )
+
+
+def fold_name(*parts: str) -> str:
+    """Klucz wyszukiwania imion i nazwisk: części złączone spacją,
+    znormalizowane (patrz fold_text) i z pojedynczymi odstępami."""
+    return " ".join(fold_text(" ".join(parts)).split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Dzieli tekst na znormalizowane słowa (patrz fold_text)."""
+    return _WORD.findall(fold_text(text))
@@ -0,0 +1,86 @@
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        # Wartości zapisane pod kluczem kończącym się w tym węźle.
+        self.values: Optional[Dict[Hashable, Any]] = None
+
+
+class PrefixTrie:
+    """Drzewo prefiksowe kluczy tekstowych z wartościami.
+
+    Pod jednym kluczem może być wiele wartości rozróżnianych
+    identyfikatorem (np. klienci o tym samym imieniu i nazwisku). Węzły
+    odpowiadają znakom, więc wyszukanie prefiksu kosztuje O(długość
+    prefiksu), a wyliczenie k pierwszych pasujących wartości - w
+    kolejności kluczy - odwiedza tylko ścieżki do nich. Pamięć zależy od
+    łącznej długości różnych kluczy, a nie od liczby wartości.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str, value_id: Hashable, value: Any) -> None:
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+        if node.values is None:
+            node.values = {}
+        if value_id not in node.values:
+            self._size += 1
+        node.values[value_id] = value
+
+    def remove(self, key: str, value_id: Hashable) -> None:
+        path: List[Tuple[_Node, str]] = []
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                return
+            path.append((node, char))
+            node = child
+        if not node.values or value_id not in node.values:
+            return
+
+        del node.values[value_id]
+        self._size -= 1
+        if not node.values:
+            node.values = None
+        # Usuwanie pustych węzłów od końca klucza.
+        for parent, char in reversed(path):
+            if node.values is not None or node.children:
+                break
+            del parent.children[char]
+            node = parent
+
+    def items(self, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+        """Pary (klucz, wartość) dla kluczy zaczynających się od prefiksu,
+        w kolejności kluczy (wartości jednego klucza w kolejności
+        dodania)."""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+
+        stack = [(prefix, node)]
+        while stack:
+            key, node = stack.pop()
+            if node.values:
+                for value in list(node.values.values()):
+                    yield key, value
+            stack.extend(
+                (key + char, node.children[char])
+                for char in sorted(node.children, reverse=True)
+            )
@@ -0,0 +1,145 @@
+import functools
+import math
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Mapping,
+    Set,
+    Tuple,
+)
+
+from src.text import tokenize
+
+# Trójka występująca w więcej niż tylu terminach nie wybiera kandydatów:
+# jej lista obejmowałaby znaczną część indeksu (np. "ent" w "klient123").
+COMMON_GRAM_TERMS = 1000
+
+
+@functools.lru_cache(maxsize=4096)
+def trigrams(text: str) -> FrozenSet[str]:
+    """Trójki znaków znormalizowanych słów tekstu (patrz tokenize).
+
+    Jak w pg_trgm każde słowo jest uzupełniane dwiema spacjami z przodu
+    i jedną z tyłu, więc początek słowa waży więcej niż jego środek.
+    """
+    grams: Set[str] = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def _jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    common = len(left & right)
+    return common / (len(left) + len(right) - common) if common else 0.0
+
+
+def similarity(left: str, right: str) -> float:
+    """Podobieństwo tekstów od 0 do 1: udział wspólnych trójek znaków."""
+    return _jaccard(trigrams(left), trigrams(right))
+
+
+def rarest_grams(
+    grams: FrozenSet[str],
+    threshold: float,
+    frequency: Callable[[str], int],
+    limit: int = COMMON_GRAM_TERMS,
+) -> List[str]:
+    """Trójki zapytania, z których list wystarczy zebrać kandydatów
+    o podobieństwie co najmniej threshold: n - ceil(threshold * n) + 1
+    najrzadszych z n trójek według frequency (patrz TrigramIndex).
+
+    Trójki częstsze niż limit są pomijane, więc liczba kandydatów nie
+    rośnie z rozmiarem indeksu. Tekst mający z zapytaniem tylko takie
+    trójki nie zostanie znaleziony.
+    """
+    # Tolerancja chroni przed zaokrągleniem w górę np. 0.3 * 10.
+    needed = max(1, math.ceil(threshold * len(grams) - 1e-9))
+    rare = sorted(grams, key=frequency)[:len(grams) - needed + 1]
+    return [gram for gram in rare if frequency(gram) <= limit]
+
+
+class TrigramIndex:
+    """Indeks odwrócony trójek znaków do wyszukiwania z literówkami.
+
+    Pod jednym terminem może być wiele wartości rozróżnianych
+    identyfikatorem. search() nie porównuje zapytania ze wszystkimi
+    terminami: termin o podobieństwie co najmniej threshold musi mieć
+    co najmniej ceil(threshold * n) z n trójek zapytania, więc wystarczy
+    zebrać kandydatów z list n - ceil(threshold * n) + 1 najrzadszych
+    trójek (filtr prefiksowy), pomijając najczęstsze, a podobieństwo
+    policzyć tylko dla nich. Trójki z więcej niż COMMON_GRAM_TERMS
+    terminów nie wybierają kandydatów (patrz rarest_grams).
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[str]] = {}
+        self._grams: Dict[str, FrozenSet[str]] = {}
+        self._values: Dict[str, Dict[Hashable, Any]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, term: str, value_id: Hashable, value: Any) -> None:
+        values = self._values.get(term)
+        if values is None:
+            grams = trigrams(term)
+            if not grams:
+                return
+            values = self._values[term] = {}
+            self._grams[term] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(term)
+        if value_id not in values:
+            self._size += 1
+        values[value_id] = value
+
+    def remove(self, term: str, value_id: Hashable) -> None:
+        values = self._values.get(term)
+        if values is None or value_id not in values:
+            return
+
+        del values[value_id]
+        self._size -= 1
+        if values:
+            return
+        del self._values[term]
+        for gram in self._grams.pop(term):
+            terms = self._postings[gram]
+            terms.discard(term)
+            if not terms:
+                del self._postings[gram]
+
+    def search(
+        self, query: str, threshold: float
+    ) -> List[Tuple[float, str, Mapping[Hashable, Any]]]:
+        """Trójki (podobieństwo, termin, wartości terminu) dla terminów
+        podobnych do zapytania co najmniej w stopniu threshold, od
+        najbardziej podobnych (przy równym podobieństwie według terminu).
+
+        Wartości są widokiem na indeks, więc przy zmianach z innych
+        wątków trzeba je odczytać pod zamkiem chroniącym indeks.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        postings = self._postings
+        candidates: Set[str] = set()
+        for gram in rarest_grams(
+            grams, threshold, lambda gram: len(postings.get(gram, ()))
+        ):
+            candidates.update(postings.get(gram, ()))
+
+        results = []
+        for term in candidates:
+            score = _jaccard(grams, self._grams[term])
+            if score >= threshold:
+                results.append((score, term, self._values[term]))
+        results.sort(key=lambda match: (-match[0], match[1]))
+        return results
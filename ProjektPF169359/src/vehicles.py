@@ -1,7 +1,11 @@
+import threading
 from enum import Enum
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator, Set
 from datetime import date
 
+from src import bulk
+from src.storage import Storage
+
 
 class VehicleStatus(Enum):
     AVAILABLE = "available"
@@ -20,6 +24,20 @@ class VehicleType(Enum):
 
 
 class Vehicle:
+    # Sloty zamiast __dict__ i leniwie tworzona historia konserwacji.
+    __slots__ = (
+        "vehicle_id",
+        "make",
+        "model",
+        "year",
+        "registration_number",
+        "daily_rate",
+        "vehicle_type",
+        "status",
+        "_maintenance_history",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         vehicle_id: str,
@@ -64,7 +82,43 @@ class Vehicle:
         self.daily_rate = daily_rate
         self.vehicle_type = vehicle_type
         self.status = VehicleStatus.AVAILABLE
-        self.maintenance_history: List[Dict] = []
+        self._maintenance_history: Optional[List[Dict]] = None
+
+    @classmethod
+    def _unchecked(
+        cls,
+        vehicle_id: str,
+        make: str,
+        model: str,
+        year: int,
+        registration_number: str,
+        daily_rate: float,
+        vehicle_type: VehicleType,
+        status: VehicleStatus,
+    ) -> "Vehicle":
+        """Tworzy pojazd z danych zwalidowanych już przez import hurtowy,
+        z pominięciem walidacji w __init__."""
+        vehicle = cls.__new__(cls)
+        vehicle.vehicle_id = vehicle_id
+        vehicle.make = make
+        vehicle.model = model
+        vehicle.year = year
+        vehicle.registration_number = registration_number
+        vehicle.daily_rate = daily_rate
+        vehicle.vehicle_type = vehicle_type
+        vehicle.status = status
+        vehicle._maintenance_history = None
+        return vehicle
+
+    @property
+    def maintenance_history(self) -> List[Dict]:
+        if self._maintenance_history is None:
+            self._maintenance_history = []
+        return self._maintenance_history
+
+    @maintenance_history.setter
+    def maintenance_history(self, value: List[Dict]) -> None:
+        self._maintenance_history = value
 
     def __str__(self) -> str:
         return (f"{self.make} {self.model} "
@@ -97,6 +151,8 @@ class Vehicle:
 
 
 class Car(Vehicle):
+    __slots__ = ("doors", "fuel_type", "transmission")
+
     def __init__(
         self,
         vehicle_id: str,
@@ -141,38 +197,229 @@ class Car(Vehicle):
                 f"drzwi, {self.fuel_type}, {self.transmission}")
 
 
+def vehicles_from_chunk(
+    chunk: bulk.Chunk, max_year: int
+) -> List[Optional[Vehicle]]:
+    """Waliduje porcję kolumnami i tworzy pojazdy; dla odrzuconych
+    wierszy zwraca None."""
+    columns = (
+        chunk.strings("vehicle_id"),
+        chunk.strings("make"),
+        chunk.strings("model"),
+        chunk.ints("year"),
+        chunk.strings("registration_number"),
+        chunk.floats("daily_rate"),
+        chunk.enums("vehicle_type", VehicleType),
+        chunk.enums("status", VehicleStatus, VehicleStatus.AVAILABLE),
+    )
+    chunk.check_range(
+        columns[3],
+        1900,
+        max_year,
+        f"Rok produkcji musi być liczbą całkowitą między 1900 a {max_year}",
+    )
+    chunk.check_range(
+        columns[5], 0, None, "Dzienna stawka musi być liczbą dodatnią"
+    )
+    if 0 in columns[5]:
+        for i, rate in enumerate(columns[5]):
+            if rate == 0:
+                chunk.reject(i, "Dzienna stawka musi być liczbą dodatnią")
+
+    # Wiersze z liczbą drzwi opisują samochody osobowe (Car).
+    is_car = chunk.present("doors")
+    if any(is_car):
+        doors = chunk.ints("doors", is_car)
+        chunk.check_range(
+            doors, 1, None, "Liczba drzwi musi być dodatnią liczbą całkowitą"
+        )
+        fuel_types = chunk.strings("fuel_type", is_car)
+        transmissions = chunk.strings("transmission", is_car)
+
+    errors = chunk.errors
+    vehicles: List[Optional[Vehicle]] = []
+    for i, values in enumerate(zip(*columns)):
+        if i in errors:
+            vehicles.append(None)
+        elif is_car[i]:
+            car = Car._unchecked(*values)
+            car.doors = doors[i]
+            car.fuel_type = fuel_types[i]
+            car.transmission = transmissions[i]
+            vehicles.append(car)
+        else:
+            vehicles.append(Vehicle._unchecked(*values))
+    return vehicles
+
+
 class VehicleInventory:
-    def __init__(self) -> None:
+    """Inwentarz pojazdów.
+
+    Zmiany są szeregowane zamkiem inwentarza, a zapytania iterują po
+    migawce słownika pojazdów, więc mogą działać równolegle ze zmianami.
+    """
+
+    def __init__(self, storage: Optional[Storage] = None) -> None:
+        if storage is not None and not isinstance(storage, Storage):
+            raise TypeError("Magazyn musi być instancją klasy Storage")
+
+        # Z magazynem słownik przechowuje tylko wczytane pojazdy.
         self.vehicles: Dict[str, Vehicle] = {}
+        self.storage = storage
+        self.journal = None
+        self._lock = threading.RLock()
+
+    def _record(self, operation: str, *args) -> None:
+        if self.journal is not None:
+            self.journal.record(operation, args)
+
+    def _load(self, vehicle_id: str) -> Optional[Vehicle]:
+        vehicle = self.vehicles.get(vehicle_id)
+        if vehicle is None and self.storage is not None:
+            vehicle = self.storage.load_vehicle(vehicle_id)
+            if vehicle is not None:
+                self.vehicles[vehicle_id] = vehicle
+        return vehicle
 
     def add_vehicle(self, vehicle: Vehicle) -> None:
         if not isinstance(vehicle, Vehicle):
             raise TypeError("Obiekt musi być instancją klasy Vehicle")
 
-        if vehicle.vehicle_id in self.vehicles:
-            raise ValueError(
-                f"Pojazd o ID {vehicle.vehicle_id} już istnieje w inwentarzu"
-            )
-        self.vehicles[vehicle.vehicle_id] = vehicle
+        with self._lock:
+            if self._load(vehicle.vehicle_id) is not None:
+                raise ValueError(
+                    f"Pojazd o ID {vehicle.vehicle_id} już istnieje "
+                    "w inwentarzu"
+                )
+            self.vehicles[vehicle.vehicle_id] = vehicle
+            if self.storage is not None:
+                self.storage.save_vehicle(vehicle)
+            self._record("add_vehicle", vehicle)
+
+    def load_vehicles(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        chunk_size: int = 10_000,
+    ) -> bulk.BulkLoadResult:
+        """Hurtowo wczytuje pojazdy z pliku CSV lub NDJSON.
+
+        Plik jest czytany porcjami po chunk_size rekordów, więc zużycie
+        pamięci przez import nie zależy od rozmiaru pliku. Pola to
+        argumenty konstruktora Vehicle i opcjonalnie status; wiersze z
+        polem doors tworzą obiekty Car. Błędne wiersze są pomijane
+        i zgłaszane w wyniku zamiast przerywać import.
+        """
+        result = bulk.BulkLoadResult()
+        max_year = date.today().year + 1
+        for chunk in bulk.read_chunks(
+            path, file_format, chunk_size, result.errors
+        ):
+            vehicles = vehicles_from_chunk(chunk, max_year)
+            with self._lock:
+                batch = self._insert_new(chunk, vehicles)
+            result.errors.extend(chunk.row_errors())
+            result.loaded += len(batch)
+        result.errors.sort()
+        return result
+
+    def _insert_new(
+        self, chunk: bulk.Chunk, vehicles: List[Optional[Vehicle]]
+    ) -> List[Vehicle]:
+        seen = self._existing_ids(
+            [v.vehicle_id for v in vehicles if v is not None]
+        )
+        batch: List[Vehicle] = []
+        for i, vehicle in enumerate(vehicles):
+            if vehicle is None:
+                continue
+            vehicle_id = vehicle.vehicle_id
+            if vehicle_id in seen:
+                chunk.reject(i, f"Pojazd o ID {vehicle_id} już istnieje")
+                continue
+            seen.add(vehicle_id)
+            batch.append(vehicle)
+
+        if batch:
+            if self.storage is not None:
+                # Pojazdy trafiają tylko do magazynu i są wczytywane
+                # z niego dopiero, gdy okażą się potrzebne.
+                self.storage.save_vehicles(batch)
+            else:
+                self.vehicles.update((v.vehicle_id, v) for v in batch)
+            self._record("add_vehicles", batch)
+        return batch
+
+    def _existing_ids(self, vehicle_ids: List[str]) -> Set[str]:
+        vehicles = self.vehicles
+        existing = {i for i in vehicle_ids if i in vehicles}
+        if self.storage is not None:
+            existing |= self.storage.existing_vehicle_ids(vehicle_ids)
+        return existing
+
+    def update_vehicle(self, vehicle: Vehicle) -> None:
+        if not isinstance(vehicle, Vehicle):
+            raise TypeError("Obiekt musi być instancją klasy Vehicle")
+
+        with self._lock:
+            if self._load(vehicle.vehicle_id) is not vehicle:
+                raise ValueError(
+                    f"Pojazd o ID {vehicle.vehicle_id} nie istnieje "
+                    "w inwentarzu"
+                )
+            if self.storage is not None:
+                self.storage.save_vehicle(vehicle)
+            self._record("update_vehicle", vehicle)
+
+    def change_vehicle_status(
+        self, vehicle_id: str, new_status: VehicleStatus
+    ) -> None:
+        with self._lock:
+            vehicle = self.get_vehicle(vehicle_id)
+            if vehicle is None:
+                raise ValueError(
+                    f"Pojazd o ID {vehicle_id} nie istnieje w inwentarzu"
+                )
+
+            vehicle.change_status(new_status)
+            if self.storage is not None:
+                self.storage.save_vehicle(vehicle)
+            self._record("change_vehicle_status", vehicle_id, new_status)
 
     def remove_vehicle(self, vehicle_id: str) -> None:
         if not vehicle_id or not isinstance(vehicle_id, str):
             raise ValueError("ID pojazdu musi być niepustym stringiem")
 
-        if vehicle_id not in self.vehicles:
-            raise ValueError(
-                f"Pojazd o ID {vehicle_id} nie istnieje w inwentarzu"
-            )
-        del self.vehicles[vehicle_id]
+        with self._lock:
+            if self._load(vehicle_id) is None:
+                raise ValueError(
+                    f"Pojazd o ID {vehicle_id} nie istnieje w inwentarzu"
+                )
+            del self.vehicles[vehicle_id]
+            if self.storage is not None:
+                self.storage.delete_vehicle(vehicle_id)
+            self._record("remove_vehicle", vehicle_id)
 
     def get_vehicle(self, vehicle_id: str) -> Optional[Vehicle]:
         if not vehicle_id or not isinstance(vehicle_id, str):
             raise ValueError("ID pojazdu musi być niepustym stringiem")
 
-        return self.vehicles.get(vehicle_id)
+        return self._load(vehicle_id)
+
+    def iter_vehicles(self) -> Iterator[Vehicle]:
+        if self.storage is None:
+            return iter(list(self.vehicles.values()))
+        return (self._load(i) for i in self.storage.vehicle_ids())
 
     def get_available_vehicles(self) -> List[Vehicle]:
-        return [v for v in self.vehicles.values() if v.is_available()]
+        if self.storage is not None:
+            return [
+                self._load(vehicle_id)
+                for vehicle_id in self.storage.vehicle_ids(
+                    status=VehicleStatus.AVAILABLE
+                )
+            ]
+        return [v for v in list(self.vehicles.values()) if v.is_available()]
 
     def get_available_vehicles_by_type(
         self, vehicle_type: VehicleType
@@ -180,14 +427,23 @@ class VehicleInventory:
         if not isinstance(vehicle_type, VehicleType):
             raise ValueError("Typ pojazdu musi być instancją VehicleType")
 
+        if self.storage is not None:
+            return [
+                self._load(vehicle_id)
+                for vehicle_id in self.storage.vehicle_ids(
+                    status=VehicleStatus.AVAILABLE, vehicle_type=vehicle_type
+                )
+            ]
         return [
             v
-            for v in self.vehicles.values()
+            for v in list(self.vehicles.values())
             if v.is_available() and v.vehicle_type == vehicle_type
         ]
 
     def count_vehicles_by_status(self) -> Dict[VehicleStatus, int]:
+        if self.storage is not None:
+            return self.storage.count_vehicles_by_status()
         counts = {status: 0 for status in VehicleStatus}
-        for vehicle in self.vehicles.values():
+        for vehicle in list(self.vehicles.values()):
             counts[vehicle.status] += 1
         return counts
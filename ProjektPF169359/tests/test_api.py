@@ -0,0 +1,333 @@
+import http.client
+import json
+import threading
+import unittest
+from datetime import date, timedelta
+from src.api import RentalApi, RentalHTTPServer, _encode
+from src.customers import CustomerRegistry
+from src.metrics import Metrics
+from src.rental import RentalManager
+from src.vehicles import VehicleInventory
+
+
+class TestRentalApi(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.api = RentalApi(
+            CustomerRegistry(), VehicleInventory(), RentalManager()
+        )
+        self.customer = {
+            "customer_id": "CUST001",
+            "first_name": "Jan",
+            "last_name": "Kowalski",
+            "email": "jan.kowalski@example.com",
+            "phone": "123456789",
+            "address": "ul. Przykładowa 1, Warszawa",
+            "license_number": "ABC123456",
+            "license_issue_date": str(self.today - timedelta(days=365)),
+            "license_expiry_date": str(self.today + timedelta(days=365)),
+            "license_categories": ["B"],
+        }
+        self.car = {
+            "vehicle_id": "CAR001",
+            "make": "Toyota",
+            "model": "Corolla",
+            "year": 2020,
+            "registration_number": "WA12345",
+            "daily_rate": 150.0,
+            "vehicle_type": "compact",
+            "doors": 5,
+            "fuel_type": "Benzyna",
+            "transmission": "Manualna",
+        }
+
+    def call(self, method, path, body=None, **query):
+        status, data = self.api.handle(method, path, query, body)
+        # Odpowiedź musi dać się zapisać w JSON.
+        return status, json.loads(json.dumps(data, default=_encode))
+
+    def test_register_and_get(self):
+        """Test dodawania i pobierania klientów oraz pojazdów"""
+        status, customer = self.call("POST", "/customers", self.customer)
+        self.assertEqual(status, 201)
+        self.assertEqual(customer["category"], "standard")
+        status, car = self.call("POST", "/vehicles", self.car)
+        self.assertEqual(status, 201)
+        self.assertEqual(car["doors"], 5)
+
+        self.assertEqual(self.call("GET", "/customers/CUST001")[0], 200)
+        status, found = self.call("GET", "/customers", last_name="kowalski")
+        self.assertEqual([c["customer_id"] for c in found], ["CUST001"])
+        status, found = self.call("GET", "/customers", prefix="jan k")
+        self.assertEqual([c["customer_id"] for c in found], ["CUST001"])
+        status, found = self.call("GET", "/customers", fuzzy="Kowalsky")
+        self.assertEqual([c["customer_id"] for c in found], ["CUST001"])
+        status, error = self.call("GET", "/customers", fuzzy="x", limit="y")
+        self.assertEqual(status, 400)
+        status, found = self.call(
+            "GET", "/customers", email="Jan.Kowalski@example.com"
+        )
+        self.assertEqual([c["customer_id"] for c in found], ["CUST001"])
+        status, found = self.call("GET", "/customers", phone="999")
+        self.assertEqual(found, [])
+        duplicate = dict(self.customer, customer_id="CUST002")
+        status, error = self.call("POST", "/customers", duplicate)
+        self.assertEqual(status, 400)
+        self.assertIn("adresem e-mail", error["error"])
+        status, vehicles = self.call("GET", "/vehicles/", status="available")
+        self.assertEqual([v["vehicle_id"] for v in vehicles], ["CAR001"])
+
+    def test_rental_flow(self):
+        """Test wypożyczenia, opłaty, zwrotu, opinii i raportu"""
+        self.call("POST", "/customers", self.customer)
+        self.call("POST", "/vehicles", self.car)
+        end = self.today + timedelta(days=2)
+        status, rental = self.call(
+            "POST",
+            "/rentals",
+            {
+                "customer_id": "CUST001",
+                "vehicle_id": "CAR001",
+                "start_date": str(self.today),
+                "end_date": str(end),
+            },
+        )
+        self.assertEqual(status, 201)
+        path = f"/rentals/{rental['rental_id']}"
+        status, free = self.call(
+            "GET", "/vehicles/available", start=str(end), end=str(end)
+        )
+        self.assertEqual(free, [])
+
+        status, rental = self.call(
+            "POST",
+            path + "/charges",
+            {"description": "Mycie", "amount": 50.0},
+        )
+        self.assertEqual(rental["additional_charges"], {"Mycie": 50.0})
+        status, rental = self.call(
+            "POST", path + "/complete", {"return_date": str(end)}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(rental["status"], "completed")
+        self.assertEqual(rental["total_cost"], 500.0)
+
+        status, review = self.call(
+            "POST", path + "/reviews", {"rating": 5, "comment": "Super auto"}
+        )
+        self.assertEqual(status, 201)
+        status, reviews = self.call("GET", "/reviews", keywords="super")
+        self.assertEqual(len(reviews), 1)
+        status, reviews = self.call("GET", "/customers/CUST001/reviews")
+        self.assertEqual(reviews["average_rating"], 5.0)
+        status, rentals = self.call("GET", "/customers/CUST001/rentals")
+        self.assertEqual(len(rentals), 1)
+
+        status, report = self.call(
+            "GET", "/reports/rentals", start=str(self.today), end=str(end)
+        )
+        self.assertEqual(report["completed_rentals"], 1)
+        self.assertEqual(report["period_start"], str(self.today))
+
+    def test_quotes(self):
+        """Test wyceny dostępnych pojazdów"""
+        self.call("POST", "/vehicles", self.car)
+        end = str(self.today + timedelta(days=2))
+        status, quotes = self.call(
+            "GET", "/quotes", start=str(self.today), end=end, category="gold"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(len(quotes), 1)
+        self.assertEqual(quotes[0]["vehicle_id"], "CAR001")
+        self.assertEqual(quotes[0]["days"], 3)
+        self.assertAlmostEqual(quotes[0]["discount"], 45.0)
+        self.assertAlmostEqual(quotes[0]["total"], 405.0)
+
+        status, quotes = self.call(
+            "GET", "/quotes", start=str(self.today), end=end, late_days="1"
+        )
+        self.assertAlmostEqual(quotes[0]["total"], 675.0)
+        status, error = self.call(
+            "GET", "/quotes", start=str(self.today), end=end, late_days="x"
+        )
+        self.assertEqual(status, 400)
+
+    def test_vehicle_quote(self):
+        """Test wyceny pojazdu dla kategorii klienta"""
+        self.call("POST", "/customers", self.customer)
+        self.call("POST", "/vehicles", self.car)
+        period = {
+            "start": str(self.today),
+            "end": str(self.today + timedelta(days=1)),
+        }
+        status, quote = self.call(
+            "GET", "/vehicles/CAR001/quote", customer_id="CUST001", **period
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(quote["vehicle_id"], "CAR001")
+        self.assertEqual(quote["total"], 300.0)
+        status, quote = self.call(
+            "GET", "/vehicles/CAR001/quote", category="platinum", **period
+        )
+        self.assertAlmostEqual(quote["total"], 255.0)
+        self.assertEqual(
+            self.call(
+                "GET", "/vehicles/CAR001/quote", customer_id="X", **period
+            )[0],
+            404,
+        )
+
+    def test_errors(self):
+        """Test kodów odpowiedzi dla błędnych żądań"""
+        self.call("POST", "/customers", self.customer)
+        self.call("POST", "/vehicles", self.car)
+        self.assertEqual(self.call("GET", "/nieznane")[0], 404)
+        self.assertEqual(self.call("POST", "/reviews")[0], 405)
+        self.assertEqual(self.call("GET", "/vehicles/CAR999")[0], 404)
+        self.assertEqual(self.call("GET", "/rentals/RENT999")[0], 404)
+        self.assertEqual(self.call("POST", "/vehicles", self.car)[0], 400)
+        self.assertEqual(self.call("POST", "/vehicles", [1])[0], 400)
+        status, error = self.call(
+            "POST", "/vehicles", dict(self.car, vehicle_id="CAR002", year=1)
+        )
+        self.assertEqual(status, 400)
+        self.assertIn("Rok produkcji", error["error"])
+        self.assertEqual(
+            self.call("GET", "/vehicles/available", start="wczoraj")[0], 400
+        )
+        self.assertEqual(self.call("GET", "/vehicles", type="rakieta")[0], 400)
+
+        booking = {
+            "customer_id": "CUST001",
+            "vehicle_id": "CAR001",
+            "start_date": str(self.today),
+            "end_date": str(self.today),
+        }
+        self.assertEqual(self.call("POST", "/rentals", booking)[0], 201)
+        # Kolizja terminów to konflikt stanu, a nie błąd żądania.
+        self.assertEqual(self.call("POST", "/rentals", booking)[0], 409)
+
+    def test_unexpected_error(self):
+        """Test odpowiedzi 500 dla nieoczekiwanego błędu obsługi"""
+
+        def broken(*args, **kwargs):
+            raise KeyError("CAR001")
+
+        self.api.inventory.get_vehicle = broken
+        with self.assertLogs("src.api", "ERROR"):
+            status, error = self.call("GET", "/vehicles/CAR001")
+        self.assertEqual(status, 500)
+        self.assertNotIn("CAR001", error["error"])
+
+
+class TestRentalHTTPServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = RentalHTTPServer(
+            ("127.0.0.1", 0),
+            RentalApi(CustomerRegistry(), VehicleInventory(), RentalManager()),
+            workers=2,
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_invalid_workers(self):
+        """Test walidacji liczby wątków roboczych"""
+        with self.assertRaises(ValueError):
+            RentalHTTPServer(("127.0.0.1", 0), self.server.api, workers=0)
+
+    def test_metrics(self):
+        """Test udostępniania pomiarów operacji"""
+        connection = http.client.HTTPConnection(
+            "127.0.0.1", self.server.server_port, timeout=5
+        )
+        try:
+            connection.request("GET", "/metrics")
+            response = connection.getresponse()
+            self.assertEqual(response.status, 404)
+            response.read()
+
+            api = self.server.api
+            api.metrics = Metrics()
+            api.metrics.instrument(api.registry, api.inventory, api.manager)
+            connection.request("GET", "/vehicles")
+            connection.getresponse().read()
+            connection.request("GET", "/metrics")
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            self.assertTrue(
+                response.getheader("Content-Type").startswith("text/plain")
+            )
+            self.assertIn(
+                'rental_calls_total{operation="VehicleInventory.'
+                'iter_vehicles"} 1',
+                response.read().decode(),
+            )
+
+            connection.request("GET", "/metrics?format=json")
+            response = connection.getresponse()
+            snapshot = json.loads(response.read())
+            self.assertEqual(
+                snapshot["VehicleInventory.iter_vehicles"]["calls"], 1
+            )
+        finally:
+            connection.close()
+
+    def test_keep_alive(self):
+        """Test wielu żądań w jednym połączeniu"""
+        connection = http.client.HTTPConnection(
+            "127.0.0.1", self.server.server_port, timeout=5
+        )
+        try:
+            connection.request("GET", "/vehicles")
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            self.assertEqual(json.loads(response.read()), [])
+            sock = connection.sock
+
+            connection.request(
+                "POST",
+                "/customers",
+                body=b"{niepoprawny",
+                headers={"Content-Type": "application/json"},
+            )
+            response = connection.getresponse()
+            self.assertEqual(response.status, 400)
+            self.assertIn("error", json.loads(response.read()))
+            self.assertIs(connection.sock, sock)
+        finally:
+            connection.close()
+
+    def test_unexpected_error_keeps_connection(self):
+        """Test odpowiedzi 500 bez zrywania połączenia keep-alive"""
+
+        def broken(*args, **kwargs):
+            raise AttributeError("błąd")
+
+        self.server.api.inventory.get_vehicle = broken
+        connection = http.client.HTTPConnection(
+            "127.0.0.1", self.server.server_port, timeout=5
+        )
+        try:
+            with self.assertLogs("src.api", "ERROR"):
+                connection.request("GET", "/vehicles/CAR001")
+                response = connection.getresponse()
+            self.assertEqual(response.status, 500)
+            self.assertIn("error", json.loads(response.read()))
+            sock = connection.sock
+
+            connection.request("GET", "/vehicles")
+            self.assertEqual(connection.getresponse().status, 200)
+            self.assertIs(connection.sock, sock)
+        finally:
+            connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
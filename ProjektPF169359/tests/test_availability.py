@@ -0,0 +1,126 @@
+import unittest
+from datetime import date, timedelta
+from src.availability import AvailabilityIndex, BookingCalendar
+
+
+class TestBookingCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.day = date(2030, 1, 1)
+        self.calendar = BookingCalendar()
+        self.calendar.book("R1", self.day, self.day + timedelta(days=3))
+        self.calendar.book(
+            "R2", self.day + timedelta(days=10), self.day + timedelta(days=12)
+        )
+
+    def test_is_free(self):
+        """Test sprawdzania kolizji terminów"""
+        d = self.day
+        self.assertFalse(self.calendar.is_free(d, d))
+        self.assertFalse(
+            self.calendar.is_free(d + timedelta(days=3), d + timedelta(days=5))
+        )
+        self.assertFalse(
+            self.calendar.is_free(d - timedelta(days=5), d + timedelta(20))
+        )
+        self.assertTrue(
+            self.calendar.is_free(d + timedelta(days=4), d + timedelta(days=9))
+        )
+        self.assertTrue(
+            self.calendar.is_free(d - timedelta(days=5), d - timedelta(days=1))
+        )
+        self.assertTrue(
+            self.calendar.is_free(
+                d + timedelta(days=13), d + timedelta(days=30)
+            )
+        )
+
+    def test_get_conflict(self):
+        """Test wskazania kolidującej rezerwacji"""
+        d = self.day
+        self.assertEqual(
+            self.calendar.get_conflict(
+                d + timedelta(days=11), d + timedelta(days=11)
+            ),
+            "R2",
+        )
+        self.assertIsNone(
+            self.calendar.get_conflict(
+                d + timedelta(days=5), d + timedelta(days=6)
+            )
+        )
+
+    def test_book_overlapping(self):
+        """Test odrzucenia nakładającej się rezerwacji"""
+        with self.assertRaises(ValueError):
+            self.calendar.book(
+                "R3", self.day + timedelta(days=2), self.day + timedelta(4)
+            )
+        with self.assertRaises(ValueError):
+            self.calendar.book("R3", self.day + timedelta(days=5), self.day)
+
+    def test_bookings_are_sorted(self):
+        """Test kolejności rezerwacji niezależnie od kolejności dodania"""
+        self.calendar.book(
+            "R0", self.day - timedelta(days=5), self.day - timedelta(days=1)
+        )
+        self.assertEqual(
+            [b[0] for b in self.calendar.bookings()], ["R0", "R1", "R2"]
+        )
+
+    def test_release(self):
+        """Test zwolnienia rezerwacji"""
+        self.calendar.release("R1", self.day)
+        self.assertEqual(len(self.calendar), 1)
+        self.assertTrue(self.calendar.is_free(self.day, self.day))
+        with self.assertRaises(ValueError):
+            self.calendar.release("R1", self.day)
+
+    def test_shorten(self):
+        """Test skrócenia rezerwacji przy wcześniejszym zwrocie"""
+        self.calendar.shorten("R1", self.day, self.day + timedelta(days=1))
+        self.assertTrue(
+            self.calendar.is_free(
+                self.day + timedelta(days=2), self.day + timedelta(days=3)
+            )
+        )
+        # Późniejszy zwrot nie wydłuża rezerwacji
+        self.calendar.shorten("R1", self.day, self.day + timedelta(days=20))
+        self.assertTrue(
+            self.calendar.is_free(
+                self.day + timedelta(days=2), self.day + timedelta(days=3)
+            )
+        )
+
+
+class TestAvailabilityIndex(unittest.TestCase):
+
+    def test_free_vehicle_ids(self):
+        """Test wyszukiwania pojazdów wolnych w danym terminie"""
+        day = date(2030, 1, 1)
+        index = AvailabilityIndex()
+        index.book("VEH001", "R1", day, day + timedelta(days=3))
+        index.book("VEH002", "R2", day + timedelta(days=5), day + timedelta(5))
+
+        self.assertEqual(
+            index.free_vehicle_ids(
+                ["VEH001", "VEH002", "VEH003"], day, day + timedelta(days=1)
+            ),
+            ["VEH002", "VEH003"],
+        )
+        self.assertEqual(
+            index.free_vehicle_ids(
+                ["VEH001", "VEH002", "VEH003"],
+                day + timedelta(days=3),
+                day + timedelta(days=5),
+            ),
+            ["VEH003"],
+        )
+        self.assertTrue(index.is_available("VEH003", day, day))
+
+        index.release("VEH001", "R1", day)
+        self.assertTrue(index.is_available("VEH001", day, day))
+
+
+if __name__ == "__main__":
+    unittest.main()
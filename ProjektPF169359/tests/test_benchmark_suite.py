@@ -0,0 +1,65 @@
+import unittest
+from datetime import date
+from benchmarks.generator import Profile, generate
+from benchmarks.suite import CASES, public_methods, run
+from src.rental import RentalStatus
+
+
+class TestGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile(vehicles=10, customers=50, years=1)
+        self.today = date(2025, 6, 1)
+
+    def test_deterministic(self):
+        """Test powtarzalności danych dla tego samego ziarna"""
+        first = generate(self.profile, seed=7, today=self.today)
+        second = generate(self.profile, seed=7, today=self.today)
+        other = generate(self.profile, seed=8, today=self.today)
+
+        def describe(fleet):
+            return [
+                (r.rental_id, r.customer.customer_id, r.vehicle.vehicle_id,
+                 r.start_date, r.status)
+                for r in fleet.manager.rentals.values()
+            ]
+
+        self.assertEqual(describe(first), describe(second))
+        self.assertNotEqual(describe(first), describe(other))
+
+    def test_generated_state(self):
+        """Test poprawności wygenerowanych klientów i historii"""
+        fleet = generate(self.profile, seed=1, today=self.today)
+        self.assertEqual(len(fleet.registry.customers), 50)
+        self.assertEqual(len(fleet.inventory.vehicles), 10)
+        self.assertTrue(
+            all(c.driving_license.is_valid(self.today)
+                for c in fleet.customers)
+        )
+        statuses = {r.status for r in fleet.manager.rentals.values()}
+        self.assertIn(RentalStatus.COMPLETED, statuses)
+        self.assertIn(RentalStatus.ACTIVE, statuses)
+        self.assertGreater(len(fleet.manager.reviews), 0)
+        history = sum(len(c.rental_history) for c in fleet.customers)
+        self.assertEqual(history, len(fleet.manager.rentals))
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_every_public_method_measured(self):
+        """Test pokrycia pomiarami wszystkich metod publicznych"""
+        self.assertEqual(public_methods() - set(CASES), set())
+        self.assertEqual(set(CASES) - public_methods(), set())
+
+    def test_run(self):
+        """Test przebiegu pomiarów na małym profilu"""
+        result = run(Profile(vehicles=10, customers=50, years=1), 1, 3)
+        self.assertEqual(set(result["results"]), set(CASES))
+        for stats in result["results"].values():
+            self.assertEqual(stats["calls"], 3)
+            self.assertGreaterEqual(stats["median_us"], stats["min_us"])
+        self.assertEqual(result["counts"]["customers"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
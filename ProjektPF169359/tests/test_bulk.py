@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from src.bulk import Chunk, RowError, read_chunks
+from src.vehicles import VehicleType
+
+
+class TestChunk(unittest.TestCase):
+
+    def setUp(self):
+        self.chunk = Chunk(
+            [2, 3, 5],
+            [
+                ["1", "2020-01-01", "1.5", "compact", "x"],
+                ["abc", "2020-13-01", "nan", "", ""],
+                ["3", "", "-2", "truck", "y"],
+            ],
+            {"n": 0, "d": 1, "f": 2, "t": 3, "s": 4},
+        )
+
+    def test_conversions(self):
+        """Test konwersji kolumn i zbierania błędów wierszy"""
+        self.assertEqual(self.chunk.ints("n"), [1, None, 3])
+        self.assertEqual(
+            self.chunk.errors, {1: "Pole n musi być liczbą całkowitą"}
+        )
+        self.assertEqual(self.chunk.floats("f"), [1.5, None, -2.0])
+        self.assertEqual(self.chunk.strings("s"), ["x", None, "y"])
+        self.assertEqual(
+            self.chunk.enums("t", VehicleType),
+            [VehicleType.COMPACT, None, None],
+        )
+        self.assertEqual(
+            self.chunk.row_errors(),
+            [
+                RowError(3, "Pole n musi być liczbą całkowitą"),
+                RowError(5, "Nieznana wartość pola t"),
+            ],
+        )
+
+    def test_mask_and_range(self):
+        """Test walidacji tylko wybranych wierszy i zakresu wartości"""
+        mask = self.chunk.present("s")
+        self.assertEqual(mask, [True, False, True])
+        self.assertEqual(
+            self.chunk.dates("d", mask), [date(2020, 1, 1), None, None]
+        )
+        self.assertEqual(list(self.chunk.errors), [2])
+
+        self.chunk.check_range(self.chunk.floats("f"), 0, None, "Ujemna")
+        self.assertEqual(
+            self.chunk.errors[2], "Pole d musi być datą w formacie RRRR-MM-DD"
+        )
+        self.assertNotIn(0, self.chunk.errors)
+
+    def test_ndjson_rows(self):
+        """Test kolumn z rekordów NDJSON"""
+        chunk = Chunk(
+            [1, 2], [{"n": 1, "l": ["B"]}, {"n": True, "l": "B;C"}]
+        )
+        self.assertEqual(chunk.ints("n"), [1, None])
+        self.assertEqual(chunk.string_lists("l"), [["B"], ["B", "C"]])
+        self.assertEqual(chunk.column("brak"), [None, None])
+
+
+class TestReadChunks(unittest.TestCase):
+
+    def test_read_chunks(self):
+        """Test strumieniowego czytania pliku porcjami"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.csv")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write('a,b\n1,2\n\n3,"x\ny"\n4\n5,6\n')
+
+            errors = []
+            chunks = list(read_chunks(path, chunk_size=2, errors=errors))
+
+            self.assertEqual([c.lines for c in chunks], [[2, 5], [7]])
+            self.assertEqual(chunks[0].column("b"), ["2", "x\ny"])
+            self.assertEqual(
+                errors, [RowError(6, "Niepoprawna liczba kolumn")]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,6 @@
+import os
+import pickle
+import tempfile
 import unittest
 from unittest.mock import Mock
 from datetime import date, timedelta
@@ -315,6 +318,16 @@ class TestCustomer(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.customer.add_rental_to_history(123)
 
+    def test_rental_history_allocated_lazily(self):
+        """Test leniwego tworzenia historii wypożyczeń"""
+        self.assertIsNone(self.customer._rental_history)
+        self.assertEqual(self.customer.rental_history, [])
+        self.customer.rental_history = ["RENT001"]
+        self.customer.add_rental_to_history("RENT002")
+        self.assertEqual(
+            self.customer.rental_history, ["RENT001", "RENT002"]
+        )
+
 
 class TestCustomerRegistry(unittest.TestCase):
     """Testy dla klasy CustomerRegistry"""
@@ -459,6 +472,134 @@ class TestCustomerRegistry(unittest.TestCase):
         )
         self.assertEqual(len(nieistniejacy), 0)
 
+    def test_last_name_index(self):
+        """Test aktualizacji indeksu nazwisk przy zmianach klientów"""
+        self.registry.register_customer(self.customer1)
+        self.registry.register_customer(self.customer2)
+        self.customer2.last_name = "Wiśniewska"
+        self.registry.update_customer(self.customer2)
+        self.assertEqual(
+            self.registry.find_customers_by_last_name("Nowak"), []
+        )
+        self.assertEqual(
+            self.registry.find_customers_by_last_name(" WISNIEWSKA "),
+            [self.customer2],
+        )
+        self.registry.remove_customer("CUST001")
+        self.assertEqual(
+            self.registry.find_customers_by_last_name("Kowalski"), []
+        )
+
+    def test_find_customers_by_name_prefix(self):
+        """Test podpowiedzi klientów dla początku imienia i nazwiska"""
+        self.registry.register_customer(self.customer1)
+        self.registry.register_customer(self.customer2)
+        self.registry.register_customer(self.customer3)
+        find = self.registry.find_customers_by_name_prefix
+
+        self.assertEqual(find("kow"), [self.customer3, self.customer1])
+        self.assertEqual(find("KOW", limit=1), [self.customer3])
+        self.assertEqual(find("kowalski j"), [self.customer1])
+        self.assertEqual(find("Jan Kow"), [self.customer1])
+        self.assertEqual(find("a"), [self.customer3, self.customer2])
+        # Spacja kończy słowo, więc "Anna" nie pasuje do "an ".
+        self.assertEqual(find("an "), [])
+        self.assertEqual(find("xyz"), [])
+
+        self.customer1.first_name = "Łucja"
+        self.registry.update_customer(self.customer1)
+        self.assertEqual(find("luc"), [self.customer1])
+        self.registry.remove_customer("CUST003")
+        self.assertEqual(find("kow"), [self.customer1])
+
+        with self.assertRaises(ValueError):
+            find("")
+        with self.assertRaises(ValueError):
+            find("kow", limit=0)
+
+    def test_find_customers_fuzzy(self):
+        """Test wyszukiwania klientów z literówkami"""
+        self.registry.register_customer(self.customer1)
+        self.registry.register_customer(self.customer2)
+        self.registry.register_customer(self.customer3)
+        find = self.registry.find_customers_fuzzy
+
+        self.assertEqual(find("Nowack"), [self.customer2])
+        self.assertEqual(find("kowalsky"), [self.customer1, self.customer3])
+        self.assertEqual(
+            find("Adam Kowalsky"), [self.customer3, self.customer1]
+        )
+        self.assertEqual(find("Adam Kowalsky", limit=1), [self.customer3])
+        self.assertEqual(find("anna.nowak@exmaple.com"), [self.customer2])
+        self.assertEqual(find("Kowalsky", threshold=0.9), [])
+        self.assertEqual(find("Zieliński"), [])
+
+        self.customer2.last_name = "Wiśniewska"
+        self.registry.update_customer(self.customer2)
+        self.assertEqual(find("Wisniewsk"), [self.customer2])
+        self.registry.remove_customer("CUST001")
+        self.assertEqual(find("kowalsky"), [self.customer3])
+
+        with self.assertRaises(ValueError):
+            find("")
+        with self.assertRaises(ValueError):
+            find("Nowak", limit=0)
+        with self.assertRaises(ValueError):
+            find("Nowak", threshold=0)
+
+    def test_unique_fields(self):
+        """Test unikalności i wyszukiwania po e-mailu, telefonie i prawie
+        jazdy"""
+        self.registry.register_customer(self.customer1)
+        self.registry.register_customer(self.customer2)
+
+        self.assertIs(
+            self.registry.get_customer_by_email(" JAN.Kowalski@example.com"),
+            self.customer1,
+        )
+        self.assertIs(
+            self.registry.get_customer_by_phone("987-654-321"), self.customer2
+        )
+        self.assertIs(
+            self.registry.get_customer_by_license_number("abc 123456"),
+            self.customer1,
+        )
+        self.assertIsNone(self.registry.get_customer_by_email("x@y.pl"))
+        with self.assertRaises(ValueError):
+            self.registry.get_customer_by_phone("")
+
+        self.customer3.email = "Anna.Nowak@example.com"
+        with self.assertRaises(ValueError):
+            self.registry.register_customer(self.customer3)
+        self.customer3.email = "adam.kowalski@example.com"
+        self.customer3.phone = "123 456 789"
+        with self.assertRaises(ValueError):
+            self.registry.register_customer(self.customer3)
+        self.customer3.phone = "456789123"
+        self.customer3.driving_license.license_number = "def789012"
+        with self.assertRaises(ValueError):
+            self.registry.register_customer(self.customer3)
+        self.assertNotIn("CUST003", self.registry.customers)
+
+        # Zmiana adresu na zajęty jest odrzucana, a na wolny - indeksowana.
+        self.customer2.email = self.customer1.email
+        with self.assertRaises(ValueError):
+            self.registry.update_customer(self.customer2)
+        self.customer2.email = "anna@example.com"
+        self.registry.update_customer(self.customer2)
+        self.assertIsNone(
+            self.registry.get_customer_by_email("anna.nowak@example.com")
+        )
+        self.assertIs(
+            self.registry.get_customer_by_email("anna@example.com"),
+            self.customer2,
+        )
+
+        # Usunięcie klienta zwalnia jego dane.
+        self.registry.remove_customer("CUST002")
+        self.assertIsNone(self.registry.get_customer_by_phone("987654321"))
+        self.registry.register_customer(self.customer3)
+
     def test_get_customers_by_category(self):
         """Test pobierania klientów według kategorii"""
         self.registry.register_customer(self.customer1)
@@ -492,6 +633,58 @@ class TestCustomerRegistry(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.registry.get_customers_by_category("gold")
 
+    def test_category_index(self):
+        """Test indeksu i liczników kategorii przy zmianach kategorii"""
+        self.registry.register_customer(self.customer1)
+        self.registry.register_customer(self.customer2)
+        counts = self.registry.count_customers_by_category()
+        self.assertEqual(counts[CustomerCategory.STANDARD], 2)
+        self.assertEqual(counts[CustomerCategory.PLATINUM], 0)
+
+        self.customer1.category = CustomerCategory.PLATINUM
+        self.customer2.upgrade_category(CustomerCategory.PLATINUM)
+        self.customer2.upgrade_category(CustomerCategory.SILVER)
+        self.assertEqual(
+            self.registry.get_customers_by_category(CustomerCategory.PLATINUM),
+            [self.customer1],
+        )
+        counts = self.registry.count_customers_by_category()
+        self.assertEqual(counts[CustomerCategory.STANDARD], 0)
+        self.assertEqual(counts[CustomerCategory.SILVER], 1)
+        self.assertEqual(sum(counts.values()), 2)
+
+        # Usunięty klient nie jest już powiązany z rejestrem.
+        self.registry.remove_customer("CUST001")
+        self.customer1.upgrade_category(CustomerCategory.GOLD)
+        self.assertEqual(
+            self.registry.get_customers_by_category(CustomerCategory.GOLD), []
+        )
+        self.assertEqual(
+            self.registry.count_customers_by_category()[
+                CustomerCategory.PLATINUM
+            ],
+            0,
+        )
+
+    def test_pickled_customer_is_detached(self):
+        """Test serializacji klienta bez powiązania z rejestrem"""
+        self.registry.register_customer(self.customer1)
+        self.customer1.upgrade_category(CustomerCategory.GOLD)
+        copy = pickle.loads(pickle.dumps(self.customer1))
+        self.assertEqual(copy.category, CustomerCategory.GOLD)
+        copy.upgrade_category(CustomerCategory.SILVER)
+        self.assertEqual(
+            self.registry.get_customers_by_category(CustomerCategory.GOLD),
+            [self.customer1],
+        )
+
+        # Stan zapisany przed wprowadzeniem właściwości category.
+        state = copy.__getstate__()
+        state["category"] = state.pop("_category")
+        old = Customer.__new__(Customer)
+        old.__setstate__(state)
+        self.assertEqual(old.category, CustomerCategory.SILVER)
+
     def test_count_customers(self):
         """Test liczenia klientów w rejestrze"""
         self.assertEqual(self.registry.count_customers(), 0)
@@ -509,5 +702,142 @@ class TestCustomerRegistry(unittest.TestCase):
         self.assertEqual(self.registry.count_customers(), 2)
 
 
+class TestCustomerBulkLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry = CustomerRegistry()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        return path
+
+    def test_load_customers_from_csv(self):
+        """Test hurtowego wczytywania klientów z CSV"""
+        path = self.write(
+            "customers.csv",
+            "customer_id,first_name,last_name,email,phone,address,"
+            "license_number,license_issue_date,license_expiry_date,"
+            "license_categories,category,registration_date\n"
+            "C1,Jan,Kowalski,jan@example.com,123,Warszawa,L1,2020-01-01,"
+            "2030-01-01,B;C,,\n"
+            'C2,Anna,Nowak,anna@example.com,456,"Kraków, ul. Długa 1",L2,'
+            "2019-05-01,2029-05-01,B,gold,2024-03-01\n"
+            "C3,Adam,Nowak,adam@example.com,789,Gdańsk,L3,2030-01-01,"
+            "2020-01-01,B,,\n"
+            "C4,Ewa,Nowak,ewa@example.com,789,Gdańsk,L4,2020-01-01,"
+            "2030-01-01,B,diamond,\n"
+            "C5,,Nowak,ewa@example.com,789,Gdańsk,L5,2020-01-01,"
+            "2030-01-01,B,,\n"
+            "C6,Ewa,Nowak,ewa@example.com,789,Gdańsk,L6,01.01.2020,"
+            "2030-01-01,B,,\n",
+        )
+
+        result = self.registry.load_customers(path)
+
+        self.assertEqual(result.loaded, 2)
+        self.assertEqual([e.line for e in result.errors], [4, 5, 6, 7])
+
+        customer = self.registry.get_customer("C1")
+        self.assertEqual(customer.driving_license.categories, ["B", "C"])
+        self.assertEqual(
+            customer.driving_license.expiry_date, date(2030, 1, 1)
+        )
+        self.assertEqual(customer.category, CustomerCategory.STANDARD)
+        self.assertEqual(customer.registration_date, date.today())
+        self.assertEqual(customer.rental_history, [])
+        self.assertTrue(customer.can_rent())
+
+        customer = self.registry.get_customer("C2")
+        self.assertEqual(customer.address, "Kraków, ul. Długa 1")
+        self.assertEqual(customer.category, CustomerCategory.GOLD)
+        self.assertEqual(customer.registration_date, date(2024, 3, 1))
+
+    def test_load_customers_rejects_duplicate_fields(self):
+        """Test odrzucania powtórzonych e-maili, telefonów i praw jazdy"""
+        header = (
+            "customer_id,first_name,last_name,email,phone,address,"
+            "license_number,license_issue_date,license_expiry_date,"
+            "license_categories\n"
+        )
+        row = "{},Jan,Kowalski,{},{},Warszawa,{},2020-01-01,2030-01-01,B\n"
+        path = self.write(
+            "customers.csv",
+            header
+            + row.format("C1", "a@example.com", "1", "L1")
+            + row.format("C2", "A@example.com", "2", "L2")
+            + row.format("C3", "c@example.com", "1", "L3")
+            + row.format("C4", "d@example.com", "4", "l1")
+            + row.format("C5", "e@example.com", "5", "L0")
+            + row.format("C6", "f@example.com", "6", "L6"),
+        )
+        self.registry.register_customer(
+            Customer(
+                "C0",
+                "Jan",
+                "Kowalski",
+                "jan@example.com",
+                "0",
+                "Warszawa",
+                DrivingLicense(
+                    "L0", date(2020, 1, 1), date(2030, 1, 1), ["B"]
+                ),
+            )
+        )
+
+        result = self.registry.load_customers(path)
+
+        self.assertEqual(result.loaded, 2)
+        self.assertEqual([e.line for e in result.errors], [3, 4, 5, 6])
+        self.assertIn("adresem e-mail", result.errors[0].message)
+        self.assertEqual(
+            self.registry.get_customer_by_license_number("L6").customer_id,
+            "C6",
+        )
+
+    def test_load_customers_from_ndjson(self):
+        """Test hurtowego wczytywania klientów z NDJSON"""
+        record = (
+            '{{"customer_id": "{0}", "first_name": "Jan",'
+            ' "last_name": "Kowalski", "email": "jan@example.com",'
+            ' "phone": "123", "address": "Warszawa",'
+            ' "license_number": "L1", "license_issue_date": "2020-01-01",'
+            ' "license_expiry_date": "2030-01-01",'
+            ' "license_categories": {1}}}\n'
+        )
+        path = self.write(
+            "customers.jsonl",
+            record.format("C1", '["B", "C"]')
+            + record.format("C1", '["B"]')
+            + record.format("C2", "[1]"),
+        )
+        self.registry.register_customer(
+            Customer(
+                "C0",
+                "Jan",
+                "Kowalski",
+                "jan0@example.com",
+                "120",
+                "Warszawa",
+                DrivingLicense(
+                    "L0", date(2020, 1, 1), date(2030, 1, 1), ["B"]
+                ),
+            )
+        )
+
+        result = self.registry.load_customers(path)
+
+        self.assertEqual(result.loaded, 1)
+        self.assertEqual([e.line for e in result.errors], [2, 3])
+        self.assertEqual(
+            len(self.registry.find_customers_by_last_name("Kowalski")), 2
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
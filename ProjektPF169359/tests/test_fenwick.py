@@ -0,0 +1,39 @@
+import unittest
+from src.fenwick import DailyFenwickTree
+
+
+class TestDailyFenwickTree(unittest.TestCase):
+
+    def test_prefix_sum(self):
+        """Test sum prefiksowych dla dni w dowolnej kolejności"""
+        tree = DailyFenwickTree()
+        self.assertEqual(tree.prefix_sum(1000), 0)
+
+        tree.add(1000, 5)
+        tree.add(990, 2)
+        tree.add(1200, 1)
+        tree.add(1000, -1)
+
+        self.assertEqual(tree.prefix_sum(989), 0)
+        self.assertEqual(tree.prefix_sum(990), 2)
+        self.assertEqual(tree.prefix_sum(999), 2)
+        self.assertEqual(tree.prefix_sum(1000), 6)
+        self.assertEqual(tree.prefix_sum(1199), 6)
+        self.assertEqual(tree.prefix_sum(5000), 7)
+
+    def test_growth_keeps_values(self):
+        """Test zachowania wartości przy rozszerzaniu zakresu dni"""
+        tree = DailyFenwickTree()
+        expected = {}
+        for i, day in enumerate([500, 700, 100, 5000, 50, 2500]):
+            tree.add(day, i + 1)
+            expected[day] = i + 1
+            for probe in [0, 50, 99, 100, 500, 2500, 4999, 5000, 10000]:
+                self.assertEqual(
+                    tree.prefix_sum(probe),
+                    sum(v for d, v in expected.items() if d <= probe),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
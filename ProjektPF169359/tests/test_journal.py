@@ -0,0 +1,299 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from src.customers import (
+    Customer,
+    CustomerCategory,
+    CustomerRegistry,
+    DrivingLicense,
+)
+from src.journal import Journal, JournalError, MutationLog
+from src.rental import RentalManager, RentalStatus
+from src.sqlite_storage import SQLiteStorage
+from src.vehicles import Vehicle, VehicleInventory, VehicleStatus, VehicleType
+
+
+class TestMutationLog(unittest.TestCase):
+
+    def test_torn_tail_is_truncated(self):
+        """Test obcięcia uszkodzonego końca dziennika"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "journal.log")
+            log = MutationLog(path)
+            log.append("a", (1,))
+            log.append("b", (date(2030, 1, 1),))
+            log.close()
+            size = os.path.getsize(path)
+            with open(path, "ab") as f:
+                f.write(b"\x00\x00\x01\x00garbage")
+
+            records = list(MutationLog.read(path))
+            self.assertEqual(
+                records, [("a", (1,)), ("b", (date(2030, 1, 1),))]
+            )
+            self.assertEqual(os.path.getsize(path), size)
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, "journal")
+        self.journal = None
+        self.open()
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmpdir.cleanup()
+
+    def open(self, snapshot_every=None):
+        if self.journal is not None:
+            self.journal.close()
+        self.registry = CustomerRegistry()
+        self.inventory = VehicleInventory()
+        self.manager = RentalManager()
+        self.journal = Journal(self.directory, snapshot_every=snapshot_every)
+        self.journal.open(self.registry, self.inventory, self.manager)
+
+    def populate(self):
+        for i in range(3):
+            self.registry.register_customer(
+                Customer(
+                    customer_id=f"CUST{i}",
+                    first_name="Jan",
+                    last_name="Kowalski",
+                    email=f"jan.kowalski{i}@example.com",
+                    phone=f"12345678{i}",
+                    address="ul. Przykładowa 1, Warszawa",
+                    driving_license=DrivingLicense(
+                        license_number=f"ABC{i}",
+                        issue_date=self.today - timedelta(days=365),
+                        expiry_date=self.today + timedelta(days=365),
+                        categories=["B"],
+                    ),
+                )
+            )
+            self.inventory.add_vehicle(
+                Vehicle(
+                    vehicle_id=f"VEH{i}",
+                    make="Toyota",
+                    model="Corolla",
+                    year=2020,
+                    registration_number=f"WA{i}",
+                    daily_rate=100.0,
+                    vehicle_type=VehicleType.COMPACT,
+                )
+            )
+
+        customer = self.registry.get_customer("CUST0")
+        customer.upgrade_category(CustomerCategory.GOLD)
+        self.registry.update_customer(customer)
+        self.registry.remove_customer("CUST2")
+        self.inventory.change_vehicle_status(
+            "VEH2", VehicleStatus.MAINTENANCE
+        )
+
+        completed = self.manager.create_rental(
+            customer,
+            self.inventory.get_vehicle("VEH0"),
+            self.today,
+            self.today + timedelta(days=3),
+        )
+        self.manager.add_charge(completed.rental_id, "Ubezpieczenie", 50.0)
+        self.manager.complete_rental(
+            completed.rental_id, self.today + timedelta(days=5)
+        )
+        self.manager.add_review(completed.rental_id, 5, "Super", self.today)
+        cancelled = self.manager.create_rental(
+            self.registry.get_customer("CUST1"),
+            self.inventory.get_vehicle("VEH1"),
+            self.today + timedelta(days=10),
+            self.today + timedelta(days=12),
+        )
+        self.manager.cancel_rental(cancelled.rental_id)
+        self.manager.create_rental(
+            self.registry.get_customer("CUST1"),
+            self.inventory.get_vehicle("VEH1"),
+            self.today,
+            self.today + timedelta(days=2),
+        )
+
+    def state(self):
+        return {
+            "customers": {
+                i: (c.category, c.rental_history)
+                for i, c in self.registry.customers.items()
+            },
+            "categories": self.registry.count_customers_by_category(),
+            "gold": [
+                c.customer_id
+                for c in self.registry.get_customers_by_category(
+                    CustomerCategory.GOLD
+                )
+            ],
+            "vehicles": {
+                i: v.status for i, v in self.inventory.vehicles.items()
+            },
+            "rentals": {
+                i: (
+                    r.customer.customer_id,
+                    r.status,
+                    r.total_cost,
+                    r.additional_charges,
+                )
+                for i, r in self.manager.rentals.items()
+            },
+            "reviews": [(r.rental_id, r.rating) for r in self.manager.reviews],
+            "report": self.manager.generate_rental_report(
+                self.today, self.today + timedelta(days=30)
+            ),
+        }
+
+    def test_recover_from_log(self):
+        """Test odtworzenia stanu z samego dziennika"""
+        self.populate()
+        expected = self.state()
+        self.open()
+        self.assertEqual(self.state(), expected)
+        self.assertEqual(
+            self.manager.get_active_rentals()[0].vehicle,
+            self.inventory.get_vehicle("VEH1"),
+        )
+
+    def test_recover_from_snapshot_and_tail(self):
+        """Test odtworzenia stanu z migawki i końca dziennika"""
+        self.populate()
+        self.journal.snapshot()
+        rental = self.manager.get_active_rentals()[0]
+        self.manager.complete_rental(
+            rental.rental_id, self.today + timedelta(days=2)
+        )
+        expected = self.state()
+
+        segments = [
+            n for n in os.listdir(self.directory) if n.endswith(".log")
+        ]
+        self.assertEqual(len(segments), 1)
+
+        self.open()
+        self.assertEqual(self.state(), expected)
+        self.assertEqual(
+            self.manager.get_rental(rental.rental_id).status,
+            RentalStatus.COMPLETED,
+        )
+        # Odtworzone indeksy pozwalają dalej obsługiwać rezerwacje
+        self.assertFalse(
+            self.manager.is_vehicle_available(
+                self.inventory.get_vehicle("VEH0"), self.today, self.today
+            )
+        )
+
+    def test_recover_overdue_marks(self):
+        """Test odtworzenia oznaczeń przeterminowanych wypożyczeń"""
+        self.populate()
+        rental = self.manager.get_active_rentals()[0]
+        marked = self.manager.mark_overdue_rentals(
+            self.today + timedelta(days=3)
+        )
+        self.assertEqual(marked, [rental])
+        expected = self.state()
+
+        self.open()
+        self.assertEqual(self.state(), expected)
+        self.assertEqual(self.manager.get_active_rentals(), [])
+        self.assertEqual(
+            self.manager.get_rental(rental.rental_id).status,
+            RentalStatus.OVERDUE,
+        )
+
+    def test_recover_started_rentals(self):
+        """Test odtworzenia wydania pojazdu przyszłej rezerwacji"""
+        self.populate()
+        start = self.today + timedelta(days=4)
+        rental = self.manager.create_rental(
+            self.registry.get_customer("CUST0"),
+            self.inventory.get_vehicle("VEH0"),
+            start,
+            start,
+        )
+        self.assertEqual(self.manager.start_rentals(start), [rental])
+        expected = self.state()
+
+        self.open()
+        self.assertEqual(self.state(), expected)
+        self.assertEqual(
+            self.inventory.get_vehicle("VEH0").status, VehicleStatus.RENTED
+        )
+
+    def test_recover_name_index(self):
+        """Test odtworzenia indeksu nazwisk po zmianie nazwiska"""
+        self.populate()
+        customer = self.registry.get_customer("CUST1")
+        customer.last_name = "Żak"
+        self.registry.update_customer(customer)
+        self.open()
+        found = self.registry.find_customers_by_last_name("zak")
+        self.assertEqual([c.customer_id for c in found], ["CUST1"])
+        self.assertEqual(
+            [
+                c.customer_id
+                for c in self.registry.find_customers_by_name_prefix("jan")
+            ],
+            ["CUST0", "CUST1"],
+        )
+
+    def test_automatic_snapshots(self):
+        """Test automatycznych migawek co zadaną liczbę zmian"""
+        self.open(snapshot_every=5)
+        self.populate()
+        self.assertTrue(
+            os.path.exists(os.path.join(self.directory, "snapshot.pickle"))
+        )
+        expected = self.state()
+        self.open(snapshot_every=5)
+        self.assertEqual(self.state(), expected)
+
+    def test_recover_bulk_load(self):
+        """Test odtworzenia stanu po hurtowym imporcie"""
+        path = os.path.join(self.tmpdir.name, "fleet.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(
+                "vehicle_id,make,model,year,registration_number,"
+                "daily_rate,vehicle_type\n"
+                "V1,Fiat,Panda,2019,WA1,90,economy\n"
+                "V2,Fiat,Panda,2019,WA2,90,economy\n"
+            )
+        self.inventory.load_vehicles(path, chunk_size=1)
+        self.open()
+        self.assertEqual(sorted(self.inventory.vehicles), ["V1", "V2"])
+
+    def test_invalid_usage(self):
+        """Test niepoprawnego użycia dziennika"""
+        with self.assertRaises(JournalError):
+            self.journal.open(
+                CustomerRegistry(), VehicleInventory(), RentalManager()
+            )
+        with self.assertRaises(ValueError):
+            Journal("")
+        with self.assertRaises(ValueError):
+            Journal(self.directory, snapshot_every=0)
+
+        journal = Journal(os.path.join(self.tmpdir.name, "inny"))
+        storage = SQLiteStorage()
+        with self.assertRaises(JournalError):
+            journal.open(
+                CustomerRegistry(storage), VehicleInventory(), RentalManager()
+            )
+        storage.close()
+
+        self.populate()
+        with self.assertRaises(JournalError):
+            journal.open(self.registry, self.inventory, self.manager)
+        with self.assertRaises(JournalError):
+            journal.record("add_vehicle", ())
+
+
+if __name__ == "__main__":
+    unittest.main()
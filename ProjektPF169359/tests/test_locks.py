@@ -0,0 +1,78 @@
+import threading
+import unittest
+from src.locks import KeyedLocks
+
+
+class TestKeyedLocks(unittest.TestCase):
+
+    def test_same_key_same_lock(self):
+        """Test zwracania tego samego zamka dla tego samego klucza"""
+        locks = KeyedLocks()
+        self.assertIs(locks("VEH001"), locks("VEH001"))
+        self.assertIsNot(locks("VEH001"), locks("VEH002"))
+        self.assertEqual(len(locks), 2)
+
+    def test_reentrant(self):
+        """Test ponownego wejścia do zamka przez ten sam wątek"""
+        locks = KeyedLocks()
+        with locks("VEH001"):
+            with locks("VEH001"):
+                pass
+
+    def test_different_keys_do_not_block(self):
+        """Test niezależności zamków różnych kluczy"""
+        locks = KeyedLocks()
+        acquired = []
+
+        def worker():
+            with locks("VEH002"):
+                acquired.append(True)
+
+        with locks("VEH001"):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join(timeout=5)
+        self.assertEqual(acquired, [True])
+
+    def test_concurrent_creation(self):
+        """Test tworzenia jednego zamka przy równoczesnych wywołaniach"""
+        locks = KeyedLocks()
+        barrier = threading.Barrier(8)
+        seen = []
+
+        def worker():
+            barrier.wait()
+            seen.append(locks("VEH001"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, seen))), 1)
+
+    def test_many_takes_locks_in_key_order(self):
+        """Test brania wielu zamków bez zakleszczenia przy odwrotnej
+        kolejności kluczy"""
+        locks = KeyedLocks()
+        done = []
+
+        def worker(keys):
+            for _ in range(200):
+                with locks.many(keys):
+                    pass
+            done.append(keys)
+
+        threads = [
+            threading.Thread(target=worker, args=(keys,))
+            for keys in (["VEH001", "VEH002"], ["VEH002", "VEH001"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        self.assertEqual(len(done), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
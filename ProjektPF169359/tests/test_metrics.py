@@ -0,0 +1,173 @@
+import json
+import math
+import random
+import unittest
+from datetime import date, timedelta
+from src.customers import Customer, CustomerRegistry, DrivingLicense
+from src.metrics import LatencyHistogram, Metrics
+from src.rental import RentalException, RentalManager
+from src.vehicles import Vehicle, VehicleInventory, VehicleType
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_empty(self):
+        """Test pustego histogramu"""
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.value_at_percentile(99), 0)
+        self.assertEqual(histogram.mean(), 0.0)
+
+    def test_invalid_values(self):
+        """Test walidacji wartości i percentyla"""
+        histogram = LatencyHistogram()
+        with self.assertRaises(ValueError):
+            histogram.record(-1)
+        with self.assertRaises(ValueError):
+            histogram.record(1.5)
+        with self.assertRaises(ValueError):
+            histogram.value_at_percentile(101)
+
+    def test_small_values_exact(self):
+        """Test dokładnego zapisu małych wartości"""
+        histogram = LatencyHistogram()
+        for value in range(1, 101):
+            histogram.record(value)
+        self.assertEqual(histogram.value_at_percentile(50), 50)
+        self.assertEqual(histogram.value_at_percentile(99), 99)
+        self.assertEqual(histogram.value_at_percentile(100), 100)
+        self.assertEqual(histogram.mean(), 50.5)
+        self.assertEqual(histogram.count_at_or_below(10), 10)
+
+    def test_relative_error(self):
+        """Test błędu względnego percentyli w szerokim zakresie wartości"""
+        rng = random.Random(1)
+        values = sorted(
+            int(10 ** rng.uniform(2, 11)) for _ in range(10_000)
+        )
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percentile in (10, 50, 90, 99, 99.9):
+            exact = values[math.ceil(len(values) * percentile / 100) - 1]
+            approx = histogram.value_at_percentile(percentile)
+            self.assertGreaterEqual(approx, exact)
+            self.assertLessEqual(approx, exact * 1.01)
+        self.assertEqual(histogram.min, values[0])
+        self.assertEqual(histogram.value_at_percentile(100), values[-1])
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.registry = CustomerRegistry()
+        self.inventory = VehicleInventory()
+        self.manager = RentalManager()
+        self.customer = Customer(
+            customer_id="CUST001",
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan.kowalski@example.com",
+            phone="123456789",
+            address="ul. Przykładowa 1, Warszawa",
+            driving_license=DrivingLicense(
+                license_number="ABC123456",
+                issue_date=self.today - timedelta(days=365),
+                expiry_date=self.today + timedelta(days=365),
+                categories=["B"],
+            ),
+        )
+        self.vehicle = Vehicle(
+            vehicle_id="VEH001",
+            make="Toyota",
+            model="Corolla",
+            year=2020,
+            registration_number="WA12345",
+            daily_rate=150.0,
+            vehicle_type=VehicleType.COMPACT,
+        )
+        self.metrics = Metrics()
+        self.metrics.instrument(self.registry, self.inventory, self.manager)
+
+    def test_counts_calls_and_errors(self):
+        """Test liczenia wywołań i błędów"""
+        self.registry.register_customer(self.customer)
+        self.inventory.add_vehicle(self.vehicle)
+        self.manager.create_rental(
+            self.customer, self.vehicle, self.today, self.today
+        )
+        with self.assertRaises(RentalException):
+            self.manager.create_rental(
+                self.customer, self.vehicle, self.today, self.today
+            )
+
+        operations = self.metrics.operations()
+        create = operations["RentalManager.create_rental"]
+        self.assertEqual(create.calls, 2)
+        self.assertEqual(create.errors, 1)
+        self.assertEqual(create.latency.count, 2)
+        self.assertEqual(
+            operations["CustomerRegistry.register_customer"].calls, 1
+        )
+        self.assertEqual(operations["VehicleInventory.add_vehicle"].calls, 1)
+
+    def test_uninstrument(self):
+        """Test przywrócenia oryginalnych metod"""
+        self.metrics.instrument(self.manager)
+        self.metrics.uninstrument(self.manager)
+        self.assertEqual(vars(self.manager).get("create_rental"), None)
+        self.manager.get_active_rentals()
+        self.assertNotIn(
+            "RentalManager.get_active_rentals", self.metrics.operations()
+        )
+
+        self.metrics.uninstrument()
+        self.registry.count_customers()
+        self.assertEqual(self.metrics.operations(), {})
+
+    def test_snapshot(self):
+        """Test migawki w formacie JSON"""
+        for _ in range(3):
+            self.manager.get_active_rentals()
+        snapshot = json.loads(self.metrics.to_json())
+        stats = snapshot["RentalManager.get_active_rentals"]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["errors"], 0)
+        self.assertLessEqual(stats["p50_us"], stats["p99_us"])
+        self.assertLessEqual(stats["p99_us"], stats["max_us"])
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_prometheus(self):
+        """Test eksportu w formacie Prometheusa"""
+        self.manager.get_active_rentals()
+        with self.assertRaises(ValueError):
+            self.manager.get_customer_rentals("")
+        text = self.metrics.to_prometheus()
+        lines = text.splitlines()
+
+        self.assertIn("# TYPE rental_calls_total counter", lines)
+        self.assertIn("# TYPE rental_latency_seconds histogram", lines)
+        self.assertIn(
+            'rental_errors_total{operation="RentalManager.'
+            'get_customer_rentals"} 1',
+            lines,
+        )
+        label = 'operation="RentalManager.get_active_rentals"'
+        self.assertIn(
+            f'rental_latency_seconds_bucket{{{label},le="+Inf"}} 1', lines
+        )
+        self.assertIn(f"rental_latency_seconds_count{{{label}}} 1", lines)
+        buckets = [
+            int(line.rsplit(" ", 1)[1])
+            for line in lines
+            if line.startswith(f"rental_latency_seconds_bucket{{{label}")
+        ]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertTrue(text.endswith("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
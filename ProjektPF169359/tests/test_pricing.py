@@ -0,0 +1,235 @@
+import unittest
+from datetime import date, timedelta
+from src.customers import Customer, CustomerCategory, DrivingLicense
+from src.pricing import CATEGORY_DISCOUNTS, PricingEngine, QuoteCache
+from src.vehicles import Vehicle, VehicleType
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - zależy od środowiska
+    np = None
+
+
+class TestPricingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.engine = PricingEngine()
+
+    def test_invalid_configuration(self):
+        """Test walidacji rabatów i mnożnika opłaty"""
+        with self.assertRaises(ValueError):
+            PricingEngine({"gold": 0.9})
+        with self.assertRaises(ValueError):
+            PricingEngine({CustomerCategory.GOLD: 1.2})
+        with self.assertRaises(ValueError):
+            PricingEngine(late_fee_factor=-1)
+
+    def test_scalar_prices(self):
+        """Test stawek dla pojedynczego wypożyczenia"""
+        self.assertEqual(
+            self.engine.discounted_rate(100.0, CustomerCategory.STANDARD),
+            100.0,
+        )
+        self.assertEqual(
+            self.engine.discounted_rate(100.0, CustomerCategory.GOLD), 90.0
+        )
+        self.assertEqual(self.engine.late_fee(100.0, 2), 300.0)
+        engine = PricingEngine({}, late_fee_factor=2)
+        self.assertEqual(
+            engine.discounted_rate(100.0, CustomerCategory.PLATINUM), 100.0
+        )
+        self.assertEqual(engine.late_fee(100.0, 2), 400.0)
+
+    def test_quote_one(self):
+        """Test wyceny pojedynczego wypożyczenia"""
+        quote = self.engine.quote_one(
+            100.0,
+            CustomerCategory.GOLD,
+            self.today,
+            self.today + timedelta(days=2),
+            late_days=1,
+        )
+        self.assertEqual(quote.days, 3)
+        self.assertEqual(quote.base_cost, 300.0)
+        self.assertAlmostEqual(quote.discount, 30.0)
+        self.assertAlmostEqual(quote.late_fee, 135.0)
+        self.assertAlmostEqual(quote.total, 405.0)
+        with self.assertRaises(ValueError):
+            self.engine.quote_one(100.0, "gold", self.today, self.today)
+        with self.assertRaises(ValueError):
+            self.engine.quote_one(
+                100.0,
+                CustomerCategory.GOLD,
+                self.today + timedelta(days=1),
+                self.today,
+            )
+
+    def test_quote_cache(self):
+        """Test trafień i unieważniania pamięci podręcznej wycen"""
+        vehicle = Vehicle(
+            "VEH1",
+            "Toyota",
+            "Corolla",
+            2020,
+            "WA1",
+            100.0,
+            VehicleType.COMPACT,
+        )
+        customer = Customer(
+            "CUST1",
+            "Jan",
+            "Kowalski",
+            "jan@example.com",
+            "123456789",
+            "ul. Polna 1",
+            DrivingLicense(
+                "ABC1",
+                self.today - timedelta(days=365),
+                self.today + timedelta(days=365),
+                ["B"],
+            ),
+        )
+        end = self.today + timedelta(days=1)
+        cache = self.engine.cache
+
+        def quote():
+            return self.engine.quote_vehicle(
+                vehicle, customer.category, self.today, end
+            )
+
+        self.assertEqual(quote().total, 200.0)
+        self.assertIs(quote(), quote())
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        vehicle.daily_rate = 150.0
+        self.assertEqual(quote().total, 300.0)
+        self.assertEqual(cache.invalidations, 1)
+        self.assertEqual(len(cache), 1)
+
+        customer.upgrade_category(CustomerCategory.GOLD)
+        self.assertEqual(quote().total, 270.0)
+        self.assertEqual(
+            cache.stats(),
+            {
+                "hits": 2,
+                "misses": 3,
+                "invalidations": 1,
+                "size": 2,
+                "maxsize": 4096,
+            },
+        )
+
+        engine = PricingEngine(cache_size=0)
+        self.assertIsNone(engine.cache)
+        self.assertEqual(
+            engine.quote_vehicle(
+                vehicle, CustomerCategory.GOLD, self.today, end
+            ).total,
+            270.0,
+        )
+
+    def test_quote_cache_eviction(self):
+        """Test usuwania najdawniej używanych wycen"""
+        cache = QuoteCache(maxsize=2)
+        quote = self.engine.quote_one(
+            100.0, CustomerCategory.STANDARD, self.today, self.today
+        )
+        cache.put("a", 100.0, quote)
+        cache.put("b", 100.0, quote)
+        self.assertIs(cache.get("a", 100.0), quote)
+        cache.put("c", 100.0, quote)
+        self.assertIsNone(cache.get("b", 100.0))
+        self.assertIs(cache.get("a", 100.0), quote)
+        self.assertIs(cache.get("c", 100.0), quote)
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(ValueError):
+            QuoteCache(maxsize=0)
+
+    @unittest.skipIf(np is None, "brak biblioteki numpy")
+    def test_quote_matches_scalar_prices(self):
+        """Test zgodności wyceny wsadowej z pojedynczymi stawkami"""
+        categories = list(CustomerCategory)
+        rates = [80.0, 120.0, 150.0, 400.0]
+        starts = [self.today + timedelta(days=i) for i in range(4)]
+        ends = [start + timedelta(days=i) for i, start in enumerate(starts)]
+        quote = self.engine.quote(
+            rates, categories, starts, ends, [0, 1, 2, 3]
+        )
+
+        for i, category in enumerate(categories):
+            days = i + 1
+            rate = rates[i] * CATEGORY_DISCOUNTS.get(category, 1)
+            self.assertEqual(quote.days[i], days)
+            self.assertAlmostEqual(quote.daily_rate[i], rate)
+            self.assertAlmostEqual(quote.base_cost[i], days * rates[i])
+            self.assertAlmostEqual(quote.discount[i], days * (rates[i] - rate))
+            self.assertAlmostEqual(
+                quote.late_fee[i], self.engine.late_fee(rate, i)
+            )
+            self.assertAlmostEqual(
+                quote.total[i], days * rate + self.engine.late_fee(rate, i)
+            )
+
+    @unittest.skipIf(np is None, "brak biblioteki numpy")
+    def test_quote_broadcasts_scalars(self):
+        """Test rozszerzania argumentów skalarnych"""
+        quote = self.engine.quote(
+            [100.0, 200.0],
+            CustomerCategory.SILVER,
+            self.today,
+            self.today + timedelta(days=2),
+        )
+        self.assertEqual(quote.days.tolist(), [3, 3])
+        self.assertEqual(quote.total.tolist(), [285.0, 570.0])
+        self.assertEqual(quote.late_fee.tolist(), [0.0, 0.0])
+
+        vehicles = [
+            Vehicle(
+                f"VEH{i}",
+                "Toyota",
+                "Corolla",
+                2020,
+                f"WA{i}",
+                100.0 * (i + 1),
+                VehicleType.COMPACT,
+            )
+            for i in range(3)
+        ]
+        quote = self.engine.quote_vehicles(
+            vehicles, CustomerCategory.GOLD, self.today, self.today, 1
+        )
+        self.assertEqual(quote.total.tolist(), [225.0, 450.0, 675.0])
+        empty = self.engine.quote_vehicles(
+            [], CustomerCategory.GOLD, self.today, self.today
+        )
+        self.assertEqual(len(empty.total), 0)
+
+    @unittest.skipIf(np is None, "brak biblioteki numpy")
+    def test_quote_invalid_arguments(self):
+        """Test walidacji argumentów wyceny wsadowej"""
+        end = self.today + timedelta(days=1)
+        with self.assertRaises(ValueError):
+            self.engine.quote(
+                [100.0, -1.0], CustomerCategory.GOLD, self.today, end
+            )
+        with self.assertRaises(ValueError):
+            self.engine.quote(100.0, ["gold"], self.today, end)
+        with self.assertRaises(ValueError):
+            self.engine.quote(100.0, CustomerCategory.GOLD, end, self.today)
+        with self.assertRaises(ValueError):
+            self.engine.quote(100.0, CustomerCategory.GOLD, ["jutro"], end)
+        with self.assertRaises(ValueError):
+            self.engine.quote(
+                [100.0, 200.0], CustomerCategory.GOLD, [self.today] * 3, end
+            )
+        with self.assertRaises(ValueError):
+            self.engine.quote(
+                100.0, CustomerCategory.GOLD, self.today, end, late_days=-1
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
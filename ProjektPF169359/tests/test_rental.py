@@ -1,9 +1,18 @@
+import random
+import sys
+import threading
 import unittest
 from unittest.mock import Mock, patch
 from datetime import date, timedelta
+from src.pricing import PricingEngine
 from src.rental import Rental, RentalManager, RentalStatus, RentalException
 from src.customers import Customer, CustomerCategory, DrivingLicense
-from src.vehicles import Vehicle, VehicleStatus, VehicleType
+from src.vehicles import (
+    Vehicle,
+    VehicleInventory,
+    VehicleStatus,
+    VehicleType,
+)
 
 
 class TestRental(unittest.TestCase):
@@ -155,6 +164,27 @@ class TestRental(unittest.TestCase):
             self.rental.is_overdue(self.today + timedelta(days=4))
         )
 
+    def test_mark_overdue(self):
+        """Test oznaczania, zakończenia i anulowania przeterminowanego
+        wypożyczenia"""
+        with self.assertRaises(RentalException):
+            self.rental.mark_overdue(self.today + timedelta(days=3))
+        self.rental.mark_overdue(self.today + timedelta(days=4))
+        self.assertEqual(self.rental.status, RentalStatus.OVERDUE)
+        self.assertTrue(
+            self.rental.is_overdue(self.today + timedelta(days=4))
+        )
+        with self.assertRaises(RentalException):
+            self.rental.mark_overdue(self.today + timedelta(days=5))
+
+        cost = self.rental.complete(self.today + timedelta(days=5))
+        self.assertEqual(self.rental.status, RentalStatus.COMPLETED)
+        self.assertEqual(cost, 1050.0)
+
+        self.rental.status = RentalStatus.OVERDUE
+        self.rental.cancel()
+        self.assertEqual(self.rental.status, RentalStatus.CANCELLED)
+
     def test_add_charge(self):
         self.assertEqual(len(self.rental.additional_charges), 0)
         self.rental.add_charge("Ubezpieczenie", 50.0)
@@ -217,6 +247,20 @@ class TestRental(unittest.TestCase):
         with self.assertRaises(RentalException):
             self.rental.cancel()
 
+    def test_compact_representation(self):
+        """Test zwartej reprezentacji wypożyczenia"""
+        self.assertFalse(hasattr(self.rental, "__dict__"))
+        self.assertIsNone(self.rental._additional_charges)
+        self.assertIsNone(self.rental._reviews)
+        with self.assertRaises(AttributeError):
+            self.rental.notes = "brak"
+
+        self.assertEqual(self.rental.reviews, [])
+        self.rental.add_charge("Ubezpieczenie", 50.0)
+        self.assertEqual(
+            self.rental._additional_charges, {"Ubezpieczenie": 50.0}
+        )
+
     def test_cancel_already_cancelled_rental(self):
         self.rental.status = RentalStatus.CANCELLED
         with self.assertRaises(RentalException):
@@ -298,8 +342,8 @@ class TestRentalManager(unittest.TestCase):
         )
         self.assertEqual(rental.daily_rate, 142.5)
 
-        # Resetowanie statusu pojazdu
-        self.vehicle.change_status(VehicleStatus.AVAILABLE)
+        # Zwolnienie terminu przed kolejną rezerwacją
+        self.manager.cancel_rental(rental.rental_id)
         self.customer.category = CustomerCategory.GOLD
         rental = self.manager.create_rental(
             customer=self.customer,
@@ -309,8 +353,8 @@ class TestRentalManager(unittest.TestCase):
         )
         self.assertEqual(rental.daily_rate, 135.0)
 
-        # Resetowanie statusu pojazdu
-        self.vehicle.change_status(VehicleStatus.AVAILABLE)
+        # Zwolnienie terminu przed kolejną rezerwacją
+        self.manager.cancel_rental(rental.rental_id)
         self.customer.category = CustomerCategory.PLATINUM
         rental = self.manager.create_rental(
             customer=self.customer,
@@ -320,6 +364,32 @@ class TestRentalManager(unittest.TestCase):
         )
         self.assertEqual(rental.daily_rate, 127.5)
 
+    def test_custom_pricing(self):
+        """Test rabatów i opłaty za opóźnienie z własnego cennika"""
+        with self.assertRaises(TypeError):
+            RentalManager(pricing={CustomerCategory.GOLD: 0.5})
+
+        manager = RentalManager(
+            pricing=PricingEngine(
+                {CustomerCategory.GOLD: 0.5}, late_fee_factor=2
+            )
+        )
+        self.customer.category = CustomerCategory.GOLD
+        rental = manager.create_rental(
+            self.customer,
+            self.vehicle,
+            self.today,
+            self.today + timedelta(days=1),
+        )
+        self.assertEqual(rental.daily_rate, 75.0)
+        # 2 dni * 75 + 1 dzień opóźnienia * 75 * 2
+        self.assertEqual(
+            manager.complete_rental(
+                rental.rental_id, self.today + timedelta(days=2)
+            ),
+            300.0,
+        )
+
     def test_create_rental_invalid_customer(self):
         with self.assertRaises(ValueError):
             self.manager.create_rental(
@@ -471,6 +541,113 @@ class TestRentalManager(unittest.TestCase):
         self.assertEqual(len(overdue_rentals), 1)
         self.assertIn(rental, overdue_rentals)
 
+    def test_overdue_rentals_follow_status_changes(self):
+        """Test wyszukiwania przeterminowanych po zwrotach i anulowaniach"""
+        vehicles = [
+            Vehicle(
+                vehicle_id=f"VEH{i:03d}",
+                make="Toyota",
+                model="Corolla",
+                year=2020,
+                registration_number=f"WA{i:05d}",
+                daily_rate=100.0,
+                vehicle_type=VehicleType.COMPACT,
+            )
+            for i in range(5)
+        ]
+        # Daty zakończenia celowo nie rosną razem z kolejnością rezerwacji.
+        rentals = [
+            self.manager.create_rental(
+                self.customer,
+                vehicle,
+                self.today,
+                self.today + timedelta(days=days),
+            )
+            for vehicle, days in zip(vehicles, (4, 1, 3, 0, 2))
+        ]
+        self.manager.complete_rental(rentals[2].rental_id, self.today)
+        self.manager.cancel_rental(rentals[3].rental_id)
+
+        self.assertEqual(
+            self.manager.get_overdue_rentals(self.today + timedelta(days=3)),
+            [rentals[1], rentals[4]],
+        )
+        # Wyszukiwanie nie zmienia zawartości kopca.
+        self.assertEqual(
+            self.manager.get_overdue_rentals(self.today + timedelta(days=5)),
+            [rentals[1], rentals[4], rentals[0]],
+        )
+        self.assertEqual(self.manager.get_overdue_rentals(self.today), [])
+        with self.assertRaises(ValueError):
+            self.manager.get_overdue_rentals("jutro")
+
+        # Wiele anulowań nie zostawia w kopcu nieograniczenie wielu
+        # nieaktualnych wpisów.
+        for day in range(10, 200):
+            rental = self.manager.create_rental(
+                self.customer,
+                vehicles[2],
+                self.today + timedelta(days=day),
+                self.today + timedelta(days=day),
+            )
+            self.manager.cancel_rental(rental.rental_id)
+        self.assertEqual(len(self.manager._due_dates), 3)
+        self.assertLess(len(self.manager._due_dates._heap), 64)
+        self.assertEqual(
+            self.manager.get_overdue_rentals(self.today + timedelta(days=5)),
+            [rentals[1], rentals[4], rentals[0]],
+        )
+
+    def test_mark_overdue_rentals(self):
+        """Test oznaczania przeterminowanych wypożyczeń w menedżerze"""
+        vehicle2 = Vehicle(
+            vehicle_id="VEH002",
+            make="Skoda",
+            model="Fabia",
+            year=2021,
+            registration_number="WA54321",
+            daily_rate=100.0,
+            vehicle_type=VehicleType.ECONOMY,
+        )
+        late = self.manager.create_rental(
+            self.customer,
+            self.vehicle,
+            self.today,
+            self.today + timedelta(days=1),
+        )
+        on_time = self.manager.create_rental(
+            self.customer,
+            vehicle2,
+            self.today,
+            self.today + timedelta(days=5),
+        )
+        checked = self.today + timedelta(days=3)
+
+        self.assertEqual(self.manager.mark_overdue_rentals(checked), [late])
+        self.assertEqual(late.status, RentalStatus.OVERDUE)
+        self.assertEqual(self.vehicle.status, VehicleStatus.RENTED)
+        self.assertEqual(self.manager.mark_overdue_rentals(checked), [])
+        self.assertEqual(self.manager.get_active_rentals(), [on_time])
+        self.assertEqual(self.manager.get_overdue_rentals(checked), [late])
+        self.assertEqual(
+            self.manager.get_overdue_rentals(self.today + timedelta(days=9)),
+            [late, on_time],
+        )
+        report = self.manager.generate_rental_report(self.today, checked)
+        self.assertEqual(report["active_rentals"], 1)
+        self.assertEqual(report["overdue_rentals"], 1)
+        with self.assertRaises(ValueError):
+            self.manager.mark_overdue_rentals("jutro")
+
+        # Przeterminowane wypożyczenie można nadal zakończyć.
+        self.manager.complete_rental(late.rental_id, checked)
+        self.assertEqual(late.status, RentalStatus.COMPLETED)
+        self.assertEqual(self.vehicle.status, VehicleStatus.AVAILABLE)
+        self.assertEqual(self.manager.get_overdue_rentals(checked), [])
+        report = self.manager.generate_rental_report(self.today, checked)
+        self.assertEqual(report["completed_rentals"], 1)
+        self.assertEqual(report["overdue_rentals"], 1)
+
     def test_get_customer_rentals(self):
         license2 = DrivingLicense(
             license_number="XYZ789012",
@@ -919,5 +1096,535 @@ class TestRentalManager(unittest.TestCase):
         finally:
             self.customer.driving_license.expiry_date = original_expiry
 
+    def test_rental_indexes_follow_status_changes(self):
+        """Test aktualizacji indeksów przy zmianach statusu"""
+        vehicle2 = Vehicle(
+            vehicle_id="VEH002",
+            make="Ford",
+            model="Focus",
+            year=2021,
+            registration_number="WA54321",
+            daily_rate=170.0,
+            vehicle_type=VehicleType.STANDARD,
+        )
+        rental1 = self.manager.create_rental(
+            customer=self.customer,
+            vehicle=self.vehicle,
+            start_date=self.today,
+            end_date=self.today + timedelta(days=3),
+        )
+        rental2 = self.manager.create_rental(
+            customer=self.customer,
+            vehicle=vehicle2,
+            start_date=self.today,
+            end_date=self.today + timedelta(days=3),
+        )
+        self.manager.complete_rental(
+            rental1.rental_id, self.today + timedelta(days=3)
+        )
+        self.manager.cancel_rental(rental2.rental_id)
+
+        self.assertEqual(self.manager.get_active_rentals(), [])
+        self.assertEqual(
+            self.manager.get_overdue_rentals(self.today + timedelta(days=10)),
+            [],
+        )
+        self.assertEqual(
+            self.manager.get_customer_rentals("CUST001"), [rental1, rental2]
+        )
+        self.assertEqual(
+            self.manager.get_vehicle_rental_history("VEH002"), [rental2]
+        )
+
+        # Zwrócona lista jest kopią - modyfikacja nie psuje indeksu
+        self.manager.get_customer_rentals("CUST001").clear()
+        self.assertEqual(len(self.manager.get_customer_rentals("CUST001")), 2)
+
+    def test_create_future_rental_while_vehicle_rented(self):
+        """Test rezerwacji na przyszły termin wypożyczonego pojazdu"""
+        current = self.manager.create_rental(
+            customer=self.customer,
+            vehicle=self.vehicle,
+            start_date=self.today,
+            end_date=self.today + timedelta(days=3),
+        )
+        future = self.manager.create_rental(
+            customer=self.customer,
+            vehicle=self.vehicle,
+            start_date=self.today + timedelta(days=30),
+            end_date=self.today + timedelta(days=33),
+        )
+        self.assertEqual(future.status, RentalStatus.ACTIVE)
+        self.assertEqual(self.vehicle.status, VehicleStatus.RENTED)
+
+        with self.assertRaises(RentalException):
+            self.manager.create_rental(
+                customer=self.customer,
+                vehicle=self.vehicle,
+                start_date=self.today + timedelta(days=32),
+                end_date=self.today + timedelta(days=40),
+            )
+
+        # Anulowanie przyszłej rezerwacji nie zwalnia bieżącego wypożyczenia
+        self.manager.cancel_rental(future.rental_id)
+        self.assertEqual(self.vehicle.status, VehicleStatus.RENTED)
+        self.assertTrue(
+            self.manager.is_vehicle_available(
+                self.vehicle,
+                self.today + timedelta(days=32),
+                self.today + timedelta(days=40),
+            )
+        )
+
+        # Wcześniejszy zwrot zwalnia pozostałe dni
+        self.manager.complete_rental(
+            current.rental_id, self.today + timedelta(days=1)
+        )
+        self.assertTrue(
+            self.manager.is_vehicle_available(
+                self.vehicle,
+                self.today + timedelta(days=2),
+                self.today + timedelta(days=3),
+            )
+        )
+
+    def test_create_rental_out_of_service_vehicle(self):
+        """Test rezerwacji pojazdu wycofanego z eksploatacji"""
+        self.vehicle.change_status(VehicleStatus.OUT_OF_SERVICE)
+        with self.assertRaises(RentalException):
+            self.manager.create_rental(
+                customer=self.customer,
+                vehicle=self.vehicle,
+                start_date=self.today + timedelta(days=10),
+                end_date=self.today + timedelta(days=12),
+            )
+
+    def test_find_available_vehicles(self):
+        """Test wyszukiwania pojazdów wolnych w zadanym terminie"""
+        inventory = VehicleInventory()
+        inventory.add_vehicle(self.vehicle)
+        vehicle2 = Vehicle(
+            vehicle_id="VEH002",
+            make="Ford",
+            model="Focus",
+            year=2021,
+            registration_number="WA54321",
+            daily_rate=170.0,
+            vehicle_type=VehicleType.STANDARD,
+        )
+        inventory.add_vehicle(vehicle2)
+        self.manager.create_rental(
+            customer=self.customer,
+            vehicle=self.vehicle,
+            start_date=self.today + timedelta(days=5),
+            end_date=self.today + timedelta(days=8),
+        )
+
+        free = self.manager.find_available_vehicles(
+            inventory,
+            self.today + timedelta(days=7),
+            self.today + timedelta(days=9),
+        )
+        self.assertEqual(free, [vehicle2])
+        free = self.manager.find_available_vehicles(
+            inventory, self.today, self.today + timedelta(days=4)
+        )
+        self.assertEqual(free, [self.vehicle, vehicle2])
+
+        with self.assertRaises(ValueError):
+            self.manager.find_available_vehicles(
+                "nie_inwentarz", self.today, self.today
+            )
+        with self.assertRaises(ValueError):
+            self.manager.find_available_vehicles(
+                inventory, self.today + timedelta(days=1), self.today
+            )
+
+    def test_generate_rental_report_matches_full_scan(self):
+        """Test zgodności raportu z agregatów z pełnym przeglądem"""
+        rng = random.Random(7)
+        vehicles = [
+            Vehicle(
+                vehicle_id=f"VEH{i:03d}",
+                make="Toyota",
+                model="Corolla",
+                year=2020,
+                registration_number=f"WA{i:05d}",
+                daily_rate=100.0 + i,
+                vehicle_type=VehicleType.COMPACT,
+            )
+            for i in range(40)
+        ]
+        for vehicle in vehicles:
+            start = self.today + timedelta(days=rng.randint(0, 60))
+            rental = self.manager.create_rental(
+                customer=self.customer,
+                vehicle=vehicle,
+                start_date=start,
+                end_date=start + timedelta(days=rng.randint(0, 10)),
+            )
+            action = rng.random()
+            if action < 0.4:
+                self.manager.complete_rental(
+                    rental.rental_id,
+                    start + timedelta(days=rng.randint(0, 15)),
+                )
+            elif action < 0.6:
+                self.manager.cancel_rental(rental.rental_id)
+
+        def full_scan(start_date, end_date):
+            relevant = [
+                r
+                for r in self.manager.rentals.values()
+                if r.start_date <= end_date
+                and (
+                    r.actual_return_date is None
+                    or r.actual_return_date >= start_date
+                )
+            ]
+            by_status = {
+                s: [r for r in relevant if r.status == s]
+                for s in RentalStatus
+            }
+            return {
+                "total_rentals": len(relevant),
+                "completed_rentals": len(by_status[RentalStatus.COMPLETED]),
+                "active_rentals": len(by_status[RentalStatus.ACTIVE]),
+                "cancelled_rentals": len(by_status[RentalStatus.CANCELLED]),
+                "overdue_rentals": len(
+                    [
+                        r
+                        for r in by_status[RentalStatus.COMPLETED]
+                        if r.actual_return_date > r.end_date
+                    ]
+                ),
+                "total_revenue": sum(
+                    r.total_cost for r in by_status[RentalStatus.COMPLETED]
+                ),
+                "average_rental_duration": (
+                    sum(r.calculate_duration() for r in relevant)
+                    / len(relevant)
+                    if relevant
+                    else 0
+                ),
+            }
+
+        for _ in range(50):
+            start = self.today + timedelta(days=rng.randint(-5, 80))
+            end = start + timedelta(days=rng.randint(0, 30))
+            report = self.manager.generate_rental_report(start, end)
+            expected = full_scan(start, end)
+            for key, value in expected.items():
+                self.assertAlmostEqual(report[key], value, msg=key)
+
+    def test_reviews_and_average_rating(self):
+        """Test indeksu opinii i średniej oceny klienta"""
+        self.assertEqual(self.manager.get_reviews_for_customer("CUST001"), [])
+        self.assertEqual(
+            self.manager.get_average_rating_for_customer("CUST001"), 0.0
+        )
+
+        ratings = [5, 4, 2]
+        rentals = []
+        for i, rating in enumerate(ratings):
+            start = self.today + timedelta(days=i * 5)
+            rental = self.manager.create_rental(
+                customer=self.customer,
+                vehicle=self.vehicle,
+                start_date=start,
+                end_date=start + timedelta(days=2),
+            )
+            self.manager.complete_rental(
+                rental.rental_id, start + timedelta(days=2)
+            )
+            self.manager.add_review(
+                rental.rental_id, rating, "Komentarz", self.today
+            )
+            rentals.append(rental)
+
+        reviews = self.manager.get_reviews_for_customer("CUST001")
+        self.assertEqual([r.rating for r in reviews], ratings)
+        self.assertAlmostEqual(
+            self.manager.get_average_rating_for_customer("CUST001"), 11 / 3
+        )
+        self.assertEqual(
+            [
+                r.rating
+                for r in self.manager.get_reviews_for_rental(
+                    rentals[1].rental_id
+                )
+            ],
+            [4],
+        )
+        self.assertEqual(self.manager.get_reviews_for_customer("CUST002"), [])
+        self.assertEqual(self.manager.get_reviews_for_rental("BRAK"), [])
+
+    def test_search_reviews(self):
+        """Test wyszukiwania opinii po słowach kluczowych"""
+        rental = self.manager.create_rental(
+            customer=self.customer,
+            vehicle=self.vehicle,
+            start_date=self.today,
+            end_date=self.today + timedelta(days=2),
+        )
+        self.manager.complete_rental(
+            rental.rental_id, self.today + timedelta(days=2)
+        )
+        review = self.manager.add_review(
+            rental.rental_id, 1, "Awaria hamulców", self.today
+        )
+        self.assertEqual(self.manager.search_reviews(["hamulce"]), [])
+        self.assertEqual(self.manager.search_reviews(["hamul"]), [review])
+        self.assertEqual(
+            self.manager.search_reviews(["awaria", "brudny"], match_all=True),
+            [],
+        )
+
+    def test_create_rentals_batch(self):
+        """Test tworzenia wypożyczeń partią z wynikiem dla każdego
+        zgłoszenia"""
+        self.customer.upgrade_category(CustomerCategory.GOLD)
+        expired = Customer(
+            customer_id="CUST002",
+            first_name="Anna",
+            last_name="Nowak",
+            email="anna.nowak@example.com",
+            phone="987654321",
+            address="ul. Kwiatowa 2, Kraków",
+            driving_license=DrivingLicense(
+                license_number="XYZ987654",
+                issue_date=self.today - timedelta(days=3650),
+                expiry_date=self.today - timedelta(days=1),
+                categories=["B"],
+            ),
+        )
+        later = self.today + timedelta(days=10)
+
+        results = self.manager.create_rentals(
+            [
+                (self.customer, self.vehicle, later, later),
+                # Kolizja z poprzednim zgłoszeniem tej samej partii
+                (self.customer, self.vehicle, later, later),
+                (self.customer, self.vehicle, self.today, self.today),
+                (expired, self.vehicle, later, later),
+                ("CUST001", self.vehicle, later, later),
+                (self.customer, self.vehicle, later),
+                (
+                    self.customer,
+                    self.vehicle,
+                    self.today - timedelta(days=1),
+                    self.today,
+                ),
+            ]
+        )
+
+        self.assertIsInstance(results[0], Rental)
+        self.assertEqual(results[0].daily_rate, 135.0)
+        self.assertIsInstance(results[1], RentalException)
+        self.assertIn("zarezerwowany", str(results[1]))
+        self.assertIsInstance(results[2], Rental)
+        self.assertEqual(self.vehicle.status, VehicleStatus.RENTED)
+        self.assertIsInstance(results[3], RentalException)
+        self.assertIsInstance(results[4], ValueError)
+        self.assertIsInstance(results[5], ValueError)
+        self.assertIsInstance(results[6], RentalException)
+
+        self.assertNotEqual(results[0].rental_id, results[2].rental_id)
+        self.assertEqual(
+            self.customer.rental_history,
+            [results[0].rental_id, results[2].rental_id],
+        )
+        self.assertEqual(
+            self.manager.get_customer_rentals("CUST001"),
+            [results[0], results[2]],
+        )
+        self.assertEqual(self.manager.create_rentals([]), [])
+
+    def test_start_rentals(self):
+        """Test wydania pojazdu, gdy nadejdzie termin rezerwacji"""
+        start = self.today + timedelta(days=3)
+        rental = self.manager.create_rental(
+            self.customer, self.vehicle, start, start
+        )
+        self.assertEqual(self.vehicle.status, VehicleStatus.AVAILABLE)
+        self.assertEqual(self.manager.start_rentals(self.today), [])
+
+        self.vehicle.change_status(VehicleStatus.MAINTENANCE)
+        self.assertEqual(self.manager.start_rentals(start), [])
+        self.vehicle.change_status(VehicleStatus.AVAILABLE)
+        self.assertEqual(self.manager.start_rentals(start), [rental])
+        self.assertEqual(self.vehicle.status, VehicleStatus.RENTED)
+        self.assertEqual(self.manager.start_rentals(start), [])
+
+        with self.assertRaises(ValueError):
+            self.manager.start_rentals("2030-01-01")
+
+    def test_unreturned_rental_blocks_later_bookings(self):
+        """Test rezerwacji pojazdu niezwróconego po terminie - wypożyczenie
+        zajmuje go aż do zwrotu"""
+        overdue = Rental(
+            "R-OLD",
+            self.customer,
+            self.vehicle,
+            self.today - timedelta(days=5),
+            self.today - timedelta(days=2),
+            150.0,
+        )
+        self.vehicle.change_status(VehicleStatus.RENTED)
+        self.manager._insert_rental(overdue)
+        inventory = VehicleInventory()
+        inventory.add_vehicle(self.vehicle)
+        later = self.today + timedelta(days=30)
+
+        for marked in (False, True):
+            if marked:
+                self.manager.mark_overdue_rentals(self.today)
+                self.assertEqual(overdue.status, RentalStatus.OVERDUE)
+            self.assertFalse(
+                self.manager.is_vehicle_available(self.vehicle, later, later)
+            )
+            self.assertEqual(
+                self.manager.find_available_vehicles(inventory, later, later),
+                [],
+            )
+            with self.assertRaises(RentalException):
+                self.manager.create_rental(
+                    self.customer, self.vehicle, later, later
+                )
+
+        self.manager.complete_rental("R-OLD", self.today)
+        self.assertTrue(
+            self.manager.is_vehicle_available(self.vehicle, later, later)
+        )
+        self.manager.create_rental(self.customer, self.vehicle, later, later)
+
+    def test_create_rental_undone_on_journal_error(self):
+        """Test cofnięcia zmian w pamięci, gdy zapis do dziennika
+        się nie powiódł"""
+
+        def broken(operation, *args):
+            raise OSError("dysk pełny")
+
+        self.manager._record = broken
+        with self.assertRaises(OSError):
+            self.manager.create_rental(
+                self.customer, self.vehicle, self.today, self.today
+            )
+        self.assertEqual(self.vehicle.status, VehicleStatus.AVAILABLE)
+        self.assertEqual(self.customer.rental_history, [])
+        self.assertEqual(self.manager.rentals, {})
+        self.assertEqual(self.manager.get_customer_rentals("CUST001"), [])
+        self.assertEqual(self.manager.get_active_rentals(), [])
+
+        del self.manager._record
+        rental = self.manager.create_rental(
+            self.customer, self.vehicle, self.today, self.today
+        )
+        self.assertEqual(self.manager.get_active_rentals(), [rental])
+
+    def test_concurrent_double_booking(self):
+        """Test współbieżnych rezerwacji tego samego pojazdu - tylko jedna
+        może się udać"""
+        later = self.today + timedelta(days=10)
+        barrier = threading.Barrier(16)
+        # Częste przełączanie wątków ujawnia wyścigi między sprawdzeniem
+        # dostępności a rezerwacją.
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        results = []
+
+        def book():
+            barrier.wait()
+            try:
+                results.append(
+                    self.manager.create_rental(
+                        self.customer, self.vehicle, later, later
+                    )
+                )
+            except RentalException as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=book) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        booked = [r for r in results if isinstance(r, Rental)]
+        self.assertEqual(len(results), 16)
+        self.assertEqual(len(booked), 1)
+        self.assertEqual(len(self.manager.rentals), 1)
+        self.assertEqual(
+            self.manager.availability.calendar("VEH001").bookings(),
+            [(booked[0].rental_id, later, later)],
+        )
+
+    def test_concurrent_bookings_keep_indexes_consistent(self):
+        """Test spójności indeksów przy rezerwacjach i zwrotach z wielu
+        wątków"""
+        vehicles = [
+            Vehicle(
+                vehicle_id=f"VEH{i:03d}",
+                make="Toyota",
+                model="Corolla",
+                year=2020,
+                registration_number=f"WA{i:05d}",
+                daily_rate=100.0,
+                vehicle_type=VehicleType.COMPACT,
+            )
+            for i in range(8)
+        ]
+        barrier = threading.Barrier(len(vehicles) * 2)
+        errors = []
+
+        def worker(vehicle, offset):
+            barrier.wait()
+            try:
+                for day in range(offset, 40, 2):
+                    start = self.today + timedelta(days=day + 1)
+                    rental = self.manager.create_rental(
+                        self.customer, vehicle, start, start
+                    )
+                    if day % 4 == offset:
+                        self.manager.cancel_rental(rental.rental_id)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=worker, args=(vehicle, offset))
+            for vehicle in vehicles
+            for offset in (0, 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.manager.rentals), 8 * 40)
+        self.assertEqual(
+            len(self.manager.get_customer_rentals("CUST001")), 8 * 40
+        )
+        self.assertEqual(len(self.customer.rental_history), 8 * 40)
+        report = self.manager.generate_rental_report(
+            self.today, self.today + timedelta(days=41)
+        )
+        self.assertEqual(report["total_rentals"], 8 * 40)
+        self.assertEqual(report["cancelled_rentals"], 8 * 20)
+        self.assertEqual(
+            len(
+                self.manager.get_overdue_rentals(
+                    self.today + timedelta(days=42)
+                )
+            ),
+            8 * 20,
+        )
+        for vehicle in vehicles:
+            self.assertEqual(
+                len(self.manager.availability.calendar(vehicle.vehicle_id)),
+                20,
+            )
+
     if __name__ == "__main__":
         unittest.main()
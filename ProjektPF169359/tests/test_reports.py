@@ -0,0 +1,107 @@
+import random
+import unittest
+from datetime import date, timedelta
+from src.customers import Customer, DrivingLicense
+from src.rental import RentalManager
+from src.vehicles import Vehicle, VehicleType
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from src.reports import RentalColumns
+
+
+@unittest.skipIf(numpy is None, "Brak biblioteki numpy")
+class TestRentalColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        license = DrivingLicense(
+            license_number="ABC123456",
+            issue_date=self.today - timedelta(days=365),
+            expiry_date=self.today + timedelta(days=365),
+            categories=["B"],
+        )
+        self.customer = Customer(
+            customer_id="CUST001",
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan.kowalski@example.com",
+            phone="123456789",
+            address="ul. Przykładowa 1, Warszawa",
+            driving_license=license,
+        )
+        self.manager = RentalManager()
+        rng = random.Random(11)
+        for i in range(60):
+            vehicle = Vehicle(
+                vehicle_id=f"VEH{i:03d}",
+                make="Toyota",
+                model="Corolla",
+                year=2020,
+                registration_number=f"WA{i:05d}",
+                daily_rate=100.0 + i,
+                vehicle_type=VehicleType.COMPACT,
+            )
+            start = self.today + timedelta(days=rng.randint(0, 60))
+            rental = self.manager.create_rental(
+                customer=self.customer,
+                vehicle=vehicle,
+                start_date=start,
+                end_date=start + timedelta(days=rng.randint(0, 10)),
+            )
+            action = rng.random()
+            if action < 0.4:
+                self.manager.complete_rental(
+                    rental.rental_id,
+                    start + timedelta(days=rng.randint(0, 15)),
+                )
+            elif action < 0.6:
+                self.manager.cancel_rental(rental.rental_id)
+
+    def test_columns(self):
+        """Test zawartości kolumn migawki"""
+        columns = RentalColumns.from_manager(self.manager)
+        self.assertEqual(len(columns), 60)
+        rental = next(iter(self.manager.rentals.values()))
+        self.assertEqual(columns.start[0], rental.start_date.toordinal())
+        self.assertEqual(columns.daily_rate[0], rental.daily_rate)
+
+    def test_report_matches_manager(self):
+        """Test zgodności raportu kolumnowego z raportem menedżera"""
+        columns = RentalColumns.from_manager(self.manager)
+        rng = random.Random(3)
+        for _ in range(30):
+            start = self.today + timedelta(days=rng.randint(-5, 80))
+            end = start + timedelta(days=rng.randint(0, 30))
+            expected = self.manager.generate_rental_report(start, end)
+            report = columns.generate_rental_report(start, end)
+            for key, value in expected.items():
+                self.assertAlmostEqual(report[key], value, msg=key)
+
+    def test_empty_snapshot(self):
+        """Test raportu dla pustej migawki"""
+        columns = RentalColumns([])
+        report = columns.generate_rental_report(self.today, self.today)
+        self.assertEqual(report["total_rentals"], 0)
+        self.assertEqual(report["total_revenue"], 0)
+        self.assertEqual(report["average_rental_duration"], 0)
+
+    def test_invalid_arguments(self):
+        """Test walidacji argumentów"""
+        with self.assertRaises(ValueError):
+            RentalColumns.from_manager("nie_menedzer")
+        columns = RentalColumns([])
+        with self.assertRaises(ValueError):
+            columns.generate_rental_report("nie_data", self.today)
+        with self.assertRaises(ValueError):
+            columns.generate_rental_report(
+                self.today + timedelta(days=1), self.today
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 from datetime import date, timedelta
-from src.reviews import Review
+from src.reviews import KeywordMatcher, Review, ReviewSearchIndex
 
 
 class TestReview(unittest.TestCase):
@@ -164,5 +164,124 @@ class TestReview(unittest.TestCase):
         )
 
 
+class TestKeywordMatcher(unittest.TestCase):
+
+    def test_find(self):
+        """Test wyszukiwania wielu słów kluczowych jednym przebiegiem"""
+        matcher = KeywordMatcher(["brudny", "awaria", "RYS", "rysa", "a"])
+        self.assertEqual(
+            matcher.find("Auto BRUDNE, na drzwiach rysa"),
+            ["RYS", "rysa", "a"],
+        )
+        self.assertEqual(matcher.find("Brudny pojazd"), ["brudny", "a"])
+        self.assertEqual(matcher.find("Brudny wóz"), ["brudny"])
+        self.assertEqual(matcher.find("xyz"), [])
+        self.assertEqual(matcher.find(""), [])
+
+    def test_overlapping_keywords(self):
+        """Test słów kluczowych będących swoimi fragmentami"""
+        matcher = KeywordMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(matcher.find("ushers"), ["he", "she", "hers"])
+        self.assertEqual(matcher.find("ahishe"), ["he", "she", "his"])
+
+    def test_matches_agrees_with_contains_keywords(self):
+        """Test zgodności z Review.contains_keywords"""
+        keywords = ["czyst", "mochód", "OBSŁUGA", "awaria", "brudny"]
+        matcher = KeywordMatcher(keywords)
+        comments = [
+            "Samochód był bardzo czysty i zadbany",
+            "Bardzo dobra obsługa",
+            "Wszystko w porządku",
+            "",
+        ]
+        for comment in comments:
+            review = Review("RENT001", "CUST001", 4, comment, date.today())
+            self.assertEqual(
+                matcher.matches(comment), review.contains_keywords(keywords)
+            )
+            self.assertEqual(
+                review.matched_keywords(matcher),
+                [k for k in keywords if review.contains_keywords([k])],
+            )
+
+    def test_duplicate_keywords(self):
+        """Test ignorowania powtórzonych słów kluczowych"""
+        matcher = KeywordMatcher(["awaria", "AWARIA"])
+        self.assertEqual(matcher.keywords, ["awaria"])
+        self.assertEqual(matcher.find("Awaria!"), ["awaria"])
+
+    def test_invalid_keywords(self):
+        """Test walidacji słów kluczowych"""
+        with self.assertRaises(ValueError):
+            KeywordMatcher("awaria")
+        with self.assertRaises(ValueError):
+            KeywordMatcher(["awaria", ""])
+        with self.assertRaises(ValueError):
+            KeywordMatcher([1])
+
+
+class TestReviewSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.index = ReviewSearchIndex()
+        self.reviews = [
+            Review("R1", "C1", 2, "Samochód był brudny", self.today),
+            Review("R2", "C2", 1, "Awaria klimatyzacji, BRUDNE fotele",
+                   self.today),
+            Review("R3", "C1", 5, "Czysty i zadbany samochód", self.today),
+            Review("R4", "C3", 3, "", self.today),
+        ]
+        for review in self.reviews:
+            self.index.add(review)
+
+    def test_search_any(self):
+        """Test wyszukiwania opinii z dowolnym słowem kluczowym"""
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(
+            self.index.search(["brudny", "awaria"]), self.reviews[:2]
+        )
+        self.assertEqual(
+            self.index.search(["SAMOCHOD"]),
+            [self.reviews[0], self.reviews[2]],
+        )
+
+    def test_search_all(self):
+        """Test wyszukiwania opinii ze wszystkimi słowami kluczowymi"""
+        self.assertEqual(
+            self.index.search(["samochód", "czyst"], match_all=True),
+            [self.reviews[2]],
+        )
+        self.assertEqual(
+            self.index.search(["awaria", "czysty"], match_all=True), []
+        )
+
+    def test_search_prefix_and_diacritics(self):
+        """Test dopasowania początków słów bez polskich znaków"""
+        self.assertEqual(self.index.search(["brudn"]), self.reviews[:2])
+        self.assertEqual(self.index.search(["klimatyzacja"]), [])
+        self.assertEqual(
+            self.index.search(["klimatyzac"]), [self.reviews[1]]
+        )
+        self.assertEqual(
+            self.index.search(["zadbany samochód"]), [self.reviews[2]]
+        )
+
+    def test_search_no_matches(self):
+        """Test wyszukiwania bez wyników"""
+        self.assertEqual(self.index.search([]), [])
+        self.assertEqual(self.index.search(["problem"]), [])
+        self.assertEqual(self.index.search(["!!!"]), [])
+
+    def test_invalid_arguments(self):
+        """Test walidacji argumentów"""
+        with self.assertRaises(ValueError):
+            self.index.add("nie_opinia")
+        with self.assertRaises(ValueError):
+            self.index.search("brudny")
+        with self.assertRaises(ValueError):
+            self.index.search([1])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import unittest
+from datetime import date, timedelta
+from src.customers import Customer, CustomerRegistry, DrivingLicense
+from src.rental import Rental, RentalException, RentalManager, RentalStatus
+from src.service import RentalService
+from src.vehicles import Vehicle, VehicleInventory, VehicleType
+
+
+class TestRentalService(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.registry = CustomerRegistry()
+        self.inventory = VehicleInventory()
+        self.manager = RentalManager()
+        self.registry.register_customer(
+            Customer(
+                customer_id="CUST001",
+                first_name="Jan",
+                last_name="Kowalski",
+                email="jan.kowalski@example.com",
+                phone="123456789",
+                address="ul. Przykładowa 1, Warszawa",
+                driving_license=DrivingLicense(
+                    license_number="ABC123456",
+                    issue_date=self.today - timedelta(days=365),
+                    expiry_date=self.today + timedelta(days=365),
+                    categories=["B"],
+                ),
+            )
+        )
+        self.inventory.add_vehicle(
+            Vehicle(
+                vehicle_id="VEH001",
+                make="Toyota",
+                model="Corolla",
+                year=2020,
+                registration_number="WA12345",
+                daily_rate=150.0,
+                vehicle_type=VehicleType.COMPACT,
+            )
+        )
+        self.service = RentalService(
+            self.registry, self.inventory, self.manager
+        )
+
+    def test_invalid_arguments(self):
+        """Test walidacji argumentów konstruktora"""
+        with self.assertRaises(ValueError):
+            RentalService("rejestr", self.inventory, self.manager)
+        with self.assertRaises(ValueError):
+            RentalService(self.registry, "inwentarz", self.manager)
+        with self.assertRaises(ValueError):
+            RentalService(self.registry, self.inventory, "menedżer")
+
+    async def test_rental_lifecycle(self):
+        """Test wypożyczenia, zwrotu i raportu przez fasadę"""
+        end = self.today + timedelta(days=2)
+        rental = await self.service.create_rental(
+            "CUST001", "VEH001", self.today, end
+        )
+        self.assertIsInstance(rental, Rental)
+        self.assertIs(await self.service.get_rental(rental.rental_id), rental)
+        self.assertEqual(
+            await self.service.get_customer_rentals("CUST001"), [rental]
+        )
+        self.assertEqual(
+            await self.service.find_available_vehicles(self.today, end), []
+        )
+
+        cost = await self.service.complete_rental(rental.rental_id, end)
+        self.assertEqual(cost, 450.0)
+        self.assertEqual(rental.status, RentalStatus.COMPLETED)
+        report = await self.service.generate_rental_report(self.today, end)
+        self.assertEqual(report["completed_rentals"], 1)
+        self.assertEqual(report["total_revenue"], 450.0)
+
+    async def test_errors_propagate(self):
+        """Test przekazywania wyjątków z operacji synchronicznych"""
+        with self.assertRaises(ValueError):
+            await self.service.create_rental(
+                "CUST999", "VEH001", self.today, self.today
+            )
+        with self.assertRaises(ValueError):
+            await self.service.create_rental(
+                "CUST001", "VEH999", self.today, self.today
+            )
+        with self.assertRaises(RentalException):
+            await self.service.cancel_rental("RENT999")
+
+    async def test_concurrent_reads_coalesced(self):
+        """Test łączenia identycznych równoczesnych zapytań"""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_report(start_date, end_date):
+            calls.append((start_date, end_date))
+            started.set()
+            release.wait(5)
+            return {"total_rentals": 0}
+
+        self.manager.generate_rental_report = slow_report
+        end = self.today + timedelta(days=7)
+        tasks = [
+            asyncio.create_task(
+                self.service.generate_rental_report(self.today, end)
+            )
+            for _ in range(5)
+        ]
+        other = asyncio.create_task(
+            self.service.generate_rental_report(end, end)
+        )
+        await asyncio.to_thread(started.wait, 5)
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, other)
+
+        self.assertEqual(sorted(calls), [(self.today, end), (end, end)])
+        self.assertTrue(all(r is results[0] for r in results[:5]))
+        self.assertEqual(self.service.coalesced_reads, 4)
+
+        # Po zakończeniu zapytania kolejne wywołanie wykonuje się od nowa.
+        await self.service.generate_rental_report(self.today, end)
+        self.assertEqual(len(calls), 3)
+
+    async def test_coalesced_error_and_cancellation(self):
+        """Test przekazania błędu wszystkim oczekującym i odporności na
+        anulowanie jednego z nich"""
+        release = threading.Event()
+
+        def failing(customer_id):
+            release.wait(5)
+            raise ValueError("błąd")
+
+        self.manager.get_customer_rentals = failing
+        first = asyncio.create_task(
+            self.service.get_customer_rentals("CUST001")
+        )
+        second = asyncio.create_task(
+            self.service.get_customer_rentals("CUST001")
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        with self.assertRaises(ValueError):
+            await second
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+    async def test_writes_not_coalesced(self):
+        """Test wykonywania każdej operacji zapisu osobno"""
+        later = self.today + timedelta(days=10)
+        results = await asyncio.gather(
+            *(
+                self.service.create_rental(
+                    "CUST001", "VEH001", later, later
+                )
+                for _ in range(3)
+            ),
+            return_exceptions=True,
+        )
+        booked = [r for r in results if isinstance(r, Rental)]
+        self.assertEqual(len(booked), 1)
+        self.assertEqual(
+            sum(isinstance(r, RentalException) for r in results), 2
+        )
+
+    async def test_coalescing_disabled(self):
+        """Test wyłączenia łączenia zapytań"""
+        service = RentalService(
+            self.registry, self.inventory, self.manager, coalesce=False
+        )
+        first, second = await asyncio.gather(
+            service.get_active_rentals(), service.get_active_rentals()
+        )
+        self.assertIsNot(first, second)
+        self.assertEqual(service.coalesced_reads, 0)
+
+    async def test_read_after_write_not_coalesced_with_older_read(self):
+        """Test odczytu po zakończonym zapisie, który nie dołącza do
+        zapytania rozpoczętego przed zapisem"""
+        started = threading.Event()
+        release = threading.Event()
+        get_customer_rentals = self.manager.get_customer_rentals
+
+        def slow_rentals(customer_id):
+            rentals = get_customer_rentals(customer_id)
+            started.set()
+            release.wait(5)
+            return rentals
+
+        self.manager.get_customer_rentals = slow_rentals
+        before = asyncio.create_task(
+            self.service.get_customer_rentals("CUST001")
+        )
+        await asyncio.to_thread(started.wait, 5)
+        rental = await self.service.create_rental(
+            "CUST001", "VEH001", self.today, self.today
+        )
+        after = asyncio.create_task(
+            self.service.get_customer_rentals("CUST001")
+        )
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await before, [])
+        self.assertEqual(await after, [rental])
+        self.assertEqual(self.service.coalesced_reads, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,840 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from datetime import date, timedelta
+from src.customers import (
+    Customer,
+    CustomerCategory,
+    CustomerRegistry,
+    DrivingLicense,
+)
+from src.rental import (
+    Rental,
+    RentalException,
+    RentalManager,
+    RentalStatus,
+)
+from src.sqlite_storage import SQLiteStorage
+from src.vehicles import (
+    Car,
+    Vehicle,
+    VehicleInventory,
+    VehicleStatus,
+    VehicleType,
+)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "rental.db")
+        self.open()
+
+        self.customer = Customer(
+            customer_id="CUST001",
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan.kowalski@example.com",
+            phone="123456789",
+            address="ul. Przykładowa 1, Warszawa",
+            driving_license=DrivingLicense(
+                license_number="ABC123456",
+                issue_date=self.today - timedelta(days=365),
+                expiry_date=self.today + timedelta(days=365),
+                categories=["B", "C"],
+            ),
+        )
+        self.customer.upgrade_category(CustomerCategory.GOLD)
+        self.car = Car(
+            vehicle_id="CAR001",
+            make="Toyota",
+            model="Corolla",
+            year=2020,
+            registration_number="WA12345",
+            daily_rate=150.0,
+            vehicle_type=VehicleType.COMPACT,
+            doors=5,
+            fuel_type="Benzyna",
+            transmission="Manualna",
+        )
+        self.car.add_maintenance_record("Wymiana oleju", self.today, 200.0)
+        self.van = Vehicle(
+            vehicle_id="VAN001",
+            make="Ford",
+            model="Transit",
+            year=2019,
+            registration_number="WA54321",
+            daily_rate=250.0,
+            vehicle_type=VehicleType.VAN,
+        )
+        self.registry.register_customer(self.customer)
+        self.inventory.add_vehicle(self.car)
+        self.inventory.add_vehicle(self.van)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmpdir.cleanup()
+
+    def open(self):
+        self.storage = SQLiteStorage(self.path)
+        self.registry = CustomerRegistry(self.storage)
+        self.inventory = VehicleInventory(self.storage)
+        self.manager = RentalManager(self.storage)
+
+    def reopen(self):
+        self.storage.close()
+        self.open()
+
+    def test_invalid_storage(self):
+        """Test przekazania niepoprawnego magazynu"""
+        with self.assertRaises(TypeError):
+            CustomerRegistry("baza")
+        with self.assertRaises(TypeError):
+            VehicleInventory("baza")
+        with self.assertRaises(TypeError):
+            RentalManager("baza")
+        with self.assertRaises(ValueError):
+            SQLiteStorage("")
+
+    def test_customers_survive_restart(self):
+        """Test odczytu klientów po ponownym otwarciu bazy"""
+        self.reopen()
+        self.assertEqual(self.registry.customers, {})
+        customer = self.registry.get_customer("CUST001")
+        self.assertEqual(customer.full_name(), "Jan Kowalski")
+        self.assertEqual(customer.category, CustomerCategory.GOLD)
+        self.assertEqual(customer.driving_license.categories, ["B", "C"])
+        self.assertEqual(
+            customer.registration_date, self.customer.registration_date
+        )
+        self.assertIs(self.registry.get_customer("CUST001"), customer)
+        self.assertEqual(self.registry.count_customers(), 1)
+        self.assertEqual(
+            self.registry.find_customers_by_last_name("KOWALSKI"), [customer]
+        )
+        self.assertEqual(
+            self.registry.get_customers_by_category(CustomerCategory.GOLD),
+            [customer],
+        )
+        self.assertEqual(
+            self.registry.count_customers_by_category(),
+            {
+                CustomerCategory.STANDARD: 0,
+                CustomerCategory.SILVER: 0,
+                CustomerCategory.GOLD: 1,
+                CustomerCategory.PLATINUM: 0,
+            },
+        )
+        with self.assertRaises(ValueError):
+            self.registry.register_customer(self.customer)
+
+    def test_find_customers_by_name(self):
+        """Test wyszukiwania klientów po nazwisku, prefiksie i podobieństwie
+        w bazie"""
+        customer = Customer(
+            customer_id="CUST002",
+            first_name="Łucja",
+            last_name="Wiśniewska",
+            email="lucja@example.com",
+            phone="987654321",
+            address="ul. Długa 2, Kraków",
+            driving_license=DrivingLicense(
+                license_number="XYZ987654",
+                issue_date=self.today - timedelta(days=365),
+                expiry_date=self.today + timedelta(days=365),
+                categories=["B"],
+            ),
+        )
+        self.registry.register_customer(customer)
+        # Baza sprzed wersji 1 przechowywała nazwiska małymi literami,
+        # a baza sprzed wersji 3, 4 i 5 nie miała kluczy imienia i nazwiska
+        # ani indeksu trójek z e-mailem bez domeny.
+        with self.storage._conn as conn:
+            conn.execute(
+                "UPDATE customers SET last_name_lower = lower(last_name), "
+                "last_first_key = '', first_last_key = ''"
+            )
+            conn.execute("DELETE FROM customer_terms")
+            conn.execute("DELETE FROM term_trigrams")
+            conn.execute("PRAGMA user_version = 0")
+        self.reopen()
+        find = self.registry.find_customers_by_name_prefix
+        customer = self.registry.get_customer("CUST002")
+        jan = self.registry.get_customer("CUST001")
+        self.assertEqual(
+            self.registry.find_customers_by_last_name("wisniewska"),
+            [customer],
+        )
+        self.assertEqual(find("LUC"), [customer])
+        self.assertEqual(find("wisniewska l"), [customer])
+        self.assertEqual(find("j"), [jan])
+        self.assertEqual(find("k"), [jan])
+        self.assertEqual(find("jan ", limit=1), [jan])
+        self.assertEqual(find("an"), [])
+        fuzzy = self.registry.find_customers_fuzzy
+        self.assertEqual(fuzzy("Wisniewsk"), [customer])
+        self.assertEqual(fuzzy("Kowalsky Jan"), [jan])
+        self.assertEqual(fuzzy("jan.kowalsky"), [jan])
+        self.assertEqual(fuzzy("Kowalsky", threshold=0.9), [])
+
+    def test_fuzzy_index_follows_changes(self):
+        """Test aktualizacji indeksu trójek przy zmianie i usunięciu
+        klienta"""
+        fuzzy = self.registry.find_customers_fuzzy
+        anna = Customer(
+            "CUST002",
+            "Anna",
+            "Kowalska",
+            "anna@example.com",
+            "987654321",
+            "Kraków",
+            DrivingLicense("XYZ987654", self.today, self.today, ["B"]),
+        )
+        self.registry.register_customer(anna)
+        self.assertEqual(fuzzy("Kowalsky"), [self.customer, anna])
+
+        self.customer.last_name = "Nowak"
+        self.customer.email = "jan.nowak@example.com"
+        self.registry.update_customer(self.customer)
+        self.assertEqual(fuzzy("Kowalsky"), [anna])
+        self.assertEqual(fuzzy("Nowack"), [self.customer])
+        self.registry.remove_customer("CUST002")
+        self.assertEqual(fuzzy("Kowalsky"), [])
+        # Nazwisko bez klientów znika z indeksu trójek.
+        self.assertEqual(
+            self.storage._conn.execute(
+                "SELECT COUNT(*) FROM term_trigrams WHERE term = 'kowalska'"
+            ).fetchone()[0],
+            0,
+        )
+        self.reopen()
+        self.assertEqual(
+            [
+                c.customer_id
+                for c in self.registry.find_customers_fuzzy("nowak jan")
+            ],
+            ["CUST001"],
+        )
+
+    @patch("src.sqlite_storage.COMMON_GRAM_TERMS", 3)
+    def test_fuzzy_index_skips_common_grams(self):
+        """Test pominięcia list częstych trójek w indeksie"""
+        fuzzy = self.registry.find_customers_fuzzy
+        count = self.storage._conn.execute
+        anna = Customer(
+            "CUST002",
+            "Anna",
+            "Kowalska",
+            "anna@example.com",
+            "987654321",
+            "Kraków",
+            DrivingLicense("XYZ987654", self.today, self.today, ["B"]),
+        )
+        self.registry.register_customer(anna)
+        # "kow" ma już więcej niż 3 teksty, więc traci listę tekstów
+        # i nie wybiera kandydatów; klientkę wskazują rzadkie "ska", "ka ".
+        self.assertEqual(
+            count(
+                "SELECT COUNT(*) FROM term_trigrams WHERE gram = 'kow'"
+            ).fetchone()[0],
+            0,
+        )
+        self.assertEqual(fuzzy("Kowalska"), [anna])
+        self.assertEqual(fuzzy("Kowalsky"), [])
+
+        self.registry.remove_customer("CUST002")
+        self.assertEqual(fuzzy("Kowalska"), [])
+        # Liczba częstej trójki nie maleje aż do przebudowy indeksu.
+        self.assertEqual(
+            count(
+                "SELECT terms FROM trigram_counts WHERE gram = 'kow'"
+            ).fetchone()[0],
+            5,
+        )
+        self.assertIsNone(
+            count(
+                "SELECT terms FROM trigram_counts WHERE gram = 'ska'"
+            ).fetchone()
+        )
+
+    def test_unique_fields(self):
+        """Test wyszukiwania i unikalności pól klienta w bazie"""
+        self.reopen()
+        customer = self.registry.get_customer_by_email(
+            "JAN.KOWALSKI@example.com"
+        )
+        self.assertEqual(customer.customer_id, "CUST001")
+        self.assertIs(
+            self.registry.get_customer_by_phone("123-456-789"), customer
+        )
+        self.assertIs(
+            self.registry.get_customer_by_license_number("abc123456"), customer
+        )
+
+        duplicate = Customer(
+            customer_id="CUST002",
+            first_name="Anna",
+            last_name="Nowak",
+            email="anna@example.com",
+            phone="123456789",
+            address="ul. Długa 2, Kraków",
+            driving_license=DrivingLicense(
+                license_number="XYZ987654",
+                issue_date=self.today - timedelta(days=365),
+                expiry_date=self.today + timedelta(days=365),
+                categories=["B"],
+            ),
+        )
+        with self.assertRaises(ValueError):
+            self.registry.register_customer(duplicate)
+        duplicate.phone = "987654321"
+        self.registry.register_customer(duplicate)
+
+        self.registry.remove_customer("CUST001")
+        self.assertIsNone(self.registry.get_customer_by_phone("123456789"))
+        self.registry.register_customer(
+            Customer(
+                "CUST003",
+                "Jan",
+                "Kowalski",
+                customer.email,
+                "555555555",
+                "Warszawa",
+                DrivingLicense(
+                    "XYZ000000", self.today, self.today, ["B"]
+                ),
+            )
+        )
+        self.reopen()
+        self.assertEqual(
+            self.registry.get_customer_by_email(
+                "jan.kowalski@example.com"
+            ).customer_id,
+            "CUST003",
+        )
+
+    def test_update_and_remove_customer(self):
+        """Test zapisu zmian i usuwania klienta"""
+        self.customer.upgrade_category(CustomerCategory.PLATINUM)
+        self.registry.update_customer(self.customer)
+        self.registry.remove_customer("CUST001")
+        with self.assertRaises(ValueError):
+            self.registry.remove_customer("CUST001")
+        self.reopen()
+        self.assertIsNone(self.registry.get_customer("CUST001"))
+        self.assertEqual(self.registry.count_customers(), 0)
+        removed = self.storage.load_customer("CUST001", include_removed=True)
+        self.assertEqual(removed.category, CustomerCategory.PLATINUM)
+
+    def test_category_change_persisted(self):
+        """Test zapisu bezpośredniej zmiany kategorii klienta w magazynie"""
+        self.customer.upgrade_category(CustomerCategory.PLATINUM)
+        self.assertEqual(
+            self.registry.count_customers_by_category()[
+                CustomerCategory.PLATINUM
+            ],
+            1,
+        )
+        self.reopen()
+        customer = self.registry.get_customer("CUST001")
+        customer.upgrade_category(CustomerCategory.SILVER)
+        self.assertEqual(
+            self.registry.count_customers_by_category(),
+            {
+                CustomerCategory.STANDARD: 0,
+                CustomerCategory.SILVER: 1,
+                CustomerCategory.GOLD: 0,
+                CustomerCategory.PLATINUM: 0,
+            },
+        )
+        self.registry.remove_customer("CUST001")
+        customer.upgrade_category(CustomerCategory.GOLD)
+        self.assertIsNone(self.storage.load_customer("CUST001"))
+        self.assertEqual(self.registry.count_customers(), 0)
+
+    def test_category_change_of_rental_customer_persisted(self):
+        """Test zapisu zmiany kategorii klienta wczytanego
+        z wypożyczeniem"""
+        rental_id = self.manager.create_rental(
+            self.customer, self.car, self.today, self.today
+        ).rental_id
+        self.reopen()
+        rental = self.storage.load_rental(rental_id)
+        rental.customer.upgrade_category(CustomerCategory.PLATINUM)
+        self.assertEqual(
+            self.registry.count_customers_by_category()[
+                CustomerCategory.PLATINUM
+            ],
+            1,
+        )
+        self.assertIs(self.registry.get_customer("CUST001"), rental.customer)
+
+        self.reopen()
+        self.assertEqual(
+            self.registry.get_customer("CUST001").category,
+            CustomerCategory.PLATINUM,
+        )
+        rental = self.manager.get_rental(rental_id)
+        self.registry.remove_customer("CUST001")
+        rental.customer.upgrade_category(CustomerCategory.SILVER)
+        self.assertIsNone(self.storage.load_customer("CUST001"))
+
+    def test_vehicles_survive_restart(self):
+        """Test odczytu pojazdów po ponownym otwarciu bazy"""
+        self.reopen()
+        car = self.inventory.get_vehicle("CAR001")
+        self.assertIsInstance(car, Car)
+        self.assertEqual(str(car), str(self.car))
+        self.assertEqual(car.maintenance_history, self.car.maintenance_history)
+        van = self.inventory.get_vehicle("VAN001")
+        self.assertNotIsInstance(van, Car)
+        self.assertEqual(self.inventory.get_available_vehicles(), [car, van])
+        self.assertEqual(
+            self.inventory.get_available_vehicles_by_type(VehicleType.VAN),
+            [van],
+        )
+        van.change_status(VehicleStatus.MAINTENANCE)
+        self.inventory.update_vehicle(van)
+        self.inventory.remove_vehicle("CAR001")
+        self.reopen()
+        counts = self.inventory.count_vehicles_by_status()
+        self.assertEqual(counts[VehicleStatus.MAINTENANCE], 1)
+        self.assertEqual(counts[VehicleStatus.AVAILABLE], 0)
+
+    def test_rentals_survive_restart(self):
+        """Test zapisu i odczytu wypożyczeń oraz opinii"""
+        rental = self.manager.create_rental(
+            self.customer,
+            self.car,
+            self.today,
+            self.today + timedelta(days=3),
+        )
+        future = self.manager.create_rental(
+            self.customer,
+            self.van,
+            self.today + timedelta(days=10),
+            self.today + timedelta(days=12),
+        )
+        rental.add_charge("Ubezpieczenie", 50.0)
+        self.manager.complete_rental(
+            rental.rental_id, self.today + timedelta(days=5)
+        )
+        self.manager.add_review(
+            rental.rental_id, 4, "Brudny samochód", self.today
+        )
+        expected_report = self.manager.generate_rental_report(
+            self.today, self.today + timedelta(days=30)
+        )
+
+        self.reopen()
+        loaded = self.manager.get_rental(rental.rental_id)
+        self.assertEqual(loaded.status, RentalStatus.COMPLETED)
+        self.assertEqual(loaded.total_cost, rental.total_cost)
+        self.assertEqual(
+            loaded.additional_charges, rental.additional_charges
+        )
+        self.assertIs(loaded.customer, self.registry.get_customer("CUST001"))
+        self.assertIs(loaded.vehicle, self.inventory.get_vehicle("CAR001"))
+        self.assertEqual(
+            loaded.customer.rental_history,
+            [rental.rental_id, future.rental_id],
+        )
+        self.assertEqual(
+            [
+                r.rental_id
+                for r in self.manager.get_customer_rentals("CUST001")
+            ],
+            [rental.rental_id, future.rental_id],
+        )
+        self.assertEqual(
+            [r.rental_id for r in self.manager.get_active_rentals()],
+            [future.rental_id],
+        )
+        self.assertEqual(
+            len(self.manager.get_vehicle_rental_history("CAR001")), 1
+        )
+        self.assertEqual(
+            len(
+                self.manager.get_overdue_rentals(
+                    self.today + timedelta(days=20)
+                )
+            ),
+            1,
+        )
+        self.assertEqual(
+            self.manager.generate_rental_report(
+                self.today, self.today + timedelta(days=30)
+            ),
+            expected_report,
+        )
+        self.assertEqual(expected_report["overdue_rentals"], 1)
+        self.assertEqual(
+            self.manager.get_average_rating_for_customer("CUST001"), 4.0
+        )
+        self.assertEqual(
+            len(self.manager.get_reviews_for_rental(rental.rental_id)), 1
+        )
+        self.assertEqual(len(self.manager.search_reviews(["brudny"])), 1)
+
+    def test_mark_overdue_rentals(self):
+        """Test oznaczania przeterminowanych wypożyczeń w magazynie"""
+        rental = self.manager.create_rental(
+            self.customer,
+            self.car,
+            self.today,
+            self.today + timedelta(days=3),
+        )
+        checked = self.today + timedelta(days=5)
+        marked = self.manager.mark_overdue_rentals(checked)
+        self.assertEqual([r.rental_id for r in marked], [rental.rental_id])
+
+        self.reopen()
+        loaded = self.manager.get_rental(rental.rental_id)
+        self.assertEqual(loaded.status, RentalStatus.OVERDUE)
+        self.assertEqual(self.manager.get_active_rentals(), [])
+        self.assertEqual(self.manager.get_overdue_rentals(checked), [loaded])
+        self.assertEqual(self.manager.mark_overdue_rentals(checked), [])
+        self.manager.complete_rental(rental.rental_id, checked)
+        self.assertEqual(self.manager.get_overdue_rentals(checked), [])
+
+    def test_start_rentals(self):
+        """Test wydania pojazdu z magazynu, gdy nadejdzie termin
+        rezerwacji"""
+        start = self.today + timedelta(days=3)
+        rental_id = self.manager.create_rental(
+            self.customer, self.car, start, start
+        ).rental_id
+        self.assertEqual(self.manager.start_rentals(self.today), [])
+        self.inventory.change_vehicle_status(
+            "CAR001", VehicleStatus.MAINTENANCE
+        )
+        self.assertEqual(self.manager.start_rentals(start), [])
+        self.inventory.change_vehicle_status("CAR001", VehicleStatus.AVAILABLE)
+
+        self.reopen()
+        started = self.manager.start_rentals(start)
+        self.assertEqual([r.rental_id for r in started], [rental_id])
+        self.assertEqual(self.manager.start_rentals(start), [])
+        self.reopen()
+        self.assertEqual(
+            self.inventory.get_vehicle("CAR001").status, VehicleStatus.RENTED
+        )
+
+    def test_unreturned_rental_blocks_later_bookings(self):
+        """Test rezerwacji w magazynie pojazdu niezwróconego po terminie"""
+        overdue = Rental(
+            "R-OLD",
+            self.customer,
+            self.car,
+            self.today - timedelta(days=5),
+            self.today - timedelta(days=2),
+            150.0,
+        )
+        self.car.change_status(VehicleStatus.RENTED)
+        self.manager._insert_rental(overdue)
+        later = self.today + timedelta(days=30)
+
+        self.reopen()
+        car = self.inventory.get_vehicle("CAR001")
+        self.assertFalse(self.manager.is_vehicle_available(car, later, later))
+        self.assertEqual(
+            self.manager.find_available_vehicles(self.inventory, later, later),
+            [self.inventory.get_vehicle("VAN001")],
+        )
+        self.manager.mark_overdue_rentals(self.today)
+        with self.assertRaises(RentalException):
+            self.manager.create_rental(self.customer, car, later, later)
+
+        self.manager.complete_rental("R-OLD", self.today)
+        self.assertTrue(self.manager.is_vehicle_available(car, later, later))
+
+    def test_bookings_checked_in_storage(self):
+        """Test wykrywania kolizji terminów zapisanych w bazie"""
+        future = self.manager.create_rental(
+            self.customer,
+            self.car,
+            self.today + timedelta(days=10),
+            self.today + timedelta(days=12),
+        )
+        self.reopen()
+        with self.assertRaises(RentalException):
+            self.manager.create_rental(
+                self.registry.get_customer("CUST001"),
+                self.inventory.get_vehicle("CAR001"),
+                self.today + timedelta(days=12),
+                self.today + timedelta(days=14),
+            )
+        free = self.manager.find_available_vehicles(
+            self.inventory,
+            self.today + timedelta(days=11),
+            self.today + timedelta(days=11),
+        )
+        self.assertEqual([v.vehicle_id for v in free], ["VAN001"])
+
+        self.manager.cancel_rental(future.rental_id)
+        self.assertTrue(
+            self.manager.is_vehicle_available(
+                self.inventory.get_vehicle("CAR001"),
+                self.today + timedelta(days=12),
+                self.today + timedelta(days=14),
+            )
+        )
+
+    def test_bulk_load_writes_through_to_storage(self):
+        """Test hurtowego importu bezpośrednio do magazynu"""
+        fleet = os.path.join(self.tmpdir.name, "fleet.csv")
+        with open(fleet, "w", encoding="utf-8", newline="") as f:
+            f.write(
+                "vehicle_id,make,model,year,registration_number,"
+                "daily_rate,vehicle_type,doors,fuel_type,transmission\n"
+                "V1,Fiat,Panda,2019,WA1,90,economy,,,\n"
+                "CAR001,Fiat,Panda,2019,WA2,90,economy,,,\n"
+                "V3,Skoda,Fabia,2021,WA3,110,compact,5,benzyna,manualna\n"
+            )
+        customers = os.path.join(self.tmpdir.name, "customers.ndjson")
+        with open(customers, "w", encoding="utf-8") as f:
+            f.write(
+                '{"customer_id": "C1", "first_name": "Anna",'
+                ' "last_name": "Nowak", "email": "anna@example.com",'
+                ' "phone": "123", "address": "Kraków",'
+                ' "license_number": "L1", "license_issue_date": "2020-01-01",'
+                ' "license_expiry_date": "2030-01-01",'
+                ' "license_categories": ["B"], "category": "silver"}\n'
+            )
+
+        result = self.inventory.load_vehicles(fleet)
+        self.assertEqual(result.loaded, 2)
+        self.assertEqual(result.errors[0].line, 3)
+        self.assertEqual(self.registry.load_customers(customers).loaded, 1)
+        # Wczytane rekordy nie są trzymane w pamięci menedżerów.
+        self.assertNotIn("V1", self.inventory.vehicles)
+        self.assertNotIn("C1", self.registry.customers)
+
+        self.storage.close()
+        self.open()
+        self.assertIsInstance(self.inventory.get_vehicle("V3"), Car)
+        self.assertEqual(self.inventory.get_vehicle("V1").daily_rate, 90.0)
+        self.assertEqual(
+            self.registry.get_customers_by_category(CustomerCategory.SILVER),
+            [self.registry.get_customer("C1")],
+        )
+
+    def test_create_rentals_in_one_transaction(self):
+        """Test partii wypożyczeń zapisanej w magazynie"""
+        start = self.today + timedelta(days=5)
+        results = self.manager.create_rentals(
+            [
+                (self.customer, self.car, start, start),
+                (self.customer, self.car, start, start),
+                (self.customer, self.van, start, start),
+            ]
+        )
+        self.assertIsInstance(results[1], RentalException)
+
+        self.storage.close()
+        self.open()
+        self.assertEqual(
+            sorted(r.rental_id for r in self.manager.get_active_rentals()),
+            sorted([results[0].rental_id, results[2].rental_id]),
+        )
+
+    def test_failed_batch_undone_in_memory(self):
+        """Test cofnięcia zmian w pamięci po wycofanej partii wypożyczeń"""
+        save_rental = self.storage.save_rental
+        saved = []
+
+        def broken(rental):
+            if saved:
+                raise sqlite3.OperationalError("dysk pełny")
+            saved.append(rental)
+            save_rental(rental)
+
+        self.storage.save_rental = broken
+        with self.assertRaises(sqlite3.OperationalError):
+            self.manager.create_rentals(
+                [
+                    (self.customer, self.car, self.today, self.today),
+                    (self.customer, self.van, self.today, self.today),
+                ]
+            )
+        self.assertEqual(self.manager.rentals, {})
+        self.assertEqual(self.car.status, VehicleStatus.AVAILABLE)
+        self.assertEqual(self.van.status, VehicleStatus.AVAILABLE)
+        self.assertEqual(self.customer.rental_history, [])
+
+        del self.storage.save_rental
+        rental = self.manager.create_rental(
+            self.customer, self.car, self.today, self.today
+        )
+        self.reopen()
+        self.assertEqual(
+            [r.rental_id for r in self.manager.get_active_rentals()],
+            [rental.rental_id],
+        )
+        self.assertEqual(
+            self.inventory.get_vehicle("VAN001").status,
+            VehicleStatus.AVAILABLE,
+        )
+
+    def test_transaction_rollback(self):
+        """Test wycofania zmian po błędzie w transakcji"""
+        with self.assertRaises(KeyError):
+            with self.storage.transaction():
+                self.registry.remove_customer("CUST001")
+                raise KeyError("błąd")
+        self.assertIsNotNone(self.storage.load_customer("CUST001"))
+
+    def test_transition_saved_atomically(self):
+        """Test zapisu wypożyczenia i statusu pojazdu w jednej transakcji"""
+        rental = self.manager.create_rental(
+            self.customer, self.car, self.today, self.today
+        )
+
+        def broken(vehicle):
+            raise sqlite3.OperationalError("dysk pełny")
+
+        self.storage.save_vehicle = broken
+        with self.assertRaises(sqlite3.OperationalError):
+            self.manager.complete_rental(rental.rental_id, self.today)
+        self.reopen()
+        self.assertEqual(
+            self.manager.get_rental(rental.rental_id).status,
+            RentalStatus.ACTIVE,
+        )
+        self.assertEqual(
+            self.inventory.get_vehicle("CAR001").status, VehicleStatus.RENTED
+        )
+
+    def test_concurrent_bookings(self):
+        """Test rezerwacji z wielu wątków przez wspólne połączenie"""
+        later = self.today + timedelta(days=10)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def book(vehicle_id):
+            barrier.wait()
+            try:
+                results.append(
+                    self.manager.create_rental(
+                        self.registry.get_customer("CUST001"),
+                        self.inventory.get_vehicle(vehicle_id),
+                        later,
+                        later,
+                    )
+                )
+            except RentalException as e:
+                results.append(e)
+
+        self.reopen()
+        threads = [
+            threading.Thread(target=book, args=(vehicle_id,))
+            for vehicle_id in ["CAR001", "VAN001"] * 4
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8)
+        booked = sorted(
+            r.vehicle.vehicle_id
+            for r in results
+            if not isinstance(r, RentalException)
+        )
+        self.assertEqual(booked, ["CAR001", "VAN001"])
+        self.reopen()
+        self.assertEqual(
+            len(self.manager.get_customer_rentals("CUST001")), 2
+        )
+
+    def test_concurrent_batch_and_single_bookings(self):
+        """Test równoległego create_rentals i create_rental bez
+        zakleszczenia zamków pojazdów i transakcji magazynu"""
+        self.reopen()
+        customer = self.registry.get_customer("CUST001")
+        vehicles = [
+            self.inventory.get_vehicle(vehicle_id)
+            for vehicle_id in ["CAR001", "VAN001"]
+        ]
+        barrier = threading.Barrier(4)
+
+        def book_batch(offset):
+            barrier.wait()
+            for day in range(offset, 40, 4):
+                start = self.today + timedelta(days=day)
+                self.manager.create_rentals(
+                    [(customer, v, start, start) for v in vehicles[::-1]]
+                )
+
+        def book_single(offset):
+            barrier.wait()
+            for day in range(offset, 40, 4):
+                start = self.today + timedelta(days=day)
+                for vehicle in vehicles:
+                    self.manager.create_rental(
+                        customer, vehicle, start, start
+                    )
+
+        threads = [
+            threading.Thread(target=target, args=(offset,), daemon=True)
+            for offset, target in enumerate(
+                [book_batch, book_single, book_batch, book_single]
+            )
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.reopen()
+        self.assertEqual(
+            len(self.manager.get_customer_rentals("CUST001")), 80
+        )
+
+    def test_mark_overdue_concurrent_with_bookings(self):
+        """Test oznaczania przeterminowanych równolegle z rezerwacjami
+        bez zakleszczenia zamków pojazdów i transakcji magazynu"""
+        self.reopen()
+        customer = self.registry.get_customer("CUST001")
+        vehicles = [
+            self.inventory.get_vehicle(vehicle_id)
+            for vehicle_id in ["CAR001", "VAN001"]
+        ]
+        checked = self.today + timedelta(days=100)
+        barrier = threading.Barrier(2)
+        marked = []
+
+        def sweep():
+            barrier.wait()
+            for _ in range(40):
+                marked.extend(self.manager.mark_overdue_rentals(checked))
+
+        def book():
+            barrier.wait()
+            for day in range(40):
+                start = self.today + timedelta(days=day)
+                for vehicle in vehicles:
+                    self.manager.create_rental(
+                        customer, vehicle, start, start
+                    )
+
+        threads = [
+            threading.Thread(target=target, daemon=True)
+            for target in [sweep, book]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        marked.extend(self.manager.mark_overdue_rentals(checked))
+        self.assertEqual(len({r.rental_id for r in marked}), 80)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from src.customers import Customer, DrivingLicense
+from src.rental import RentalManager, RentalStatus
+from src.sweeper import OverdueSweeper
+from src.vehicles import Vehicle, VehicleStatus, VehicleType
+
+
+class TestOverdueSweeper(unittest.TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.manager = RentalManager()
+        customer = Customer(
+            customer_id="CUST001",
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan.kowalski@example.com",
+            phone="123456789",
+            address="ul. Przykładowa 1, Warszawa",
+            driving_license=DrivingLicense(
+                license_number="ABC123456",
+                issue_date=self.today - timedelta(days=365),
+                expiry_date=self.today + timedelta(days=365),
+                categories=["B"],
+            ),
+        )
+        vehicle = Vehicle(
+            vehicle_id="VEH001",
+            make="Toyota",
+            model="Corolla",
+            year=2020,
+            registration_number="WA12345",
+            daily_rate=150.0,
+            vehicle_type=VehicleType.COMPACT,
+        )
+        self.rental = self.manager.create_rental(
+            customer, vehicle, self.today, self.today + timedelta(days=1)
+        )
+        self.now = self.today
+
+    def clock(self):
+        return self.now
+
+    def test_invalid_arguments(self):
+        """Test walidacji parametrów"""
+        with self.assertRaises(ValueError):
+            OverdueSweeper("menedżer")
+        with self.assertRaises(ValueError):
+            OverdueSweeper(self.manager, interval=0)
+
+    def test_sweep(self):
+        """Test pojedynczego przebiegu dla daty z zegara"""
+        sweeper = OverdueSweeper(self.manager, clock=self.clock)
+        self.assertEqual(sweeper.sweep(), [])
+        self.assertEqual(self.rental.status, RentalStatus.ACTIVE)
+
+        self.now = self.today + timedelta(days=2)
+        self.assertEqual(sweeper.sweep(), [self.rental])
+        self.assertEqual(self.rental.status, RentalStatus.OVERDUE)
+        self.assertEqual(sweeper.sweep(), [])
+        self.assertEqual((sweeper.sweeps, sweeper.marked), (3, 1))
+
+    def test_sweep_starts_rentals(self):
+        """Test wydania pojazdu rezerwacji w przebiegu w dniu jej
+        rozpoczęcia"""
+        vehicle = Vehicle(
+            vehicle_id="VEH002",
+            make="Ford",
+            model="Focus",
+            year=2021,
+            registration_number="WA54321",
+            daily_rate=120.0,
+            vehicle_type=VehicleType.COMPACT,
+        )
+        start = self.today + timedelta(days=1)
+        self.manager.create_rental(self.rental.customer, vehicle, start, start)
+        sweeper = OverdueSweeper(self.manager, clock=self.clock)
+        sweeper.sweep()
+        self.assertEqual(vehicle.status, VehicleStatus.AVAILABLE)
+
+        self.now = start
+        sweeper.sweep()
+        self.assertEqual(vehicle.status, VehicleStatus.RENTED)
+        self.assertEqual((sweeper.sweeps, sweeper.started), (2, 1))
+
+    def test_background_thread(self):
+        """Test przebiegów w wątku w tle i jego zatrzymania"""
+        self.now = self.today + timedelta(days=2)
+        swept = threading.Event()
+        sweeper = OverdueSweeper(self.manager, interval=0.01)
+        sweeper.clock = lambda: swept.set() or self.now
+
+        with sweeper:
+            self.assertTrue(sweeper.running)
+            with self.assertRaises(RuntimeError):
+                sweeper.start()
+            self.assertTrue(swept.wait(timeout=5))
+        self.assertFalse(sweeper.running)
+        self.assertEqual(self.rental.status, RentalStatus.OVERDUE)
+
+    def test_error_does_not_stop_thread(self):
+        """Test kontynuowania przebiegów po błędzie"""
+        calls = []
+
+        def clock():
+            calls.append(True)
+            if len(calls) == 1:
+                return "nie data"
+            return self.today + timedelta(days=2)
+
+        sweeper = OverdueSweeper(self.manager, interval=0.01, clock=clock)
+        sweeper.start()
+        try:
+            for _ in range(500):
+                if self.rental.status == RentalStatus.OVERDUE:
+                    break
+                time.sleep(0.01)
+        finally:
+            sweeper.stop()
+        self.assertEqual(self.rental.status, RentalStatus.OVERDUE)
+        self.assertEqual(sweeper.errors, 1)
+        self.assertIsNone(sweeper.last_error)
+
+
+if __name__ == "__main__":
+    unittest.main()
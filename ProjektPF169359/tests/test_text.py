@@ -0,0 +1,30 @@
+import unittest
+from src.text import fold_name, fold_text, tokenize
+
+
+class TestText(unittest.TestCase):
+
+    def test_fold_text(self):
+        """Test usuwania polskich znaków i wielkości liter"""
+        self.assertEqual(fold_text("Zażółć GĘŚLĄ jaźń"), "zazolc gesla jazn")
+        self.assertEqual(fold_text("ŁÓDŹ"), "lodz")
+        self.assertEqual(fold_text("Müller"), "muller")
+        self.assertEqual(fold_text(""), "")
+
+    def test_fold_name(self):
+        """Test klucza wyszukiwania imion i nazwisk"""
+        self.assertEqual(fold_name("  Wiśniewski "), "wisniewski")
+        self.assertEqual(fold_name("Żak", "Łucja  Anna"), "zak lucja anna")
+        self.assertEqual(fold_name(), "")
+
+    def test_tokenize(self):
+        """Test podziału tekstu na znormalizowane słowa"""
+        self.assertEqual(
+            tokenize("Samochód był BRUDNY, a klimatyzacja - awaria!"),
+            ["samochod", "byl", "brudny", "a", "klimatyzacja", "awaria"],
+        )
+        self.assertEqual(tokenize("!!! ---"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
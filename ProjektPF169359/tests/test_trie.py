@@ -0,0 +1,60 @@
+import unittest
+from itertools import islice
+from src.trie import PrefixTrie
+
+
+class TestPrefixTrie(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = PrefixTrie()
+        for i, key in enumerate(
+            ["kowalski", "kowalczyk", "kowal", "nowak", "kowalski"]
+        ):
+            self.trie.add(key, i, f"{key}-{i}")
+
+    def test_items_in_key_order(self):
+        """Test wyszukiwania prefiksu w kolejności kluczy"""
+        self.assertEqual(
+            [v for _, v in self.trie.items("kowal")],
+            ["kowal-2", "kowalczyk-1", "kowalski-0", "kowalski-4"],
+        )
+        self.assertEqual(
+            list(self.trie.items("nowak")), [("nowak", "nowak-3")]
+        )
+        self.assertEqual(list(self.trie.items("x")), [])
+        self.assertEqual(len(list(self.trie.items())), 5)
+        self.assertEqual(len(self.trie), 5)
+
+    def test_items_lazy(self):
+        """Test pobierania tylko k pierwszych wartości"""
+        first = list(islice(self.trie.items("k"), 2))
+        self.assertEqual([v for _, v in first], ["kowal-2", "kowalczyk-1"])
+
+    def test_add_replaces_same_id(self):
+        """Test zastąpienia wartości o tym samym identyfikatorze"""
+        self.trie.add("nowak", 3, "nowy")
+        self.assertEqual(list(self.trie.items("now")), [("nowak", "nowy")])
+        self.assertEqual(len(self.trie), 5)
+
+    def test_remove(self):
+        """Test usuwania wartości i pustych węzłów"""
+        self.trie.remove("kowalski", 0)
+        self.trie.remove("kowalski", 99)
+        self.trie.remove("brak", 0)
+        self.assertEqual(
+            [v for _, v in self.trie.items("kowals")], ["kowalski-4"]
+        )
+        self.trie.remove("kowalski", 4)
+        self.trie.remove("kowalczyk", 1)
+        self.assertEqual(
+            list(self.trie.items("kowal")), [("kowal", "kowal-2")]
+        )
+        node = self.trie._root
+        for char in "kowal":
+            node = node.children[char]
+        self.assertEqual(node.children, {})
+        self.assertEqual(len(self.trie), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from src.trigram import TrigramIndex, rarest_grams, similarity, trigrams
+
+
+class TestTrigrams(unittest.TestCase):
+
+    def test_trigrams(self):
+        """Test trójek znaków ze znormalizowanych słów"""
+        self.assertEqual(trigrams("Żak"), {"  z", " za", "zak", "ak "})
+        self.assertEqual(trigrams("ab, AB"), {"  a", " ab", "ab "})
+        self.assertEqual(trigrams("!!"), frozenset())
+
+    def test_similarity(self):
+        """Test podobieństwa tekstów z literówkami"""
+        self.assertEqual(similarity("Kowalski", "KOWALSKI"), 1.0)
+        self.assertAlmostEqual(similarity("Nowack", "Nowak"), 4 / 9)
+        self.assertGreater(
+            similarity("Kowalsky", "Kowalski"),
+            similarity("Kowalsky", "Nowak"),
+        )
+        self.assertEqual(similarity("Nowak", ""), 0.0)
+
+    def test_rarest_grams(self):
+        """Test wyboru najrzadszych trójek do zebrania kandydatów"""
+        grams = trigrams("abcd")
+        frequency = {"  a": 9, " ab": 5, "abc": 1, "bcd": 2, "cd ": 7}.get
+        # 5 trójek, próg 0.5: podobny termin ma co najmniej 3 z nich.
+        self.assertEqual(
+            rarest_grams(grams, 0.5, frequency), ["abc", "bcd", " ab"]
+        )
+        self.assertEqual(len(rarest_grams(grams, 1.0, frequency)), 1)
+        self.assertEqual(len(rarest_grams(grams, 0.01, frequency)), 5)
+        # Trójki częstsze niż limit są pomijane.
+        self.assertEqual(
+            rarest_grams(grams, 0.5, frequency, limit=4), ["abc", "bcd"]
+        )
+
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        for i, term in enumerate(["kowalski", "kowalczyk", "nowak"]):
+            self.index.add(term, i, term.upper())
+        self.index.add("nowak", 3, "NOWAK-2")
+
+    def search(self, query, threshold=0.3):
+        return [
+            (round(score, 3), value)
+            for score, _, values in self.index.search(query, threshold)
+            for value in values.values()
+        ]
+
+    def test_search(self):
+        """Test wyszukiwania terminów podobnych do zapytania"""
+        self.assertEqual(
+            self.search("nowack"), [(0.444, "NOWAK"), (0.444, "NOWAK-2")]
+        )
+        self.assertEqual(
+            self.search("kowalsky"),
+            [(0.636, "KOWALSKI"), (0.357, "KOWALCZYK")],
+        )
+        self.assertEqual(self.search("kowalsky", 0.5), [(0.636, "KOWALSKI")])
+        self.assertEqual(self.search("zzz"), [])
+        self.assertEqual(self.search("!!"), [])
+        self.assertEqual(len(self.index), 4)
+
+    def test_prefix_filter_keeps_threshold_matches(self):
+        """Test, że pominięcie częstych trójek nie gubi wyników"""
+        index = TrigramIndex()
+        terms = [f"ab{i}" for i in range(50)]
+        terms += ["abcdefghij", "xbcdefghij", "abcdefghiz"]
+        for i, term in enumerate(terms):
+            index.add(term, i, term)
+        for threshold in (0.1, 0.3, 0.5, 0.8):
+            expected = {
+                t for t in terms if similarity("abcdefghij", t) >= threshold
+            }
+            found = {t for _, t, _ in index.search("abcdefghij", threshold)}
+            self.assertEqual(found, expected)
+
+    def test_remove(self):
+        """Test usuwania wartości i nieużywanych terminów"""
+        self.index.remove("nowak", 2)
+        self.index.remove("nowak", 99)
+        self.index.remove("brak", 0)
+        self.assertEqual(self.search("nowak"), [(1.0, "NOWAK-2")])
+        self.index.remove("nowak", 3)
+        self.assertEqual(self.search("nowak"), [])
+        self.assertNotIn("now", self.index._postings)
+        self.assertEqual(len(self.index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from datetime import date
 from src.vehicles import (
@@ -34,6 +36,13 @@ class TestVehicle(unittest.TestCase):
         self.assertEqual(self.vehicle.status, VehicleStatus.AVAILABLE)
         self.assertEqual(self.vehicle.maintenance_history, [])
 
+    def test_compact_representation(self):
+        """Test zwartej reprezentacji pojazdu"""
+        self.assertFalse(hasattr(self.vehicle, "__dict__"))
+        self.assertIsNone(self.vehicle._maintenance_history)
+        self.vehicle.add_maintenance_record("Przegląd", date.today(), 0)
+        self.assertEqual(len(self.vehicle._maintenance_history), 1)
+
     def test_vehicle_str_representation(self):
         """Test reprezentacji tekstowej pojazdu"""
         expected_str = "Toyota Corolla (2020) - WA12345"
@@ -440,5 +449,98 @@ class TestVehicleInventory(unittest.TestCase):
         self.assertEqual(counts[VehicleStatus.OUT_OF_SERVICE], 0)
 
 
+class TestVehicleBulkLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.inventory = VehicleInventory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        return path
+
+    def test_load_vehicles_from_csv(self):
+        """Test hurtowego wczytywania pojazdów z CSV"""
+        path = self.write(
+            "fleet.csv",
+            "vehicle_id,make,model,year,registration_number,daily_rate,"
+            "vehicle_type,status,doors,fuel_type,transmission\n"
+            "V1,Toyota,Corolla,2020,WA1,150.5,compact,,,,\n"
+            "V2,Skoda,Octavia,2021,WA2,200,standard,rented,5,diesel,"
+            "manualna\n"
+            "\n"
+            "V3,Fiat,Panda,1800,WA3,90,economy,,,,\n"
+            "V4,Fiat,Panda,2019,WA4,0,economy,,,,\n"
+            "V5,Fiat,Panda,2019,WA5,90,truck,,,,\n"
+            "V6,Fiat,Panda,2019,WA6,90,economy,,0,benzyna,manualna\n"
+            "V1,Fiat,Panda,2019,WA7,90,economy,,,,\n"
+            "V8,Fiat\n",
+        )
+
+        result = self.inventory.load_vehicles(path, chunk_size=2)
+
+        self.assertEqual(result.loaded, 2)
+        self.assertEqual([e.line for e in result.errors], [5, 6, 7, 8, 9, 10])
+        self.assertIn("Rok produkcji", result.errors[0].message)
+        self.assertIn("już istnieje", result.errors[4].message)
+
+        vehicle = self.inventory.get_vehicle("V1")
+        self.assertNotIsInstance(vehicle, Car)
+        self.assertEqual(vehicle.year, 2020)
+        self.assertEqual(vehicle.daily_rate, 150.5)
+        self.assertEqual(vehicle.status, VehicleStatus.AVAILABLE)
+        self.assertEqual(vehicle.maintenance_history, [])
+
+        car = self.inventory.get_vehicle("V2")
+        self.assertIsInstance(car, Car)
+        self.assertEqual(car.doors, 5)
+        self.assertEqual(car.vehicle_type, VehicleType.STANDARD)
+        self.assertEqual(car.status, VehicleStatus.RENTED)
+
+    def test_load_vehicles_from_ndjson(self):
+        """Test hurtowego wczytywania pojazdów z NDJSON"""
+        path = self.write(
+            "fleet.ndjson",
+            '{"vehicle_id": "V1", "make": "Toyota", "model": "Corolla",'
+            ' "year": 2020, "registration_number": "WA1",'
+            ' "daily_rate": 150, "vehicle_type": "compact"}\n'
+            '{"vehicle_id": "V2", "make": "Toyota", "model": "Corolla",'
+            ' "year": "2020", "registration_number": "WA2",'
+            ' "daily_rate": 150, "vehicle_type": "compact"}\n'
+            '{"vehicle_id": "V3", "make": "", "model": "Corolla",'
+            ' "year": true, "registration_number": "WA3",'
+            ' "daily_rate": 150, "vehicle_type": "compact"}\n'
+            "[1, 2]\n"
+            "{niepoprawny\n",
+        )
+        self.inventory.add_vehicle(
+            Vehicle("V0", "Fiat", "Panda", 2019, "WA0", 90.0,
+                    VehicleType.ECONOMY)
+        )
+
+        result = self.inventory.load_vehicles(path)
+
+        self.assertEqual(result.loaded, 2)
+        self.assertEqual([e.line for e in result.errors], [3, 4, 5])
+        self.assertEqual(self.inventory.get_vehicle("V2").year, 2020)
+        self.assertEqual(len(self.inventory.vehicles), 3)
+
+    def test_load_vehicles_invalid_arguments(self):
+        """Test niepoprawnych argumentów importu pojazdów"""
+        path = self.write("fleet.txt", "")
+        with self.assertRaises(ValueError):
+            self.inventory.load_vehicles(path)
+        with self.assertRaises(ValueError):
+            self.inventory.load_vehicles(path, file_format="xml")
+        with self.assertRaises(ValueError):
+            self.inventory.load_vehicles(path, "csv", chunk_size=0)
+        self.assertEqual(self.inventory.load_vehicles(path, "csv").loaded, 0)
+
+
 if __name__ == "__main__":
     unittest.main()